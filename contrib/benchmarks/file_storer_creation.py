@@ -0,0 +1,137 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+""" 
+Measures the costs of file storers created when listing a collection
+of the local file system. The previous approach creating the data, meta data,
+and privilege storers for every listed item is compared to the lazy creation.
+Allocations are reported as the number of objects tracked by the garbage 
+collector which have been created per listed item.
+
+Usage: file_storer_creation.py [number of items]
+"""
+
+
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from datafinder.persistence.common.configuration import BaseConfiguration
+from datafinder.persistence.factory import FileSystem
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_DEFAULT_NUMBER_OF_ITEMS = 10000
+_REPETITIONS = 3
+
+
+def _listEagerly(fileStorer):
+    """ Lists the children and creates all storers as done previously. """
+    
+    children = fileStorer.getChildren()
+    for child in children:
+        _ = child.dataStorer, child.metadataStorer, child.privilegeStorer
+    return children
+
+
+def _listLazily(fileStorer):
+    """ Lists the children only. """
+    
+    return fileStorer.getChildren()
+
+
+def _listWithState(fileStorer):
+    """ Lists the children and determines whether they are collections. """
+    
+    children = fileStorer.getChildren()
+    for child in children:
+        _ = child.isCollection
+    return children
+
+
+def _measure(fileSystem, listFunction):
+    """ Returns the best time and the allocated objects of the listing. """
+    
+    times = list()
+    allocations = 0
+    for _ in range(_REPETITIONS):
+        fileStorer = fileSystem.createFileStorer("/")
+        gc.collect()
+        gc.disable()
+        try:
+            objectCount = len(gc.get_objects())
+            start = time.time()
+            children = listFunction(fileStorer)
+            times.append(time.time() - start)
+            allocations = len(gc.get_objects()) - objectCount
+        finally:
+            gc.enable()
+        del children
+    return min(times), allocations
+
+
+def main():
+    """ Runs the benchmark. """
+    
+    numberOfItems = _DEFAULT_NUMBER_OF_ITEMS
+    if len(sys.argv) > 1:
+        numberOfItems = int(sys.argv[1])
+    directory = tempfile.mkdtemp()
+    try:
+        for index in range(numberOfItems):
+            open(os.path.join(directory, "item%i" % index), "wb").close()
+        fileSystem = FileSystem(BaseConfiguration("file://" + directory))
+        print("%i items" % numberOfItems)
+        print("%-25s %15s %22s" % ("Listing", "Time/item [us]", "Allocations/item"))
+        for name, listFunction in [("all storers (previous)", _listEagerly), 
+                                   ("lazy storers", _listLazily),
+                                   ("lazy storers + state", _listWithState)]:
+            duration, allocations = _measure(fileSystem, listFunction)
+            print("%-25s %15.1f %22.1f" % (name, duration / numberOfItems * 1e6, 
+                                           float(allocations) / numberOfItems))
+        fileSystem.release()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Measures how many item capability lookups per second can be performed
+on a large item tree with and without the capabilities cached on the items.
+"""
+
+
+import time
+
+from datafinder.core.item.collection import ItemRoot, ItemCollection
+from datafinder.core.item.data_persister.constants import ITEM_STATE_ACCESSIBLE, ITEM_STATE_NULL
+from datafinder.core.item.leaf import ItemLeaf
+from datafinder.core.item.privileges.privilege import READ_PRIVILEGE, WRITE_CONTENT
+from datafinder.core.item.visitor.checks import ItemCapabilityChecker
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_NUMBER_OF_COLLECTIONS = 100
+_NUMBER_OF_LEAFS = 100
+_NUMBER_OF_PASSES = 5
+
+
+class _Mock(object):
+    """ Provides the attributes given on initialization. """
+    
+    def __init__(self, **kwargs):
+        """ Constructor. """
+        
+        self.__dict__.update(kwargs)
+        
+
+class _ItemFactory(object):
+    """ Provides the capability checkers, file storers and data persisters of the items. """
+    
+    hasCustomMetadataSupport = True
+    hasMetadataSearchSupport = True
+    
+    @staticmethod
+    def createItemCapabilityChecker(item):
+        """ Creates a new capability checker. """
+        
+        return ItemCapabilityChecker(item, True, True)
+    
+    @staticmethod
+    def createFileStorer(_):
+        """ Creates a file storer mock. """
+        
+        return _Mock(canAddChildren=True, getChildren=list)
+    
+    @staticmethod
+    def createDataPersister(item):
+        """ Creates a data persister mock. """
+        
+        if item.isCollection:
+            return _Mock(state=ITEM_STATE_NULL)
+        return _Mock(state=ITEM_STATE_ACCESSIBLE)
+    
+
+def _initItem(item):
+    """ Marks the item as existing item with limited privileges. """
+    
+    item.itemFactory = _ItemFactory()
+    item._created = True
+    item._privileges = [READ_PRIVILEGE, WRITE_CONTENT]
+    
+    
+def _createTree():
+    """ Creates the item tree and returns all items of it. """
+    
+    root = ItemRoot("root")
+    root.path = "/"
+    _initItem(root)
+    items = [root]
+    for collectionIndex in range(_NUMBER_OF_COLLECTIONS):
+        collection = ItemCollection("collection%i" % collectionIndex)
+        _initItem(collection)
+        collection.parent = root
+        items.append(collection)
+        for leafIndex in range(_NUMBER_OF_LEAFS):
+            leaf = ItemLeaf("leaf%i" % leafIndex)
+            _initItem(leaf)
+            leaf.parent = collection
+            items.append(leaf)
+    return items
+
+
+def _lookupCapabilities(items, createCapabilities):
+    """ Performs the capability lookups typically done when rendering an item. """
+    
+    for _ in range(_NUMBER_OF_PASSES):
+        for item in items:
+            createCapabilities(item).canAddChildren
+            createCapabilities(item).canDelete
+            createCapabilities(item).canStoreData
+            createCapabilities(item).canStoreProperties
+
+
+def _measure(items, createCapabilities):
+    """ Returns the number of capability lookups per second. """
+    
+    start = time.time()
+    _lookupCapabilities(items, createCapabilities)
+    return len(items) * _NUMBER_OF_PASSES * 4 / (time.time() - start)
+
+
+def main():
+    """ Runs the benchmark. """
+    
+    items = _createTree()
+    uncached = _measure(items, _ItemFactory.createItemCapabilityChecker)
+    cached = _measure(items, lambda item: item.capabilities)
+    print("%i items, %i passes" % (len(items), _NUMBER_OF_PASSES))
+    print("%15s %15s" % ("Uncached [1/s]", "Cached [1/s]"))
+    print("%15.0f %15.0f" % (uncached, cached))
+
+
+if __name__ == "__main__":
+    main()
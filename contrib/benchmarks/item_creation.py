@@ -0,0 +1,156 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Counts the backend calls performed when creating the items of a listed 
+collection. A counting mock adapter registers every type check (isCollection, 
+isLink, isLeaf) as a backend call, e.g. a PROPFIND request in case of WebDAV 
+or a stat call in case of SFTP. The previous creation checking the item types 
+is compared to the creation using the item types known from the listing.
+
+Usage: item_creation.py [number of items]
+"""
+
+
+import sys
+import time
+
+from datafinder.core.item.factory import ItemFactory
+from datafinder.persistence.data.datastorer import NullDataStorer, ITEM_TYPE_COLLECTION, ITEM_TYPE_LEAF
+from datafinder.persistence.filestorer import FileStorer
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_DEFAULT_NUMBER_OF_ITEMS = 2000
+_COLLECTION_RATIO = 10 # Every tenth item is a collection
+
+
+class _CountingDataStorer(NullDataStorer):
+    """ Mocks an adapter and counts the backend calls. """
+    
+    def __init__(self, identifier, fileSystem):
+        NullDataStorer.__init__(self, identifier)
+        self._fileSystem = fileSystem
+        
+    def _isCollection(self):
+        return self.identifier == "/" or int(self.identifier.rsplit("_", 1)[1]) % _COLLECTION_RATIO == 0
+        
+    @property
+    def isCollection(self):
+        self._fileSystem.backendCalls += 1
+        return self._isCollection()
+    
+    @property
+    def isLink(self):
+        self._fileSystem.backendCalls += 1
+        return False
+    
+    @property
+    def isLeaf(self):
+        self._fileSystem.backendCalls += 1
+        return not self._isCollection()
+    
+    def getChildren(self):
+        self._fileSystem.backendCalls += 1
+        return ["/item_%i" % index for index in range(self._fileSystem.numberOfItems)]
+    
+    def getTypedChildren(self):
+        if not self._fileSystem.isTypedListing:
+            return NullDataStorer.getTypedChildren(self)
+        result = list()
+        for identifier in self.getChildren():
+            itemType = ITEM_TYPE_LEAF
+            if int(identifier.rsplit("_", 1)[1]) % _COLLECTION_RATIO == 0:
+                itemType = ITEM_TYPE_COLLECTION
+            result.append((identifier, itemType))
+        return result
+    
+
+class _FileSystem(object):
+    """ Creates file storers using the counting mock adapter. """
+    
+    def __init__(self, numberOfItems, isTypedListing):
+        self.numberOfItems = numberOfItems
+        self.isTypedListing = isTypedListing
+        self.backendCalls = 0
+        
+    def createFileStorer(self, identifier):
+        """ Creates a file storer which uses the counting mock adapter. """
+        
+        return FileStorer(self, identifier, _CountingDataStorer(identifier, self), 
+                          NullDataStorer(identifier), NullDataStorer(identifier))
+    
+
+class _Configuration(object):
+    """ Provides the configuration attributes required by the item factory. """
+    
+    dataStoreHandler = None
+    dataStoreAccessManager = None
+    propertyDefinitionRegistry = None
+
+    
+def _measure(numberOfItems, isTypedListing):
+    """ Lists the root collection and returns the backend calls and the duration. """
+    
+    fileSystem = _FileSystem(numberOfItems, isTypedListing)
+    itemFactory = ItemFactory(fileSystem, _Configuration())
+    root = itemFactory.create("/")
+    fileSystem.backendCalls = 0
+    start = time.time()
+    root.getChildren()
+    return fileSystem.backendCalls, time.time() - start
+
+
+def main():
+    """ Runs the benchmark. """
+    
+    numberOfItems = _DEFAULT_NUMBER_OF_ITEMS
+    if len(sys.argv) > 1:
+        numberOfItems = int(sys.argv[1])
+    print("%i items (every %ith item is a collection)" % (numberOfItems, _COLLECTION_RATIO))
+    print("%-25s %22s %15s" % ("Item creation", "Backend calls/item", "Time/item [us]"))
+    for name, isTypedListing in [("type checks (previous)", False), ("types from listing", True)]:
+        backendCalls, duration = _measure(numberOfItems, isTypedListing)
+        print("%-25s %22.2f %15.1f" % (name, float(backendCalls) / numberOfItems, 
+                                       duration / numberOfItems * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Measures the throughput of local file copies with the file system adapter.
+The previous approach reading and writing blocks of 30,000 bytes in Python is
+compared to the kernel-level copying used by the adapter now.
+
+Usage: local_file_copy.py [file size in MB] [target directory]
+"""
+
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from datafinder.persistence.adapters.filesystem import util
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_DEFAULT_SIZE = 512 # MB
+_PREVIOUS_BLOCK_SIZE = 30000
+_REPETITIONS = 3
+
+
+def _copyBlockWise(sourcePath, destinationPath):
+    """ Copies the file in small blocks. """
+    
+    with open(sourcePath, "rb") as source:
+        with open(destinationPath, "wb") as destination:
+            block = source.read(_PREVIOUS_BLOCK_SIZE)
+            while len(block) > 0:
+                destination.write(block)
+                block = source.read(_PREVIOUS_BLOCK_SIZE)
+            
+
+def _copyWithoutKernelSupport(sourcePath, destinationPath):
+    """ Copies the file with the tuned block size in user space. """
+    
+    copyFileRange, sendFile = util._copyFileRange, util._sendFile
+    util._copyFileRange = util._sendFile = None
+    try:
+        with open(sourcePath, "rb") as source:
+            with open(destinationPath, "wb") as destination:
+                util.copyFileObject(source, destination)
+    finally:
+        util._copyFileRange, util._sendFile = copyFileRange, sendFile
+        
+
+def _copyInKernel(sourcePath, destinationPath):
+    """ Copies the file like the file system adapter. """
+    
+    with open(sourcePath, "rb") as source:
+        with open(destinationPath, "wb") as destination:
+            util.copyFileObject(source, destination)
+
+
+def _measure(function, sourcePath, destinationPath):
+    """ Returns the best time of the copy function. """
+    
+    times = list()
+    for _ in range(_REPETITIONS):
+        start = time.time()
+        function(sourcePath, destinationPath)
+        times.append(time.time() - start)
+        os.remove(destinationPath)
+    return min(times)
+
+
+def main():
+    """ Runs the benchmark. """
+    
+    size = _DEFAULT_SIZE
+    directory = None
+    if len(sys.argv) > 1:
+        size = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        directory = sys.argv[2]
+    directory = tempfile.mkdtemp(dir=directory)
+    try:
+        sourcePath = os.path.join(directory, "source.bin")
+        with open(sourcePath, "wb") as source:
+            for _ in range(size):
+                source.write(os.urandom(1024 * 1024))
+        destinationPath = os.path.join(directory, "destination.bin")
+        print("%i MB file in '%s'" % (size, directory))
+        print("%-25s %12s %18s" % ("Approach", "Time [s]", "Throughput [MB/s]"))
+        for name, function in [("blocks of 30000 bytes", _copyBlockWise), 
+                               ("blocks of 1 MB", _copyWithoutKernelSupport),
+                               ("kernel-level copy", _copyInKernel)]:
+            duration = _measure(function, sourcePath, destinationPath)
+            print("%-25s %12.2f %18.0f" % (name, duration, size / duration))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+""" 
+Measures the query latency of the local meta data index. The index is filled
+with synthetic items organized in collections of 10,000 items. Every item has 
+a name, a category, a size, a creation date, and two keywords.
+
+Usage: metadata_index_search.py [number of items] [index path]
+"""
+
+
+import datetime
+import decimal
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from datafinder.core.search_restriction import SearchRestrictionCache
+from datafinder.persistence.adapters.metadata_index.index import MetadataIndex
+from datafinder.persistence.adapters.metadata_index.search.adapter import SearchIndexAdapter
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_DEFAULT_NUMBER_OF_ITEMS = 1000000
+_COLLECTION_SIZE = 10000
+_BATCH_SIZE = 10000
+_QUERIES = [("selective equality", "name = 'item_bcdef'", "/"),
+            ("broad equality", "category = 'category_d'", "/"),
+            ("number range", "size > '999000'", "/"),
+            ("date range", "created < '01.01.2000 00:00:00'", "/"),
+            ("combined", "category = 'category_d' and size > '990000' and not keywords = 'red'", "/"),
+            ("like", "name like 'item_bc'", "/"),
+            ("list entry in collection", "keywords = 'blue'", "/c42"),
+            ("exists in collection", "exists created", "/c7")]
+
+
+def _encode(number):
+    """ Encodes the number by letters as the restriction parser evaluates digits in literals. """
+    
+    letters = list()
+    while True:
+        number, remainder = divmod(number, 26)
+        letters.insert(0, chr(ord("a") + remainder))
+        if number == 0:
+            return "".join(letters)
+
+
+def _createItems(numberOfItems):
+    """ Creates the synthetic items. """
+    
+    startDate = datetime.datetime(1990, 1, 1)
+    keywords = [u"red", u"green", u"blue", u"yellow"]
+    items = list()
+    for index in xrange(numberOfItems):
+        collection = "/c%i" % (index // _COLLECTION_SIZE)
+        if index % _COLLECTION_SIZE == 0:
+            items.append((collection, True, dict(), None))
+        properties = {"name": u"item_" + _encode(index), 
+                      "category": u"category_" + _encode(index % 10),
+                      "size": decimal.Decimal((index * 7919) % 1000000),
+                      "created": startDate + datetime.timedelta(hours=index % 250000),
+                      "keywords": [keywords[index % 4], keywords[(index // 4) % 4]]}
+        items.append(("%s/item%i" % (collection, index), False, properties, float(index)))
+        if len(items) >= _BATCH_SIZE:
+            yield items
+            items = list()
+    if len(items) > 0:
+        yield items
+
+
+def _measure(searcher, restrictions, destination):
+    """ Returns the time until the first and the last result and the number of results. """
+    
+    start = time.time()
+    firstResultTime = None
+    hits = 0
+    for _ in searcher.search(restrictions, destination):
+        if firstResultTime is None:
+            firstResultTime = time.time() - start
+        hits += 1
+    return firstResultTime or 0, time.time() - start, hits
+
+
+class _Destination(object):
+    """ Stands in for the file storer restricting the search. """
+    
+    def __init__(self, identifier):
+        self.identifier = identifier
+
+
+def main():
+    """ Runs the benchmark. """
+    
+    numberOfItems = _DEFAULT_NUMBER_OF_ITEMS
+    if len(sys.argv) > 1:
+        numberOfItems = int(sys.argv[1])
+    directory = tempfile.mkdtemp()
+    indexPath = os.path.join(directory, "index.db")
+    if len(sys.argv) > 2:
+        indexPath = sys.argv[2]
+    index = MetadataIndex(indexPath)
+    try:
+        if index.getModificationTime("/c0/item0") is None:
+            start = time.time()
+            for items in _createItems(numberOfItems):
+                index.replaceItems(items)
+            print("Indexed %i items in %.1f s (%.1f MB)" 
+                  % (numberOfItems, time.time() - start, os.path.getsize(indexPath) / 1048576.0))
+        searcher = SearchIndexAdapter(index)
+        parser = SearchRestrictionCache()
+        print("%-26s %15s %15s %10s" % ("Query", "First hit [ms]", "All hits [ms]", "Hits"))
+        for name, restrictions, destination in _QUERIES:
+            firstResultTime, duration, hits = _measure(searcher, parser.parse(restrictions), _Destination(destination))
+            print("%-26s %15.1f %15.1f %10i" % (name, firstResultTime * 1000, duration * 1000, hits))
+    finally:
+        index.close()
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+""" 
+Measures the number of search restrictions which are parsed and mapped to 
+the WebDAV search conditions per second. The previous approach creating a 
+new parser for every search is compared to the cached parsing and mapping.
+
+Usage: search_restriction_parsing.py [number of searches]
+"""
+
+
+import sys
+import time
+
+from datafinder.core import search_restriction
+from datafinder.persistence.adapters.webdav_.search.adapter import _restrictionCache
+from datafinder.persistence.adapters.webdav_.search.search_restriction_mapping import mapSearchRestriction
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_DEFAULT_NUMBER_OF_SEARCHES = 2000
+_RESTRICTIONS = ["name like 'report' and size > '1000'",
+                 "(creationDate > '01.01.2010 00:00:00' or owner = 'me') and not exists archived",
+                 "isCollection and description like 'test'"]
+
+
+def _searchPreviously(restrictions):
+    """ Creates a new parser and maps the parsed restrictions. """
+    
+    parser = search_restriction.SearchRestrictionParser()
+    return mapSearchRestriction(parser.parseString(restrictions).asList())
+
+
+def _createCachedSearch(maxSize=search_restriction.MAX_CACHED_RESTRICTIONS):
+    """ Returns a function which uses the cached parsing and mapping. """
+    
+    cache = search_restriction.SearchRestrictionCache(maxSize)
+    def _search(restrictions):
+        return _restrictionCache.map(cache.parse(restrictions))
+    return _search
+
+
+def _measure(search, numberOfSearches):
+    """ Returns the number of searches per second. """
+    
+    start = time.time()
+    for index in range(numberOfSearches):
+        search(_RESTRICTIONS[index % len(_RESTRICTIONS)])
+    return numberOfSearches / (time.time() - start)
+
+
+def main():
+    """ Runs the benchmark. """
+    
+    numberOfSearches = _DEFAULT_NUMBER_OF_SEARCHES
+    if len(sys.argv) > 1:
+        numberOfSearches = int(sys.argv[1])
+    print("%i searches with %i different restrictions" % (numberOfSearches, len(_RESTRICTIONS)))
+    print("%-20s %20s" % ("Parsing", "Restrictions/s"))
+    print("%-20s %20.1f" % ("new parser", _measure(_searchPreviously, numberOfSearches)))
+    print("%-20s %20.1f" % ("shared parser", _measure(_createCachedSearch(0), numberOfSearches)))
+    print("%-20s %20.1f" % ("cached", _measure(_createCachedSearch(), numberOfSearches)))
+
+
+if __name__ == "__main__":
+    main()
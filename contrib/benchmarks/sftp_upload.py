@@ -0,0 +1,326 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Measures SFTP uploads against a local SSH/SFTP server stand-in. A proxy between
+client and server delays every forwarded data part to simulate the latency of a
+WAN link. The previous approach with synchronous writes of small blocks is 
+compared to the pipelined upload of the SFTP data adapter.
+
+Usage: sftp_upload.py [one-way latency in ms] [upload size in MB]
+"""
+
+
+import os
+import Queue
+import shutil
+import socket
+import StringIO
+import sys
+import tempfile
+import threading
+import time
+
+import paramiko
+
+from datafinder.persistence.adapters.sftp import constants, utils
+from datafinder.persistence.adapters.sftp.data.adapter import SftpDataAdapter
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_DEFAULT_LATENCY = 10 # milliseconds
+_DEFAULT_SIZE = 4 # MB
+_PREVIOUS_BLOCK_SIZE = 30000
+USERNAME = "benchmark"
+PASSWORD = "benchmark"
+
+
+class _ServerInterface(paramiko.ServerInterface):
+    """ Accepts the benchmark user and SFTP sessions. """
+    
+    def check_auth_password(self, username, password):
+        """ Checks the benchmark credentials. """
+        
+        if username == USERNAME and password == PASSWORD:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+    
+    def get_allowed_auths(self, _):
+        """ Only password authentication. """
+        
+        return "password"
+    
+    def check_channel_request(self, kind, _):
+        """ Only sessions are allowed. """
+        
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+    
+
+class _SftpHandle(paramiko.SFTPHandle):
+    """ Handle of a local file. """
+    
+    def stat(self):
+        """ Returns the attributes of the local file. """
+        
+        return paramiko.SFTPAttributes.from_stat(os.fstat(self.writefile.fileno()))
+    
+
+class _SftpServerInterface(paramiko.SFTPServerInterface):
+    """ Maps SFTP paths into a local directory. """
+    
+    def __init__(self, server, rootDirectory):
+        """ Constructor. """
+        
+        paramiko.SFTPServerInterface.__init__(self, server)
+        self._rootDirectory = rootDirectory
+        
+    def _localPath(self, path):
+        """ Determines the local path. """
+        
+        return os.path.join(self._rootDirectory, path.lstrip("/"))
+        
+    def open(self, path, flags, _):
+        """ Opens the local file. """
+        
+        try:
+            fileDescriptor = os.open(self._localPath(path), flags | getattr(os, "O_BINARY", 0), 0o660)
+        except OSError, error:
+            return paramiko.SFTPServer.convert_errno(error.errno)
+        if flags & os.O_WRONLY:
+            mode = "wb"
+        else:
+            mode = "rb"
+        handle = _SftpHandle(flags)
+        handle.readfile = handle.writefile = os.fdopen(fileDescriptor, mode)
+        return handle
+    
+    def stat(self, path):
+        """ Returns the attributes of the local file. """
+        
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(self._localPath(path)))
+        except OSError, error:
+            return paramiko.SFTPServer.convert_errno(error.errno)
+    lstat = stat
+    
+    
+class _LatencyProxy(object):
+    """ Forwards TCP connections and delays every data part by a fixed latency. """
+    
+    def __init__(self, targetAddress, latency):
+        """ Constructor. """
+        
+        self._targetAddress = targetAddress
+        self._latency = latency
+        self._socket = socket.socket()
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen(5)
+        self.address = self._socket.getsockname()
+        _startDaemon(self._accept)
+        
+    def _accept(self):
+        """ Accepts connections and starts the forwarding threads. """
+        
+        while True:
+            clientSocket, _ = self._socket.accept()
+            serverSocket = socket.create_connection(self._targetAddress)
+            for source, destination in [(clientSocket, serverSocket), (serverSocket, clientSocket)]:
+                dataParts = Queue.Queue()
+                _startDaemon(self._receive, source, dataParts)
+                _startDaemon(self._send, destination, dataParts)
+                
+    def _receive(self, source, dataParts):
+        """ Receives data parts and marks them with their delivery time. """
+        
+        data = source.recv(65536)
+        while data:
+            dataParts.put((time.time() + self._latency, data))
+            data = source.recv(65536)
+        dataParts.put((None, None))
+    
+    @staticmethod
+    def _send(destination, dataParts):
+        """ Delivers the data parts when their latency has elapsed. """
+        
+        deliveryTime, data = dataParts.get()
+        while not data is None:
+            delay = deliveryTime - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            destination.sendall(data)
+            deliveryTime, data = dataParts.get()
+        destination.close()
+        
+
+class LocalSftpServer(object):
+    """ SSH/SFTP server stand-in serving a temporary directory. """
+    
+    def __init__(self):
+        """ Constructor. """
+        
+        self.rootDirectory = tempfile.mkdtemp()
+        self._hostKey = paramiko.RSAKey.generate(1024)
+        self._socket = socket.socket()
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen(5)
+        self.address = self._socket.getsockname()
+        _startDaemon(self._accept)
+        
+    def _accept(self):
+        """ Starts a SSH transport for every connection. """
+        
+        while True:
+            connection, _ = self._socket.accept()
+            transport = paramiko.Transport(connection)
+            transport.window_size = constants.DEFAULT_WINDOW_SIZE # Similar to OpenSSH, limits the uploads
+            transport.add_server_key(self._hostKey)
+            transport.set_subsystem_handler(
+                "sftp", paramiko.SFTPServer, _SftpServerInterface, self.rootDirectory)
+            transport.start_server(server=_ServerInterface())
+    
+    def close(self):
+        """ Removes the served directory. """
+        
+        shutil.rmtree(self.rootDirectory, ignore_errors=True)
+    
+
+class _ConnectionPool(object):
+    """ Provides a single SFTP connection. """
+    
+    def __init__(self, connection):
+        """ Constructor. """
+        
+        self._connection = connection
+        
+    def acquire(self):
+        """ Returns the connection. """
+        
+        return self._connection
+    
+    def release(self, _):
+        """ Nothing to release. """
+        
+        pass
+        
+
+class _Configuration(object):
+    """ Upload parameters of the SFTP adapter. """
+    
+    maxParallelTransfers = 1
+    transferBlockSize = constants.DEFAULT_TRANSFER_BLOCK_SIZE
+    
+
+def _startDaemon(function, *args):
+    """ Runs the function in a daemon thread. """
+    
+    thread = threading.Thread(target=function, args=args)
+    thread.daemon = True
+    thread.start()
+    
+    
+def _connect(address):
+    """ 
+    Opens a SFTP connection. The client window size is not changed because 
+    it only affects downloads.
+    """
+    
+    transport = paramiko.Transport(address)
+    transport.connect(username=USERNAME, password=PASSWORD)
+    return transport.open_sftp_client()
+
+
+def _uploadSynchronously(address, data):
+    """ Writes small blocks and waits for every write response. """
+    
+    connection = _connect(address)
+    try:
+        start = time.time()
+        remoteFileObject = connection.open("/synchronous.bin", "w")
+        block = data.read(_PREVIOUS_BLOCK_SIZE)
+        while block:
+            remoteFileObject.write(block)
+            block = data.read(_PREVIOUS_BLOCK_SIZE)
+        remoteFileObject.close()
+        return time.time() - start
+    finally:
+        connection.close()
+    
+    
+def _uploadPipelined(address, data):
+    """ Uploads the data with the SFTP data adapter. """
+    
+    connection = _connect(address)
+    try:
+        statistics = utils.TransferStatistics()
+        adapter = SftpDataAdapter(
+            u"/pipelined.bin", "/pipelined.bin", _ConnectionPool(connection), None, None, 
+            _Configuration(), transferStatistics=statistics)
+        adapter.writeData(data)
+        return statistics.transferTime
+    finally:
+        connection.close()
+        
+
+def main():
+    """ Runs the benchmark. """
+    
+    latency = _DEFAULT_LATENCY
+    size = _DEFAULT_SIZE
+    if len(sys.argv) > 1:
+        latency = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        size = int(sys.argv[2])
+    content = os.urandom(size * 1024 * 1024)
+    server = LocalSftpServer()
+    try:
+        proxy = _LatencyProxy(server.address, latency / 1000.0)
+        print("%i MB upload, %i ms one-way latency" % (size, latency))
+        print("%-15s %12s %18s" % ("Approach", "Time [s]", "Throughput [MB/s]"))
+        for name, function in [("synchronous", _uploadSynchronously), ("pipelined", _uploadPipelined)]:
+            duration = function(proxy.address, StringIO.StringIO(content))
+            print("%-15s %12.2f %18.2f" % (name, duration, size / duration))
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
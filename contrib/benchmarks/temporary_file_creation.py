@@ -0,0 +1,114 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Measures the creation of local temporary files with C{FileStorer.getTemporaryFileObject}
+for different back ends and block sizes. The local file system is used directly. SFTP 
+is accessed via the local SFTP server stand-in of the C{sftp_upload} benchmark.
+
+Usage: temporary_file_creation.py [file size in MB]
+"""
+
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from datafinder.persistence.common.configuration import BaseConfiguration
+from datafinder.persistence.factory import FileSystem
+
+import sftp_upload
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_DEFAULT_SIZE = 64 # MB
+_PREVIOUS_BLOCK_SIZE = 30000
+_REPETITIONS = 3
+
+
+def _measure(baseUri, blockSize):
+    """ Returns the best time required to create the temporary file. """
+    
+    configuration = BaseConfiguration(baseUri, username=sftp_upload.USERNAME, 
+                                      password=sftp_upload.PASSWORD, blockSize=blockSize)
+    fileSystem = FileSystem(configuration)
+    try:
+        times = list()
+        for _ in range(_REPETITIONS):
+            fileStorer = fileSystem.createFileStorer("/data.bin")
+            start = time.time()
+            _, fileObject = fileStorer.getTemporaryFileObject()
+            times.append(time.time() - start)
+            fileObject.close()
+        return min(times), fileSystem.blockSize
+    finally:
+        fileSystem.release()
+    
+
+def main():
+    """ Runs the benchmark. """
+    
+    size = _DEFAULT_SIZE
+    if len(sys.argv) > 1:
+        size = int(sys.argv[1])
+    content = os.urandom(size * 1024 * 1024)
+    localDirectory = tempfile.mkdtemp()
+    server = sftp_upload.LocalSftpServer()
+    try:
+        for directory in [localDirectory, server.rootDirectory]:
+            with open(os.path.join(directory, "data.bin"), "wb") as fileObject:
+                fileObject.write(content)
+        backends = [("file", "file://" + localDirectory), 
+                    ("sftp", "sftp://%s:%i/" % server.address)]
+        print("%i MB file" % size)
+        print("%-10s %15s %12s %18s" % ("Back end", "Block size", "Time [s]", "Throughput [MB/s]"))
+        for name, baseUri in backends:
+            for blockSize in [_PREVIOUS_BLOCK_SIZE, None]:
+                duration, usedBlockSize = _measure(baseUri, blockSize)
+                print("%-10s %15i %12.2f %18.1f" % (name, usedBlockSize, duration, size / duration))
+    finally:
+        server.close()
+        shutil.rmtree(localDirectory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Measures the collection and parsing of a large synthetic C{dsmc query archive} 
+output. The previous approach concatenating the received output parts and parsing
+the complete output afterwards is compared to the incremental line-based parsing
+of the TSM session.
+"""
+
+
+import time
+from StringIO import StringIO
+
+from datafinder.persistence.adapters.tsm.constants import MAXIMUM_RECEIVED_BYTES
+from datafinder.persistence.adapters.tsm.data.adapter import iterateArchivedFiles
+from datafinder.persistence.adapters.tsm.session import TsmSession
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_NUMBER_OF_ENTRIES = 200000
+_ENTRY = "         1,024  B  02/14/2011 10:11:12    /archive/path/to/file%i 02/14/2012 Archive Date: 02/14/2011\n"
+
+
+class _ChannelMock(object):
+    """ Delivers the synthetic output in parts like a paramiko channel. """
+    
+    def __init__(self, output):
+        """ Constructor. """
+        
+        self._output = StringIO(output)
+        
+    def recv(self, size):
+        """ Returns the next output part. """
+        
+        return self._output.read(size)
+    
+    def recv_stderr(self, _):
+        """ No errors. """
+        
+        return ""
+    
+    def settimeout(self, _):
+        """ Ignored. """
+        
+        pass
+    
+    def exec_command(self, _):
+        """ Ignored. """
+        
+        pass
+    
+    def close(self):
+        """ Ignored. """
+        
+        pass
+    
+
+class _TransportMock(object):
+    """ Provides the channel. """
+    
+    def __init__(self, output):
+        """ Constructor. """
+        
+        self._output = output
+        
+    def open_session(self):
+        """ Returns a new channel mock. """
+        
+        return _ChannelMock(self._output)
+    
+
+def _concatenateAndParse(output):
+    """ Collects the output by string concatenation and parses it afterwards. """
+    
+    channel = _ChannelMock(output)
+    start = time.time()
+    collectedOutput = ""
+    outputPart = channel.recv(MAXIMUM_RECEIVED_BYTES)
+    while len(outputPart) > 0:
+        collectedOutput = collectedOutput + outputPart
+        outputPart = channel.recv(MAXIMUM_RECEIVED_BYTES)
+    firstEntryTime = None
+    count = 0
+    for _ in iterateArchivedFiles(collectedOutput.splitlines(True)):
+        if firstEntryTime is None:
+            firstEntryTime = time.time() - start
+        count += 1
+    return firstEntryTime, time.time() - start, count
+
+
+def _parseIncrementally(output):
+    """ Parses the output while it is received. """
+    
+    session = TsmSession(_TransportMock(output))
+    start = time.time()
+    firstEntryTime = None
+    count = 0
+    for _ in iterateArchivedFiles(session.iterateOutputLines("dsmc query archive")):
+        if firstEntryTime is None:
+            firstEntryTime = time.time() - start
+        count += 1
+    return firstEntryTime, time.time() - start, count
+
+
+def main():
+    """ Runs the benchmark. """
+    
+    output = "".join([_ENTRY % index for index in xrange(_NUMBER_OF_ENTRIES)])
+    print("%i entries, %.1f MB output" % (_NUMBER_OF_ENTRIES, len(output) / 1024.0 / 1024.0))
+    print("%-15s %18s %12s %15s" % ("Approach", "First entry [s]", "Total [s]", "Entries [1/s]"))
+    for name, function in [("concatenation", _concatenateAndParse), ("incremental", _parseIncrementally)]:
+        firstEntryTime, totalTime, count = function(output)
+        print("%-15s %18.4f %12.2f %15.0f" % (name, firstEntryTime, totalTime, count / totalTime))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Measures how many PROPFIND request bodies per second can be prepared
+with and without the request body cache of the WebDAV adapter.
+"""
+
+
+import timeit
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_SETUP = """
+from webdav import Constants
+from webdav.WebdavRequests import createFindBody
+from datafinder.persistence.adapters.webdav_ import util
+from datafinder.persistence.adapters.webdav_.constants import LINK_TARGET_PROPERTY, RESOURCE_TYPE_PROPERTY
+
+propertyIds = %s
+"""
+_PROPERTY_SETS = {"resource type": "[LINK_TARGET_PROPERTY, RESOURCE_TYPE_PROPERTY]",
+                  "privileges": "[(Constants.NS_DAV, Constants.PROP_CURRENT_USER_PRIVILEGE_SET)]",
+                  "ACL": "[(Constants.NS_DAV, Constants.TAG_ACL)]"}
+_NUMBER_OF_REQUESTS = 100000
+
+
+def _measure(statement, propertySet):
+    """ Returns the number of prepared requests per second. """
+    
+    timer = timeit.Timer(statement, _SETUP % propertySet)
+    return _NUMBER_OF_REQUESTS / min(timer.repeat(3, _NUMBER_OF_REQUESTS))
+
+
+def main():
+    """ Runs the benchmark for all property sets. """
+    
+    print("%-15s %15s %15s" % ("Property set", "Uncached [1/s]", "Cached [1/s]"))
+    for name, propertySet in _PROPERTY_SETS.iteritems():
+        uncached = _measure("createFindBody(propertyIds)", propertySet)
+        cached = _measure("util.getFindBody(propertyIds)", propertySet)
+        print("%-15s %15.0f %15.0f" % (name, uncached, cached))
+
+
+if __name__ == "__main__":
+    main()
@@ -98,6 +98,7 @@ class ItemBase(object):
         self._properties = None
         self._ignoreChecks = False
         self._requiredPropertyDefinitions = None
+        self._capabilities = None
         
     def refresh(self, itemStateOnly=False):
         """ 
@@ -117,6 +118,7 @@ class ItemBase(object):
         self._properties = None
         self._privileges = None
         self._requiredPropertyDefinitions = None
+        self._capabilities = None
             
     def create(self, properties):
         """ 
@@ -391,6 +393,21 @@ class ItemBase(object):
         @type properties: C{list} of L{Property<datafinder.core.item.property.Property>}
         """
         
+        propertiesToStore, currentProperties = self._preparePropertyUpdate(properties)
+        try:
+            self.fileStorer.updateMetadata(propertiesToStore)
+        except (AttributeError, PersistenceError), error:
+            _logger.error(error.args)
+            self._properties = currentProperties
+            
+    def _preparePropertyUpdate(self, properties):
+        """ 
+        Adds/Updates the given properties without storing them. 
+        
+        @return: The properties in persistence format and the properties before the update.
+        @rtype: C{tuple} of C{dict}, C{dict}
+        """
+        
         if not self.capabilities.canStoreProperties:
             raise ItemError("You are not allowed to change properties!")
         propertiesToStore = dict()
@@ -401,20 +418,17 @@ class ItemBase(object):
         for prop in properties:
             if prop.propertyDefinition.category != UNMANAGED_SYSTEM_PROPERTY_CATEGORY:
                 if self.isManaged or prop.propertyDefinition.category != MANAGED_SYSTEM_PROPERTY_CATEGORY:
-                    if prop.identifier in self.properties:
-                        self.properties[prop.identifier].value = prop.value
+                    if prop.identifier in self.properties: # Keeps the current property to allow a reset
+                        propDef = self.properties[prop.identifier].propertyDefinition
                     else:
                         propDef = self.itemFactory.getPropertyDefinition(prop.identifier)
-                        self.properties[prop.identifier] = Property(propDef, prop.value)
+                    self.properties[prop.identifier] = Property(propDef, prop.value)
                     try:
                         propertiesToStore.update(**prop.toPersistenceFormat())
                     except PropertyError, error:
                         _logger.error(error.args)
-        try:
-            self.fileStorer.updateMetadata(propertiesToStore)
-        except (AttributeError, PersistenceError), error:
-            _logger.error(error.args)
-            self._properties = currentProperties
+        self._capabilities = None
+        return propertiesToStore, currentProperties
             
     def deleteProperties(self, propertyIdentifiers):
         """ 
@@ -434,6 +448,7 @@ class ItemBase(object):
             for propertyIdentifier in propertyIdentifiers:
                 if propertyIdentifier in self.properties:
                     del self.properties[propertyIdentifier]
+            self._capabilities = None
     
     @property
     def acl(self):
@@ -462,6 +477,8 @@ class ItemBase(object):
             _logger.error(error.args)
         else:
             self._acl = acl
+            self._privileges = None
+            self._capabilities = None
     
     @property
     def fileStorer(self):
@@ -597,9 +614,28 @@ class ItemBase(object):
 
     @property
     def capabilities(self):
-        """ Property holding the direct capabilities. """
+        """ 
+        Property holding the direct capabilities. The capability checker is 
+        kept with the item and re-evaluates the capabilities only when the item 
+        state they are derived from has changed.
+        """
+        
+        if self._capabilities is None:
+            self._capabilities = self.itemFactory.createItemCapabilityChecker(self)
+        return self._capabilities
+    
+    def _getCapabilityState(self):
+        """ 
+        Returns the item information the capabilities are derived from.
+        Changed privileges, properties, data persister or file storer are detected
+        by object identity. Thus, the returned objects have to be compared using C{is}.
+        
+        @return: Current state of the capability relevant item information.
+        @rtype: C{tuple}
+        """
         
-        return self.itemFactory.createItemCapabilityChecker(self)
+        return (self._created, self._ignoreChecks, self.path, self._fileStorer,
+                self._dataPersister, self._privileges, self._properties)
 
     @property
     def dataUri(self):
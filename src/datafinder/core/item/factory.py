@@ -46,12 +46,19 @@ from datafinder.core.item.leaf import ItemLeaf
 from datafinder.core.item.link import ItemLink
 from datafinder.core.item.data_persister.factory import DataPersisterFactory
 from datafinder.core.item.visitor.checks import ActionCheckTreeWalker, ItemCapabilityChecker
+from datafinder.persistence.data import datastorer
 from datafinder.persistence.error import PersistenceError
 
 
 __version__ = "$Revision-Id:$" 
 
 
+_MIN_TARGETS_PER_LISTING = 2 # Link targets of the same collection which are retrieved by listing it
+_ITEM_CLASSES = {datastorer.ITEM_TYPE_COLLECTION: ItemCollection,
+                 datastorer.ITEM_TYPE_LINK: ItemLink,
+                 datastorer.ITEM_TYPE_LEAF: ItemLeaf}
+
+
 class ItemFactory(object):
     """ Factory for the item creation. """
     
@@ -68,6 +75,7 @@ class ItemFactory(object):
         self._dataPersisterFactory = DataPersisterFactory(
             configuration.dataStoreHandler, configuration.dataStoreAccessManager ,configuration.propertyDefinitionRegistry)
         self._itemCache = dict()
+        self._linkTargetCache = dict()
                 
     def createFileStorer(self, path):
         """ 
@@ -201,7 +209,9 @@ class ItemFactory(object):
     def create(self, path, parent=None, fileStorer=None):
         """
         Returns an item for the given path. If it does not exist
-        an error is raised.
+        an error is raised. The item type known from listing the parent 
+        collection is used if the file storer provides it. Otherwise,
+        the item type is determined using the file storer.
         
         @param path: Path relative to the root item. E.g. "/a/b/c".
         @type path: C{unicode}
@@ -227,14 +237,10 @@ class ItemFactory(object):
             if path == "/":
                 item = self._createItem(ItemRoot, fileStorer, None, parent)
             else:
-                if fileStorer.isCollection:
-                    item = self._createItem(ItemCollection, fileStorer, None, parent)
-                elif fileStorer.isLink:
-                    item = self._createItem(ItemLink, fileStorer, None, parent)
-                elif fileStorer.isLeaf:
-                    item = self._createItem(ItemLeaf, fileStorer, None, parent)
-                else:
-                    raise ItemError("No valid item representation found for '%s'" % path)
+                itemClass = _ITEM_CLASSES.get(fileStorer.itemType)
+                if itemClass is None:
+                    itemClass = self._determineItemClass(fileStorer)
+                item = self._createItem(itemClass, fileStorer, None, parent)
         except PersistenceError, error:
             raise ItemError("Problem accessing item '%s'. Reason: '%s'" % (path, error.message))
         else:
@@ -242,6 +248,19 @@ class ItemFactory(object):
             self._itemCache[path] = item
             return item
 
+    @staticmethod
+    def _determineItemClass(fileStorer):
+        """ Checks the item type using the file storer. """
+        
+        if fileStorer.isCollection:
+            return ItemCollection
+        elif fileStorer.isLink:
+            return ItemLink
+        elif fileStorer.isLeaf:
+            return ItemLeaf
+        else:
+            raise ItemError("No valid item representation found for '%s'" % fileStorer.identifier)
+        
     def _createItem(self, itemClass, fileStorer=None, name=None, parent=None):
         """ Creates the concrete item. """
         
@@ -257,14 +276,104 @@ class ItemFactory(object):
         self._itemCache[item.path] = item
         return item 
     
+    def resolveLinkTargets(self, links):
+        """
+        Resolves the targets of the given links in one batch. Targets which are 
+        shared by several links and the links of link chains are resolved only once. 
+        Targets located in the same collection are retrieved by listing this collection.
+        Links which are part of a cycle are resolved to C{None}.
+        
+        @param links: The links whose targets are resolved.
+        @type links: C{list} of L{ItemLink<datafinder.core.item.link.ItemLink>}
+        
+        @return: The final non-link targets in the order of the given links. 
+                 C{None} indicates a broken link or a link cycle.
+        @rtype: C{list} of L{ItemBase<datafinder.core.item.base.ItemBase>}
+        """
+        
+        targetFileStorers = dict()
+        for link in links:
+            targetFileStorers[link.path] = self._determineLinkTargetFileStorer(link)
+        self._retrieveLinkTargets(targetFileStorers.values())
+        return [self._resolveLinkTarget(link.path, targetFileStorers) for link in links]
+    
+    @staticmethod
+    def _determineLinkTargetFileStorer(link):
+        """ Determines the file storer of the direct link target or C{None}. """
+        
+        try:
+            return link.fileStorer.linkTarget
+        except (AttributeError, PersistenceError):
+            return None
+        
+    def _retrieveLinkTargets(self, targetFileStorers):
+        """ Retrieves uncached targets located in the same collection by listing the collection once. """
+        
+        collectionTargets = dict()
+        for fileStorer in targetFileStorers:
+            if not fileStorer is None and not fileStorer.identifier in self._itemCache:
+                parentPath = fileStorer.identifier.rsplit("/", 1)[0] or "/"
+                collectionTargets.setdefault(parentPath, set()).add(fileStorer.identifier)
+        for parentPath, targetPaths in collectionTargets.iteritems():
+            if len(targetPaths) >= _MIN_TARGETS_PER_LISTING:
+                try:
+                    collection = self.create(parentPath)
+                    if collection.isCollection:
+                        collection.getChildren()
+                except ItemError:
+                    continue
+    
+    def _resolveLinkTarget(self, linkPath, targetFileStorers):
+        """ Follows the link chain starting at the given link until a non-link target is reached. """
+        
+        chain = list()
+        path = linkPath
+        targetPath = None
+        isCycle = False
+        while True:
+            if path in self._linkTargetCache and path != linkPath:
+                targetPath = self._linkTargetCache[path]
+                break
+            if path in chain:
+                isCycle = True
+                break
+            chain.append(path)
+            
+            if not path in targetFileStorers:
+                targetFileStorers[path] = self._determineLinkTargetFileStorer(self._itemCache.get(path))
+            targetFileStorer = targetFileStorers[path]
+            if targetFileStorer is None:
+                break
+            try:
+                target = self.create(targetFileStorer.identifier, fileStorer=targetFileStorer)
+            except ItemError:
+                break
+            if not target.isLink:
+                targetPath = target.path
+                break
+            path = target.path
+        
+        if not targetPath is None or isCycle:
+            for path in chain:
+                self._linkTargetCache[path] = targetPath
+        if not targetPath is None:
+            try:
+                return self.create(targetPath)
+            except ItemError:
+                return None
+        
     def invalidate(self, path):
-        """ Invalidate an entry from the item cache. """
+        """ Invalidate an entry from the item cache. Link targets resolved via this entry are invalidated as well. """
         
         if path in self._itemCache:
             del self._itemCache[path]
         for itemPath in self._itemCache.keys()[:]:
             if itemPath.startswith(path):
                 del self._itemCache[itemPath]
+        for linkPath, targetPath in self._linkTargetCache.items():
+            if linkPath.startswith(path) \
+               or (not targetPath is None and targetPath.startswith(path)):
+                del self._linkTargetCache[linkPath]
 
     def getDataType(self, dataTypeName):
         """ Retrieves the data type for the given name. """
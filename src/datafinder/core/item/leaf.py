@@ -64,17 +64,21 @@ class ItemLeaf(ItemBase):
         self._dataFormat = None
         
     def create(self, properties):
-        """ @see: L{ItemBase.create<datafinder.core.item.base.ItemBase.create>} """
+        """ 
+        @see: L{ItemBase.create<datafinder.core.item.base.ItemBase.create>} 
+        @note: The resource is created together with its properties. The properties
+               are retrieved again from the persistence backend on the next access.
+        """
 
         ItemBase.create(self, properties)
         try:
             if not self.fileStorer.exists():
-                canStoreProperties = self.capabilities.canStoreProperties
-                self.fileStorer.createResource()
-                if canStoreProperties:
-                    self.updateProperties(properties)
+                propertiesToStore = None
+                if self.capabilities.canStoreProperties:
+                    propertiesToStore = self._preparePropertyUpdate(properties)[0]
+                self.fileStorer.createResource(propertiesToStore)
                 self.dataPersister.create()
-                self._refreshProperties()
+                self._properties = None
         except PersistenceError, error:
             raise ItemError("Unable to create leaf item.\nReason:'%s'" % error.message)
         else:
@@ -97,23 +97,21 @@ class ItemLink(ItemBase):
                 self._created = True
                 
     def _getLinkTarget(self):
-        """ Getter for the link target. """
+        """ 
+        Getter for the link target. The targets of all unresolved links 
+        of the already listed parent collection are resolved together. 
+        """
         
         if self._refreshLinkTarget:
-            try:
-                targetFileStorer = self._fileStorer.linkTarget
-            except PersistenceError:
-                self._linkTarget = None
-            else:
-                if not targetFileStorer is None:
-                    try:
-                        self._linkTarget = self.itemFactory.create(targetFileStorer.identifier, 
-                                                                   fileStorer=targetFileStorer)
-                    except ItemError:
-                        self._linkTarget = None
-                else:
-                    self._linkTarget = None
-            self._refreshLinkTarget = False
+            links = [self]
+            if not self._parent is None and self._parent.childrenPopulated:
+                # Only accesses link items: pylint: disable=W0212
+                links += [child for child in self._parent.getChildren() 
+                          if child.isLink and child._refreshLinkTarget and not child is self]
+            linkTargets = self.itemFactory.resolveLinkTargets(links)
+            for link, linkTarget in zip(links, linkTargets):
+                link._linkTarget = linkTarget
+                link._refreshLinkTarget = False
             
         if not self._linkTarget is None:
             if self._linkTarget.parent is None: # checks for removed parent
@@ -469,14 +469,61 @@ class ItemCapabilityChecker(object):
     """ 
     Convenience class providing the can* methods of C{ActionCheckVisitor}.
     The item is not passed to the method but to the constructor.
+    
+    The capabilities are evaluated once and are re-evaluated only if the 
+    privileges, properties, data persister or file storer of the item have changed
+    in the meantime.
     """
     
+    _CAPABILITY_METHOD_NAMES = {
+        "canAddChildren": ActionCheckVisitor.CAPABILITY_ADD_CHILDREN,
+        "canDelete": ActionCheckVisitor.CAPABILITY_DELETE,
+        "canCopy": ActionCheckVisitor.CAPABILITY_COPY,
+        "canMove": ActionCheckVisitor.CAPABILITY_MOVE,
+        "canStoreData": ActionCheckVisitor.CAPABILITY_STORE,
+        "canRetrieveData": ActionCheckVisitor.CAPABILITY_RETRIEVE,
+        "canArchive": ActionCheckVisitor.CAPABILITY_ARCHIVE,
+        "canSearch": ActionCheckVisitor.CAPABILITY_SEARCH,
+        "canPrivileges": ActionCheckVisitor.CAPABILITY_PRIVILEGES,
+        "canRetrieveProperties": ActionCheckVisitor.CAPABILITY_RETRIEVE_PROPERTIES,
+        "canStoreProperties": ActionCheckVisitor.CAPABILITY_STORE_PROPERTIES
+    }
+    
     def __init__(self, item, hasCustomMetadataSupport=False, hasSearchSupport=False):
         """ Constructor. """
         
         self._item = item
         self._actionCheckVisitor = ActionCheckVisitor(False, hasCustomMetadataSupport, hasSearchSupport)
-        
+        self._capabilities = None
+        self._itemState = None
+        
+    @property
+    def capabilities(self):
+        """ 
+        Returns the capabilities of the item. They are only re-evaluated
+        when the relevant item state has changed since the last evaluation.
+        
+        @return: Maps the capability constants to the corresponding flag.
+        @rtype: C{dict} of C{unicode}, C{bool}
+        """
+        
+        if self._capabilities is None or self._isItemStateChanged():
+            self._actionCheckVisitor.check(self._item)
+            self._capabilities = self._actionCheckVisitor.capabilities
+            # The state is taken after the check because privileges and 
+            # the data persister are lazily initialized during the check.
+            self._itemState = self._item._getCapabilityState() # pylint: disable=W0212
+        return self._capabilities
+    
+    def _isItemStateChanged(self):
+        """ Compares the current item state with the one of the last evaluation. """
+        
+        currentItemState = self._item._getCapabilityState() # pylint: disable=W0212
+        for index, value in enumerate(currentItemState):
+            if not value is self._itemState[index]:
+                return True
+        return False
+    
     def _decorateMethodWithItemInstance(self, method):
         """ Returns a method decorated with the item instance. """
         
@@ -489,7 +536,9 @@ class ItemCapabilityChecker(object):
     def __getattr__(self, name):
         """ The implementation does the decoration magic. """
         
-        if hasattr(self._actionCheckVisitor, name):
+        if name in self._CAPABILITY_METHOD_NAMES:
+            return self.capabilities[self._CAPABILITY_METHOD_NAMES[name]]
+        elif hasattr(self._actionCheckVisitor, name):
             return self._decorateMethodWithItemInstance(getattr(self._actionCheckVisitor, name))
         else:
             raise AttributeError("AttributeError: '%s' object has no attribute '%s'" % (str(self), name))
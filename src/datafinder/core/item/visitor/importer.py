@@ -38,6 +38,10 @@
 """ This module provides a tree walker that copies all items from one repository to another. """
 
 
+import Queue
+import sys
+import threading
+
 from datafinder.common import logger
 from datafinder.core.configuration.properties.constants import CONTENT_CREATION_DATETIME_PROPERTY_ID, \
                                                                CREATION_DATETIME_ID, DATA_FORMAT_ID, SIZE_ID, \
@@ -54,11 +58,22 @@ from datafinder.core.item.visitor.base import ItemTreeWalkerBase, VisitSlot
 __version__ = "$Revision-Id:$" 
 
 
+_QUEUED_IMPORTS_PER_WORKER = 2
+
+
 class Importer(ItemTreeWalkerBase, object): # inherit from object to make pylint happy, but this is a pylint issue
     """
     This class uses the L{ItemTreeWalkerBase<datafinder.core.item.visitor.base.ItemTreeWalkerBase>}
     protocol to implement a recursive copy algorithm between two repositories. It is assumed
     (but NOT checked) that the repository configurations are compatible.
+    
+    Problems of single items do not stop the import. They are reported together at the end.
+    The sub tree of a collection which cannot be imported is skipped.
+    
+    Items are created and registered with their parents while walking the source tree. Thus,
+    a parent collection always exists before its children are imported. In the concurrent mode,
+    only the transfer of the leaf data is performed by a bounded pool of worker threads.
+    Leafs whose data cannot be transferred are removed again by the walking thread.
     """
     
     
@@ -85,10 +100,15 @@ class Importer(ItemTreeWalkerBase, object): # inherit from object to make pylint
         self._copyData = True
         self._ignoreLinks = False
         self._determinePropertiesCallback = None
+        self._isCancelledCallback = None
+        self._workerPool = None
+        self._failedItems = None
+        self._failedTransfers = None
         self.importedLeafs = None
         
     def performImport(self, source, targetCollection, newSourceName=None, 
-                      defaultProperties=None, copyData=True, ignoreLinks=False, determinePropertiesCallback=None):
+                      defaultProperties=None, copyData=True, ignoreLinks=False, determinePropertiesCallback=None,
+                      maxConcurrentImports=1, isCancelledCallback=None):
         """
         This method initiates the copy process and starts walking the source creating a
         new node in the destination tree for each item it passes.
@@ -108,9 +128,14 @@ class Importer(ItemTreeWalkerBase, object): # inherit from object to make pylint
         @param determinePropertiesCallback: Function determining properties used when importing a specific item.
         @type: determinePropertiesCallback: C{callable} using an item description as input and returns a dictionary
                                             describing the properties.
-    
+        @param maxConcurrentImports: Maximum number of leafs whose data is transferred in parallel. Default: C{1}
+        @type maxConcurrentImports: C{int}
+        @param isCancelledCallback: Optional function indicating that the import has been cancelled. 
+                                    It is called from different threads. Default: C{None}
+        @type isCancelledCallback: C{callable} without arguments returning C{bool}
         
-        @raise ItemError: Indicating errors during import.
+        @raise ItemError: Indicating errors of single items after the import 
+                          or the cancellation of the import.
         """
         
         self._pwd = targetCollection
@@ -124,8 +149,22 @@ class Importer(ItemTreeWalkerBase, object): # inherit from object to make pylint
         self.importedLeafs = list()
         self._ignoreLinks = ignoreLinks
         self._determinePropertiesCallback = determinePropertiesCallback
+        self._isCancelledCallback = isCancelledCallback
+        self._failedItems = list()
+        self._failedTransfers = Queue.Queue()
         
-        self.walk(source)
+        if maxConcurrentImports > 1:
+            self._workerPool = _ImportWorkerPool(maxConcurrentImports)
+            try:
+                self.walk(source)
+            finally:
+                workerPool, self._workerPool = self._workerPool, None
+                workerPool.join()
+                self._removeFailedTransfers()
+        else:
+            self.walk(source)
+        if self._isCancelled():
+            raise ItemError("The import has been cancelled.")
         
         missingDefferedLinkPaths = list()
         for source, importName, destinationParent in self._deferredLinks:
@@ -134,21 +173,45 @@ class Importer(ItemTreeWalkerBase, object): # inherit from object to make pylint
             except ItemError:
                 missingDefferedLinkPaths.append(source.path)
         
+        errorMessages = list()
+        if len(self._failedItems) > 0:
+            errorMessage = "The following items could not be imported:"
+            for itemPath, reason in self._failedItems:
+                errorMessage += "\n" + itemPath + " Reason: " + reason
+            errorMessages.append(errorMessage)
         if len(missingDefferedLinkPaths) > 0:
             errorMessage = "The following links could not be imported:"
             for linkPath in missingDefferedLinkPaths:
                 errorMessage += "\n" + linkPath
-            raise ItemError(errorMessage)
+            errorMessages.append(errorMessage)
+        if len(errorMessages) > 0:
+            raise ItemError("\n".join(errorMessages))
     
     def walk(self, node):
         """
         @see: L{walk<datafinder.core.item.visitor.base.ItemTreeWalkerBase.walk>} method to add further post-processing.
+        @note: Problems of single items are recorded and the sub tree of a collection 
+               which cannot be imported is skipped.
         """
 
-        super(Importer, self).walk(node)
-        if node.isCollection:
-            if not node.state in self._stopTraversalStates:
-                self._pwd = self._pwd.parent
+        self._removeFailedTransfers()
+        if self._isCancelled():
+            return
+        pwd = self._pwd
+        try:
+            super(Importer, self).walk(node)
+        except CoreError, error:
+            self._pwd = pwd
+            self._failedItems.append((node.path, error.message))
+        else:
+            if node.isCollection:
+                if not node.state in self._stopTraversalStates:
+                    self._pwd = self._pwd.parent
+                
+    def _isCancelled(self):
+        """ Checks whether the import has been cancelled. """
+        
+        return not self._isCancelledCallback is None and self._isCancelledCallback()
     
     def _copyLink(self, source, importName, destinationParent):
         """ Copies a link item. """
@@ -195,7 +258,10 @@ class Importer(ItemTreeWalkerBase, object): # inherit from object to make pylint
         return importName
 
     def _importLeaf(self, leaf):
-        """ Retrieves the content of a leaf item. """
+        """ 
+        Creates the imported leaf and retrieves the content of the source leaf. 
+        In the concurrent mode, the content is transferred by a worker thread. 
+        """
         
         if leaf.capabilities.canRetrieveData:
             importName = self._determineImportName(leaf)
@@ -207,12 +273,47 @@ class Importer(ItemTreeWalkerBase, object): # inherit from object to make pylint
                 self._handleLeafCreationError(importedLeaf, error)
             else:
                 if self._copyData:
-                    try:
-                        importedLeaf.storeData(leaf.retrieveData())
-                    except CoreError, error:
-                        self._handleLeafCreationError(importedLeaf, error)
+                    if self._workerPool is None:
+                        try:
+                            self._transferData(leaf, importedLeaf)
+                        except CoreError, error:
+                            self._handleLeafCreationError(importedLeaf, error)
                     else:
-                        self.importedLeafs.append(leaf)
+                        self._workerPool.submit(self._transferDataConcurrently, leaf, importedLeaf)
+                        
+    def _transferData(self, leaf, importedLeaf):
+        """ Copies the content of the source leaf. Only the two leafs are accessed. """
+        
+        importedLeaf.storeData(leaf.retrieveData())
+        self.importedLeafs.append(leaf)
+    
+    def _transferDataConcurrently(self, leaf, importedLeaf):
+        """ 
+        Copies the content within a worker thread. Failed transfers are handed 
+        over to the walking thread which removes the imported leaf again.
+        """
+        
+        if self._isCancelled():
+            self._failedTransfers.put((leaf, importedLeaf, ItemError("The import has been cancelled.")))
+        else:
+            try:
+                self._transferData(leaf, importedLeaf)
+            except CoreError, error:
+                self._failedTransfers.put((leaf, importedLeaf, error))
+                
+    def _removeFailedTransfers(self):
+        """ Removes the imported leafs whose content could not be transferred and records the problems. """
+        
+        while True:
+            try:
+                leaf, importedLeaf, error = self._failedTransfers.get_nowait()
+            except Queue.Empty:
+                break
+            else:
+                try:
+                    self._handleLeafCreationError(importedLeaf, error)
+                except CoreError:
+                    self._failedItems.append((leaf.path, error.message))
                         
     def _handleLeafCreationError(self, leaf, error):
         self._log.error(error.args)
@@ -264,3 +365,60 @@ class Importer(ItemTreeWalkerBase, object): # inherit from object to make pylint
                        (_importLeaf, [ItemLeaf]), 
                        (_importCollection, [ItemCollection]), 
                        (lambda self, _: None, [ItemRoot]))
+
+
+class _ImportWorkerPool(object):
+    """ 
+    Bounded pool of worker threads processing the submitted calls in submission order.
+    Submitting blocks when all workers are busy and the queue is full. 
+    """
+    
+    def __init__(self, workerNumber):
+        """
+        @param workerNumber: Number of worker threads.
+        @type workerNumber: C{int}
+        """
+        
+        self._workQueue = Queue.Queue(workerNumber * _QUEUED_IMPORTS_PER_WORKER)
+        self._unexpectedErrors = list()
+        self._workers = list()
+        for _ in range(workerNumber):
+            worker = threading.Thread(target=self._work)
+            worker.setDaemon(True)
+            worker.start()
+            self._workers.append(worker)
+            
+    def submit(self, function, *args):
+        """ Queues the call of C{function} with the given arguments. """
+        
+        self._workQueue.put((function, args))
+        
+    def join(self):
+        """ 
+        Waits until all submitted calls have been finished. 
+        Unexpected errors of the calls are re-raised afterwards.
+        """
+        
+        for _ in self._workers:
+            self._workQueue.put(None)
+        for worker in self._workers:
+            worker.join()
+        if len(self._unexpectedErrors) > 0:
+            errorType, error, traceback = self._unexpectedErrors[0]
+            raise errorType, error, traceback
+        
+    def _work(self):
+        """ Processes calls from the queue until the stop marker is received. """
+        # pylint: disable=W0703
+        # W0703: Unexpected errors are handed over to the joining thread.
+        
+        while True:
+            task = self._workQueue.get()
+            if task is None:
+                break
+            if len(self._unexpectedErrors) == 0:
+                function, args = task
+                try:
+                    function(*args)
+                except Exception:
+                    self._unexpectedErrors.append(sys.exc_info())
@@ -44,7 +44,7 @@ from pyparsing import ParseException
 
 from datafinder.core import search_restriction
 from datafinder.core.archiver import Archiver
-from datafinder.core.error import CoreError
+from datafinder.core.error import CoreError, ItemError
 from datafinder.core.item.factory import ItemFactory
 from datafinder.core.item.privileges.principal import Principal
 from datafinder.core.item.property import Property
@@ -78,6 +78,7 @@ class Repository(object):
         
         self._archiver = Archiver(self, repositoryManager)
         self._itemFactory = ItemFactory(self._fileSystem, self._configuration)
+        self._searchRestrictionCache = search_restriction.SearchRestrictionCache()
         self._identifierPattern = None
         self._customMetadataSupport = None
         self._metadataSearchSupport = None
@@ -92,7 +93,8 @@ class Repository(object):
     @Observable
     @staticmethod
     def performImport(sourceItem, targetCollection, targetItemName=None, 
-                      defaultProperties=None, copyData=True, ignoreLinks=False, determinePropertiesCallback=None):
+                      defaultProperties=None, copyData=True, ignoreLinks=False, determinePropertiesCallback=None,
+                      maxConcurrentImports=1, isCancelledCallback=None):
         """ 
         Import the given item into the repository.
         
@@ -105,7 +107,8 @@ class Repository(object):
         if not defaultProperties is None:
             defaultProperties = defaultProperties[:]
         importer.performImport(sourceItem, targetCollection, targetItemName, defaultProperties, 
-                               copyData, ignoreLinks, determinePropertiesCallback)
+                               copyData, ignoreLinks, determinePropertiesCallback, 
+                               maxConcurrentImports, isCancelledCallback)
         
     @staticmethod
     def walk(item):
@@ -201,6 +204,45 @@ class Repository(object):
         
         return Property(propertyDefinition, value)
     
+    def updateProperties(self, itemProperties):
+        """ 
+        Adds/Updates the properties of multiple items at once. In contrast to
+        L{ItemBase.updateProperties<datafinder.core.item.base.ItemBase.updateProperties>}
+        the file system is able to store the properties of different items in parallel.
+        
+        @param itemProperties: Items and the properties which are added / updated.
+        @type itemProperties: C{list} of C{tuple} of L{ItemBase<datafinder.core.item.base.ItemBase>}, 
+                              C{list} of L{Property<datafinder.core.item.property.Property>}
+        
+        @return: Maps the paths of the items which could not be updated to the reason.
+        @rtype: C{dict} keys: C{unicode}, values: C{unicode}
+        """
+        # pylint: disable=W0212
+        # W0212: The property handling of the items is reused to
+        # prepare and reset the property updates.
+        
+        failedItems = dict()
+        identifierPropertiesMap = dict()
+        preparedItems = dict()
+        for item, properties in itemProperties:
+            try:
+                propertiesToStore, currentProperties = item._preparePropertyUpdate(properties)
+            except ItemError, error:
+                failedItems[item.path] = error.message
+            else:
+                identifierPropertiesMap[item.path] = propertiesToStore
+                preparedItems[item.path] = item, currentProperties
+        
+        try:
+            errors = self._fileSystem.updateMetadata(identifierPropertiesMap)
+        except PersistenceError, error:
+            errors = dict([(path, error) for path in identifierPropertiesMap])
+        for path, error in errors.iteritems():
+            item, currentProperties = preparedItems[path]
+            item._properties = currentProperties
+            failedItems[path] = error.message
+        return failedItems
+    
     def searchPrincipal(self, pattern, searchMode):
         """ Triggers a search for principals. 
         
@@ -208,6 +250,13 @@ class Repository(object):
         @type pattern: C{unicode}
         @param searchMode: Determines type of search.
         @type searchMode: C{int}
+        
+        @return: Iterator over the matched principals. Further principals may be 
+                 retrieved while the result is iterated.
+        @rtype: C{generator} of L{Principal<datafinder.core.item.privileges.principal.Principal>}
+        
+        @raise CoreError: Indicates problems on starting the search. Problems occurring 
+                          later are raised while iterating the result.
         """
         
         try:
@@ -215,34 +264,53 @@ class Repository(object):
         except PersistenceError, error:
             raise CoreError(error.message)
         else:
-            mappedPrincipals = list()
+            return self._createPrincipals(principals)
+            
+    @staticmethod
+    def _createPrincipals(principals):
+        """ Lazily maps the principals of the search result. """
+        
+        try:
             for principal in principals:
-                mappedPrincipals.append(Principal.create(principal))
-            return mappedPrincipals
+                yield Principal.create(principal)
+        except PersistenceError, error:
+            raise CoreError(error.message)
         
-    def search(self, restrictions, collection):
+    def search(self, restrictions, collection, limit=None):
         """ Triggers a search.
         
         @param restrictions: The search restrictions.
         @type restrictions: C{unicode}
         @param collection: Restricts the search to a certain collection and its sub-items.
         @type collection: L{<ItemBase>datafinder.core.item.base.ItemBase}
+        @param limit: Optional maximum number of matched items.
+        @type limit: C{int}
+        
+        @return: Iterator over the matched items. The search is performed
+                 while the result is iterated, so the first items are available
+                 before the search has been completed.
+        @rtype: C{generator} of L{<ItemBase>datafinder.core.item.base.ItemBase}
+        
+        @raise CoreError: Indicates invalid restrictions. Problems of the search 
+                          itself are raised while iterating the result.
         """
         
-        parser = search_restriction.SearchRestrictionParser()
         try:
-            parsedRestrictions = parser.parseString(restrictions).asList()
+            parsedRestrictions = self._searchRestrictionCache.parse(restrictions)
         except ParseException, error:
             raise CoreError(str(error))
         else:
-            result = list()
-            try:
-                fileStorers = self._fileSystem.search(parsedRestrictions, collection.fileStorer)
-                for fileStorer in fileStorers:
-                    result.append(self._itemFactory.create(fileStorer.identifier, fileStorer=fileStorer))
-            except PersistenceError, error:
-                raise CoreError(str(error))
-            return result
+            fileStorers = self._fileSystem.search(parsedRestrictions, collection.fileStorer, limit)
+            return self._createSearchResultItems(fileStorers)
+            
+    def _createSearchResultItems(self, fileStorers):
+        """ Lazily creates the items of the search result. """
+        
+        try:
+            for fileStorer in fileStorers:
+                yield self._itemFactory.create(fileStorer.identifier, fileStorer=fileStorer)
+        except PersistenceError, error:
+            raise CoreError(str(error))
             
     def isValidIdentifier(self, identifier):
         """ 
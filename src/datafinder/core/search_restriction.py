@@ -40,6 +40,7 @@ Implementation of commonly used search grammar.
 """
 
 
+import threading
 import time 
 import unicodedata
 
@@ -64,6 +65,8 @@ AND_OPERATOR = "AND"
 OR_OPERATOR = "OR"
 NOT_OPERATOR = "NOT"
 
+MAX_CACHED_RESTRICTIONS = 1000
+
 
 ParserElement.enablePackrat() # Improves the performance of pyparsing
 
@@ -374,3 +377,47 @@ class SearchRestrictionParser(object):
             expressionString = expression[0]
             result.append((expressionString, startIndex, endIndex))
         return result
+
+
+
+class SearchRestrictionCache(object):
+    """ 
+    Parses search restrictions with a single parser instance and keeps
+    the parsed restrictions by restriction string. Thus, the grammar is
+    created only once and repeated searches skip the parsing.
+    """
+    
+    def __init__(self, maxSize=MAX_CACHED_RESTRICTIONS):
+        """ 
+        @param maxSize: Maximum number of cached restrictions. C{0} disables caching.
+        @type maxSize: C{int}
+        """
+        
+        self._maxSize = maxSize
+        self._parser = SearchRestrictionParser()
+        self._restrictions = dict()
+        self._lock = threading.Lock()
+        
+    def parse(self, restrictions):
+        """ 
+        Returns the parsed restrictions. The same list is returned 
+        for equal restriction strings. So it must not be modified.
+        
+        @param restrictions: The search restrictions.
+        @type restrictions: C{unicode}
+        
+        @return: Search restrictions described as hierarchical organized list.
+        @rtype: C{list}
+        
+        @raise ParseException: Signals an error parsing the given restrictions.
+        """
+        
+        with self._lock: # The packrat cache of pyparsing is not thread-safe
+            if restrictions in self._restrictions:
+                return self._restrictions[restrictions]
+            parsedRestrictions = self._parser.parseString(restrictions).asList()
+            if self._maxSize > 0:
+                if len(self._restrictions) >= self._maxSize:
+                    self._restrictions.clear()
+                self._restrictions[restrictions] = parsedRestrictions
+            return parsedRestrictions
@@ -41,6 +41,8 @@ Implements the principal search part of the privilege dialog.
 """
 
 
+import itertools
+
 from PyQt4.QtGui import QMessageBox, QStandardItemModel
 from PyQt4.QtCore import QObject, SIGNAL
 
@@ -54,6 +56,9 @@ from datafinder.gui.user.dialogs.privilege_dialog.items import PrincipalItem
 __version__ = "$Revision-Id$" 
 
 
+_PRINCIPAL_PAGE_SIZE = 50
+
+
 class PrincipalSearchController(QObject):
     """ Handles the principal search interactions. """
 
@@ -102,13 +107,13 @@ class PrincipalSearchController(QObject):
             searchMode = SEARCH_MODE_GROUP_ONLY
         
         self._searchButton.setEnabled(False)
-        self._resultWidget.setEnabled(False)
+        self._model.clearResult()
         self._workerThread = startNewQtThread(self._model.performPrincipalSearch,
                                               self._searchCallback,
                                               pattern, searchMode)    
         
     def _searchCallback(self):
-        """ Handles errors and activates search button and result view again. """
+        """ Handles errors and activates the search button again. """
         
         if not self._workerThread.error is None:
             self._messageBox.setText(self._workerThread.error.message)
@@ -116,7 +121,6 @@ class PrincipalSearchController(QObject):
         else:
             self._model.enableCurrentResult()
         self._searchButton.setEnabled(True)
-        self._resultWidget.setEnabled(True)
         self._selectionChangedSlot()
         
     def _addPrincipalSlot(self):
@@ -138,6 +142,8 @@ class PrincipalSearchController(QObject):
 class PrincipalSearchModel(QStandardItemModel):
     """ Principal search model component. """
     
+    PRINCIPALS_FOUND_SIGNAL = "principalsFoundSignal"
+    
     def __init__(self, model):
         """ Constructor. 
         
@@ -151,8 +157,17 @@ class PrincipalSearchModel(QStandardItemModel):
         self._currentResult = SPECIAL_PRINCIPALS
         self.enableCurrentResult()
         
+        self.connect(self, SIGNAL(self.PRINCIPALS_FOUND_SIGNAL), self.enableCurrentResult)
+        
+    def clearResult(self):
+        """ Resets the result to the special principals. """
+        
+        self._currentResult = SPECIAL_PRINCIPALS
+        self.enableCurrentResult()
+        
     def performPrincipalSearch(self, pattern, searchMode):
-        """ Performs the search. 
+        """ Performs the search. The found principals are published page by page 
+        using the signal L{PRINCIPALS_FOUND_SIGNAL<PrincipalSearchModel.PRINCIPALS_FOUND_SIGNAL>}. 
         
         @param pattern: Name pattern.
         @type pattern: C{unicode}
@@ -160,15 +175,21 @@ class PrincipalSearchModel(QStandardItemModel):
         @type searchMode: C{int}
         """
 
-        self._currentResult = SPECIAL_PRINCIPALS + self._model.searchPrincipal(pattern, searchMode)
+        principals = self._model.searchPrincipal(pattern, searchMode)
+        page = list(itertools.islice(principals, _PRINCIPAL_PAGE_SIZE))
+        while len(page) > 0:
+            self._currentResult = self._currentResult + page
+            self.emit(SIGNAL(self.PRINCIPALS_FOUND_SIGNAL))
+            page = list(itertools.islice(principals, _PRINCIPAL_PAGE_SIZE))
         
     def enableCurrentResult(self):
         """ Activates the current search. As the search is done in a separated thread which is
         controlled by the controller component we have to provide this explicit activation function.
         Otherwise GUI related updates would be performed in the worker thread and this leads to 
-        application crashed. """
+        application crashed. Only principals which are not displayed yet are added. """
         
-        self.clear()
-        items = [PrincipalItem(principal) for principal in self._currentResult]
-        for item in items:
-            self.appendRow(item)
+        currentResult = self._currentResult
+        if self.rowCount() > len(currentResult):
+            self.clear()
+        for principal in currentResult[self.rowCount():]:
+            self.appendRow(PrincipalItem(principal))
@@ -40,6 +40,7 @@ Implements actions of the data repository.
 """
 
 
+import itertools
 import sys
         
 from datafinder.core.configuration.properties.constants import UNMANAGED_SYSTEM_PROPERTY_CATEGORY, MANAGED_SYSTEM_PROPERTY_CATEGORY
@@ -52,6 +53,9 @@ from datafinder.gui.user.models.repository.clipboard import ItemClipboard
 __version__ = "$Revision-Id:$" 
 
 
+_SEARCH_RESULT_PAGE_SIZE = 100
+
+
 class ActionHandler(object):
     """
     Implements actions of the data repository.
@@ -236,6 +240,7 @@ class ActionHandler(object):
     def search(self, index, restrictions):
         """
         Performs a search request at the given collections with the given restrictions.
+        The search result is published in pages as soon as the items are available.
 
         @param index: Index identifying the collection that is searched.
         @type index: L{QModelIndex<PyQt4.QtCore.QModelIndex>}
@@ -247,7 +252,12 @@ class ActionHandler(object):
 
         collection = self._parentModel.nodeFromIndex(index)
         searchResult = self._repository.search(restrictions, collection)
-        self._parentModel.searchResultChangedSignal(searchResult)
+        page = list(itertools.islice(searchResult, _SEARCH_RESULT_PAGE_SIZE))
+        self._parentModel.searchResultChangedSignal(page)
+        while len(page) == _SEARCH_RESULT_PAGE_SIZE:
+            page = list(itertools.islice(searchResult, _SEARCH_RESULT_PAGE_SIZE))
+            if len(page) > 0:
+                self._parentModel.searchResultExtendedSignal(page)
 
     def createCollection(self, name, parentIndex, properties=None):
         """ 
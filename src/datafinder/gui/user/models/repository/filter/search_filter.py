@@ -70,6 +70,7 @@ class SearchFilter(BaseRepositoryFilter, QtCore.QAbstractTableModel):
         self._emptyModelIndex = QtCore.QModelIndex()
         
         self.connect(self._repositoryModel, QtCore.SIGNAL("searchResultChangedSignal"), self._searchResultChangedSlot)
+        self.connect(self._repositoryModel, QtCore.SIGNAL("searchResultExtendedSignal"), self._searchResultExtendedSlot)
         self.connect(self._repositoryModel, QtCore.SIGNAL("modelReset()"), self.clear)
         self.connect(self._repositoryModel, QtCore.SIGNAL("rowsRemoved(const QModelIndex & , int, int)"), self._handleRemovedRows)
 
@@ -84,23 +85,34 @@ class SearchFilter(BaseRepositoryFilter, QtCore.QAbstractTableModel):
         self._result = items[:]
         self._removeInvalidItems()
         self._updateSignal()
+        
+    def _searchResultExtendedSlot(self, items):
+        """ Handles items which have been appended to the search result. """
+        
+        validItems = self._determineValidItems(items)
+        if len(validItems) > 0:
+            currentRowCount = len(self._result)
+            self.beginInsertRows(self._emptyModelIndex, currentRowCount, currentRowCount + len(validItems) - 1)
+            self._result.extend(validItems)
+            self.endInsertRows()
+        self._updateSignal()
 
     def _removeInvalidItems(self):
         """ Removes invalid items (removed from source model) from the current result. """
         
-        invalids = list()
-        for item_ in self._result:
+        self._result = self._determineValidItems(self._result)
+        self.reset()  
+        
+    def _determineValidItems(self, items):
+        """ Returns the items which are still contained in the source model. """
+        
+        validItems = list()
+        for item_ in items:
             path = item_.path
             item = self._repositoryModel.nodeFromPath(path)
-            if item is None:
-                invalids.append(item_)
-            elif not item.path == path:
-                invalids.append(item_)
-        if len(invalids) > 0:
-            invalids.reverse()
-            for invalid in invalids:
-                self._result.remove(invalid)
-        self.reset()  
+            if not item is None and item.path == path:
+                validItems.append(item_)
+        return validItems
         
     def data(self, index, role):
         """
@@ -227,6 +227,16 @@ class HistoryModel(QtCore.QAbstractItemModel):
         """
         
         self.emit(QtCore.SIGNAL("searchResultChangedSignal"), items)
+        
+    def searchResultExtendedSignal(self, items):
+        """
+        Emits the search result extended signal to all connected views.
+
+        @param items: List of items which have been appended to the search result.
+        @type index: C{list}
+        """
+        
+        self.emit(QtCore.SIGNAL("searchResultExtendedSignal"), items)
 
 
     activeIndex = property(_getIndex, _setIndex)
@@ -40,11 +40,23 @@ Defines configuration parameters for the file system implementation.
 """
 
 
+from datafinder.persistence.adapters.filesystem.util import COPY_BLOCK_SIZE
+
+
 __version__ = "$Revision-Id:$" 
 
 
+DEFAULT_ITEM_STATE_CACHE_TIMEOUT = 10 # seconds
+
+
 class Configuration(object):
-    """ Defines the configuration parameters. """
+    """ 
+    Defines the configuration parameters. 
+    
+    @ivar itemStateCacheTimeout: Time in seconds the item states determined when
+                                 listing a directory are reused. C{0} disables the cache.
+    @ivar blockSize: Size in bytes of the blocks used when data cannot be copied by the kernel.
+    """
     
     def __init__(self, baseConfiguration):
         """ 
@@ -66,3 +78,7 @@ class Configuration(object):
         self.basePath = baseConfiguration.uriPath
         self.username = baseConfiguration.username
         self.password = baseConfiguration.password
+        self.itemStateCacheTimeout = baseConfiguration.itemStateCacheTimeout
+        if self.itemStateCacheTimeout is None:
+            self.itemStateCacheTimeout = DEFAULT_ITEM_STATE_CACHE_TIMEOUT
+        self.blockSize = baseConfiguration.blockSize or COPY_BLOCK_SIZE
@@ -51,13 +51,10 @@ from datafinder.persistence.error import PersistenceError
 __version__ = "$Revision-Id$" 
 
 
-_BLOCK_SIZE = 30000
-
-
 class DataFileSystemAdapter(NullDataStorer):
     """ Implements data storer interface for a standard file system. """
 
-    def __init__(self, identifier, itemIdMapper):
+    def __init__(self, identifier, itemIdMapper, itemStateCache=None, blockSize=util.COPY_BLOCK_SIZE):
         """ 
         Constructor.
         
@@ -65,11 +62,21 @@ class DataFileSystemAdapter(NullDataStorer):
         @type identifier: C{unicode}
         @param itemIdMapper: Utility object allowing item identifier mapping.
         @type itemIdMapper: L{ItemIdentifierMapper<datafinder.persistence.adapters.filesystem.util.ItemIdentifierMapper>}
+        @param itemStateCache: Optional cache of the item states which is shared with the other adapters.
+        @type itemStateCache: L{ItemStateCache<datafinder.persistence.adapters.filesystem.util.ItemStateCache>}
+        @param blockSize: Size in bytes of the blocks used when data cannot be copied by the kernel.
+        @type blockSize: C{int}
         """
         
         NullDataStorer.__init__(self, identifier)
         self._itemIdMapper = itemIdMapper
         self._persistenceId = self._itemIdMapper.mapIdentifier(identifier)
+        self._itemStateCache = itemStateCache
+        self._blockSize = blockSize
+        
+    def _invalidateItemState(self, persistenceId):
+        if not self._itemStateCache is None:
+            self._itemStateCache.invalidate(persistenceId)
 
     @property
     def linkTarget(self):
@@ -84,18 +91,26 @@ class DataFileSystemAdapter(NullDataStorer):
     def isLink(self):
         """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}  """
         
+        if not self._itemStateCache is None:
+            isLink = self._itemStateCache.determine(self._persistenceId).isLink
+            if not isLink is None:
+                return isLink
         return util.createShortcut(self._persistenceId).isLink()
 
     @property
     def isCollection(self):
         """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}  """
         
+        if not self._itemStateCache is None:
+            return self._itemStateCache.determine(self._persistenceId).isCollection
         return os.path.isdir(self._persistenceId)
 
     @property
     def isLeaf(self):
         """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}  """
         
+        if not self._itemStateCache is None:
+            return self._itemStateCache.determine(self._persistenceId).isLeaf
         return os.path.isfile(self._persistenceId)
     
     @property
@@ -121,6 +136,8 @@ class DataFileSystemAdapter(NullDataStorer):
             reason = os.strerror(error.errno)
             errorMessage = "Cannot create collection '%s'. Reason: '%s'" % (self.identifier, reason)
             raise PersistenceError(errorMessage)
+        finally:
+            self._invalidateItemState(self._persistenceId)
 
     def createResource(self):
         """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}  """
@@ -132,12 +149,17 @@ class DataFileSystemAdapter(NullDataStorer):
             reason = os.strerror(error.errno)
             errorMessage = "Cannot create resource '%s'. Reason: '%s'" % (self.identifier, reason)
             raise PersistenceError(errorMessage)
+        finally:
+            self._invalidateItemState(self._persistenceId)
 
     def createLink(self, source):
         """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}  """
         
         link = util.createShortcut(self._persistenceId)
-        link.create(self._itemIdMapper.mapIdentifier(source.identifier))
+        try:
+            link.create(self._itemIdMapper.mapIdentifier(source.identifier))
+        finally:
+            self._invalidateItemState(self._persistenceId)
 
     def getChildren(self):
         """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}  """
@@ -146,7 +168,10 @@ class DataFileSystemAdapter(NullDataStorer):
         rawResult = list()
         if self.isCollection:
             try:
-                rawResult = util.listDirectory(self._persistenceId)
+                if self._itemStateCache is None:
+                    rawResult = util.listDirectory(self._persistenceId)
+                else:
+                    rawResult = self._itemStateCache.listDirectory(self._persistenceId)
             except OSError, error:
                 reason = os.strerror(error.errno)
                 errorMessage = "Cannot retrieve children of '%s'. Reason: '%s'." % (self.identifier, reason)
@@ -158,6 +183,8 @@ class DataFileSystemAdapter(NullDataStorer):
     def exists(self):
         """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}  """
         
+        if not self._itemStateCache is None:
+            return self._itemStateCache.determine(self._persistenceId).exists
         return os.path.exists(self._persistenceId)
 
     def delete(self):
@@ -175,6 +202,8 @@ class DataFileSystemAdapter(NullDataStorer):
         except shutil.Error, error:
             errorMessage = "Cannot delete item '%s'. Reason: '%s'." % (self.identifier, reason)
             raise PersistenceError(errorMessage)
+        finally:
+            self._invalidateItemState(self._persistenceId)
 
     def copy(self, destination):
         """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}  """
@@ -182,23 +211,29 @@ class DataFileSystemAdapter(NullDataStorer):
         try:
             targetPersistenceId = self._itemIdMapper.mapIdentifier(destination.identifier)
             if self.isCollection:
-                shutil.copytree(self._persistenceId, targetPersistenceId)
+                util.copyTree(self._persistenceId, targetPersistenceId)
             else:
-                shutil.copy(self._persistenceId, targetPersistenceId)
+                util.copyFile(self._persistenceId, targetPersistenceId)
         except (IOError, OSError, EnvironmentError), error:
             reason = os.strerror(error.errno or 0)
             errorMessage = "Cannot copy item '%s' to item '%s'. Reason: '%s'." % (self.identifier, destination.identifier, reason)
             raise PersistenceError(errorMessage)
+        finally:
+            self._invalidateItemState(self._itemIdMapper.mapIdentifier(destination.identifier))
         
     def move(self, destination):
         """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}  """
         
+        targetPersistenceId = self._itemIdMapper.mapIdentifier(destination.identifier)
         try:
-            os.rename(self._persistenceId, self._itemIdMapper.mapIdentifier(destination.identifier))
+            os.rename(self._persistenceId, targetPersistenceId)
         except OSError, error:
             reason = os.strerror(error.errno)
             errorMessage = "Cannot move item '%s' to item '%s'. Reason: '%s'." % (self.identifier, destination.identifier, reason)
             raise PersistenceError(errorMessage)
+        finally:
+            self._invalidateItemState(self._persistenceId)
+            self._invalidateItemState(targetPersistenceId)
  
     def readData(self):
         """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}  """
@@ -216,10 +251,7 @@ class DataFileSystemAdapter(NullDataStorer):
         try:
             fd = open(self._persistenceId, "wb")
             try:
-                block = dataStream.read(_BLOCK_SIZE)
-                while len(block) > 0:
-                    fd.write(block)
-                    block = dataStream.read(_BLOCK_SIZE)
+                util.copyFileObject(dataStream, fd, self._blockSize)
             finally:
                 fd.close()
         except IOError, error:
@@ -227,4 +259,5 @@ class DataFileSystemAdapter(NullDataStorer):
             errorMessage = "Cannot read item data '%s'. Reason: '%s'." % (self.identifier, reason)
             raise PersistenceError(errorMessage)
         finally:
+            self._invalidateItemState(self._persistenceId)
             dataStream.close()
@@ -44,7 +44,7 @@ Factory implementation for the standard file system implementation.
 from datafinder.persistence.adapters.filesystem.configuration import Configuration
 from datafinder.persistence.adapters.filesystem.data.adapter import DataFileSystemAdapter
 from datafinder.persistence.adapters.filesystem.metadata.adapter import MetadataFileSystemAdapter
-from datafinder.persistence.adapters.filesystem.util import ItemIdentifierMapper, connectWindowsShare
+from datafinder.persistence.adapters.filesystem.util import ItemIdentifierMapper, ItemStateCache, connectWindowsShare
 from datafinder.persistence.common.base_factory import BaseFileSystem
 from datafinder.persistence.error import PersistenceError
 
@@ -65,6 +65,7 @@ class FileSystem(BaseFileSystem):
         
         BaseFileSystem.__init__(self)
         self._configuration = Configuration(baseConfiguration)
+        self._itemStateCache = ItemStateCache(self._configuration.itemStateCacheTimeout)
     
     def updateCredentials(self, credentials):
         """ @see: L{updateCredentials<datafinder.persistence.factory.FileSystem.updateCredentials>} """
@@ -80,14 +81,17 @@ class FileSystem(BaseFileSystem):
         Factory Method providing a data storer. 
         """
         
-        return DataFileSystemAdapter(identifier, ItemIdentifierMapper(self._configuration.basePath))
+        return DataFileSystemAdapter(
+            identifier, ItemIdentifierMapper(self._configuration.basePath), self._itemStateCache, 
+            self._configuration.blockSize)
     
     def createMetadataStorer(self, identifier):
         """ 
         Factory Method providing a meta data storer. 
         """
         
-        return MetadataFileSystemAdapter(identifier, ItemIdentifierMapper(self._configuration.basePath))
+        return MetadataFileSystemAdapter(
+            identifier, ItemIdentifierMapper(self._configuration.basePath), self._itemStateCache)
 
     def prepareUsage(self):
         """ Prepares usage of the file system. """
@@ -95,6 +99,14 @@ class FileSystem(BaseFileSystem):
         if self._configuration.connectBaseDirectory:
             connectWindowsShare(self._configuration.basePath, self._configuration.username, self._configuration.password)
 
+    @property
+    def blockSize(self):
+        """ 
+        @see: L{BaseFileSystem.blockSize<datafinder.persistence.common.base_factory.BaseFileSystem.blockSize>}
+        """
+        
+        return self._configuration.blockSize
+
     def isValidIdentifier(self, name):
         """ 
         @see: L{FileSystem.isValidIdentifier<datafinder.persistence.factory.FileSystem.metadataIdentifierPattern>}
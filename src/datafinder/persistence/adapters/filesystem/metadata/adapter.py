@@ -41,6 +41,7 @@ Implements adapter for accessing the file system.
 
 
 from datetime import datetime
+import errno
 import mimetypes
 import os
     
@@ -55,21 +56,31 @@ __version__ = "$Revision-Id:$"
 class MetadataFileSystemAdapter(NullMetadataStorer):
     """ Implements meta data storer interface for a standard file system. """
     
-    def __init__(self, identifier, itemIdMapper):
+    def __init__(self, identifier, itemIdMapper, itemStateCache=None):
         """ 
         @param identifier: Identifier of the item.
         @type identifier: C{unicode}
         @param itemIdMapper: Utility object allowing item identifier mapping.
         @type itemIdMapper: L{ItemIdentifierMapper<datafinder.persistence.adapters.filesystem.util.ItemIdentifierMapper>}
+        @param itemStateCache: Optional cache of the item states which is shared with the data adapters.
+        @type itemStateCache: L{ItemStateCache<datafinder.persistence.adapters.filesystem.util.ItemStateCache>}
         """
         
         NullMetadataStorer.__init__(self, identifier)
         self.__itemIdMapper = itemIdMapper
         self.__persistenceId = self.__itemIdMapper.mapIdentifier(identifier)
+        self.__itemStateCache = itemStateCache
         
     def retrieve(self, propertyIds=None):
         """ @see: L{NullMetadataStorer<datafinder.persistence.metadata.metadatastorer.NullMetadataStorer>}"""
         
+        if not self.__itemStateCache is None:
+            itemState = self.__itemStateCache.determine(self.__persistenceId)
+            if not itemState.exists:
+                errorMessage = "Cannot retrieve properties of collection '%s'. Reason: '%s'" \
+                               % (self.identifier, os.strerror(errno.ENOENT))
+                raise PersistenceError(errorMessage)
+            return self._filterResult(propertyIds, self._mapItemState(itemState))
         try:
             rawResult = os.stat(self.__persistenceId)
         except OSError, error:
@@ -96,6 +107,18 @@ class MetadataFileSystemAdapter(NullMetadataStorer):
             mappedResult[constants.MIME_TYPE] = value_mapping.MetadataValue(mimeType[0])
         return mappedResult
         
+    @staticmethod
+    def _mapItemState(itemState):
+        """ Maps the cached item state to interface format. """
+        
+        mappedResult = dict()
+        mappedResult[constants.CREATION_DATETIME] = value_mapping.MetadataValue(str(itemState.creationTime), datetime)
+        mappedResult[constants.MODIFICATION_DATETIME] = value_mapping.MetadataValue(str(itemState.modificationTime), datetime)
+        mappedResult[constants.SIZE] = value_mapping.MetadataValue(str(itemState.size))
+        mappedResult[constants.OWNER] = value_mapping.MetadataValue("")
+        mappedResult[constants.MIME_TYPE] = value_mapping.MetadataValue(itemState.mimeType)
+        return mappedResult
+        
     @staticmethod
     def _filterResult(selectedPropertyIds, mappedResult):
         """ Filters the result so it contains only the specified properties. """
@@ -49,9 +49,17 @@ file system access.
 _WIN32_PLATFORM = "win32"
 
 
+import ctypes
+import ctypes.util
+import errno
 import logging
+import mimetypes
 import os
+import shutil
+import stat
 import sys
+import threading
+import time
 if sys.platform == _WIN32_PLATFORM:
     import pythoncom
     import pywintypes
@@ -67,6 +75,14 @@ __version__ = "$Revision-Id:$"
 
 
 _log = logging.getLogger(None)
+_MAX_CACHED_ITEM_STATES = 50000
+
+COPY_BLOCK_SIZE = 1048576 # bytes
+
+_FICLONE = 0x40049409 # Linux ioctl request number cloning (reflinking) a file
+_KERNEL_COPY_CHUNK_SIZE = 1073741824 # bytes
+_KERNEL_COPY_NOT_SUPPORTED_ERRORS = (errno.ENOSYS, errno.EINVAL, errno.EXDEV, errno.EOPNOTSUPP, 
+                                     errno.EBADF, errno.ETXTBSY, errno.EPERM)
 
 
 class ShortCut(object):
@@ -174,6 +190,274 @@ def listDirectory(directoryPath):
     return result
 
 
+class ItemState(object):
+    """ 
+    Type, size, time stamps and MIME type of a file system item which 
+    are determined with a single C{lstat} call. Only symbolic links
+    require an additional C{stat} call to determine the type of the target.
+    """
+    
+    __slots__ = ("exists", "isLink", "isCollection", "isLeaf", "size", 
+                 "creationTime", "modificationTime", "mimeType")
+    
+    def __init__(self, path):
+        """ 
+        @param path: Path of the item.
+        @type path: C{unicode}
+        """
+        
+        self.exists = False
+        self.isLink = False
+        self.isCollection = False
+        self.isLeaf = False
+        self.size = 0
+        self.creationTime = 0
+        self.modificationTime = 0
+        self.mimeType = mimetypes.guess_type(path, False)[0] or ""
+        try:
+            statResult = os.lstat(path)
+        except OSError:
+            return
+        if sys.platform == _WIN32_PLATFORM:
+            if path.endswith(ShortCut._WINDOWS_LINK_EXTENSION):
+                self.isLink = None # Requires parsing of the shortcut file
+        elif stat.S_ISLNK(statResult.st_mode):
+            self.isLink = True
+            try:
+                statResult = os.stat(path)
+            except OSError: # Dangling link
+                return
+        self.exists = True
+        self.isCollection = stat.S_ISDIR(statResult.st_mode)
+        self.isLeaf = stat.S_ISREG(statResult.st_mode)
+        self.size = statResult.st_size
+        self.creationTime = statResult.st_ctime
+        self.modificationTime = statResult.st_mtime
+
+
+class ItemStateCache(object):
+    """ 
+    Keeps the item states gathered when listing a directory for a limited time. 
+    So the type and meta data queries of the children do not require further
+    file system calls. This considerably reduces the number of meta data 
+    requests on network file systems.
+    """
+    
+    def __init__(self, timeout):
+        """ 
+        @param timeout: Time in seconds the item states are valid. C{0} disables caching.
+        @type timeout: C{int}
+        """
+        
+        self._timeout = timeout
+        self._itemStates = dict()
+        self._lock = threading.Lock()
+        
+    def determine(self, path):
+        """ 
+        Returns the cached item state or determines it. Item states 
+        determined here are not cached. Otherwise, items changed outside 
+        of DataFinder might be reported with an outdated state.
+        
+        @param path: Path of the item.
+        @type path: C{unicode}
+        
+        @rtype: L{ItemState<datafinder.persistence.adapters.filesystem.util.ItemState>}
+        """
+        
+        path = os.path.normpath(path)
+        with self._lock:
+            if path in self._itemStates:
+                itemState, expirationTime = self._itemStates[path]
+                if time.time() < expirationTime:
+                    return itemState
+                del self._itemStates[path]
+        return ItemState(path)
+    
+    def _put(self, path, itemState):
+        if self._timeout > 0:
+            with self._lock:
+                if len(self._itemStates) >= _MAX_CACHED_ITEM_STATES:
+                    self._itemStates.clear()
+                self._itemStates[path] = itemState, time.time() + self._timeout
+                
+    def listDirectory(self, directoryPath):
+        """ 
+        Lists the given directory and determines the states of all children.
+        
+        @see: L{listDirectory<datafinder.persistence.adapters.filesystem.util.listDirectory>}
+        """
+        
+        result = listDirectory(directoryPath)
+        if not isWindowsRootPath(directoryPath):
+            for path in result:
+                normalizedPath = os.path.normpath(path)
+                itemState = ItemState(normalizedPath)
+                if itemState.exists:
+                    self._put(normalizedPath, itemState)
+        return result
+    
+    def invalidate(self, path):
+        """ 
+        Removes the state of the item, its parent and all its descendants.
+        This is required after modifications of the item.
+        
+        @param path: Path of the item.
+        @type path: C{unicode}
+        """
+        
+        path = os.path.normpath(path)
+        prefix = os.path.join(path, "")
+        with self._lock:
+            self._itemStates.pop(path, None)
+            self._itemStates.pop(os.path.dirname(path), None)
+            for cachedPath in self._itemStates.keys():
+                if cachedPath.startswith(prefix):
+                    del self._itemStates[cachedPath]
+
+
+def _loadKernelCopyFunctions():
+    """ Determines the kernel-level copy functions offered by the C library. """
+    
+    copyFileRange = sendFile = None
+    if sys.platform.startswith("linux"):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        except OSError:
+            return None, None
+        offsetPointer = ctypes.POINTER(ctypes.c_int64)
+        copyFileRange = getattr(libc, "copy_file_range", None)
+        if not copyFileRange is None:
+            copyFileRange.restype = ctypes.c_ssize_t
+            copyFileRange.argtypes = [ctypes.c_int, offsetPointer, ctypes.c_int, offsetPointer, 
+                                      ctypes.c_size_t, ctypes.c_uint]
+        sendFile = getattr(libc, "sendfile64", None)
+        if not sendFile is None:
+            sendFile.restype = ctypes.c_ssize_t
+            sendFile.argtypes = [ctypes.c_int, ctypes.c_int, offsetPointer, ctypes.c_size_t]
+    return copyFileRange, sendFile
+
+_copyFileRange, _sendFile = _loadKernelCopyFunctions()
+
+
+def _reflink(sourceDescriptor, destinationDescriptor):
+    """ Lets the file system share the data blocks (e.g., Btrfs, XFS). Returns the success. """
+    
+    if sys.platform.startswith("linux"):
+        import fcntl
+        try:
+            fcntl.ioctl(destinationDescriptor, _FICLONE, sourceDescriptor)
+            return True
+        except IOError:
+            pass
+    return False
+
+
+def _copyInKernel(sourceDescriptor, sourceOffset, destinationDescriptor, destinationOffset, size):
+    """ 
+    Copies the given range with C{copy_file_range} or C{sendfile} so the data
+    is not transferred through user space. Returns the number of copied bytes 
+    which is smaller than C{size} if no kernel-level copying is available.
+    """
+    
+    copiedBytes = 0
+    for copyFunction in [_copyFileRange, _sendFile]:
+        if copyFunction is None:
+            continue
+        while copiedBytes < size:
+            chunkSize = min(size - copiedBytes, _KERNEL_COPY_CHUNK_SIZE)
+            sourceOffsetValue = ctypes.c_int64(sourceOffset + copiedBytes)
+            if copyFunction is _copyFileRange:
+                destinationOffsetValue = ctypes.c_int64(destinationOffset + copiedBytes)
+                result = copyFunction(sourceDescriptor, ctypes.byref(sourceOffsetValue), 
+                                      destinationDescriptor, ctypes.byref(destinationOffsetValue), chunkSize, 0)
+            else:
+                os.lseek(destinationDescriptor, destinationOffset + copiedBytes, os.SEEK_SET)
+                result = copyFunction(destinationDescriptor, sourceDescriptor, ctypes.byref(sourceOffsetValue), chunkSize)
+            if result < 0:
+                errorNumber = ctypes.get_errno()
+                if errorNumber in _KERNEL_COPY_NOT_SUPPORTED_ERRORS:
+                    break
+                raise IOError(errorNumber, os.strerror(errorNumber))
+            if result == 0: # Source file has been truncated in the meantime
+                return size
+            copiedBytes += result
+    return copiedBytes
+
+
+def copyFileObject(source, destination, blockSize=COPY_BLOCK_SIZE):
+    """ 
+    Copies the remaining content of the source file object to the destination file object.
+    If both are regular files, the data is copied by the kernel. If supported by the file
+    system, the data blocks are just shared (reflink). Otherwise, the data is copied block-wise.
+    
+    @param source: Readable file object.
+    @type source: C{file} or file-like object
+    @param destination: Writable file object.
+    @type destination: C{file} or file-like object
+    @param blockSize: Size of the blocks used when copying in user space.
+    @type blockSize: C{int}
+    
+    @raise IOError: Indicating problems copying the data.
+    """
+    
+    try:
+        sourceDescriptor = source.fileno()
+        destinationDescriptor = destination.fileno()
+    except (AttributeError, IOError, ValueError): # No real file
+        sourceDescriptor = destinationDescriptor = None
+    if not sourceDescriptor is None and stat.S_ISREG(os.fstat(sourceDescriptor).st_mode):
+        destination.flush()
+        sourceOffset = source.tell()
+        destinationOffset = destination.tell()
+        size = os.fstat(sourceDescriptor).st_size - sourceOffset
+        if size > 0:
+            if sourceOffset == 0 and destinationOffset == 0 and _reflink(sourceDescriptor, destinationDescriptor):
+                copiedBytes = size
+            else:
+                copiedBytes = _copyInKernel(sourceDescriptor, sourceOffset, destinationDescriptor, destinationOffset, size)
+            source.seek(sourceOffset + copiedBytes)
+            destination.seek(destinationOffset + copiedBytes)
+    block = source.read(blockSize)
+    while len(block) > 0:
+        destination.write(block)
+        block = source.read(blockSize)
+        
+
+def copyFile(sourcePath, destinationPath):
+    """ 
+    Copies the file content and the permission bits.
+    
+    @see: L{copyFileObject<datafinder.persistence.adapters.filesystem.util.copyFileObject>}
+    """
+    
+    if os.path.isdir(destinationPath):
+        destinationPath = os.path.join(destinationPath, os.path.basename(sourcePath))
+    with open(sourcePath, "rb") as source:
+        with open(destinationPath, "wb") as destination:
+            copyFileObject(source, destination)
+    shutil.copymode(sourcePath, destinationPath)
+    
+    
+def copyTree(sourcePath, destinationPath):
+    """ 
+    Recursively copies the directory like C{shutil.copytree} 
+    but uses L{copyFile<datafinder.persistence.adapters.filesystem.util.copyFile>}
+    for the files.
+    """
+    
+    os.makedirs(destinationPath)
+    for name in os.listdir(sourcePath):
+        childSourcePath = os.path.join(sourcePath, name)
+        childDestinationPath = os.path.join(destinationPath, name)
+        if os.path.isdir(childSourcePath):
+            copyTree(childSourcePath, childDestinationPath)
+        else:
+            copyFile(childSourcePath, childDestinationPath)
+            shutil.copystat(childSourcePath, childDestinationPath)
+    shutil.copystat(sourcePath, destinationPath)
+
+
 def _binaryToUnicodeFilePathDecoding(binaryString):
     """
     Decodes the given binary string into an unicode string.
@@ -40,6 +40,9 @@ Defines the set of LDAP-specific configuration parameters.
 """
 
 
+from datafinder.persistence.adapters.ldap_ import constants
+
+
 __version__ = "$Revision-Id:$" 
 
 
@@ -47,7 +50,12 @@ _LDAP_SERVER_DEFAULT_ENCODING = "UTF-8"
 
 
 class Configuration(object):
-    """ Defines a set of configuration parameters of the WebDAV protocol. """
+    """ 
+    Defines a set of configuration parameters of the LDAP protocol. 
+    
+    @ivar searchCacheTimeout: Time in seconds principal search results are reused.
+                              C{0} disables the search cache.
+    """
     
     def __init__(self, baseConfiguration):
         """
@@ -63,3 +71,6 @@ class Configuration(object):
         self.encoding = baseConfiguration.encoding or _LDAP_SERVER_DEFAULT_ENCODING
         self.baseDn = baseConfiguration.baseDn or ""
         self.domain = baseConfiguration.domain or ""
+        self.searchCacheTimeout = baseConfiguration.searchCacheTimeout
+        if self.searchCacheTimeout is None:
+            self.searchCacheTimeout = constants.DEFAULT_SEARCH_CACHE_TIMEOUT
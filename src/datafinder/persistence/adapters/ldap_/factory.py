@@ -40,9 +40,12 @@ LDAP-specific factory implementation.
 """
 
 
+from datafinder.persistence.adapters.ldap_ import constants
 from datafinder.persistence.adapters.ldap_.configuration import Configuration
-from datafinder.persistence.adapters.ldap_.principal_search.adapter import LdapPrincipalSearchAdapter
+from datafinder.persistence.adapters.ldap_.principal_search.adapter import LdapConnectionPool, \
+    LdapPrincipalSearchAdapter, PrincipalSearchCache
 from datafinder.persistence.common.base_factory import BaseFileSystem
+from datafinder.persistence.common.connection.manager import ConnectionPoolManager
 from datafinder.persistence.error import PersistenceError
 
 
@@ -51,6 +54,8 @@ __version__ = "$Revision-Id:$"
 
 class FileSystem(BaseFileSystem):
     """ Implements factory method of the different aspects of file system items. """
+    
+    _connectionManager = ConnectionPoolManager(constants.MAX_POOL_NUMBER)
      
     def __init__(self, baseConfiguration):
         """ 
@@ -62,6 +67,15 @@ class FileSystem(BaseFileSystem):
         
         BaseFileSystem.__init__(self)
         self._configuration = Configuration(baseConfiguration)
+        self._connectionPool = self._getConnectionPool()
+        self._searchCache = PrincipalSearchCache(self._configuration.searchCacheTimeout)
+        
+    def _getConnectionPool(self):
+        connectionPool = self._connectionManager.get(self._configuration.serverUri)
+        if connectionPool is None:
+            connectionPool = LdapConnectionPool(self._configuration)
+            self._connectionManager.add(self._configuration.serverUri, connectionPool)
+        return connectionPool
         
     def updateCredentials(self, credentials):
         """ @see: L{updateCredentials<datafinder.persistence.factory.FileSystem.updateCredentials>} """
@@ -71,8 +85,17 @@ class FileSystem(BaseFileSystem):
             self._configuration.password = credentials["password"]
         except KeyError:
             raise PersistenceError("Invalid credentials provided.")
+        else:
+            self._connectionPool.reload()
+            self._searchCache.clear()
             
     def createPrincipalSearcher(self):
         """ factory method for the principal search object. """
         
-        return LdapPrincipalSearchAdapter(self._configuration)
+        return LdapPrincipalSearchAdapter(self._configuration, self._connectionPool, self._searchCache)
+    
+    def release(self):
+        """ Releases the acquired connection pool. """
+        
+        self._connectionManager.remove(self._configuration.serverUri)
+        self._connectionPool.reload()
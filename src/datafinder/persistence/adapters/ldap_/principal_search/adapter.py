@@ -38,8 +38,15 @@
 """ Adapts the principal search interface to the LDAP protocol. """
 
 
+import itertools
+import threading
+import time
+
 import ldap
+from ldap.controls import SimplePagedResultsControl
 
+from datafinder.persistence.adapters.ldap_ import constants as ldap_constants
+from datafinder.persistence.common.connection.pool import ConnectionPool
 from datafinder.persistence.error import PersistenceError
 from datafinder.persistence.principal_search import constants, principal
 from datafinder.persistence.principal_search.principalsearcher import NullPrincipalSearcher
@@ -68,10 +75,13 @@ _userQuery = "(&%s (%s=%s))" % ("(" + _LDAP_PROPERTY_DISPLAY_NAME + "=%s)",
 _groupQuery = "(&%s (%s=%s))" % ("(" +_LDAP_PROPERTY_COMMON_NAME + "=%s)",
                                  _LDAP_PROPERTY_OBJECT_CLASS,
                                  _LDAP_PROPERTY_OBJECT_CLASS_GROUP_VALUE)
+_QUERIES = {constants.SEARCH_MODE_USER_AND_GROUP: [_userQuery, _groupQuery],
+            constants.SEARCH_MODE_USER_ONLY: [_userQuery],
+            constants.SEARCH_MODE_GROUP_ONLY: [_groupQuery]}
 
 
-class LdapPrincipalSearchAdapter(NullPrincipalSearcher):
-    """ LDAP-specific implementation of the principal search. """
+class LdapConnectionPool(ConnectionPool):
+    """ Provides connections which are bound to the LDAP server. """
     
     def __init__(self, configuration):
         """ 
@@ -79,37 +89,9 @@ class LdapPrincipalSearchAdapter(NullPrincipalSearcher):
         @type configuration: L{Configuration<datafinder.persistence.ldap.configuration.Configuration>}
         """
         
-        NullPrincipalSearcher.__init__(self)
         self._configuration = configuration
-    
-    def searchPrincipal(self, pattern, searchMode):
-        """ @see: L{NullPrincipalSearcher<datafinder.persistence.principal_search.principalsearcher.NullPrincipalSearcher>} """
+        ConnectionPool.__init__(self, ldap_constants.MAX_CONNECTION_NUMBER)
         
-        connection = self._createConnection()
-        try:
-            pattern = pattern + _LDAP_WILDCARD_CHARACTER
-            userQuery = _userQuery % pattern
-            groupQuery = _groupQuery % pattern
-            rawResult = list()
-            try:
-                if searchMode == constants.SEARCH_MODE_USER_AND_GROUP:
-                    rawResult = list()
-                    rawResult.extend(connection.search(userQuery, self._configuration.baseDn, filterDictionary=_FILTER))
-                    rawResult.extend(connection.search(groupQuery, self._configuration.baseDn, filterDictionary=_FILTER))
-                elif searchMode == constants.SEARCH_MODE_USER_ONLY:
-                    rawResult = connection.search(userQuery, self._configuration.baseDn, filterDictionary=_FILTER)
-                elif searchMode == constants.SEARCH_MODE_GROUP_ONLY:
-                    rawResult = connection.search(groupQuery, self._configuration.baseDn, filterDictionary=_FILTER)
-                else:
-                    raise PersistenceError("Search mode '%s' is not supported." % searchMode)
-            except ldap.LDAPError, error:
-                errorMessage = "Problems on querying the LDAP server occurred. Problem: '%s'" % str(error)
-                raise PersistenceError(errorMessage)
-            else:
-                return self._mapRawResult(rawResult)
-        finally:
-            connection.close()
-    
     def _createConnection(self):
         """ Creates a connection accessing the specified LDAP server. """
         
@@ -130,29 +112,146 @@ class LdapPrincipalSearchAdapter(NullPrincipalSearcher):
         else:
             return self._configuration.username
         
-    def _mapRawResult(self, rawResult):
-        """ Prepare LDAP query result. """
-        
-        mappedResult = list()
-        for item in rawResult:
-            uniqueName = self._configuration.domain + _DOMAIN_SEPARATOR + unicode(item[0][0], self._configuration.encoding)
-            displayName = ""
-            if not item[2][0] is None:
-                displayName = unicode(item[2][0], self._configuration.encoding)
-            if _LDAP_PROPERTY_OBJECT_CLASS_USER_VALUE in item[1]:
-                principalType = constants.USER_PRINCIPAL_TYPE
-            else:
-                principalType = constants.GROUP_PRINCIPAL_TYPE
-            memberOf = list()
-            if not item[3] is None:
-                for member in item[3]:
-                    if not member is None:
-                        uniqueMemberName = self._configuration.domain + _DOMAIN_SEPARATOR + unicode(member, self._configuration.encoding)
-                        member = principal.Principal(uniqueMemberName, type=constants.GROUP_PRINCIPAL_TYPE)
-                        memberOf.append(member)
-            principal_ = principal.Principal(uniqueName, type=principalType, displayName=displayName, roles=memberOf)
-            mappedResult.append(principal_)
-        return mappedResult
+    def _releaseConnection(self, connection):
+        """ Unbinds the connection. """
+        
+        connection.close()
+
+
+class PrincipalSearchCache(object):
+    """ Keeps the results of principal searches for a limited time. """
+    
+    def __init__(self, timeout=ldap_constants.DEFAULT_SEARCH_CACHE_TIMEOUT):
+        """
+        @param timeout: Time in seconds the results are valid. C{0} disables caching.
+        @type timeout: C{int}
+        """
+        
+        self._timeout = timeout
+        self._results = dict()
+        self._lock = threading.Lock()
+        
+    def get(self, pattern, searchMode):
+        """ 
+        Returns the result if it is still valid or C{None}.
+        
+        @param pattern: The search pattern.
+        @type pattern: C{unicode}
+        @param searchMode: The search mode.
+        @type searchMode: C{int}
+        
+        @rtype: C{list} of L{Principal<datafinder.persistence.principal_search.principal.Principal>}
+        """
+        
+        with self._lock:
+            if (pattern, searchMode) in self._results:
+                result, expirationTime = self._results[(pattern, searchMode)]
+                if time.time() < expirationTime:
+                    return list(result)
+                del self._results[(pattern, searchMode)]
+                
+    def put(self, pattern, searchMode, result):
+        """ 
+        Adds the result retrieved from the server. 
+        
+        @param pattern: The search pattern.
+        @type pattern: C{unicode}
+        @param searchMode: The search mode.
+        @type searchMode: C{int}
+        @param result: The found principals.
+        @type result: C{list} of L{Principal<datafinder.persistence.principal_search.principal.Principal>}
+        """
+        
+        if self._timeout > 0:
+            with self._lock:
+                if len(self._results) >= ldap_constants.MAX_CACHED_SEARCHES:
+                    self._results.clear()
+                self._results[(pattern, searchMode)] = list(result), time.time() + self._timeout
+                
+    def clear(self):
+        """ Removes all results, e.g. after the credentials changed. """
+        
+        with self._lock:
+            self._results.clear()
+
+
+class LdapPrincipalSearchAdapter(NullPrincipalSearcher):
+    """ LDAP-specific implementation of the principal search. """
+    
+    def __init__(self, configuration, connectionPool=None, searchCache=None):
+        """ 
+        @param configuration: LDAP-specific configuration parameters.
+        @type configuration: L{Configuration<datafinder.persistence.ldap.configuration.Configuration>}
+        @param connectionPool: Provides bound LDAP connections. By default, a new pool is used.
+        @type connectionPool: L{LdapConnectionPool<datafinder.persistence.adapters.ldap_.
+                              principal_search.adapter.LdapConnectionPool>}
+        @param searchCache: Caches the search results. By default, the results are not cached.
+        @type searchCache: L{PrincipalSearchCache<datafinder.persistence.adapters.ldap_.
+                           principal_search.adapter.PrincipalSearchCache>}
+        """
+        
+        NullPrincipalSearcher.__init__(self)
+        self._configuration = configuration
+        self._connectionPool = connectionPool or LdapConnectionPool(configuration)
+        self._searchCache = searchCache or PrincipalSearchCache(0)
+    
+    def searchPrincipal(self, pattern, searchMode):
+        """ 
+        @see: L{NullPrincipalSearcher<datafinder.persistence.principal_search.principalsearcher.NullPrincipalSearcher>} 
+        @note: Results are taken from the search cache if possible. Otherwise, only the first page
+               of principals is retrieved immediately. The remaining principals are retrieved 
+               while the result is iterated. Problems of this phase are raised during the iteration.
+        """
+        
+        result = self._searchCache.get(pattern, searchMode)
+        if result is None:
+            if not searchMode in _QUERIES:
+                raise PersistenceError("Search mode '%s' is not supported." % searchMode)
+            principals = self._searchPrincipal(pattern, searchMode)
+            firstPage = list(itertools.islice(principals, ldap_constants.SEARCH_PAGE_SIZE))
+            result = itertools.chain(firstPage, principals)
+        return result
+    
+    def _searchPrincipal(self, pattern, searchMode):
+        """ Searches the principals using a pooled connection and adds the complete result to the cache. """
+        
+        connection = self._connectionPool.acquire()
+        try:
+            result = list()
+            try:
+                for query in _QUERIES[searchMode]:
+                    rawResult = connection.iterSearch(query % (pattern + _LDAP_WILDCARD_CHARACTER), 
+                                                      self._configuration.baseDn, filterDictionary=_FILTER)
+                    for item in rawResult:
+                        principal_ = self._mapRawItem(item)
+                        result.append(principal_)
+                        yield principal_
+            except ldap.LDAPError, error:
+                errorMessage = "Problems on querying the LDAP server occurred. Problem: '%s'" % str(error)
+                raise PersistenceError(errorMessage)
+            self._searchCache.put(pattern, searchMode, result)
+        finally:
+            self._connectionPool.release(connection)
+        
+    def _mapRawItem(self, item):
+        """ Maps a single entry of the LDAP query result to a principal. """
+        
+        uniqueName = self._configuration.domain + _DOMAIN_SEPARATOR + unicode(item[0][0], self._configuration.encoding)
+        displayName = ""
+        if not item[2][0] is None:
+            displayName = unicode(item[2][0], self._configuration.encoding)
+        if _LDAP_PROPERTY_OBJECT_CLASS_USER_VALUE in item[1]:
+            principalType = constants.USER_PRINCIPAL_TYPE
+        else:
+            principalType = constants.GROUP_PRINCIPAL_TYPE
+        memberOf = list()
+        if not item[3] is None:
+            for member in item[3]:
+                if not member is None:
+                    uniqueMemberName = self._configuration.domain + _DOMAIN_SEPARATOR + unicode(member, self._configuration.encoding)
+                    member = principal.Principal(uniqueMemberName, type=constants.GROUP_PRINCIPAL_TYPE)
+                    memberOf.append(member)
+        return principal.Principal(uniqueName, type=principalType, displayName=displayName, roles=memberOf)
 
 
 class _Ldap(object):
@@ -189,9 +288,18 @@ class _Ldap(object):
     
         self._handle = None
         self._encoding = encoding
-        self._handle = ldap.initialize(ldapServerUri)
-        self._handle.protocol_version = ldapVersion
-        self._handle.simple_bind_s(userDN, password)
+        self._ldapServerUri = ldapServerUri
+        self._userDN = userDN
+        self._password = password
+        self._ldapVersion = ldapVersion
+        self._connect()
+        
+    def _connect(self):
+        """ Initializes the connection and binds to the LDAP server. """
+        
+        self._handle = ldap.initialize(self._ldapServerUri)
+        self._handle.protocol_version = self._ldapVersion
+        self._handle.simple_bind_s(self._userDN, self._password)
       
     def search(self, query, baseDN, scope=ldap.SCOPE_SUBTREE, \
                timeout=0, filterDictionary=None):
@@ -239,26 +347,73 @@ class _Ldap(object):
                 of L{_filterResults} for further details.
         
         @raise ldap.LDAPError indicating problems on LDAP search.
+        
+        @note: The connection is re-established once if the server closed it.
+        """
+        
+        return list(self.iterSearch(query, baseDN, scope, timeout, filterDictionary))
+        
+    def iterSearch(self, query, baseDN, scope=ldap.SCOPE_SUBTREE, \
+                   timeout=0, filterDictionary=None):
         """
+        Searches the LDAP server page by page using the paged results control 
+        and yields the entries as soon as they arrive. The single entries are 
+        structured like the items of the result list of L{search<_Ldap.search>}.
+        
+        @note: The paged results control is marked non-critical. Thus, servers 
+               not supporting it simply return the whole result at once.
+        @note: The connection is re-established once if the server closed it
+               before the first entry has been yielded.
+        
+        @see: L{search<_Ldap.search>} for the parameter descriptions.
+        
+        @raise ldap.LDAPError indicating problems on LDAP search.
+        """
+        
+        yielded = False
+        try:
+            for entry in self._iterSearch(query, baseDN, scope, timeout, filterDictionary):
+                yielded = True
+                yield entry
+        except ldap.SERVER_DOWN:
+            if yielded:
+                raise
+            self._connect()
+            for entry in self._iterSearch(query, baseDN, scope, timeout, filterDictionary):
+                yield entry
+    
+    def _iterSearch(self, query, baseDN, scope, timeout, filterDictionary):
+        """ Performs the paged search. @see: L{iterSearch<_Ldap.iterSearch>} """
         
         if not self._handle:
             raise ldap.LDAPError("The LDAP connection has not been initialized.")
-        resultSet = list()
         self._handle.set_option(ldap.OPT_REFERRALS, 0)
-        resultId = self._handle.search(baseDN, 
-                                       scope, 
-                                       query.encode(self._encoding), 
-                                       None)
+        pageControl = SimplePagedResultsControl(False, size=ldap_constants.SEARCH_PAGE_SIZE, cookie="")
         while True:
-            resultType, resultData = self._handle.result(resultId, timeout)
-            if (len(resultData) == 0):
+            resultId = self._handle.search_ext(baseDN, scope, query.encode(self._encoding), 
+                                               None, serverctrls=[pageControl])
+            _, resultData, _, serverControls = self._handle.result3(resultId, 1, timeout or None)
+            for entry in resultData:
+                if entry[0] is None: # Skips search references
+                    continue
+                if filterDictionary is None:
+                    yield [entry]
+                else:
+                    for filteredEntry in self._filterResults([[entry]], filterDictionary):
+                        yield filteredEntry
+            
+            pageControl.cookie = self._getPageCookie(serverControls)
+            if not pageControl.cookie:
                 break
-            else:
-                if resultType == ldap.RES_SEARCH_ENTRY:
-                    resultSet.append(resultData)
-        if not filterDictionary is None:
-            resultSet = self._filterResults(resultSet, filterDictionary)
-        return resultSet
+    
+    @staticmethod
+    def _getPageCookie(serverControls):
+        """ Determines the cookie of the next result page. """
+        
+        for serverControl in serverControls or list():
+            if serverControl.controlType == SimplePagedResultsControl.controlType:
+                return serverControl.cookie
+        return None
     
     @staticmethod
     def _filterResults(results, filterDictionary):
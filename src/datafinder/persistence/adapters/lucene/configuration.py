@@ -40,6 +40,8 @@ Defines the set of lucene-specific configuration parameters.
 """
 
 
+import re
+
 from datafinder.persistence.error import PersistenceError
 
 
@@ -48,6 +50,8 @@ __version__ = "$Revision-Id:$"
 
 _LUCENE_SCHEME_PREFIX = "lucene+"
 _LUCENE_PLUS_FILE_SCHEME_PREFIX = _LUCENE_SCHEME_PREFIX + "file"
+_FILE_SCHEME_PREFIX = "file://"
+_WINDOWS_DRIVE_PATTERN = re.compile("^/[a-zA-Z]:")
 
 
 class Configuration(object):
@@ -72,4 +76,9 @@ class Configuration(object):
             else:
                 indexUri = indexUri[len(_LUCENE_SCHEME_PREFIX):]
         self.luceneIndexUri = indexUri
+        self.luceneIndexPath = None
+        if indexUri.startswith(_FILE_SCHEME_PREFIX):
+            self.luceneIndexPath = indexUri[len(_FILE_SCHEME_PREFIX):]
+            if _WINDOWS_DRIVE_PATTERN.match(self.luceneIndexPath):
+                self.luceneIndexPath = self.luceneIndexPath[1:]
         self.env = env
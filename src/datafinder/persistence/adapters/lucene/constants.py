@@ -43,7 +43,12 @@ Constant definitions for lucene.
 __version__ = "$Revision-Id:$" 
 
 
-MAX_RESULTS = 1000
+MAX_RESULTS = 1000 # Number of hits fetched at once
+COMMIT_BATCH_SIZE = 1000 # Number of changes after which the indexer commits the index
 
 FILEPATH_FIELD = "filePath"
 CONTENT_FIELD = "content"
+IDENTIFIER_FIELD = "identifier"
+PARENT_FIELD = "parent"
+IS_COLLECTION_FIELD = "isCollection"
+MODIFICATION_TIME_FIELD = "modificationTime"
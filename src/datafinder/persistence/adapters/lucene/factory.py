@@ -43,7 +43,9 @@ Lucene-specific factory implementation.
 import lucene
 
 from datafinder.persistence.adapters.lucene.configuration import Configuration
+from datafinder.persistence.adapters.lucene.indexer import LuceneIndexer
 from datafinder.persistence.adapters.lucene.search.adapter import SearchLuceneAdapter
+from datafinder.persistence.adapters.lucene.search.searcher_manager import SearcherManager
 from datafinder.persistence.common.base_factory import BaseFileSystem
 
 
@@ -63,12 +65,31 @@ class FileSystem(BaseFileSystem):
         BaseFileSystem.__init__(self)
         self._env = lucene.initVM()
         self._configuration = Configuration(baseConfiguration, self._env)
+        self._searcherManager = None
+        if not self._configuration.luceneIndexPath is None:
+            self._searcherManager = SearcherManager(self._configuration)
             
     def createSearcher(self):
         """ Factory method for the search object. """
 
-        return SearchLuceneAdapter(self._configuration)
+        return SearchLuceneAdapter(self._configuration, self._searcherManager)
+    
+    def createIndexer(self):
+        """ 
+        Creates the indexer maintaining a local index. 
+        Remote (Solr) indexes are maintained by the server. 
+        """
+        
+        if self._configuration.luceneIndexPath is None:
+            return None
+        return LuceneIndexer(self._configuration)
 
+    def release(self):
+        """ Closes the shared index searcher. """
+        
+        if not self._searcherManager is None:
+            self._searcherManager.close()
+    
     @property
     def hasMetadataSearchSupport(self):
         """ @see: L{<BaseFileSystem.hasMetadataSearchSupport>datafinder.persistence.
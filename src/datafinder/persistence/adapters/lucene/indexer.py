@@ -0,0 +1,487 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Incrementally maintains a local Lucene index.
+"""
+
+
+import datetime
+import threading
+import urllib
+
+import lucene
+
+from datafinder.persistence.adapters.lucene import constants
+from datafinder.persistence.error import PersistenceError
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_INTERNAL_FIELDS = [constants.IDENTIFIER_FIELD, constants.FILEPATH_FIELD, constants.PARENT_FIELD, 
+                    constants.IS_COLLECTION_FIELD, constants.MODIFICATION_TIME_FIELD, constants.CONTENT_FIELD]
+_MAX_QUERY_TERMS = 512 # Lucene restricts the number of clauses of a Boolean query to 1024 by default
+
+
+class LuceneIndexer(object):
+    """ 
+    Writes the data and meta data changes of the repository into a local Lucene index.
+    Every item is represented by a document which is identified by the item identifier.
+    The changes are buffered and written in batches. Thus, changes become visible 
+    to the search after C{commitBatchSize} changes or when the indexer is closed.
+    The index writer is only opened while a batch is written. Thus, the write lock
+    of the index is not held between batches and other clients can update the index.
+    
+    Documents of indexes created by other tools (e.g., C{contrib/lucene/create_sample_index.py}) 
+    only contain the file path and the content. They are extended by the identifier 
+    and the other internal fields when the index is opened the first time.
+    
+    E1101: Pylint cannot detect the internals of the lucene module.
+    """
+    # pylint: disable=E1101
+    
+    def __init__(self, configuration, commitBatchSize=constants.COMMIT_BATCH_SIZE):
+        """ 
+        @param configuration: Lucene-specific configuration parameters.
+        @type configuration: L{Configuration<datafinder.persistence.adapters.lucene.configuration.Configuration>}
+        @param commitBatchSize: Number of changes after which the index is committed.
+        @type commitBatchSize: C{int}
+        """
+        
+        self._configuration = configuration
+        self._commitBatchSize = commitBatchSize
+        self._directory = None
+        self._isPrepared = False
+        self._reader = None
+        self._readerIsCurrent = False
+        self._pendingDocuments = dict()
+        self._changeCount = 0
+        self._lock = threading.RLock()
+        
+    def _perform(self, function, *args):
+        """ Performs the function with the current thread attached to the Java VM. """
+        
+        with self._lock:
+            self._configuration.env.attachCurrentThread()
+            try:
+                return function(*args)
+            except lucene.JavaError, error:
+                raise PersistenceError("Cannot access the Lucene index. Reason: '%s'" % error)
+            
+    def _getDirectory(self):
+        """ Returns the directory of the index. """
+        
+        if self._directory is None:
+            self._directory = lucene.SimpleFSDirectory(lucene.File(self._configuration.luceneIndexPath))
+        return self._directory
+    
+    def _prepareIndex(self):
+        """ Creates the index if it does not exist and adds the identifier to documents which lack it. """
+        
+        if not self._isPrepared:
+            self._isPrepared = True
+            if not lucene.IndexReader.indexExists(self._getDirectory()):
+                self._write(lambda _: None)
+            else:
+                searcher = lucene.IndexSearcher(self._getReader())
+                documents = self._searchDocuments(searcher, _createMissingIdentifierQuery())
+                if len(documents) > 0:
+                    def _addIdentifiers(writer):
+                        writer.deleteDocuments(_createMissingIdentifierQuery())
+                        for identifier, document in documents.iteritems():
+                            writer.addDocument(document.createLuceneDocument(identifier))
+                    self._write(_addIdentifiers)
+        
+    def _write(self, function):
+        """ 
+        Opens the index writer, performs the changes and commits them. 
+        The writer is closed afterwards to release the write lock of the index.
+        """
+        
+        self._prepareIndex()
+        analyzer = lucene.StandardAnalyzer(lucene.Version.LUCENE_CURRENT)
+        writer = lucene.IndexWriter(self._getDirectory(), analyzer, lucene.IndexWriter.MaxFieldLength.UNLIMITED)
+        try:
+            function(writer)
+        except:
+            writer.rollback()
+            raise
+        else:
+            writer.close()
+        self._readerIsCurrent = False
+    
+    def _getReader(self):
+        """ Returns a read-only reader of the committed index which is only reopened when the index changed. """
+        
+        self._prepareIndex()
+        if not self._readerIsCurrent:
+            if not self._reader is None:
+                self._reader.close()
+            self._reader = lucene.IndexReader.open(self._getDirectory(), True)
+            self._readerIsCurrent = True
+        return self._reader
+    
+    def close(self):
+        """ Commits the pending changes and closes the index. """
+        
+        def _close():
+            self._commit()
+            if not self._reader is None:
+                self._reader.close()
+                self._reader = None
+                self._readerIsCurrent = False
+        self._perform(_close)
+        
+    def commit(self):
+        """ Writes the pending changes into the index. """
+        
+        self._perform(self._commit)
+        
+    def _commit(self):
+        """ Writes the buffered documents in one batch. Partially known documents are completed from the index. """
+        
+        if len(self._pendingDocuments) > 0:
+            pendingDocuments = self._pendingDocuments
+            self._pendingDocuments = dict()
+            self._completeDocuments(pendingDocuments)
+            def _update(writer):
+                for identifier, document in pendingDocuments.iteritems():
+                    writer.updateDocument(lucene.Term(constants.IDENTIFIER_FIELD, identifier), 
+                                          document.createLuceneDocument(identifier))
+            self._write(_update)
+        self._changeCount = 0
+        
+    def _completeDocuments(self, documents):
+        """ Completes the documents using the stored documents. The stored content is always kept. """
+        
+        identifiers = [identifier for identifier, document in documents.iteritems() if not document.isComplete]
+        if len(identifiers) > 0:
+            searcher = lucene.IndexSearcher(self._getReader())
+            for index in range(0, len(identifiers), _MAX_QUERY_TERMS):
+                query = lucene.BooleanQuery()
+                for identifier in identifiers[index:index + _MAX_QUERY_TERMS]:
+                    query.add(lucene.TermQuery(lucene.Term(constants.IDENTIFIER_FIELD, identifier)), 
+                              lucene.BooleanClause.Occur.SHOULD)
+                storedDocuments = self._searchDocuments(searcher, query)
+                for identifier in identifiers[index:index + _MAX_QUERY_TERMS]:
+                    documents[identifier].complete(storedDocuments.get(identifier))
+        
+    def _registerChanges(self, count):
+        """ Commits the index when enough changes have been collected. """
+        
+        self._changeCount += count
+        if self._changeCount >= self._commitBatchSize:
+            self._commit()
+            
+    @staticmethod
+    def _searchDocuments(searcher, query):
+        """ Returns the documents matching the query. """
+        
+        documents = dict()
+        maxDoc = max(1, searcher.getIndexReader().maxDoc())
+        for hit in searcher.search(query, maxDoc).scoreDocs:
+            document = _Document.fromLuceneDocument(searcher.doc(hit.doc))
+            documents[document.identifier] = document
+        return documents
+    
+    def _getPendingDocument(self, identifier):
+        """ Returns the buffered document or a partially known document. """
+        
+        if not identifier in self._pendingDocuments:
+            self._pendingDocuments[identifier] = _Document(identifier, isComplete=False)
+        return self._pendingDocuments[identifier]
+    
+    def addItem(self, identifier, isCollection):
+        """ @see: L{MetadataIndex<datafinder.persistence.adapters.metadata_index.index.MetadataIndex>} """
+        
+        def _add():
+            document = _Document(identifier, isCollection)
+            document.contents = list()
+            self._pendingDocuments[identifier] = document
+            self._registerChanges(1)
+        self._perform(_add)
+        
+    def updateProperties(self, identifier, properties):
+        """ @see: L{MetadataIndex<datafinder.persistence.adapters.metadata_index.index.MetadataIndex>} """
+        
+        def _update():
+            self._getPendingDocument(identifier).updateProperties(properties)
+            self._registerChanges(1)
+        self._perform(_update)
+        
+    def deleteProperties(self, identifier, propertyIds):
+        """ @see: L{MetadataIndex<datafinder.persistence.adapters.metadata_index.index.MetadataIndex>} """
+        
+        def _delete():
+            self._getPendingDocument(identifier).deleteProperties(propertyIds)
+            self._registerChanges(1)
+        self._perform(_delete)
+        
+    def replaceItems(self, items):
+        """ 
+        @see: L{MetadataIndex<datafinder.persistence.adapters.metadata_index.index.MetadataIndex>} 
+        @note: The stored content of the items is kept.
+        """
+        
+        def _replace():
+            for identifier, isCollection, properties, modificationTime in items:
+                document = _Document(identifier, isCollection, modificationTime=modificationTime, isComplete=False)
+                document.replaceProperties(properties)
+                self._pendingDocuments[identifier] = document
+            self._registerChanges(len(items))
+        self._perform(_replace)
+        
+    def getModificationTimes(self, parent):
+        """ @see: L{MetadataIndex<datafinder.persistence.adapters.metadata_index.index.MetadataIndex>} """
+        
+        def _get():
+            self._commit()
+            searcher = lucene.IndexSearcher(self._getReader())
+            query = lucene.TermQuery(lucene.Term(constants.PARENT_FIELD, parent))
+            documents = self._searchDocuments(searcher, query)
+            return dict([(identifier, document.modificationTime) for identifier, document in documents.iteritems()])
+        return self._perform(_get)
+    
+    def getModificationTime(self, identifier):
+        """ @see: L{MetadataIndex<datafinder.persistence.adapters.metadata_index.index.MetadataIndex>} """
+        
+        def _get():
+            self._commit()
+            searcher = lucene.IndexSearcher(self._getReader())
+            query = lucene.TermQuery(lucene.Term(constants.IDENTIFIER_FIELD, identifier))
+            documents = self._searchDocuments(searcher, query)
+            if identifier in documents:
+                return documents[identifier].modificationTime
+        return self._perform(_get)
+    
+    def removeItem(self, identifier):
+        """ @see: L{MetadataIndex<datafinder.persistence.adapters.metadata_index.index.MetadataIndex>} """
+        
+        def _remove():
+            self._commit()
+            self._write(lambda writer: writer.deleteDocuments(_createIdentifierQuery(identifier, True)))
+        self._perform(_remove)
+        
+    def moveItem(self, identifier, destination):
+        """ @see: L{MetadataIndex<datafinder.persistence.adapters.metadata_index.index.MetadataIndex>} """
+        
+        self._perform(self._copy, identifier, destination, True)
+        
+    def copyItem(self, identifier, destination):
+        """ 
+        @see: L{MetadataIndex<datafinder.persistence.adapters.metadata_index.index.MetadataIndex>}
+        @note: The copies are updated by the next rescan.
+        """
+        
+        self._perform(self._copy, identifier, destination, False)
+        
+    def _copy(self, identifier, destination, removeSource):
+        """ Rewrites the documents of the item and its sub-items to the destination. """
+        
+        self._commit()
+        searcher = lucene.IndexSearcher(self._getReader())
+        documents = self._searchDocuments(searcher, _createIdentifierQuery(identifier, True))
+        def _rewrite(writer):
+            writer.deleteDocuments(_createIdentifierQuery(destination, True))
+            if removeSource:
+                writer.deleteDocuments(_createIdentifierQuery(identifier, True))
+            for sourceIdentifier, document in documents.iteritems():
+                if not removeSource:
+                    document.modificationTime = None
+                targetIdentifier = destination + sourceIdentifier[len(identifier):]
+                writer.addDocument(document.createLuceneDocument(targetIdentifier))
+        self._write(_rewrite)
+
+
+class _Document(object):
+    """ Represents the indexed state of an item. """
+    
+    def __init__(self, identifier, isCollection=None, modificationTime=None, isComplete=True):
+        """ 
+        @param identifier: Identifier of the item.
+        @type identifier: C{unicode}
+        @param isCollection: Flag indicating a collection.
+        @type isCollection: C{bool}
+        @param modificationTime: Modification time in seconds since the epoch.
+        @type modificationTime: C{float}
+        @param isComplete: Flag indicating that the document replaces the indexed document.
+                           Otherwise, the document is completed from the indexed document.
+        @type isComplete: C{bool}
+        """
+        
+        self.identifier = identifier
+        self.isCollection = isCollection
+        self.modificationTime = modificationTime
+        self.isComplete = isComplete
+        self.properties = dict()
+        self.contents = None
+        self._deletedPropertyIds = set()
+        self._replacesProperties = False
+        
+    @staticmethod
+    def fromLuceneDocument(luceneDocument):
+        """ Creates the document from the stored fields of the Lucene document. """
+        
+        identifier = luceneDocument.get(constants.IDENTIFIER_FIELD)
+        if identifier is None: # Documents which have not been created by the indexer
+            identifier = _determineIdentifier(luceneDocument.get(constants.FILEPATH_FIELD))
+        document = _Document(identifier)
+        document.contents = list()
+        document.isCollection = luceneDocument.get(constants.IS_COLLECTION_FIELD) == "1"
+        modificationTime = luceneDocument.get(constants.MODIFICATION_TIME_FIELD)
+        if modificationTime:
+            document.modificationTime = float(modificationTime)
+        for field in luceneDocument.getFields():
+            name = field.name()
+            if name == constants.CONTENT_FIELD:
+                document.contents.append(field.stringValue())
+            elif not name in _INTERNAL_FIELDS:
+                document.properties.setdefault(name, list()).append(field.stringValue())
+        return document
+    
+    def updateProperties(self, properties):
+        """ Sets the given properties. """
+        
+        self.properties.update(properties)
+        self._deletedPropertyIds.difference_update(properties)
+        
+    def replaceProperties(self, properties):
+        """ Sets the given properties and removes all other properties. """
+        
+        self.properties = dict(properties)
+        self._replacesProperties = True
+        
+    def deleteProperties(self, propertyIds):
+        """ Removes the given properties. """
+        
+        for propertyId in propertyIds:
+            self.properties.pop(propertyId, None)
+        self._deletedPropertyIds.update(propertyIds)
+        
+    def complete(self, indexedDocument):
+        """ 
+        Adds the state of the indexed document which has not been changed. 
+        C{None} indicates that the item has not been indexed so far.
+        """
+        
+        if not indexedDocument is None:
+            if self.isCollection is None:
+                self.isCollection = indexedDocument.isCollection
+            if self.modificationTime is None:
+                self.modificationTime = indexedDocument.modificationTime
+            if self.contents is None:
+                self.contents = indexedDocument.contents
+            if not self._replacesProperties:
+                for propertyId, value in indexedDocument.properties.iteritems():
+                    if not propertyId in self.properties and not propertyId in self._deletedPropertyIds:
+                        self.properties[propertyId] = value
+        self.isComplete = True
+        
+    def createLuceneDocument(self, identifier):
+        """ Creates the Lucene document of the item with the given identifier. """
+        
+        luceneDocument = lucene.Document()
+        _addField(luceneDocument, constants.IDENTIFIER_FIELD, identifier, False)
+        _addField(luceneDocument, constants.FILEPATH_FIELD, 
+                  urllib.quote(identifier[1:].encode("utf-8")).decode("ascii"), True)
+        if identifier != "/":
+            _addField(luceneDocument, constants.PARENT_FIELD, identifier.rsplit("/", 1)[0] or "/", False)
+        _addField(luceneDocument, constants.IS_COLLECTION_FIELD, self.isCollection and u"1" or u"0", False)
+        if not self.modificationTime is None:
+            _addField(luceneDocument, constants.MODIFICATION_TIME_FIELD, repr(self.modificationTime), False)
+        for content in self.contents or list():
+            _addField(luceneDocument, constants.CONTENT_FIELD, content, True)
+        for propertyId, value in self.properties.iteritems():
+            for textValue in _convertValue(value):
+                _addField(luceneDocument, propertyId, textValue, True)
+        return luceneDocument
+
+
+def _addField(luceneDocument, name, value, analyzed):
+    """ Adds a stored field to the Lucene document. """
+    
+    if analyzed:
+        index = lucene.Field.Index.ANALYZED
+    else:
+        index = lucene.Field.Index.NOT_ANALYZED
+    luceneDocument.add(lucene.Field(name, value, lucene.Field.Store.YES, index))
+
+
+def _determineIdentifier(filePath):
+    """ Determines the item identifier from the stored file path. """
+    
+    return u"/" + urllib.unquote(filePath.encode("utf-8")).decode("utf-8")
+
+
+def _createMissingIdentifierQuery():
+    """ Creates the query matching the documents without identifier field. """
+    
+    query = lucene.BooleanQuery()
+    query.add(lucene.MatchAllDocsQuery(), lucene.BooleanClause.Occur.MUST)
+    query.add(lucene.PrefixQuery(lucene.Term(constants.IDENTIFIER_FIELD, "/")), lucene.BooleanClause.Occur.MUST_NOT)
+    return query
+
+
+def _createIdentifierQuery(identifier, includeSubItems=False):
+    """ Creates the query matching the item and optionally its sub-items. """
+    
+    query = lucene.BooleanQuery()
+    query.add(lucene.TermQuery(lucene.Term(constants.IDENTIFIER_FIELD, identifier)), lucene.BooleanClause.Occur.SHOULD)
+    if includeSubItems:
+        prefix = identifier.rstrip("/") + "/"
+        query.add(lucene.PrefixQuery(lucene.Term(constants.IDENTIFIER_FIELD, prefix)), lucene.BooleanClause.Occur.SHOULD)
+    return query
+
+
+def _convertValue(value):
+    """ Converts the meta data value to the list of indexed texts. """
+    
+    if value is None:
+        return list()
+    elif isinstance(value, (list, tuple)):
+        texts = list()
+        for item in value:
+            texts.extend(_convertValue(item))
+        return texts
+    elif isinstance(value, dict):
+        return _convertValue(value.values())
+    elif isinstance(value, datetime.datetime):
+        return [unicode(value.replace(microsecond=0))]
+    else:
+        return [unicode(value)]
@@ -45,7 +45,9 @@ import lucene
  
 from datafinder.persistence.adapters.lucene import constants    
 from datafinder.persistence.adapters.lucene.search import search_restriction_mapping
+from datafinder.persistence.adapters.lucene.search.searcher_manager import SearcherManager
 from datafinder.persistence.error import PersistenceError
+from datafinder.persistence.search.restriction_cache import RestrictionMappingCache
 from datafinder.persistence.search.searcher import NullSearcher
 
 
@@ -54,51 +56,95 @@ from datafinder.persistence.search.searcher import NullSearcher
 __version__ = "$Revision-Id:$" 
 
 
+_restrictionCache = RestrictionMappingCache(search_restriction_mapping.mapSearchRestriction)
+
 
 class SearchLuceneAdapter(NullSearcher):
-    """ Lucene-specific implementation of the search. """
+    """ 
+    Lucene-specific implementation of the search. 
+    
+    E1101: Pylint cannot detect the internals of the modules solr and lucene. 
+    """
+    # pylint: disable=E1101
     
-    def __init__(self, configuration):
+    def __init__(self, configuration, searcherManager=None):
         """ 
         @param configuration: Lucene-specific configuration parameters.
         @type configuration: L{Configuration<datafinder.persistence.lucene.configuration.Configuration>}
+        @param searcherManager: Provides the shared searcher of a local index.
+        @type searcherManager: L{SearcherManager<datafinder.persistence.adapters.lucene.search.
+                               searcher_manager.SearcherManager>}
         """
  
         NullSearcher.__init__(self)
         self._configuration = configuration
+        self._searcherManager = searcherManager
+        if self._searcherManager is None and not configuration.luceneIndexPath is None:
+            self._searcherManager = SearcherManager(configuration)
 
-    def search(self, restrictions, destination):
+    def search(self, restrictions, destination, limit=None):
         """ 
         @see: L{NullPrincipalSearcher<datafinder.persistence.search.searcher.NullSearcher>} 
-        
-        E1101: Pylint cannot detect the internals of the modules solr and lucene. 
+        @note: The results are fetched in pages of C{MAX_RESULTS} hits while the result is iterated.
         """
-        # pylint: disable=E1101
+        # pylint: disable=W0613
+        # W0613: The paged retrieval already stops when the result is no longer iterated.
         
-        results = list()
-        queryString = search_restriction_mapping.mapSearchRestriction(restrictions)
-        if self._configuration.luceneIndexUri.startswith("file:///"):
-            try:
-                self._configuration.env.attachCurrentThread()
-                indexDir = lucene.SimpleFSDirectory(lucene.File(
-                    self._configuration.luceneIndexUri.replace("file:///", "")))
-                analyzer = lucene.StandardAnalyzer(lucene.Version.LUCENE_CURRENT)
-                searcher = lucene.IndexSearcher(indexDir)
-                query = lucene.QueryParser(lucene.Version.LUCENE_CURRENT, "content", analyzer).parse(queryString)
-                hits = searcher.search(query, constants.MAX_RESULTS)
-                for hit in hits.scoreDocs:
-                    doc = searcher.doc(hit.doc)
-                    results.append("/%s" % urllib.unquote(doc.get(constants.FILEPATH_FIELD).encode("utf-8")))
-                searcher.close()
-            except Exception, error:
-                errorMessage = "Cannot search items. Reason: '%s'" % error 
-                raise PersistenceError(errorMessage)
+        queryString = _restrictionCache.map(restrictions)
+        if not self._searcherManager is None:
+            return self._searchLocalIndex(queryString)
         elif self._configuration.luceneIndexUri.startswith("http://") or self._configuration.luceneIndexUri.startswith("https://"):
-            solr = pysolr.Solr(self._configuration.luceneIndexUri)
-            results = solr.query(queryString)
-            for hit in results:
-                results.append("/%s" % urllib.unquote(hit[constants.FILEPATH_FIELD]))
+            return self._searchSolr(queryString)
         else:
             errorMessage = "Cannot search items. Reason: Invalid luceneIndexUri" 
             raise PersistenceError(errorMessage)
-        return results
+        
+    def _searchLocalIndex(self, queryString):
+        """ Searches the local index using the shared searcher. """
+        
+        searcher = self._perform(self._searcherManager.acquire)
+        try:
+            analyzer = lucene.StandardAnalyzer(lucene.Version.LUCENE_CURRENT)
+            query = self._perform(lucene.QueryParser(lucene.Version.LUCENE_CURRENT, 
+                                                     constants.CONTENT_FIELD, analyzer).parse, queryString)
+            topDocs = self._perform(searcher.search, query, constants.MAX_RESULTS)
+            for scoreDoc in topDocs.scoreDocs:
+                yield self._determineIdentifier(searcher, scoreDoc)
+            if topDocs.totalHits > len(topDocs.scoreDocs): # Fetching the remaining hits
+                allDocs = self._perform(searcher.search, query, topDocs.totalHits)
+                for scoreDoc in allDocs.scoreDocs[len(topDocs.scoreDocs):]:
+                    yield self._determineIdentifier(searcher, scoreDoc)
+        finally:
+            self._searcherManager.release(searcher)
+            
+    def _determineIdentifier(self, searcher, scoreDoc):
+        """ Determines the item identifier of the hit. """
+        
+        filePath = self._perform(searcher.doc, scoreDoc.doc).get(constants.FILEPATH_FIELD)
+        return "/%s" % urllib.unquote(filePath.encode("utf-8"))
+    
+    def _perform(self, function, *args):
+        """ Calls the function in the current thread attached to the Java VM. """
+        
+        try:
+            self._configuration.env.attachCurrentThread()
+            return function(*args)
+        except Exception, error:
+            raise PersistenceError("Cannot search items. Reason: '%s'" % error)
+            
+    def _searchSolr(self, queryString):
+        """ Searches the Solr server page by page. """
+        
+        solr = pysolr.Solr(self._configuration.luceneIndexUri)
+        start = 0
+        while True:
+            try:
+                results = solr.search(queryString, start=start, rows=constants.MAX_RESULTS)
+            except Exception, error:
+                raise PersistenceError("Cannot search items. Reason: '%s'" % error)
+            for hit in results.docs:
+                yield "/%s" % urllib.unquote(hit[constants.FILEPATH_FIELD])
+            start += len(results.docs)
+            if len(results.docs) == 0 or start >= results.hits:
+                break
+
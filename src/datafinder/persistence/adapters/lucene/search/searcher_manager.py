@@ -0,0 +1,114 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Shares an index searcher between the Lucene searches.
+"""
+
+
+import threading
+
+import lucene
+
+
+__version__ = "$Revision-Id:$" 
+
+
+class SearcherManager(object):
+    """ 
+    Provides a long-lived index searcher which is reopened only when the index changed.
+    Acquired searchers stay usable until they are released even if the index has been 
+    reopened in the meantime.
+    
+    E1101: Pylint cannot detect the internals of the lucene module.
+    """
+    # pylint: disable=E1101
+    
+    def __init__(self, configuration):
+        """ 
+        @param configuration: Lucene-specific configuration parameters.
+        @type configuration: L{Configuration<datafinder.persistence.adapters.lucene.configuration.Configuration>}
+        """
+        
+        self._configuration = configuration
+        self._searcher = None
+        self._lock = threading.Lock()
+        
+    def acquire(self):
+        """ 
+        Returns the current searcher. The index is reopened if it changed since the last call.
+        
+        @return: Index searcher which has to be released afterwards.
+        @rtype: C{lucene.IndexSearcher}
+        """
+        
+        with self._lock:
+            self._configuration.env.attachCurrentThread()
+            if self._searcher is None:
+                directory = lucene.SimpleFSDirectory(lucene.File(self._configuration.luceneIndexPath))
+                self._searcher = lucene.IndexSearcher(lucene.IndexReader.open(directory, True))
+            else:
+                reader = self._searcher.getIndexReader()
+                if not reader.isCurrent():
+                    newReader = reader.reopen()
+                    if newReader != reader:
+                        self._searcher = lucene.IndexSearcher(newReader)
+                        reader.decRef()
+            self._searcher.getIndexReader().incRef()
+            return self._searcher
+        
+    def release(self, searcher):
+        """ 
+        Releases the acquired searcher. 
+        
+        @param searcher: Index searcher returned by L{acquire<SearcherManager.acquire>}.
+        @type searcher: C{lucene.IndexSearcher}
+        """
+        
+        with self._lock:
+            self._configuration.env.attachCurrentThread()
+            searcher.getIndexReader().decRef()
+            
+    def close(self):
+        """ Closes the current searcher. Acquired searchers are closed when they are released. """
+        
+        with self._lock:
+            if not self._searcher is None:
+                self._configuration.env.attachCurrentThread()
+                self._searcher.getIndexReader().decRef()
+                self._searcher = None
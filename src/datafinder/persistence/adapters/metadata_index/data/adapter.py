@@ -0,0 +1,135 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Keeps the meta data index in sync with the data operations of the wrapped adapter.
+"""
+
+
+import logging
+
+from datafinder.persistence.error import PersistenceError
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_logger = logging.getLogger()
+
+
+class DataIndexAdapter(object):
+    """ 
+    Wraps the data storer of an adapter and updates the meta data index 
+    when items are created, deleted, copied, or moved. All other calls
+    are delegated to the wrapped data storer.
+    """
+    
+    def __init__(self, dataStorer, index):
+        """ 
+        @param dataStorer: The wrapped data storer.
+        @type dataStorer: C{object} implementing the interface of L{NullDataStorer<datafinder.
+                          persistence.data.datastorer.NullDataStorer>}
+        @param index: The meta data index.
+        @type index: L{MetadataIndex<datafinder.persistence.adapters.metadata_index.index.MetadataIndex>}
+        """
+        
+        self._dataStorer = dataStorer
+        self._index = index
+        
+    def __getattr__(self, name):
+        """ Delegates to the wrapped data storer. """
+        
+        return getattr(self._dataStorer, name)
+    
+    @property
+    def wrappedDataStorer(self):
+        """ Returns the wrapped data storer. """
+        
+        return self._dataStorer
+    
+    def createCollection(self, recursively=False):
+        """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>} """
+        
+        self._dataStorer.createCollection(recursively)
+        self._updateIndex(self._index.addItem, self._dataStorer.identifier, True)
+        
+    def createResource(self):
+        """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>} """
+        
+        self._dataStorer.createResource()
+        self._updateIndex(self._index.addItem, self._dataStorer.identifier, False)
+        
+    def createLink(self, destination):
+        """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>} """
+        
+        self._dataStorer.createLink(_unwrap(destination))
+        
+    def delete(self):
+        """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>} """
+        
+        self._dataStorer.delete()
+        self._updateIndex(self._index.removeItem, self._dataStorer.identifier)
+        
+    def copy(self, destination):
+        """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>} """
+        
+        self._dataStorer.copy(_unwrap(destination))
+        self._updateIndex(self._index.copyItem, self._dataStorer.identifier, destination.identifier)
+        
+    def move(self, destination):
+        """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>} """
+        
+        self._dataStorer.move(_unwrap(destination))
+        self._updateIndex(self._index.moveItem, self._dataStorer.identifier, destination.identifier)
+        
+    @staticmethod
+    def _updateIndex(function, *args):
+        """ Updates the index. Problems are logged because the data operation has already been performed. """
+        
+        try:
+            function(*args)
+        except PersistenceError, error:
+            _logger.warning("Cannot update the meta data index. Reason: '%s'" % error.message)
+
+
+def _unwrap(dataStorer):
+    """ Returns the data storer of the adapter which is wrapped by the index. """
+    
+    if isinstance(dataStorer, DataIndexAdapter):
+        return dataStorer.wrappedDataStorer
+    return dataStorer
@@ -0,0 +1,334 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Factories wrapping the factory of an adapter to maintain a meta data index.
+"""
+
+
+import logging
+import threading
+import time
+
+from datafinder.persistence.adapters.metadata_index import constants
+from datafinder.persistence.adapters.metadata_index.data.adapter import DataIndexAdapter
+from datafinder.persistence.adapters.metadata_index.index import MetadataIndex
+from datafinder.persistence.adapters.metadata_index.metadata.adapter import MetadataIndexAdapter
+from datafinder.persistence.adapters.metadata_index.search.adapter import SearchIndexAdapter
+from datafinder.persistence.common.base_factory import BaseFileSystem
+from datafinder.persistence.common.concurrency import performConcurrently
+from datafinder.persistence.error import PersistenceError
+from datafinder.persistence.metadata.constants import MODIFICATION_DATETIME
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_logger = logging.getLogger()
+
+
+class IndexFeedingFileSystem(BaseFileSystem):
+    """ 
+    Wraps the factory of an adapter. Data and meta data changes are fed into
+    an index. All other aspects are delegated to the wrapped factory.
+    
+    The index has to provide the interface of L{MetadataIndex<datafinder.persistence.
+    adapters.metadata_index.index.MetadataIndex>} except for the search.
+    """
+    
+    def __init__(self, fileSystem, index):
+        """ 
+        @param fileSystem: The wrapped adapter-specific factory.
+        @type fileSystem: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>}
+        @param index: The fed index.
+        @type index: C{object}
+        """
+        
+        BaseFileSystem.__init__(self)
+        self._fileSystem = fileSystem
+        self._index = index
+        
+    @property
+    def canHandleLocation(self):
+        """ @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} """
+        
+        return self._fileSystem.canHandleLocation
+        
+    def createDataStorer(self, identifier):
+        """ Creates the wrapped data storer which keeps the index in sync. """
+        
+        return DataIndexAdapter(self._fileSystem.createDataStorer(identifier), self._index)
+    
+    def createMetadataStorer(self, identifier):
+        """ Creates the wrapped meta data storer which feeds the index. """
+        
+        return MetadataIndexAdapter(self._fileSystem.createMetadataStorer(identifier), self._index)
+    
+    def createPrivilegeStorer(self, identifier):
+        """ @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} """
+        
+        return self._fileSystem.createPrivilegeStorer(identifier)
+    
+    def createPrincipalSearcher(self):
+        """ @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} """
+        
+        return self._fileSystem.createPrincipalSearcher()
+    
+    def createSearcher(self):
+        """ @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} """
+        
+        return self._fileSystem.createSearcher()
+    
+    def updateMetadata(self, identifierPropertiesMap):
+        """ @see: L{FileSystem.updateMetadata<datafinder.persistence.factory.FileSystem.updateMetadata>} """
+        
+        errors = self._fileSystem.updateMetadata(identifierPropertiesMap)
+        for identifier, properties in identifierPropertiesMap.iteritems():
+            if not identifier in errors:
+                try:
+                    self._index.updateProperties(identifier, properties)
+                except PersistenceError, error:
+                    _logger.warning("Cannot update the meta data index. Reason: '%s'" % error.message)
+        return errors
+    
+    def readData(self, identifiers):
+        """ @see: L{FileSystem.readData<datafinder.persistence.factory.FileSystem.readData>} """
+        
+        return self._fileSystem.readData(identifiers)
+    
+    def writeData(self, identifierDataMap):
+        """ 
+        @see: L{FileSystem.writeData<datafinder.persistence.factory.FileSystem.writeData>} 
+        @note: Storing data does not change the index.
+        """
+        
+        return self._fileSystem.writeData(identifierDataMap)
+    
+    def createResource(self, dataStorer, metadataStorer, properties):
+        """ 
+        Lets the wrapped factory create the resource and feeds the index afterwards.
+        @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} 
+        """
+        
+        self._fileSystem.createResource(dataStorer.wrappedDataStorer, 
+                                        metadataStorer.wrappedMetadataStorer, properties)
+        try:
+            self._index.addItem(dataStorer.identifier, False)
+            self._index.updateProperties(dataStorer.identifier, properties)
+        except PersistenceError, error:
+            _logger.warning("Cannot update the meta data index. Reason: '%s'" % error.message)
+    
+    def rescanMetadataIndex(self, identifier, full=False):
+        """ 
+        @see: L{FileSystem.rescanMetadataIndex<datafinder.persistence.factory.FileSystem.rescanMetadataIndex>}
+        @note: The tree is walked level by level using up to C{maxConcurrentRequests} 
+               parallel requests. Unless C{full} is set, only items whose modification 
+               time changed since the last scan are indexed again.
+        """
+        
+        _Rescan(self._fileSystem, self._index, full).perform(identifier)
+        
+    def release(self):
+        """ Releases the wrapped factory and closes the index. """
+        
+        self._fileSystem.release()
+        self._index.close()
+        
+    def updateCredentials(self, credentials):
+        """ @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} """
+        
+        self._fileSystem.updateCredentials(credentials)
+        
+    def prepareUsage(self):
+        """ @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} """
+        
+        self._fileSystem.prepareUsage()
+        
+    def isValidIdentifier(self, name):
+        """ @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} """
+        
+        return self._fileSystem.isValidIdentifier(name)
+    
+    def isValidMetadataIdentifier(self, name):
+        """ @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} """
+        
+        return self._fileSystem.isValidMetadataIdentifier(name)
+    
+    @property
+    def maxConcurrentRequests(self):
+        """ @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} """
+        
+        return self._fileSystem.maxConcurrentRequests
+    
+    @property
+    def blockSize(self):
+        """ @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} """
+        
+        return self._fileSystem.blockSize
+    
+    @property
+    def hasCustomMetadataSupport(self):
+        """ @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} """
+        
+        return self._fileSystem.hasCustomMetadataSupport
+    
+    @property
+    def hasMetadataSearchSupport(self):
+        """ @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} """
+        
+        return self._fileSystem.hasMetadataSearchSupport
+    
+    @property
+    def hasPrivilegeSupport(self):
+        """ @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} """
+        
+        return self._fileSystem.hasPrivilegeSupport
+    
+    def determineFreeDiskSpace(self):
+        """ @see: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>} """
+        
+        return self._fileSystem.determineFreeDiskSpace()
+
+
+class IndexingFileSystem(IndexFeedingFileSystem):
+    """ 
+    Feeds the local meta data index which additionally provides the meta data search.
+    """
+    
+    def __init__(self, fileSystem, databasePath):
+        """ 
+        @param fileSystem: The wrapped adapter-specific factory.
+        @type fileSystem: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>}
+        @param databasePath: Path of the index database file.
+        @type databasePath: C{unicode}
+        """
+        
+        IndexFeedingFileSystem.__init__(self, fileSystem, MetadataIndex(databasePath))
+        
+    def createSearcher(self):
+        """ Creates the searcher using the meta data index. """
+        
+        return SearchIndexAdapter(self._index)
+    
+    @property
+    def hasMetadataSearchSupport(self):
+        """ The meta data search is always supported by the index. """
+        
+        return True
+
+
+class _Rescan(object):
+    """ Walks a sub-tree level by level and writes the changed items into the index. """
+    
+    def __init__(self, fileSystem, index, full):
+        """ 
+        @param fileSystem: The adapter-specific factory.
+        @type fileSystem: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>}
+        @param index: The fed index.
+        @type index: C{object}
+        @param full: Flag indicating that unchanged items are indexed as well.
+        @type full: C{bool}
+        """
+        
+        self._fileSystem = fileSystem
+        self._index = index
+        self._full = full
+        self._lock = threading.Lock()
+        self._changedItems = list()
+        self._nextLevel = list()
+        
+    def perform(self, identifier):
+        """ 
+        Scans the item and its sub-items.
+        
+        @param identifier: Identifier of the item the scan starts with.
+        @type identifier: C{unicode}
+        
+        @raise PersistenceError: Indicates problems accessing the items or the index.
+        """
+        
+        level = [(identifier, self._index.getModificationTime(identifier))]
+        while len(level) > 0:
+            errors = performConcurrently(self._scanItem, level, self._fileSystem.maxConcurrentRequests)
+            if len(errors) > 0:
+                raise errors.values()[0]
+            level = self._nextLevel
+            self._nextLevel = list()
+        self._index.replaceItems(self._changedItems)
+        
+    def _scanItem(self, item):
+        """ Scans the item and determines its children. """
+        
+        identifier, indexedModificationTime = item
+        dataStorer = self._fileSystem.createDataStorer(identifier)
+        metadataStorer = self._fileSystem.createMetadataStorer(identifier)
+        isCollection = dataStorer.isCollection
+        modificationTime = _determineModificationTime(metadataStorer.retrieve([MODIFICATION_DATETIME]))
+        if self._full or modificationTime is None or modificationTime != indexedModificationTime:
+            properties = dict()
+            for propertyId, value in metadataStorer.retrieve().iteritems():
+                properties[propertyId] = value.value
+            self._addChangedItem((identifier, isCollection, properties, modificationTime))
+        if isCollection and not dataStorer.isLink:
+            indexedChildren = self._index.getModificationTimes(identifier)
+            children = dataStorer.getChildren()
+            for removedChild in set(indexedChildren).difference(children):
+                self._index.removeItem(removedChild)
+            with self._lock:
+                self._nextLevel.extend([(child, indexedChildren.get(child)) for child in children])
+                
+    def _addChangedItem(self, changedItem):
+        """ Collects the changed item and writes full batches into the index. """
+        
+        changedItems = None
+        with self._lock:
+            self._changedItems.append(changedItem)
+            if len(self._changedItems) >= constants.RESCAN_BATCH_SIZE:
+                changedItems = self._changedItems
+                self._changedItems = list()
+        if not changedItems is None:
+            self._index.replaceItems(changedItems)
+
+
+def _determineModificationTime(properties):
+    """ Returns the modification time in seconds since the epoch or C{None}. """
+    
+    if MODIFICATION_DATETIME in properties:
+        modificationDatetime = properties[MODIFICATION_DATETIME].value
+        if hasattr(modificationDatetime, "timetuple"):
+            return time.mktime(modificationDatetime.timetuple()) + modificationDatetime.microsecond / 1000000.0
@@ -0,0 +1,396 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Implements the SQLite-based storage of the meta data index.
+"""
+
+
+import datetime
+import decimal
+import sqlite3
+import threading
+import time
+
+from datafinder.persistence.adapters.metadata_index import constants
+from datafinder.persistence.error import PersistenceError
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, identifier TEXT UNIQUE NOT NULL, "
+    + "parent TEXT, isCollection INTEGER, modificationTime REAL)",
+    "CREATE INDEX IF NOT EXISTS itemParents ON items (parent)",
+    "CREATE TABLE IF NOT EXISTS properties (item INTEGER NOT NULL, name TEXT NOT NULL, "
+    + "textValue TEXT, numberValue REAL, dateValue REAL)",
+    "CREATE INDEX IF NOT EXISTS propertyItems ON properties (item, name)",
+    "CREATE INDEX IF NOT EXISTS propertyTexts ON properties (name, textValue)",
+    "CREATE INDEX IF NOT EXISTS propertyNumbers ON properties (name, numberValue) WHERE numberValue IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS propertyDates ON properties (name, dateValue) WHERE dateValue IS NOT NULL"]
+_SUBTREE_CONDITION = "(identifier = ? OR (identifier >= ? AND identifier < ?))"
+
+
+def determineSubtreeParameters(identifier):
+    """ 
+    Determines the parameters of a condition matching the item and all its sub-items.
+    The condition compares the identifiers lexicographically so the index of
+    the identifiers is used.
+    
+    @param identifier: Identifier of the root item of the subtree.
+    @type identifier: C{unicode}
+    
+    @return: Identifier, lower and upper bound of the sub-item identifiers.
+    @rtype: C{tuple} of C{unicode}
+    """
+    
+    prefix = identifier
+    if not prefix.endswith("/"):
+        prefix += "/"
+    return identifier, prefix, prefix[:-1] + "0" # "0" follows "/"
+
+
+def determineParent(identifier):
+    """ Returns the identifier of the parent item or C{None} for the root item. """
+    
+    if identifier == "/":
+        return None
+    return identifier.rsplit("/", 1)[0] or "/"
+
+
+def convertValue(value):
+    """ 
+    Converts a meta data value to the rows stored in the index.
+    Lists are stored as one row per list entry.
+    
+    @param value: Meta data value in persistence format.
+    @type value: C{object}
+    
+    @return: Text, number, and date representations of the value. 
+    @rtype: C{list} of C{tuple} of C{unicode}, C{float}, C{float}
+    """
+    
+    rows = list()
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            rows.extend(convertValue(item))
+    elif isinstance(value, bool):
+        rows.append((unicode(value), int(value), None))
+    elif isinstance(value, (int, long, float, decimal.Decimal)):
+        rows.append((unicode(value), float(value), None))
+    elif isinstance(value, datetime.datetime):
+        rows.append((unicode(value.isoformat()), None, time.mktime(value.timetuple())))
+    elif isinstance(value, basestring):
+        rows.append((unicode(value), None, None))
+    elif value is None:
+        rows.append((None, None, None))
+    else:
+        rows.append((unicode(value), None, None))
+    return rows
+
+
+class MetadataIndex(object):
+    """ 
+    Stores the meta data of items in a local SQLite database.
+    The database is opened on first use and can be shared by multiple threads.
+    """
+    
+    def __init__(self, databasePath):
+        """ 
+        @param databasePath: Path of the database file. C{:memory:} creates a temporary index.
+        @type databasePath: C{unicode}
+        """
+        
+        self._databasePath = databasePath
+        self._connection = None
+        self._lock = threading.RLock()
+        
+    def _getConnection(self):
+        """ Opens the database and creates the schema when required. """
+        
+        if self._connection is None:
+            try:
+                connection = sqlite3.connect(self._databasePath, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                for statement in _SCHEMA:
+                    connection.execute(statement)
+                connection.commit()
+            except sqlite3.Error, error:
+                raise PersistenceError("Cannot open the meta data index '%s'. Reason: '%s'" 
+                                       % (self._databasePath, str(error)))
+            self._connection = connection
+        return self._connection
+    
+    def _execute(self, function, *args):
+        """ Executes the function with a cursor in a transaction. """
+        
+        with self._lock:
+            connection = self._getConnection()
+            try:
+                with connection:
+                    return function(connection.cursor(), *args)
+            except sqlite3.Error, error:
+                raise PersistenceError("Cannot access the meta data index. Reason: '%s'" % str(error))
+        
+    def close(self):
+        """ Closes the database. It is opened again on next use. """
+        
+        with self._lock:
+            if not self._connection is None:
+                self._connection.close()
+                self._connection = None
+    
+    def addItem(self, identifier, isCollection):
+        """ 
+        Adds the item to the index or updates its type.
+        
+        @param identifier: Identifier of the item.
+        @type identifier: C{unicode}
+        @param isCollection: Flag indicating whether the item is a collection.
+        @type isCollection: C{bool}
+        """
+        
+        def _add(cursor):
+            itemId = self._determineItemId(cursor, identifier)
+            cursor.execute("UPDATE items SET isCollection = ? WHERE id = ?", (isCollection, itemId))
+        self._execute(_add)
+        
+    @staticmethod
+    def _determineItemId(cursor, identifier):
+        """ Returns the database identifier of the item and adds it if required. """
+        
+        cursor.execute("SELECT id FROM items WHERE identifier = ?", (identifier, ))
+        row = cursor.fetchone()
+        if row is None:
+            cursor.execute("INSERT INTO items (identifier, parent) VALUES (?, ?)", 
+                           (identifier, determineParent(identifier)))
+            return cursor.lastrowid
+        return row[0]
+    
+    @staticmethod
+    def _insertProperties(cursor, itemId, properties):
+        """ Inserts the rows of the given properties. """
+        
+        rows = list()
+        for name, value in properties.iteritems():
+            for textValue, numberValue, dateValue in convertValue(value):
+                rows.append((itemId, name, textValue, numberValue, dateValue))
+        cursor.executemany("INSERT INTO properties (item, name, textValue, numberValue, dateValue) " 
+                           + "VALUES (?, ?, ?, ?, ?)", rows)
+    
+    def updateProperties(self, identifier, properties):
+        """ 
+        Adds or replaces the given properties of the item.
+        
+        @param identifier: Identifier of the item.
+        @type identifier: C{unicode}
+        @param properties: New / updated meta data in persistence format.
+        @type properties: C{dict} of C{unicode}, C{object}
+        """
+        
+        def _update(cursor):
+            itemId = self._determineItemId(cursor, identifier)
+            cursor.executemany("DELETE FROM properties WHERE item = ? AND name = ?", 
+                               [(itemId, name) for name in properties])
+            self._insertProperties(cursor, itemId, properties)
+        self._execute(_update)
+        
+    def deleteProperties(self, identifier, propertyIds):
+        """ 
+        Removes the given properties of the item.
+        
+        @param identifier: Identifier of the item.
+        @type identifier: C{unicode}
+        @param propertyIds: Identifiers of the removed properties.
+        @type propertyIds: C{list} of C{unicode}
+        """
+        
+        def _delete(cursor):
+            cursor.executemany("DELETE FROM properties WHERE item = " 
+                               + "(SELECT id FROM items WHERE identifier = ?) AND name = ?", 
+                               [(identifier, name) for name in propertyIds])
+        self._execute(_delete)
+        
+    def replaceItems(self, items):
+        """ 
+        Replaces the complete state of the given items.
+        
+        @param items: Identifier, collection flag, meta data, and modification time of the items.
+        @type items: C{list} of C{tuple} of C{unicode}, C{bool}, C{dict}, C{float}
+        """
+        
+        def _replace(cursor):
+            for identifier, isCollection, properties, modificationTime in items:
+                itemId = self._determineItemId(cursor, identifier)
+                cursor.execute("UPDATE items SET isCollection = ?, modificationTime = ? WHERE id = ?", 
+                               (isCollection, modificationTime, itemId))
+                cursor.execute("DELETE FROM properties WHERE item = ?", (itemId, ))
+                self._insertProperties(cursor, itemId, properties)
+        self._execute(_replace)
+        
+    def getModificationTimes(self, parent):
+        """ 
+        Returns the modification times of the indexed children.
+        
+        @param parent: Identifier of the parent item.
+        @type parent: C{unicode}
+        
+        @return: Maps the child identifiers to the modification time at indexing time.
+        @rtype: C{dict} of C{unicode}, C{float}
+        """
+        
+        def _get(cursor):
+            cursor.execute("SELECT identifier, modificationTime FROM items WHERE parent = ?", (parent, ))
+            return dict(cursor.fetchall())
+        return self._execute(_get)
+    
+    def getModificationTime(self, identifier):
+        """ 
+        Returns the modification time of the item at indexing time or C{None}.
+        
+        @param identifier: Identifier of the item.
+        @type identifier: C{unicode}
+        
+        @rtype: C{float}
+        """
+        
+        def _get(cursor):
+            cursor.execute("SELECT modificationTime FROM items WHERE identifier = ?", (identifier, ))
+            row = cursor.fetchone()
+            if not row is None:
+                return row[0]
+        return self._execute(_get)
+        
+    def removeItem(self, identifier):
+        """ 
+        Removes the item and its sub-items from the index.
+        
+        @param identifier: Identifier of the item.
+        @type identifier: C{unicode}
+        """
+        
+        self._execute(self._removeItem, identifier)
+        
+    @staticmethod
+    def _removeItem(cursor, identifier):
+        """ Removes the subtree of the given item. """
+        
+        parameters = determineSubtreeParameters(identifier)
+        cursor.execute("DELETE FROM properties WHERE item IN (SELECT id FROM items WHERE %s)" 
+                       % _SUBTREE_CONDITION, parameters)
+        cursor.execute("DELETE FROM items WHERE %s" % _SUBTREE_CONDITION, parameters)
+        
+    def moveItem(self, identifier, destination):
+        """ 
+        Moves the item and its sub-items to the given destination.
+        
+        @param identifier: Identifier of the item.
+        @type identifier: C{unicode}
+        @param destination: Identifier of the destination.
+        @type destination: C{unicode}
+        """
+        
+        def _move(cursor):
+            self._removeItem(cursor, destination)
+            offset = len(identifier) + 1
+            cursor.execute("UPDATE items SET identifier = ? || substr(identifier, ?), parent = ? || substr(parent, ?) " 
+                           + "WHERE identifier >= ? AND identifier < ?", 
+                           (destination, offset, destination, offset) + determineSubtreeParameters(identifier)[1:])
+            cursor.execute("UPDATE items SET identifier = ?, parent = ? WHERE identifier = ?", 
+                           (destination, determineParent(destination), identifier))
+        self._execute(_move)
+        
+    def copyItem(self, identifier, destination):
+        """ 
+        Copies the index entries of the item and its sub-items to the given destination.
+        The copies are updated by the next rescan.
+        
+        @param identifier: Identifier of the item.
+        @type identifier: C{unicode}
+        @param destination: Identifier of the destination.
+        @type destination: C{unicode}
+        """
+        
+        def _copy(cursor):
+            self._removeItem(cursor, destination)
+            offset = len(identifier) + 1
+            subtreeParameters = determineSubtreeParameters(identifier)
+            cursor.execute("INSERT INTO items (identifier, parent, isCollection) " 
+                           + "SELECT ? || substr(identifier, ?), CASE WHEN identifier = ? THEN ? " 
+                           + "ELSE ? || substr(parent, ?) END, isCollection FROM items WHERE " + _SUBTREE_CONDITION, 
+                           (destination, offset, identifier, determineParent(destination), destination, offset) 
+                           + subtreeParameters)
+            cursor.execute("INSERT INTO properties (item, name, textValue, numberValue, dateValue) " 
+                           + "SELECT target.id, name, textValue, numberValue, dateValue FROM items source " 
+                           + "JOIN properties ON properties.item = source.id " 
+                           + "JOIN items target ON target.identifier = ? || substr(source.identifier, ?) " 
+                           + "WHERE " + _SUBTREE_CONDITION.replace("identifier", "source.identifier"), 
+                           (destination, offset) + subtreeParameters)
+        self._execute(_copy)
+
+    def search(self, condition, parameters, destination):
+        """ 
+        Determines the identifiers of the items matching the condition.
+        The identifiers are fetched in batches while the result is iterated.
+        
+        @param condition: SQL condition on the C{items} table.
+        @type condition: C{unicode}
+        @param parameters: Parameters of the condition.
+        @type parameters: C{tuple}
+        @param destination: Restricts the search to the item and its sub-items.
+        @type destination: C{unicode}
+        
+        @return: Iterator over the matched item identifiers.
+        @rtype: C{generator} of C{unicode}
+        """
+        
+        statement = "SELECT identifier FROM items WHERE %s AND (%s)" % (_SUBTREE_CONDITION, condition)
+        parameters = determineSubtreeParameters(destination) + tuple(parameters)
+        cursor = self._execute(lambda cursor: cursor.execute(statement, parameters))
+        while True:
+            with self._lock:
+                try:
+                    rows = cursor.fetchmany(constants.SEARCH_BATCH_SIZE)
+                except sqlite3.Error, error:
+                    raise PersistenceError("Cannot search the meta data index. Reason: '%s'" % str(error))
+            if len(rows) == 0:
+                break
+            for row in rows:
+                yield row[0]
@@ -0,0 +1,100 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Feeds the meta data updates of the wrapped adapter into the meta data index.
+"""
+
+
+import logging
+
+from datafinder.persistence.error import PersistenceError
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_logger = logging.getLogger()
+
+
+class MetadataIndexAdapter(object):
+    """ 
+    Wraps the meta data storer of an adapter and writes the updated meta data
+    into the index as well. All other calls are delegated to the wrapped storer.
+    """
+    
+    def __init__(self, metadataStorer, index):
+        """ 
+        @param metadataStorer: The wrapped meta data storer.
+        @type metadataStorer: C{object} implementing the interface of L{NullMetadataStorer<datafinder.
+                              persistence.metadata.metadatastorer.NullMetadataStorer>}
+        @param index: The meta data index.
+        @type index: L{MetadataIndex<datafinder.persistence.adapters.metadata_index.index.MetadataIndex>}
+        """
+        
+        self._metadataStorer = metadataStorer
+        self._index = index
+        
+    def __getattr__(self, name):
+        """ Delegates to the wrapped meta data storer. """
+        
+        return getattr(self._metadataStorer, name)
+    
+    @property
+    def wrappedMetadataStorer(self):
+        """ Returns the wrapped meta data storer. """
+        
+        return self._metadataStorer
+        
+    def update(self, properties):
+        """ @see: L{NullMetadataStorer<datafinder.persistence.metadata.metadatastorer.NullMetadataStorer>} """
+        
+        self._metadataStorer.update(properties)
+        try:
+            self._index.updateProperties(self._metadataStorer.identifier, properties)
+        except PersistenceError, error:
+            _logger.warning("Cannot update the meta data index. Reason: '%s'" % error.message)
+            
+    def delete(self, propertyIds):
+        """ @see: L{NullMetadataStorer<datafinder.persistence.metadata.metadatastorer.NullMetadataStorer>} """
+        
+        self._metadataStorer.delete(propertyIds)
+        try:
+            self._index.deleteProperties(self._metadataStorer.identifier, propertyIds)
+        except PersistenceError, error:
+            _logger.warning("Cannot update the meta data index. Reason: '%s'" % error.message)
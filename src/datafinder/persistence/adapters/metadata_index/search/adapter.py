@@ -0,0 +1,80 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Implements the search using the meta data index.
+"""
+
+
+from datafinder.persistence.adapters.metadata_index.search.search_restriction_mapping import mapSearchRestriction
+from datafinder.persistence.error import PersistenceError
+from datafinder.persistence.search.restriction_cache import RestrictionMappingCache
+from datafinder.persistence.search.searcher import NullSearcher
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_restrictionCache = RestrictionMappingCache(mapSearchRestriction)
+
+
+class SearchIndexAdapter(NullSearcher):
+    """ Searches the meta data index. """
+    
+    def __init__(self, index):
+        """ 
+        @param index: The meta data index.
+        @type index: L{MetadataIndex<datafinder.persistence.adapters.metadata_index.index.MetadataIndex>}
+        """
+        
+        NullSearcher.__init__(self)
+        self._index = index
+        
+    def search(self, restrictions, destination, limit=None):
+        """ 
+        @see: L{NullSearcher<datafinder.persistence.search.searcher.NullSearcher>} 
+        @note: The matched identifiers are fetched from the index while the result is iterated.
+        """
+        # pylint: disable=W0613
+        # W0613: The matches are fetched incrementally, so the limit is not required.
+        
+        try:
+            condition, parameters = _restrictionCache.map(restrictions)
+        except AssertionError:
+            raise PersistenceError("The search restrictions are invalid.")
+        return self._index.search(condition, parameters, destination.identifier)
@@ -0,0 +1,134 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Maps search restrictions to SQL conditions on the meta data index.
+"""
+
+
+import time
+
+from datafinder.persistence.error import PersistenceError
+from datafinder.persistence.search import constants
+
+
+__version__ = "$Revision-Id:$" 
+
+
+__comparisonOperatorMapping = {
+    constants.EQUAL_OPERATOR: "=",
+    constants.LT_OPERATOR: "<",
+    constants.GT_OPERATOR: ">",
+    constants.LTE_OPERATOR: "<=",
+    constants.GTE_OPERATOR: ">="
+}
+
+__conjunctionOperatorMapping = {
+    constants.AND_OPERATOR: "AND",
+    constants.OR_OPERATOR: "OR",
+    constants.NOT_OPERATOR: "NOT"
+}
+
+_PROPERTY_CONDITION = "id IN (SELECT item FROM properties WHERE name = ?%s)"
+
+
+def mapSearchRestriction(restrictions):
+    """ 
+    Transforms the given restrictions into a SQL condition on the C{items}
+    table of the meta data index.
+    
+    @param restrictions: Search restrictions described as hierarchical organized list.
+    @type restrictions: C{list}
+    
+    @return: SQL condition and the corresponding parameters.
+    @rtype: C{tuple} of C{unicode}, C{tuple}
+    """
+    
+    conditionTerms = list()
+    conjunctionTerms = list()
+    for token in restrictions:
+        if isinstance(token, list):
+            conditionTerms.append(mapSearchRestriction(token))
+        elif token in __conjunctionOperatorMapping:
+            conjunctionTerms.append(token)
+        else: # conditionTerm
+            conditionTerms.append(__conditionTermParseAction(token))
+    
+    if len(conjunctionTerms) > 0 and conjunctionTerms[0] == constants.NOT_OPERATOR:
+        assert len(conditionTerms) == 1
+        condition, parameters = conditionTerms[0]
+        return "NOT (%s)" % condition, parameters
+    assert len(conditionTerms) == len(conjunctionTerms) + 1
+    condition, parameters = conditionTerms[0]
+    condition = "(%s)" % condition
+    for conjunctionTerm, (nextCondition, nextParameters) in zip(conjunctionTerms, conditionTerms[1:]):
+        condition += " %s (%s)" % (__conjunctionOperatorMapping[conjunctionTerm], nextCondition)
+        parameters += nextParameters
+    return condition, parameters
+
+
+def __conditionTermParseAction(condition):
+    """ Translates the operator, propertyName_, literal tuple to a SQL condition. """
+    
+    propertyName, operator, literal = condition
+    if operator in __comparisonOperatorMapping:
+        column, value = __mapLiteral(literal)
+        return (_PROPERTY_CONDITION % (" AND %s %s ?" % (column, __comparisonOperatorMapping[operator])), 
+                (propertyName, value))
+    elif operator == constants.LIKE_OPERATOR:
+        pattern = unicode(literal).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return (_PROPERTY_CONDITION % " AND textValue LIKE ? ESCAPE '\\'", (propertyName, "%" + pattern + "%"))
+    elif operator == constants.EXISTS_OPERATOR:
+        return _PROPERTY_CONDITION % "", (propertyName, )
+    elif operator == constants.IS_COLLECTION_OPERATOR:
+        return "isCollection = 1", ()
+    elif operator == constants.CONTENT_CONTAINS_OPERATOR:
+        return "0", () # The content is not indexed
+    else:
+        raise PersistenceError("Operator '%s' is not supported!" % operator)
+
+
+def __mapLiteral(literal):
+    """ Determines the column and value used to compare the literal. """
+    
+    if isinstance(literal, basestring):
+        return "textValue", literal
+    elif isinstance(literal, time.struct_time):
+        return "dateValue", time.mktime(literal)
+    else:
+        return "numberValue", float(literal)
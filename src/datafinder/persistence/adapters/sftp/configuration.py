@@ -40,11 +40,30 @@ SFTP configuration parameters.
 """
 
 
+from datafinder.persistence.adapters.sftp import constants
+
+
 __version__ = "$Revision-Id:$" 
 
 
 class Configuration(object):
-    """ Defines a set of SFTP configuration parameters. """
+    """ 
+    Defines a set of SFTP configuration parameters. 
+    
+    @ivar maxParallelTransfers: Maximum number of SFTP connections which are 
+                                concurrently used for tree operations.
+    @ivar serverSideCopy: Indicates whether collections are copied using C{cp} on the server.
+                          C{None} means that it is determined on first use.
+    @ivar attributeCacheTimeout: Time in seconds retrieved file attributes are reused.
+                                 C{0} disables the attribute cache.
+    @ivar transferBlockSize: Size in bytes of the blocks which are transferred at once.
+                             Uploads pass them to the pipelined SFTP file object.
+    @ivar windowSize: SSH transport window size in bytes which is advertised for received 
+                      data. Larger windows allow more unacknowledged data in flight on 
+                      high latency links. It only affects downloads. The window used
+                      for uploads is advertised by the server. Uploads rely on the
+                      pipelined writes instead.
+    """
     
     def __init__(self, baseConfiguration):
         """ 
@@ -54,6 +73,15 @@ class Configuration(object):
         
         self.baseUri = baseConfiguration.baseUri or ""
         self.hostname = baseConfiguration.uriHostname or ""
+        self.port = baseConfiguration.uriPort or constants.DEFAULT_SSH_PORT
         self.basePath = baseConfiguration.uriPath or "/"
         self.username = baseConfiguration.username
         self.password = baseConfiguration.password
+        self.maxParallelTransfers = baseConfiguration.maxParallelTransfers or constants.DEFAULT_PARALLEL_TRANSFERS
+        self.serverSideCopy = baseConfiguration.serverSideCopy
+        self.attributeCacheTimeout = baseConfiguration.attributeCacheTimeout
+        if self.attributeCacheTimeout is None:
+            self.attributeCacheTimeout = constants.DEFAULT_ATTRIBUTE_CACHE_TIMEOUT
+        self.transferBlockSize = baseConfiguration.transferBlockSize or baseConfiguration.blockSize \
+                                 or constants.DEFAULT_TRANSFER_BLOCK_SIZE
+        self.windowSize = baseConfiguration.windowSize or constants.DEFAULT_WINDOW_SIZE
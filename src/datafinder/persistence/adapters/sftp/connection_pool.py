@@ -43,9 +43,10 @@ Implements a connection pool for the SFTP adapter.
 
 import socket
 
-from paramiko import Transport, SSHException
+from paramiko import SSHException
 
 from datafinder.persistence.adapters.sftp import constants
+from datafinder.persistence.common.connection import ssh
 from datafinder.persistence.common.connection.pool import ConnectionPool
 from datafinder.persistence.error import PersistenceError
 
@@ -54,7 +55,12 @@ __version__ = "$Revision-Id:$"
 
 
 class SftpConnectionPool(ConnectionPool):
-    """ Implements the connection pool. """
+    """ 
+    Implements the connection pool. Every connection is a SFTP channel
+    on the SSH transport which is shared with other SSH-based adapters.
+    """
+    
+    _transportManager = ssh.transportManager
 
     def __init__(self, configuration):
         """ 
@@ -63,18 +69,21 @@ class SftpConnectionPool(ConnectionPool):
         """
         
         self._configuration = configuration
-        ConnectionPool.__init__(self, constants.MAX_CONNECTION_NUMBER)
+        ConnectionPool.__init__(
+            self, max(constants.MAX_CONNECTION_NUMBER, configuration.maxParallelTransfers + 1))
 
     def _createConnection(self):
         """
         @see: L{_createConnection<datafinder.persistence.common.connection.pool.ConnectionPool._createConnection>}
         """
 
+        transport = self._transportManager.acquire(
+            self._configuration.hostname, self._configuration.port, self._configuration.username, 
+            self._configuration.password, self._configuration.windowSize)
         try:
-            connection = Transport((self._configuration.hostname, constants.DEFAULT_SSH_PORT))
-            connection.connect(username=self._configuration.username, password=self._configuration.password)
-            return connection.open_sftp_client()
-        except (SSHException, socket.error, socket.gaierror), error:
+            return transport.open_sftp_client()
+        except (SSHException, socket.error), error:
+            self._transportManager.release(transport)
             errorMessage = u"Unable to establish SFTP connection to host '%s'! " \
                            % (self._configuration.hostname) + "\nReason: '%s'" % str(error)
             raise PersistenceError(errorMessage)
@@ -84,4 +93,8 @@ class SftpConnectionPool(ConnectionPool):
         @see: L{_releaseConnection<datafinder.persistence.common.connection.pool.ConnectionPool._releaseConnection>}
         """
         
-        return connection.close()
+        transport = connection.get_channel().get_transport()
+        try:
+            connection.close()
+        finally:
+            self._transportManager.release(transport)
@@ -46,7 +46,11 @@ __version__ = "$Revision-Id:$"
 DEFAULT_SSH_PORT = 22
 MAX_POOL_NUMBER = 10
 MAX_CONNECTION_NUMBER = 5
-BLOCK_SIZE = 30000
+DEFAULT_PARALLEL_TRANSFERS = 4
+DEFAULT_ATTRIBUTE_CACHE_TIMEOUT = 30 # seconds
+MAX_CACHED_ATTRIBUTES = 50000
+DEFAULT_TRANSFER_BLOCK_SIZE = 262144 # bytes
+DEFAULT_WINDOW_SIZE = 2097152 # bytes, receive window only
 FILE_NAME_ENCODING = "UTF-8"
 DEFAULT_DIRECTORY_PERMISSIONS = 0o3770 # rwxrws--T
 DEFAULT_FILE_PERMISSIONS = 0o660 # rw-rw----
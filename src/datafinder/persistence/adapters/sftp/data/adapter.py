@@ -44,34 +44,51 @@ __version__ = "$Revision-Id:$"
 
 
 import errno
+import pipes
 import stat
 import StringIO
 import sys
 import tempfile
+import time
 
 from paramiko.ssh_exception import SSHException
 from datafinder.persistence.error import PersistenceError
 from datafinder.persistence.data import datastorer
-from datafinder.persistence.adapters.sftp import constants
+from datafinder.persistence.adapters.sftp import constants, utils
+from datafinder.persistence.common import concurrency
+
+
+_CHECK_COPY_COMMAND = "command -v cp && command -v find"
+_COPY_COMMAND = "cp -R %(source)s %(destination)s && find %(destination)s -type d -exec chmod %(permissions)o {} +"
 
 
 class SftpDataAdapter(datastorer.NullDataStorer):
     """
     @note: Links are not supported.
     @note: Copying of large collections might be inefficient
+           if the server does not allow the execution of C{cp}
            because files are transferred to the client and then 
            back to the server. However, this is a limitation of SFTP.
     @see: For interface details see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}
     """
     
     def __init__(self, identifier, persistenceIdentifier, 
-                 connectionPool, factory, idMapper):
+                 connectionPool, factory, idMapper, configuration=None, 
+                 attributeCache=None, transferStatistics=None):
         datastorer.NullDataStorer.__init__(self, identifier)
         
         self._connectionPool = connectionPool
         self._persistenceIdentifier = persistenceIdentifier
         self._factory = factory
         self._idMapper = idMapper
+        self._configuration = configuration
+        self._attributeCache = attributeCache or utils.AttributeCache(0)
+        self._transferStatistics = transferStatistics or utils.TransferStatistics()
+        self._maxParallelTransfers = 1
+        self._transferBlockSize = constants.DEFAULT_TRANSFER_BLOCK_SIZE
+        if not configuration is None:
+            self._maxParallelTransfers = configuration.maxParallelTransfers
+            self._transferBlockSize = configuration.transferBlockSize
         
     @property
     def isCollection(self):
@@ -79,7 +96,8 @@ class SftpDataAdapter(datastorer.NullDataStorer):
         
         connection = self._connectionPool.acquire()
         try:
-            return stat.S_ISDIR(connection.stat(self._persistenceIdentifier).st_mode)
+            attributes = self._attributeCache.stat(connection, self._persistenceIdentifier)
+            return stat.S_ISDIR(attributes.st_mode)
         except (IOError, EOFError, SSHException):
             message = "Cannot determine item type (file or collection) of '%s'!" % self.identifier
             self._reRaiseError(message)
@@ -133,6 +151,7 @@ class SftpDataAdapter(datastorer.NullDataStorer):
             message = "Cannot create collection '%s'!" % self.identifier
             self._reRaiseError(message)
         finally:
+            self._attributeCache.invalidate(self._persistenceIdentifier)
             self._connectionPool.release(connection)
             
         # Set the directory permissions because the mode parameter of 
@@ -144,6 +163,7 @@ class SftpDataAdapter(datastorer.NullDataStorer):
         See os.chmode for details on the mode parameter (octal). 
         """
         connection = self._connectionPool.acquire()
+        self._attributeCache.invalidate(self._persistenceIdentifier)
         try:
             connection.chmod(self._persistenceIdentifier, mode)
         except (IOError, EOFError, SSHException):
@@ -164,15 +184,35 @@ class SftpDataAdapter(datastorer.NullDataStorer):
         raise PersistenceError("Not implemented.")
 
     def getChildren(self):
-        """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>} """
+        """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>} 
+        @note: The retrieved attributes of the children are cached except for symbolic links.
+        """
+        
+        return [identifier for identifier, _ in self.getTypedChildren()]
+    
+    def getTypedChildren(self):
+        """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>} 
+        @note: The retrieved attributes of the children are cached except for symbolic links.
+               C{listdir_attr} does not follow symbolic links in contrast to C{stat}. 
+               Thus, the item type of symbolic links is unknown.
+        """
         
         connection = self._connectionPool.acquire()
         try:
             children = list()
-            for name in connection.listdir(self._persistenceIdentifier):
-                name = name.decode(constants.FILE_NAME_ENCODING, "replace")
+            for attributes in connection.listdir_attr(self._persistenceIdentifier):
+                if not utils.isSymbolicLink(attributes):
+                    self._attributeCache.put(
+                        self._idMapper.determinePersistenceChildId(self._persistenceIdentifier, attributes.filename), 
+                        attributes)
+                name = attributes.filename.decode(constants.FILE_NAME_ENCODING, "replace")
                 child_id = self._idMapper.determineChildId(self.identifier, name)
-                children.append(child_id)
+                itemType = datastorer.ITEM_TYPE_LEAF
+                if utils.isSymbolicLink(attributes):
+                    itemType = None
+                elif stat.S_ISDIR(attributes.st_mode):
+                    itemType = datastorer.ITEM_TYPE_COLLECTION
+                children.append((child_id, itemType))
             return children
         except (IOError, EOFError, SSHException):
             message = "Cannot retrieve children of item '%s'!" % self.identifier
@@ -185,7 +225,7 @@ class SftpDataAdapter(datastorer.NullDataStorer):
         
         connection = self._connectionPool.acquire()
         try:
-            connection.stat(self._persistenceIdentifier)
+            self._attributeCache.stat(connection, self._persistenceIdentifier)
             return True
         except IOError, error:
             if error.errno == errno.ENOENT:
@@ -202,101 +242,163 @@ class SftpDataAdapter(datastorer.NullDataStorer):
         """
         @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}
         @note: As there is no library function to delete complete directories,
-               we implemented it on our own.
+               we implemented it on our own. Files are removed concurrently.
+               Afterwards, the directories are removed level by level starting
+               with the deepest one.
         """
         
-        isCollection = self.isCollection
-        connection = self._connectionPool.acquire()
         try:
-            if isCollection:
-                self._deleteCollection(connection)
+            if self.isCollection:
+                self._deleteCollection()
             else:
-                self._deleteLeaf(connection)
-        except (IOError, EOFError, SSHException):
+                self._performConcurrently(self._deleteLeaf, [self._persistenceIdentifier])
+        except (IOError, EOFError, SSHException, PersistenceError):
             message = "Cannot delete item '%s'!" % self.identifier
             self._reRaiseError(message)
         finally:
-            self._connectionPool.release(connection)
+            self._attributeCache.invalidate(self._persistenceIdentifier)
+            
+    def _deleteCollection(self):
+        leafs, collectionLevels = self._determineTree()
+        self._performConcurrently(self._deleteLeaf, leafs)
+        collectionLevels.reverse()
+        for collections in collectionLevels:
+            self._performConcurrently(self._deleteEmptiedCollection, collections)
             
-    def _deleteCollection(self, connection):
-        emptiedCollections = self._emptyAllCollections(connection)
-        self._deleteEmptiedCollections(connection, emptiedCollections)
+    def _determineTree(self):
+        """ Determines all files and the collections grouped by their depth.
+        The listing of the collections of one level is performed concurrently.
+        """
         
-    def _emptyAllCollections(self, connection):
+        leafs = list()
+        collectionLevels = list()
         collections = [self._persistenceIdentifier]
-        emptiedCollections = list()
         while collections:
-            currentCollection = collections[0]
-            for attrs in connection.listdir_attr(currentCollection):
-                persistenceId = self._idMapper.determinePersistenceChildId(
-                    currentCollection, attrs.filename)
-                if not stat.S_ISDIR(attrs.st_mode):
-                    connection.remove(persistenceId)
-                else:
-                    collections.append(persistenceId)
-            collections.remove(currentCollection)
-            emptiedCollections.append(currentCollection)
-        return emptiedCollections
+            collectionLevels.append(collections)
+            subCollections = list()
+            def _listCollection(connection, collection):
+                for attrs in connection.listdir_attr(collection):
+                    persistenceId = self._idMapper.determinePersistenceChildId(collection, attrs.filename)
+                    if stat.S_ISDIR(attrs.st_mode):
+                        subCollections.append(persistenceId)
+                    else:
+                        leafs.append(persistenceId)
+            self._performConcurrently(_listCollection, collections)
+            collections = subCollections
+        return leafs, collectionLevels
         
     @staticmethod
-    def _deleteEmptiedCollections(connection, emptiedCollections):
-        emptiedCollections.reverse()
-        for collection in emptiedCollections:
-            connection.rmdir(collection)
+    def _deleteEmptiedCollection(connection, persistenceId):
+        connection.rmdir(persistenceId)
+        
+    @staticmethod
+    def _deleteLeaf(connection, persistenceId):
+        connection.remove(persistenceId)
+        
+    def _performConcurrently(self, function, persistenceIds):
+        """ Calls C{function} with a pooled connection for every persistence identifier.
+        The calls are distributed over C{maxParallelTransfers} connections.
         
-    def _deleteLeaf(self, connection):
-        connection.remove(self._persistenceIdentifier)
+        @raise PersistenceError: Indicating that at least one call failed.
+        """
+        
+        def _perform(persistenceId):
+            connection = self._connectionPool.acquire()
+            try:
+                function(connection, persistenceId)
+            except (IOError, EOFError, SSHException), error:
+                raise PersistenceError(u"'%s': %s" % (persistenceId.decode(constants.FILE_NAME_ENCODING, "replace"), error))
+            finally:
+                self._connectionPool.release(connection)
+        errors = concurrency.performConcurrently(_perform, persistenceIds, self._maxParallelTransfers)
+        if errors:
+            raise PersistenceError(u"%i of %i operations failed. First problem: %s" 
+                                   % (len(errors), len(persistenceIds), errors.values()[0].message))
 
     def copy(self, destination):
         """
         @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}
-        @note: There is no library function to copy complete directories.
-               Additionally, every file needs to be transferred to the client
-               and back to the server. Thus, it takes some time to copy large data sets.
-               Unfortunately, this is a limitation of SFTP.
+        @note: Collections are copied using C{cp} on the server if the server allows 
+               command execution. Otherwise, every file needs to be transferred to the client
+               and back to the server. In this case, the files are copied concurrently.
         """
         
-        isCollection = self.isCollection
-        connection = self._connectionPool.acquire()
         try:
-            if isCollection:
-                self._copyCollection(connection, destination)
+            if self.isCollection:
+                self._copyCollection(destination)
             else:
                 self._copyLeaf(destination)
-        except (IOError, EOFError, SSHException):
+        except (IOError, EOFError, SSHException, PersistenceError):
             message = "Cannot copy item '%s'!" % self.identifier
             self._reRaiseError(message)
+            
+    def _copyCollection(self, destination):
+        destPersistenceId = self._idMapper.determinePeristenceId(destination.identifier)
+        self._attributeCache.invalidate(destPersistenceId)
+        if not self._copyCollectionOnServer(destPersistenceId):
+            leafs, collectionLevels = self._determineTree()
+            def _determineDestinationId(persistenceId):
+                return destPersistenceId + persistenceId[len(self._persistenceIdentifier):]
+            def _createCollection(connection, persistenceId):
+                destCollectionId = _determineDestinationId(persistenceId)
+                connection.mkdir(destCollectionId)
+                connection.chmod(destCollectionId, constants.DEFAULT_DIRECTORY_PERMISSIONS)
+            def _copyCollectionLeaf(connection, persistenceId):
+                self._copyFile(connection, persistenceId, _determineDestinationId(persistenceId), 
+                               self._transferBlockSize)
+            for collections in collectionLevels:
+                self._performConcurrently(_createCollection, collections)
+            self._performConcurrently(_copyCollectionLeaf, leafs)
+            
+    def _copyCollectionOnServer(self, destPersistenceId):
+        """ Copies the collection using C{cp} if the server allows command execution. 
+        The copied collections get the same permissions as collections created by the adapter.
+        The result of the check whether C{cp} can be executed is kept by the factory.
+        
+        @return: Flag indicating whether the collection has been copied.
+        @rtype: C{bool}
+        """
+        
+        if self._configuration is None or self._factory.serverSideCopy is False:
+            return False
+        connection = self._connectionPool.acquire()
+        try:
+            transport = connection.get_channel().get_transport()
+            if self._factory.serverSideCopy is None:
+                commandRunner = utils.SshCommandRunner(_CHECK_COPY_COMMAND, transport)
+                try:
+                    commandRunner.executeCommand()
+                except PersistenceError:
+                    self._factory.serverSideCopy = False
+                else:
+                    self._factory.serverSideCopy = commandRunner.exitStatus == 0
+                if not self._factory.serverSideCopy:
+                    return False
+            copyCommand = _COPY_COMMAND % {"source": pipes.quote(self._persistenceIdentifier), 
+                                           "destination": pipes.quote(destPersistenceId),
+                                           "permissions": constants.DEFAULT_DIRECTORY_PERMISSIONS}
+            commandRunner = utils.SshCommandRunner(copyCommand, transport)
+            _, standardError = commandRunner.executeCommand()
+            if commandRunner.exitStatus != 0:
+                raise PersistenceError(standardError.decode(constants.FILE_NAME_ENCODING, "replace"))
+            return True
         finally:
             self._connectionPool.release(connection)
             
-    def _copyCollection(self, connection, destination):
-        collections = [self]
-        baseOrginalId = self.identifier
-        baseDestinationId = destination.identifier
-        while collections:
-            currentCollection = collections[0]
-            self._createDestinationCollection(currentCollection, baseOrginalId, baseDestinationId)
-            self._copyCollectionContent(currentCollection, connection, collections, baseOrginalId, baseDestinationId)
-            
-    def _createDestinationCollection(self, orgCollection, baseOrginalId, baseDestinationId):
-        destCollectionId = orgCollection.identifier.replace(baseOrginalId, baseDestinationId)
-        destCollection = self._factory.createDataStorer(destCollectionId)
-        destCollection.createCollection()
-    
-    def _copyCollectionContent(self, orgCollection, connection, collections, baseOrginalId, baseDestinationId):
-        orgPersistenceId = self._idMapper.determinePeristenceId(orgCollection.identifier)
-        for attrs in connection.listdir_attr(orgPersistenceId):
-            name = attrs.filename.decode(constants.FILE_NAME_ENCODING, "replace")
-            itemId = self._idMapper.determineChildId(orgCollection.identifier, name)
-            itemStorer = self._factory.createDataStorer(itemId)
-            if stat.S_ISDIR(attrs.st_mode):
-                collections.append(itemStorer)
-            else:
-                destItemId = itemId.replace(baseOrginalId, baseDestinationId)
-                destItemStorer = self._factory.createDataStorer(destItemId)
-                data = itemStorer.readData()
-                destItemStorer.writeData(data)
-        collections.remove(orgCollection)
+    @staticmethod
+    def _copyFile(connection, persistenceId, destPersistenceId, blockSize):
+        sourceFileObject = connection.open(persistenceId)
+        try:
+            destFileObject = connection.open(destPersistenceId, "w")
+            try:
+                block = sourceFileObject.read(blockSize)
+                while block:
+                    destFileObject.write(block)
+                    block = sourceFileObject.read(blockSize)
+            finally:
+                destFileObject.close()
+        finally:
+            sourceFileObject.close()
     
     def _copyLeaf(self, destination):
         data = self.readData()
@@ -307,6 +409,8 @@ class SftpDataAdapter(datastorer.NullDataStorer):
         
         connection = self._connectionPool.acquire()
         destPersistenceId = self._idMapper.determinePeristenceId(destination.identifier)
+        self._attributeCache.invalidate(self._persistenceIdentifier)
+        self._attributeCache.invalidate(destPersistenceId)
         try:
             connection.rename(self._persistenceIdentifier, destPersistenceId)
         except (IOError, EOFError, SSHException):
@@ -323,10 +427,10 @@ class SftpDataAdapter(datastorer.NullDataStorer):
         try:
             temporaryFileObject.seek(0)
             remoteFileObject = connection.open(self._persistenceIdentifier)
-            block = remoteFileObject.read(constants.BLOCK_SIZE)
+            block = remoteFileObject.read(self._transferBlockSize)
             while block:
                 temporaryFileObject.write(block)
-                block = remoteFileObject.read(constants.BLOCK_SIZE)
+                block = remoteFileObject.read(self._transferBlockSize)
             temporaryFileObject.seek(0)
             return temporaryFileObject
         except (IOError, EOFError, SSHException):
@@ -340,14 +444,24 @@ class SftpDataAdapter(datastorer.NullDataStorer):
         
         connection = self._connectionPool.acquire()
         try:
-            remoteFileObject = connection.open(self._persistenceIdentifier, "w")
-            block = data.read(constants.BLOCK_SIZE)
-            while block:
-                remoteFileObject.write(block)
-                block = data.read(constants.BLOCK_SIZE)
+            startTime = time.time()
+            transferredBytes = 0
+            remoteFileObject = connection.open(self._persistenceIdentifier, "w", self._transferBlockSize)
+            try:
+                # Write responses are collected asynchronously and checked on close
+                remoteFileObject.set_pipelined(True)
+                block = data.read(self._transferBlockSize)
+                while block:
+                    remoteFileObject.write(block)
+                    transferredBytes += len(block)
+                    block = data.read(self._transferBlockSize)
+            finally:
+                remoteFileObject.close()
+            self._transferStatistics.record(transferredBytes, time.time() - startTime)
         except (IOError, EOFError, SSHException):
             message = "Cannot write data to item '%s'!" % self.identifier
             self._reRaiseError(message)
         finally:
+            self._attributeCache.invalidate(self._persistenceIdentifier)
             data.close()
             self._connectionPool.release(connection)
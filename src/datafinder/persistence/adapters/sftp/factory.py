@@ -42,10 +42,6 @@ Implements the basic SFTP file system.
 
 
 import decimal
-import logging
-import socket
-
-from paramiko import SSHException
 
 from datafinder.persistence.error import PersistenceError
 
@@ -53,6 +49,7 @@ from datafinder.persistence.adapters.sftp import constants, utils
 from datafinder.persistence.adapters.sftp.configuration import Configuration
 from datafinder.persistence.adapters.sftp.connection_pool import SftpConnectionPool
 from datafinder.persistence.adapters.sftp.data.adapter import SftpDataAdapter
+from datafinder.persistence.adapters.sftp.metadata.adapter import MetadataSftpAdapter
 from datafinder.persistence.common.base_factory import BaseFileSystem
 from datafinder.persistence.common.connection.manager import ConnectionPoolManager
 
@@ -61,7 +58,12 @@ __version__ = "$Revision-Id:$"
 
 
 class FileSystem(BaseFileSystem):
-    """ Implements factory of the SFTP file system. """
+    """ 
+    Implements factory of the SFTP file system. 
+    
+    @ivar serverSideCopy: Indicates whether collections are copied using C{cp} on the server.
+                          C{None} means that it is determined on first use.
+    """
     
     _connectionManager = ConnectionPoolManager(constants.MAX_POOL_NUMBER)
     
@@ -75,6 +77,9 @@ class FileSystem(BaseFileSystem):
         self._configuration = Configuration(baseConfiguration)
         self._connectionPool = self._getConnectionPool()
         self._idMapper = utils.ItemIdentifierMapper(self._configuration.basePath)
+        self._attributeCache = utils.AttributeCache(self._configuration.attributeCacheTimeout)
+        self._transferStatistics = utils.TransferStatistics()
+        self.serverSideCopy = self._configuration.serverSideCopy
         
     def _getConnectionPool(self):
         connectionPool = self._connectionManager.get(self._configuration.baseUri)
@@ -96,7 +101,40 @@ class FileSystem(BaseFileSystem):
         
         persistenceId = self._idMapper.determinePeristenceId(identifier)
         return SftpDataAdapter(
-            identifier, persistenceId, self._connectionPool, self, self._idMapper)
+            identifier, persistenceId, self._connectionPool, self, self._idMapper, 
+            self._configuration, self._attributeCache, self._transferStatistics)
+    
+    def createMetadataStorer(self, identifier):
+        """ 
+        Creates a SFTP specific meta data storer instance which provides the system-specific properties.
+        
+        @param identifier: Logical identifier of a file system item.
+        @type identifier: C{unicode}
+        
+        @return: SFTP specific meta data storer instance.
+        @rtype: L{MetadataSftpAdapter<datafinder.persistence.adapters.sftp.metadata.adapter.MetadataSftpAdapter>}
+        """
+        
+        persistenceId = self._idMapper.determinePeristenceId(identifier)
+        return MetadataSftpAdapter(identifier, persistenceId, self._connectionPool, self._attributeCache)
+    
+    @property
+    def transferStatistics(self):
+        """ 
+        Throughput statistics of the data uploads performed via this file system.
+        
+        @rtype: L{TransferStatistics<datafinder.persistence.adapters.sftp.utils.TransferStatistics>}
+        """
+        
+        return self._transferStatistics
+    
+    @property
+    def blockSize(self):
+        """ 
+        @see: L{BaseFileSystem.blockSize<datafinder.persistence.common.base_factory.BaseFileSystem.blockSize>}
+        """
+        
+        return self._configuration.transferBlockSize
     
     def release(self):
         """ 
@@ -126,7 +164,7 @@ class FileSystem(BaseFileSystem):
             transport = connection.get_channel().get_transport()
             diskFreeCommand = "df -k %s" % self._configuration.basePath
             print diskFreeCommand
-            commandRunner = _SshCommandRunner(diskFreeCommand, transport)
+            commandRunner = utils.SshCommandRunner(diskFreeCommand, transport)
             diskFreeCommandOutput, _ = commandRunner.executeCommand()
             return _parseDiskFreeCommandOutForAvailableSpace(diskFreeCommandOutput)
         finally:
@@ -150,61 +188,3 @@ def _parseDiskFreeCommandOutForAvailableSpace(diskFreeCommandOutput):
                     raise PersistenceError("Unable to parse df command output '%s' for avaialble disk space." % diskFreeCommandOutput)
     # Handle all non-conformant df command outputs
     raise PersistenceError("Unable to parse df command output '%s' for avaialble disk space." % diskFreeCommandOutput)
-
-
-class _SshCommandRunner(object):
-    """ Helper class which executes a specific SSH command on the basis of an 
-    authenticated transport channel. It creates a new channel and properly closes it.
-    This class might be reused in the TSM adapter.
-    """
-    
-    _log = logging.getLogger()
-    
-    def __init__(self, command, transport, timeout=500.0, maxReceivedBytes=1024):
-        """
-        @param command: String representing the command that should be executed.
-        @type command: C{str}
-        @param transport: An authenticated paramiko transport channel.
-        @type transport: C{paramiko.Transport}
-        """
-        
-        self._command = command
-        self._transport = transport
-        self._timeout = timeout
-        self._maxReceivedBytes = maxReceivedBytes
-        
-    def executeCommand(self):
-        """ 
-        Executes the given command on the connected host and returns corresponding
-        standard output and standard error output.
-
-        @raise PersistenceError: Indicating problem executing the specific command.
-        """
-        
-        channel = self._transport.open_session()
-        channel.settimeout(self._timeout)
-        try:
-            channel.exec_command(self._command)
-        except SSHException, sshException:
-            errorMessage = "Cannot send command '%s' to host.\nReason: '%s'" % (self._command, str(sshException)) 
-            raise PersistenceError(errorMessage)
-        else:
-            standardOutput =  self._getCommandOutput(channel.recv)
-            standardError = self._getCommandOutput(channel.recv_stderr)
-            if standardError:
-                self._log.debug(standardError)
-            return standardOutput, standardError
-        finally:
-            channel.close()
-
-    def _getCommandOutput(self, outputFunction):
-        output = ""
-        try:
-            outputContentPart = outputFunction(self._maxReceivedBytes)
-            while len(outputContentPart) > 0:
-                output = output + outputContentPart
-                outputContentPart = outputFunction(self._maxReceivedBytes)
-        except socket.timeout:
-            raise PersistenceError("Receiving out put from '%s' command timed out." % self._command)
-        else:
-            return output
@@ -0,0 +1,118 @@
+# $Filename$ 
+# $Authors$
+#
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Implements the read-only meta data adapter of the SFTP file system.
+"""
+
+
+from datetime import datetime
+import mimetypes
+
+from paramiko.ssh_exception import SSHException
+
+from datafinder.persistence.adapters.sftp import utils
+from datafinder.persistence.error import PersistenceError
+from datafinder.persistence.metadata import constants, value_mapping
+from datafinder.persistence.metadata.metadatastorer import NullMetadataStorer
+
+
+__version__ = "$Revision-Id:$" 
+
+
+class MetadataSftpAdapter(NullMetadataStorer):
+    """ Provides the system-specific properties of SFTP files and directories. """
+    
+    def __init__(self, identifier, persistenceIdentifier, connectionPool, attributeCache=None):
+        """ 
+        @param identifier: Logical identifier of the item.
+        @type identifier: C{unicode}
+        @param persistenceIdentifier: Path of the item on the SFTP server.
+        @type persistenceIdentifier: C{str}
+        @param connectionPool: The SFTP connection pool.
+        @type connectionPool: L{SftpConnectionPool<datafinder.persistence.adapters.sftp.connection_pool.SftpConnectionPool>}
+        @param attributeCache: Cache of already retrieved attributes.
+        @type attributeCache: L{AttributeCache<datafinder.persistence.adapters.sftp.utils.AttributeCache>}
+        """
+        
+        NullMetadataStorer.__init__(self, identifier)
+        self._persistenceIdentifier = persistenceIdentifier
+        self._connectionPool = connectionPool
+        self._attributeCache = attributeCache or utils.AttributeCache(0)
+        
+    def retrieve(self, propertyIds=None):
+        """ @see: L{NullMetadataStorer<datafinder.persistence.metadata.metadatastorer.NullMetadataStorer>}"""
+        
+        connection = self._connectionPool.acquire()
+        try:
+            attributes = self._attributeCache.stat(connection, self._persistenceIdentifier)
+        except (IOError, EOFError, SSHException), error:
+            errorMessage = "Cannot retrieve properties of item '%s'. Reason: '%s'" % (self.identifier, error)
+            raise PersistenceError(errorMessage)
+        finally:
+            self._connectionPool.release(connection)
+        mappedResult = self._mapAttributes(attributes)
+        return self._filterResult(propertyIds, mappedResult)
+        
+    def _mapAttributes(self, attributes):
+        """ Maps the SFTP attributes to interface format. """
+        
+        mappedResult = dict()
+        mappedResult[constants.MODIFICATION_DATETIME] = value_mapping.MetadataValue(str(attributes.st_mtime), datetime)
+        mappedResult[constants.SIZE] = value_mapping.MetadataValue(str(attributes.st_size))
+        mappedResult[constants.OWNER] = value_mapping.MetadataValue("")
+
+        mimeType = mimetypes.guess_type(self._persistenceIdentifier, False)
+        if mimeType[0] is None:
+            mappedResult[constants.MIME_TYPE] = value_mapping.MetadataValue("")
+        else:
+            mappedResult[constants.MIME_TYPE] = value_mapping.MetadataValue(mimeType[0])
+        return mappedResult
+        
+    @staticmethod
+    def _filterResult(selectedPropertyIds, mappedResult):
+        """ Filters the result so it contains only the specified properties. """
+        
+        if not selectedPropertyIds is None and len(selectedPropertyIds) > 0:
+            result = dict()
+            for propertyId in selectedPropertyIds:
+                if propertyId in mappedResult:
+                    result[propertyId] = mappedResult[propertyId]
+            return result
+        else:
+            return mappedResult
@@ -41,7 +41,17 @@ Implements some utility functionality.
 """
 
 
+import logging
+import posixpath
+import socket
+import stat
+import threading
+import time
+
+from paramiko import SSHException
+
 from datafinder.persistence.adapters.sftp import constants
+from datafinder.persistence.error import PersistenceError
 
 
 __version__ = "$Revision-Id:$" 
@@ -122,3 +132,227 @@ class ItemIdentifierMapper(object):
         """
         
         return ItemIdentifierMapper.determineChildId(persistenceIdentifier, name)
+
+
+def isSymbolicLink(attributes):
+    """ Checks whether the attributes retrieved via C{lstat} or C{listdir_attr} describe a symbolic link.
+    
+    @param attributes: The retrieved attributes.
+    @type attributes: C{paramiko.SFTPAttributes}
+    
+    @rtype: C{bool}
+    """
+    
+    return not attributes.st_mode is None and stat.S_ISLNK(attributes.st_mode)
+
+
+class AttributeCache(object):
+    """ Keeps the SFTP attributes of items for a limited time to avoid 
+    repeated C{stat} calls. The attributes are stored by persistence identifier.
+    Only attributes as returned by C{stat} should be added, i.e. symbolic links
+    have to be resolved.
+    """
+    
+    def __init__(self, timeout=constants.DEFAULT_ATTRIBUTE_CACHE_TIMEOUT):
+        """
+        @param timeout: Time in seconds the attributes are valid. C{0} disables caching.
+        @type timeout: C{int}
+        """
+        
+        self._timeout = timeout
+        self._attributes = dict()
+        self._lock = threading.Lock()
+        
+    def get(self, persistenceId):
+        """ Returns the attributes if they are still valid or C{None}.
+        
+        @param persistenceId: Path on the SFTP server.
+        @type persistenceId: C{str}
+        
+        @rtype: C{paramiko.SFTPAttributes}
+        """
+        
+        with self._lock:
+            if persistenceId in self._attributes:
+                attributes, expirationTime = self._attributes[persistenceId]
+                if time.time() < expirationTime:
+                    return attributes
+                del self._attributes[persistenceId]
+            
+    def stat(self, connection, persistenceId):
+        """ Returns the cached attributes or retrieves them using the given connection.
+        
+        @param connection: SFTP connection which is used if the attributes are not cached.
+        @type connection: C{paramiko.SFTPClient}
+        @param persistenceId: Path on the SFTP server.
+        @type persistenceId: C{str}
+        
+        @rtype: C{paramiko.SFTPAttributes}
+        @raise IOError: Indicating problems retrieving the attributes.
+        """
+        
+        attributes = self.get(persistenceId)
+        if attributes is None:
+            attributes = connection.stat(persistenceId)
+            self.put(persistenceId, attributes)
+        return attributes
+            
+    def put(self, persistenceId, attributes):
+        """ Adds the attributes retrieved from the server.
+        
+        @param persistenceId: Path on the SFTP server.
+        @type persistenceId: C{str}
+        @param attributes: The retrieved attributes.
+        @type attributes: C{paramiko.SFTPAttributes}
+        """
+        
+        if self._timeout > 0:
+            with self._lock:
+                if len(self._attributes) >= constants.MAX_CACHED_ATTRIBUTES:
+                    self._attributes.clear()
+                self._attributes[persistenceId] = attributes, time.time() + self._timeout
+                
+    def invalidate(self, persistenceId):
+        """ Removes the attributes of the item, its parent and all its descendants.
+        This is required after modifications of the item.
+        
+        @param persistenceId: Path on the SFTP server.
+        @type persistenceId: C{str}
+        """
+        
+        with self._lock:
+            if persistenceId.endswith("/"):
+                persistenceId = persistenceId[:-1]
+            self._attributes.pop(persistenceId, None)
+            self._attributes.pop(posixpath.dirname(persistenceId), None)
+            prefix = persistenceId + "/"
+            for cachedPersistenceId in self._attributes.keys():
+                if cachedPersistenceId.startswith(prefix):
+                    del self._attributes[cachedPersistenceId]
+
+
+class TransferStatistics(object):
+    """ Collects the number of transferred bytes and the required time to 
+    determine the achieved throughput. Instances are shared between the 
+    adapters of a file system and can be safely used from different threads.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._transferredBytes = 0
+        self._transferTime = 0.0
+        self._transferNumber = 0
+        
+    def record(self, transferredBytes, transferTime):
+        """ Adds a finished transfer.
+        
+        @param transferredBytes: Number of transferred bytes.
+        @type transferredBytes: C{int}
+        @param transferTime: Duration of the transfer in seconds.
+        @type transferTime: C{float}
+        """
+        
+        with self._lock:
+            self._transferredBytes += transferredBytes
+            self._transferTime += transferTime
+            self._transferNumber += 1
+            
+    def reset(self):
+        """ Discards all recorded transfers. """
+        
+        with self._lock:
+            self._transferredBytes = 0
+            self._transferTime = 0.0
+            self._transferNumber = 0
+        
+    @property
+    def transferredBytes(self):
+        """ Number of bytes transferred in total. """
+        
+        return self._transferredBytes
+        
+    @property
+    def transferTime(self):
+        """ Time in seconds spent for all transfers. """
+        
+        return self._transferTime
+    
+    @property
+    def transferNumber(self):
+        """ Number of recorded transfers. """
+        
+        return self._transferNumber
+    
+    @property
+    def throughput(self):
+        """ Average throughput in bytes per second or C{0.0} if nothing has been transferred. """
+        
+        with self._lock:
+            if self._transferTime > 0:
+                return self._transferredBytes / self._transferTime
+            return 0.0
+
+
+class SshCommandRunner(object):
+    """ Helper class which executes a specific SSH command on the basis of an 
+    authenticated transport channel. It creates a new channel and properly closes it.
+    
+    @ivar exitStatus: Exit status of the last executed command or C{None}.
+    """
+    
+    _log = logging.getLogger()
+    
+    def __init__(self, command, transport, timeout=500.0, maxReceivedBytes=1024):
+        """
+        @param command: String representing the command that should be executed.
+        @type command: C{str}
+        @param transport: An authenticated paramiko transport channel.
+        @type transport: C{paramiko.Transport}
+        """
+        
+        self._command = command
+        self._transport = transport
+        self._timeout = timeout
+        self._maxReceivedBytes = maxReceivedBytes
+        self.exitStatus = None
+        
+    def executeCommand(self):
+        """ 
+        Executes the given command on the connected host and returns corresponding
+        standard output and standard error output.
+
+        @raise PersistenceError: Indicating problem executing the specific command.
+        """
+        
+        try:
+            channel = self._transport.open_session()
+        except SSHException, sshException:
+            errorMessage = "Cannot open channel to host.\nReason: '%s'" % str(sshException) 
+            raise PersistenceError(errorMessage)
+        channel.settimeout(self._timeout)
+        try:
+            channel.exec_command(self._command)
+        except SSHException, sshException:
+            errorMessage = "Cannot send command '%s' to host.\nReason: '%s'" % (self._command, str(sshException)) 
+            raise PersistenceError(errorMessage)
+        else:
+            standardOutput =  self._getCommandOutput(channel.recv)
+            standardError = self._getCommandOutput(channel.recv_stderr)
+            if standardError:
+                self._log.debug(standardError)
+            self.exitStatus = channel.recv_exit_status()
+            return standardOutput, standardError
+        finally:
+            channel.close()
+
+    def _getCommandOutput(self, outputFunction):
+        output = ""
+        try:
+            outputContentPart = outputFunction(self._maxReceivedBytes)
+            while len(outputContentPart) > 0:
+                output = output + outputContentPart
+                outputContentPart = outputFunction(self._maxReceivedBytes)
+        except socket.timeout:
+            raise PersistenceError("Receiving out put from '%s' command timed out." % self._command)
+        else:
+            return output
@@ -45,6 +45,7 @@ import os
 import tempfile
 
 from datafinder.persistence.error import PersistenceError
+from datafinder.persistence.adapters.svn.constants import BLOCK_SIZE
 from datafinder.persistence.adapters.svn.util.util import pepareSvnPath
 
 
@@ -52,7 +53,11 @@ __version__ = "$Revision-Id$"
 
 
 class Configuration(object):
-    """ Defines a set of configuration parameters of the SVN protocol. """
+    """ 
+    Defines a set of configuration parameters of the SVN protocol. 
+    
+    @ivar blockSize: Size in bytes of the blocks used when writing data to the working copy.
+    """
     
     def __init__(self, baseConfiguration):
         """ 
@@ -66,6 +71,7 @@ class Configuration(object):
 
         self.username = baseConfiguration.username
         self.password = baseConfiguration.password
+        self.blockSize = baseConfiguration.blockSize or BLOCK_SIZE
         
         baseWorkingCopyPath = baseConfiguration.baseWorkingDirectory or tempfile.gettempdir()
         if not baseWorkingCopyPath is None:
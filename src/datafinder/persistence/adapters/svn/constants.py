@@ -52,3 +52,5 @@ LC_ALL = "LC_ALL"
 
 LINK_TARGET_PROPERTY_NAME = "datafinder:____LINK____"
 JSON_PROPERTY_NAME = "datafinder:json"
+
+BLOCK_SIZE = 1048576 # bytes
@@ -49,19 +49,19 @@ from datafinder.persistence.adapters.svn.error import SubversionError
 from datafinder.persistence.adapters.svn import constants
 from datafinder.persistence.adapters.svn.util import util
 from datafinder.persistence.data.datastorer import NullDataStorer
+from datafinder.persistence.metadata.value_mapping import json_format
 
 
 __version__ = "$Revision-Id$" 
 
 
-_BLOCK_SIZE = 30000
 _log = logging.getLogger()
 
 
 class DataSubversionAdapter(NullDataStorer):
     """ An adapter instance represents an item within the SVN file system. """
 
-    def __init__(self, identifier, connectionPool):
+    def __init__(self, identifier, connectionPool, blockSize=constants.BLOCK_SIZE):
         """
         Constructor.
         
@@ -70,10 +70,13 @@ class DataSubversionAdapter(NullDataStorer):
         @param connectionPool: Connection pool.
         @type connectionPool: L{Connection<datafinder.persistence.svn.
         connection_pool.SVNConnectionPool>}
+        @param blockSize: Size in bytes of the blocks used when writing data.
+        @type blockSize: C{int}
         """
         
         NullDataStorer.__init__(self, identifier)
         self._connectionPool = connectionPool
+        self._blockSize = blockSize
 
     @property
     def linkTarget(self):
@@ -157,8 +160,13 @@ class DataSubversionAdapter(NullDataStorer):
         finally:
             self._connectionPool.release(connection)
             
-    def createResource(self):
-        """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>} """
+    def createResource(self, properties=None):
+        """ 
+        @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>} 
+        
+        @param properties: Optional custom meta data which is committed together with the resource.
+        @type properties: C{dict}, keys: C{unicode}, values: C{object}
+        """
 
         connection = self._connectionPool.acquire()
         path = connection.workingCopyPath + self.identifier
@@ -171,7 +179,11 @@ class DataSubversionAdapter(NullDataStorer):
                     shutil.rmtree(path)
                 self._createLocalFile(path)
             connection.add(self.identifier)
-            connection.checkin(self.identifier)
+            if properties: # Setting the property checks in the new resource as well
+                connection.setProperty(self.identifier, constants.JSON_PROPERTY_NAME, 
+                                       json_format.convertToPersistenceFormat(properties))
+            else:
+                connection.checkin(self.identifier)
         except OSError, error:
             errorMessage = os.strerror(error.errno)
             raise PersistenceError(errorMessage)
@@ -228,7 +240,7 @@ class DataSubversionAdapter(NullDataStorer):
         """ Helper which create the parent data storer. """
   
         parentId = util.determineParentPath(self.identifier)
-        return DataSubversionAdapter(parentId, self._connectionPool)
+        return DataSubversionAdapter(parentId, self._connectionPool, self._blockSize)
 
     def getChildren(self):
         """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}  """
@@ -251,10 +263,10 @@ class DataSubversionAdapter(NullDataStorer):
             connection.update(self.identifier)
             fd = open(connection.workingCopyPath + self.identifier, "wb")
             try:
-                block = dataStream.read(_BLOCK_SIZE)
+                block = dataStream.read(self._blockSize)
                 while len(block) > 0:
                     fd.write(block)
-                    block = dataStream.read(_BLOCK_SIZE)
+                    block = dataStream.read(self._blockSize)
             finally:
                 fd.close()
                 dataStream.close()
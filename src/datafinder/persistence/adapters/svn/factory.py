@@ -101,7 +101,7 @@ class FileSystem(BaseFileSystem):
         data.adapter.DataSubversionAdapter>
         """
         
-        return DataSubversionAdapter(identifier, self._connectionPool)    
+        return DataSubversionAdapter(identifier, self._connectionPool, self._configuration.blockSize)
     
     def createMetadataStorer(self, identifier):
         """ 
@@ -114,6 +114,23 @@ class FileSystem(BaseFileSystem):
 
         return MetadataSubversionAdapter(identifier, self._connectionPool)
     
+    def createResource(self, dataStorer, metadataStorer, properties):
+        """ 
+        @see: L{BaseFileSystem.createResource<datafinder.persistence.common.base_factory.BaseFileSystem.createResource>}
+        @note: The resource and its meta data are committed at once.
+        """
+        
+        dataStorer.createResource(properties)
+    
+    @property
+    def blockSize(self):
+        """ 
+        This is the SVN-specific implementation.
+        @see: L{BaseFileSystem.blockSize<datafinder.persistence.common.base_factory.BaseFileSystem.blockSize>}
+        """
+        
+        return self._configuration.blockSize
+
     def release(self):
         """ Releases the acquired connection pool. """
         
@@ -222,6 +222,7 @@ class JythonSubversionWrapper(object):
         try:
             self._svnWorkingCopyClient.doSetProperty(File(path), key, SVNPropertyValue.create(value), False, \
                                                      SVNDepth.EMPTY, ISVNPropertyHandler, None)
+            self.checkin(path)
         except SVNException, error:
             raise SubversionError(error)
         
@@ -42,12 +42,18 @@ Implements a configuration holder object.
 
 from urlparse import urlsplit
 
+from datafinder.persistence.adapters.tsm.constants import BLOCK_SIZE, DEFAULT_SSH_PORT
+
 
 __version__ = "$Revision-Id:$" 
 
 
 class Configuration(object):
-    """ Defines a set of configuration parameters for TSdM access. """
+    """ 
+    Defines a set of configuration parameters for TSdM access. 
+    
+    @ivar blockSize: Size in bytes of the blocks used when transferring data.
+    """
     
     def __init__(self, baseConfiguration):
         """ 
@@ -58,12 +64,14 @@ class Configuration(object):
         """
         
         self.baseUri = baseConfiguration.baseUri
-        hostname, path = self._determineHostAndPath(baseConfiguration.uriPath or "")
+        hostname, port, path = self._determineHostAndPath(baseConfiguration.uriPath or "")
         self.hostname = hostname or ""
+        self.port = port or DEFAULT_SSH_PORT
         self.basePath = path
         self.username = baseConfiguration.username
         self.password = baseConfiguration.password
         self.serverNodeName = baseConfiguration.serverNodeName
+        self.blockSize = baseConfiguration.blockSize or BLOCK_SIZE
         
     @staticmethod
     def _determineHostAndPath(hostAndPath):
@@ -77,4 +85,4 @@ class Configuration(object):
         # cannot correctly determine it.
 
         splitUrl = urlsplit("http:" + hostAndPath, allow_fragments=False)
-        return splitUrl.hostname, splitUrl.path
+        return splitUrl.hostname, splitUrl.port, splitUrl.path
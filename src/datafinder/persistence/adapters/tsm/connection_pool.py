@@ -41,20 +41,24 @@ Implements a connection pool for TSM adapter.
 """
 
 
-import socket
-
-from paramiko import Transport, SSHException
-
-from datafinder.persistence.adapters.tsm.constants import DEFAULT_SSH_PORT
+from datafinder.persistence.adapters.tsm.session import TsmSession
+from datafinder.persistence.common.connection import ssh
 from datafinder.persistence.common.connection.pool import ConnectionPool
-from datafinder.persistence.error import PersistenceError
 
 
 __version__ = "$Revision-Id:$" 
 
 
+_CHANNELS_PER_SESSION = 2 # The SFTP channel and the channel of the executed command
+
+
 class TsmConnectionPool(ConnectionPool):
-    """ Implements the connection pool. """
+    """ 
+    Implements the connection pool. The sessions use the SSH transport 
+    which is shared with other SSH-based adapters.
+    """
+    
+    _transportManager = ssh.transportManager
 
     def __init__(self, configuration):
         """ 
@@ -72,18 +76,17 @@ class TsmConnectionPool(ConnectionPool):
         @see: L{_createConnection<datafinder.persistence.common.connection.pool.ConnectionPool._createConnection>}
         """
 
-        try:
-            connection = Transport((self._configuration.hostname, DEFAULT_SSH_PORT))
-            connection.connect(username=self._configuration.username, password=self._configuration.password)
-            return connection
-        except (SSHException, socket.error, socket.gaierror), error:
-            errorMessage = u"Unable to establish SSH connection to TSM host '%s'! " \
-                           % (self._configuration.hostname) + "\nReason: '%s'" % str(error)
-            raise PersistenceError(errorMessage)
+        transport = self._transportManager.acquire(
+            self._configuration.hostname, self._configuration.port, 
+            self._configuration.username, self._configuration.password, channels=_CHANNELS_PER_SESSION)
+        return TsmSession(transport)
 
     def _releaseConnection(self, connection):
         """
         @see: L{_releaseConnection<datafinder.persistence.common.connection.pool.ConnectionPool._releaseConnection>}
         """
         
-        return connection.close()
+        try:
+            connection.close()
+        finally:
+            self._transportManager.release(connection.transport, _CHANNELS_PER_SESSION)
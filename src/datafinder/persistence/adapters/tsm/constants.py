@@ -47,3 +47,4 @@ DEFAULT_SSH_PORT = 22
 MAXIMUM_RECEIVED_BYTES = 1024
 CONNECTION_TIMEOUT = 500.0
 MAX_POOL_NUMBER = 10
+BLOCK_SIZE = 262144 # bytes
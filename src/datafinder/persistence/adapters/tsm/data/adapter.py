@@ -43,12 +43,14 @@ stored in a Tivoli Storage Manager archive.
 
 
 import logging
-import socket
+import posixpath
+import re
 import tempfile
+import uuid
 
-from paramiko import SSHException, SFTPClient
+from paramiko import SSHException
 
-from datafinder.persistence.adapters.tsm.constants import CONNECTION_TIMEOUT, MAXIMUM_RECEIVED_BYTES
+from datafinder.persistence.adapters.tsm import constants
 from datafinder.persistence.data.datastorer import NullDataStorer 
 from datafinder.persistence.error import PersistenceError
 
@@ -56,19 +58,20 @@ from datafinder.persistence.error import PersistenceError
 __version__ = "$Revision-Id$" 
 
 
-_BLOCK_SIZE = 30000
-
-_TIMEOUT_ERROR_MESSAGE = "A timeout occurred during the execution of command '%s'!"
-_COMMAND_STDERR_MESSAGE_START = "Problems executing command"
-
 _ARCHIVE_COMMANDLINE_TOOL = u"dsmc"
 _ARCHIVE_RESOURCE_COMMAND = _ARCHIVE_COMMANDLINE_TOOL + " archive %s -v2archive -deletefiles -se=%s"
 _QUERY_RESOURE_COMMAND = _ARCHIVE_COMMANDLINE_TOOL + " query archive %s -se=%s"
 _RETRIEVE_RESOURCE_COMMAND = _ARCHIVE_COMMANDLINE_TOOL + " retrieve %s -replace=yes -se=%s"
 _DELETE_ARCHIVE_COMMAND = _ARCHIVE_COMMANDLINE_TOOL + " delete archive %s -noprompt -se=%s"
 
-_UNKNOWN_TSM_NODE_ERROR_CODE = "ANS1217E"
-_INVALID_OPTION_ERROR_CODE = "ANS1107E"
+_ARCHIVE_FILELIST_COMMAND = _ARCHIVE_COMMANDLINE_TOOL + " archive -filelist=%s -v2archive -deletefiles -se=%s"
+_QUERY_FILELIST_COMMAND = _ARCHIVE_COMMANDLINE_TOOL + " query archive -filelist=%s -se=%s"
+_RETRIEVE_FILELIST_COMMAND = _ARCHIVE_COMMANDLINE_TOOL + " retrieve -filelist=%s -replace=yes -se=%s"
+_FILELIST_NAME = ".datafinder-filelist-%s"
+
+_QUERY_ENTRY_PATTERN = re.compile(r"^\s*[\d,.]+\s+\S+\s+\d\d/\d\d/\d{4}\s+\d\d:\d\d:\d\d\s+"
+                                  r"(?P<path>.+?)\s+(Never|\d\d/\d\d/\d{4})(\s|$)")
+
 _NON_MATCHING_FILESEARCH_ERROR_CODE = "ANS1092W"
 _NO_FILES_PREVIOUSLY_ARCHIVED = "ANS1083E"
 
@@ -79,9 +82,13 @@ _log = logging.getLogger()
 class DataTsmAdapter(NullDataStorer):
     """ Stores data in a TSM archive. """
 
-    def __init__(self, identifier, persistenceIdentifier, serverNodeName, connectionPool):
+    def __init__(self, identifier, persistenceIdentifier, serverNodeName, connectionPool, 
+                 blockSize=constants.BLOCK_SIZE):
         """
         @see L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}
+        
+        @param blockSize: Size in bytes of the blocks used when transferring data.
+        @type blockSize: C{int}
         """
         
         NullDataStorer.__init__(self, identifier)
@@ -89,6 +96,7 @@ class DataTsmAdapter(NullDataStorer):
         self._persistenceIdentifier = persistenceIdentifier
         self._serverNodeName = serverNodeName
         self._connectionPool = connectionPool
+        self._blockSize = blockSize
         
     @property
     def isLeaf(self):
@@ -122,6 +130,8 @@ class DataTsmAdapter(NullDataStorer):
     def exists(self):
         """
         @see L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}
+        The query output is parsed while it is received. The query is finished as soon 
+        as the archive has been found.
         """
         
         connection = self._connectionPool.acquire()
@@ -129,7 +139,13 @@ class DataTsmAdapter(NullDataStorer):
             exists = True
             command = _QUERY_RESOURE_COMMAND % (self._persistenceIdentifier, self._serverNodeName)
             try:
-                self._sendCommand(command, connection)
+                outputLines = connection.iterateOutputLines(command)
+                try:
+                    for archivedFile in iterateArchivedFiles(outputLines):
+                        if archivedFile == self._persistenceIdentifier:
+                            return True
+                finally:
+                    outputLines.close()
             except PersistenceError, error:
                 if _NON_MATCHING_FILESEARCH_ERROR_CODE in error.message:
                     if self.identifier != "/":
@@ -145,18 +161,27 @@ class DataTsmAdapter(NullDataStorer):
     def delete(self):
         """
         @see L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}
+        The archive is directly deleted. A missing archive is detected by the TSM error code.
         """
         
-        if not self.exists():
-            errorMessage = u"The requested archive '%s' does not exist on the TSM server!" % self._persistenceIdentifier
-            raise PersistenceError(errorMessage)
         connection = self._connectionPool.acquire()
         try:
             command = _DELETE_ARCHIVE_COMMAND % (self._persistenceIdentifier, self._serverNodeName)
-            self._sendCommand(command, connection)
+            self._executeArchiveCommand(command, connection)
         finally:
             self._connectionPool.release(connection)
 
+    def _executeArchiveCommand(self, command, connection):
+        """ Executes a command which requires an existing archive. """
+        
+        try:
+            connection.execute(command)
+        except PersistenceError, error:
+            if _isMissingArchiveError(error):
+                errorMessage = u"The requested archive '%s' does not exist on the TSM server!" % self._persistenceIdentifier
+                raise PersistenceError(errorMessage)
+            raise error
+
     def copy(self, destination):
         """
         @see L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}
@@ -175,41 +200,17 @@ class DataTsmAdapter(NullDataStorer):
     def readData(self):
         """
         @see L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}
+        The archive is directly retrieved. A missing archive is detected by the TSM error code.
         """
         
-        if not self.exists():
-            errorMessage = u"The requested archive '%s' does not exist on the TSM server!" % self._persistenceIdentifier
-            raise PersistenceError(errorMessage)
         connection = self._connectionPool.acquire()
         try:
             command = _RETRIEVE_RESOURCE_COMMAND % (self._persistenceIdentifier, self._serverNodeName)
-            self._sendCommand(command, connection)
-            return self._getFile(connection)
+            self._executeArchiveCommand(command, connection)
+            return _getFile(self._persistenceIdentifier, connection, self._blockSize)
         finally:
             self._connectionPool.release(connection)
 
-    def _getFile(self, connection):
-        """ Transfers the given file from the TSM host to the local file system. """
-
-        try:
-            temporaryFileObject = tempfile.TemporaryFile()
-            sftp = SFTPClient.from_transport(connection)
-            try:
-                temporaryFileObject.seek(0)
-                remoteFileObject = sftp.open(self._persistenceIdentifier)
-                block = remoteFileObject.read(_BLOCK_SIZE)
-                while len(block) > 0:
-                    temporaryFileObject.write(block)
-                    block = remoteFileObject.read(_BLOCK_SIZE)
-                sftp.remove(self._persistenceIdentifier)
-                temporaryFileObject.seek(0)
-                return temporaryFileObject
-            except (IOError, SSHException), error:
-                errorMessage = "Cannot retrieve file from TSM host!\nReason: '%s'" % str(error)
-                raise PersistenceError(errorMessage)
-        finally:
-            sftp.close()
-
     def writeData(self, data):
         """
         @see L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}
@@ -220,71 +221,237 @@ class DataTsmAdapter(NullDataStorer):
             raise PersistenceError(errorMessage)
         connection = self._connectionPool.acquire()
         try:
-            self._putFile(data, connection)
+            _putFile(self._persistenceIdentifier, data, connection, self._blockSize)
             archiveCommand = _ARCHIVE_RESOURCE_COMMAND % (self._persistenceIdentifier, self._serverNodeName)
-            self._sendCommand(archiveCommand, connection)
+            connection.execute(archiveCommand)
         finally:
             self._connectionPool.release(connection)
+
+
+class BatchDataTsmAdapter(object):
+    """ 
+    Queries, retrieves and archives multiple files at once. Every operation
+    requires only a constant number of C{dsmc} invocations which are provided 
+    with a file list of all involved files.
+    """
     
-    def _putFile(self, data, connection):
-        """ Puts the given file on the TSM host. """
+    def __init__(self, identifierMap, serverNodeName, connectionPool, blockSize=constants.BLOCK_SIZE):
+        """
+        Constructor.
+        
+        @param identifierMap: Maps logical identifiers to the persistence identifiers.
+        @type identifierMap: C{dict} of C{unicode}, C{unicode}
+        @param serverNodeName: Name of the TSM server node.
+        @type serverNodeName: C{unicode}
+        @param connectionPool: Pool of TSM sessions.
+        @type connectionPool: L{TsmConnectionPool<datafinder.persistence.adapters.tsm.connection_pool.TsmConnectionPool>}
+        @param blockSize: Size in bytes of the blocks used when transferring data.
+        @type blockSize: C{int}
+        """
         
-        sftp = SFTPClient.from_transport(connection)
+        self._identifierMap = identifierMap
+        self._serverNodeName = serverNodeName
+        self._connectionPool = connectionPool
+        self._blockSize = blockSize
+        
+    def exists(self):
+        """
+        Determines the existing archives using a single query.
+        
+        @return: Maps the logical identifiers to the existence flag.
+        @rtype: C{dict} of C{unicode}, C{bool}
+        
+        @raise PersistenceError: Indicating problems querying the TSM server.
+        """
+        
+        connection = self._connectionPool.acquire()
         try:
+            return self._exists(connection)
+        finally:
+            self._connectionPool.release(connection)
+        
+    def _exists(self, connection):
+        """ Performs the query of all archives. """
+        
+        identifierMap = dict()
+        result = dict()
+        for identifier, persistenceIdentifier in self._identifierMap.iteritems():
+            identifierMap[persistenceIdentifier] = identifier
+            result[identifier] = False
+        if len(identifierMap) > 0:
+            outputLines = self._iterateWithFileList(_QUERY_FILELIST_COMMAND, identifierMap.keys(), connection)
             try:
-                remoteFileObject = sftp.open(self._persistenceIdentifier, "w")
-                block = data.read(_BLOCK_SIZE)
-                while len(block) > 0:
-                    remoteFileObject.write(block)
-                    block = data.read(_BLOCK_SIZE)
-            except (IOError, SSHException), sshException:
-                errorMessage = "Cannot transfer data to TSM host!\nReason: '%s'" % str(sshException)
-                raise PersistenceError(errorMessage)
+                for archivedFile in iterateArchivedFiles(outputLines):
+                    if archivedFile in identifierMap:
+                        result[identifierMap[archivedFile]] = True
+            except PersistenceError, error:
+                if not _isMissingArchiveError(error):
+                    raise error
+        return result
+        
+    def readData(self):
+        """
+        Retrieves all archives using a single query and a single retrieval.
+        
+        @return: Maps the logical identifiers to file-like objects and the identifiers 
+                 of the archives which could not be retrieved to the occurred error.
+        @rtype: C{tuple} of C{dict} of C{unicode}, C{object} and 
+                C{dict} of C{unicode}, L{PersistenceError<datafinder.persistence.error.PersistenceError>}
+        
+        @raise PersistenceError: Indicating problems querying or retrieving the archives.
+        """
+        
+        result = dict()
+        errors = dict()
+        connection = self._connectionPool.acquire()
+        try:
+            existingIdentifiers = list()
+            for identifier, exists in self._exists(connection).iteritems():
+                if exists:
+                    existingIdentifiers.append(identifier)
+                else:
+                    errorMessage = u"The requested archive '%s' does not exist on the TSM server!" % identifier
+                    errors[identifier] = PersistenceError(errorMessage)
+            if len(existingIdentifiers) > 0:
+                persistenceIdentifiers = [self._identifierMap[identifier] for identifier in existingIdentifiers]
+                self._executeWithFileList(_RETRIEVE_FILELIST_COMMAND, persistenceIdentifiers, connection)
+                for identifier in existingIdentifiers:
+                    try:
+                        result[identifier] = _getFile(self._identifierMap[identifier], connection, self._blockSize)
+                    except PersistenceError, error:
+                        errors[identifier] = error
+            return result, errors
         finally:
-            data.close()
-            sftp.close()
+            self._connectionPool.release(connection)
             
-    def _sendCommand(self, command, connection):
-        """ 
-        Helper method executing the given command on the connected host. 
-
-        @raise PersistenceError: Indicating problem executing the specific command.
+    def writeData(self, identifierDataMap):
         """
+        Archives the given data using a single query and a single archive command.
         
-        channel = connection.open_session()
-        channel.settimeout(CONNECTION_TIMEOUT)
-        try:
-            channel.exec_command(command)
-        except SSHException, sshException:
-            errorMessage = "Cannot send command '%s' to TSM host.\nReason: '%s'" % (command, str(sshException)) 
-            raise PersistenceError(errorMessage)
-        else:
-            standardOutput = self._getCommandOutput(channel.recv, command)
-            _log.debug("standard out of command '%s' >>" % command)
-            _log.debug(standardOutput)
-            if _UNKNOWN_TSM_NODE_ERROR_CODE in standardOutput or _INVALID_OPTION_ERROR_CODE in standardOutput:
-                raise PersistenceError(_COMMAND_STDERR_MESSAGE_START + "'%s'. Error message was:\n '%s'" % (command, standardOutput))
-            standardError = self._getCommandOutput(channel.recv_stderr, command)
-            _log.debug("standard error of command '%s' >>" % command)
-            _log.debug(standardError)
-            if len(standardError) > 0:
-                raise PersistenceError(_COMMAND_STDERR_MESSAGE_START + "'%s'. Error message was:\n '%s'" % (command, standardError))
-
-    @staticmethod
-    def _getCommandOutput(outputFunction, command):
+        @param identifierDataMap: Maps logical identifiers to file-like objects.
+        @type identifierDataMap: C{dict} of C{unicode}, C{object}
+        
+        @return: Maps the identifiers of the archives which could not be created to the occurred error.
+        @rtype: C{dict} of C{unicode}, L{PersistenceError<datafinder.persistence.error.PersistenceError>}
+        
+        @raise PersistenceError: Indicating problems querying the TSM server or creating the archives.
         """
-        Returns required output of the executed command (standard out or standard error).
         
-        @raise PersistenceError: Indicating problem time outs.
+        errors = dict()
+        connection = self._connectionPool.acquire()
+        try:
+            persistenceIdentifiers = list()
+            for identifier, exists in self._exists(connection).iteritems():
+                if identifier in identifierDataMap:
+                    if exists:
+                        errorMessage = u"There does already exist an archive with the identifier '%s'!" % identifier
+                        errors[identifier] = PersistenceError(errorMessage)
+                    else:
+                        persistenceIdentifier = self._identifierMap[identifier]
+                        try:
+                            _putFile(persistenceIdentifier, identifierDataMap[identifier], connection, self._blockSize)
+                        except PersistenceError, error:
+                            errors[identifier] = error
+                        else:
+                            persistenceIdentifiers.append(persistenceIdentifier)
+            if len(persistenceIdentifiers) > 0:
+                self._executeWithFileList(_ARCHIVE_FILELIST_COMMAND, persistenceIdentifiers, connection)
+            return errors
+        finally:
+            self._connectionPool.release(connection)
+            
+    def _executeWithFileList(self, commandTemplate, persistenceIdentifiers, connection):
+        """ Puts the file list on the TSM host and executes the given command with it. """
+        
+        return "".join(self._iterateWithFileList(commandTemplate, persistenceIdentifiers, connection))
+            
+    def _iterateWithFileList(self, commandTemplate, persistenceIdentifiers, connection):
+        """ 
+        Puts the file list on the TSM host, executes the given command with it and 
+        yields the output lines of the command. 
         """
         
-        output = ""
+        fileListPath = posixpath.join(posixpath.dirname(persistenceIdentifiers[0]), _FILELIST_NAME % uuid.uuid4().hex)
         try:
-            outputContentPart = outputFunction(MAXIMUM_RECEIVED_BYTES)
-            while len(outputContentPart) > 0:
-                output = output + outputContentPart
-                outputContentPart = outputFunction(MAXIMUM_RECEIVED_BYTES)
-        except socket.timeout:
-            raise PersistenceError(_TIMEOUT_ERROR_MESSAGE % command)
-        else:
-            return output
+            fileList = connection.sftp.open(fileListPath, "w")
+            try:
+                for persistenceIdentifier in persistenceIdentifiers:
+                    fileList.write('"%s"\n' % persistenceIdentifier.encode("utf-8"))
+            finally:
+                fileList.close()
+        except (IOError, SSHException), error:
+            raise PersistenceError("Cannot transfer file list to TSM host!\nReason: '%s'" % str(error))
+        try:
+            for line in connection.iterateOutputLines(commandTemplate % (fileListPath, self._serverNodeName)):
+                yield line
+        finally:
+            try:
+                connection.sftp.remove(fileListPath)
+            except (IOError, SSHException), error:
+                _log.debug("Cannot remove file list '%s'. Reason: '%s'" % (fileListPath, str(error)))
+
+
+def iterateArchivedFiles(outputLines):
+    """
+    Parses the output of the C{dsmc query archive} command incrementally.
+    
+    @param outputLines: Lines of the command output.
+    @type outputLines: C{iterable} of C{str}
+    
+    @return: Generator of the paths of the archived files in the order of the output.
+    @rtype: C{generator} of C{unicode}
+    """
+    
+    for line in outputLines:
+        match = _QUERY_ENTRY_PATTERN.match(line)
+        if not match is None:
+            yield match.group("path").decode("utf-8")
+            
+
+def _isMissingArchiveError(error):
+    """ Checks whether the error indicates that the requested archive does not exist. """
+    
+    return _NON_MATCHING_FILESEARCH_ERROR_CODE in error.message \
+           or _NO_FILES_PREVIOUSLY_ARCHIVED in error.message
+
+
+def _getFile(persistenceIdentifier, connection, blockSize):
+    """ Transfers the given file from the TSM host to the local file system. """
+
+    try:
+        temporaryFileObject = tempfile.TemporaryFile()
+        temporaryFileObject.seek(0)
+        remoteFileObject = connection.sftp.open(persistenceIdentifier)
+        try:
+            block = remoteFileObject.read(blockSize)
+            while len(block) > 0:
+                temporaryFileObject.write(block)
+                block = remoteFileObject.read(blockSize)
+        finally:
+            remoteFileObject.close()
+        connection.sftp.remove(persistenceIdentifier)
+        temporaryFileObject.seek(0)
+        return temporaryFileObject
+    except (IOError, SSHException), error:
+        errorMessage = "Cannot retrieve file from TSM host!\nReason: '%s'" % str(error)
+        raise PersistenceError(errorMessage)
+
+
+def _putFile(persistenceIdentifier, data, connection, blockSize):
+    """ Puts the given file on the TSM host. """
+    
+    try:
+        try:
+            remoteFileObject = connection.sftp.open(persistenceIdentifier, "w")
+            try:
+                block = data.read(blockSize)
+                while len(block) > 0:
+                    remoteFileObject.write(block)
+                    block = data.read(blockSize)
+            finally:
+                remoteFileObject.close()
+        except (IOError, SSHException), sshException:
+            errorMessage = "Cannot transfer data to TSM host!\nReason: '%s'" % str(sshException)
+            raise PersistenceError(errorMessage)
+    finally:
+        data.close()
@@ -43,9 +43,10 @@ Implements factory for the TSM adapters.
 from datafinder.persistence.adapters.tsm import constants
 from datafinder.persistence.adapters.tsm.configuration import Configuration
 from datafinder.persistence.adapters.tsm.connection_pool import TsmConnectionPool
-from datafinder.persistence.adapters.tsm.data.adapter import DataTsmAdapter
+from datafinder.persistence.adapters.tsm.data.adapter import DataTsmAdapter, BatchDataTsmAdapter
 from datafinder.persistence.common.base_factory import BaseFileSystem
 from datafinder.persistence.common.connection.manager import ConnectionPoolManager
+from datafinder.persistence.error import PersistenceError
 
 
 __version__ = "$Revision-Id:$" 
@@ -89,7 +90,39 @@ class FileSystem(BaseFileSystem):
         """
         
         return DataTsmAdapter(identifier, self._determinePeristenceIdentifier(identifier), 
-                              self._configuration.serverNodeName, self._connectionPool)
+                              self._configuration.serverNodeName, self._connectionPool,
+                              self._configuration.blockSize)
+    
+    def readData(self, identifiers):
+        """ 
+        @see: L{FileSystem.readData<datafinder.persistence.factory.FileSystem.readData>}
+        @note: All archives are queried and retrieved using one C{dsmc} invocation each.
+        """
+        
+        try:
+            return self._createBatchDataStorer(identifiers).readData()
+        except PersistenceError, error:
+            return dict(), dict([(identifier, error) for identifier in identifiers])
+        
+    def writeData(self, identifierDataMap):
+        """ 
+        @see: L{FileSystem.writeData<datafinder.persistence.factory.FileSystem.writeData>}
+        @note: All archives are queried and created using one C{dsmc} invocation each.
+        """
+        
+        try:
+            return self._createBatchDataStorer(identifierDataMap.keys()).writeData(identifierDataMap)
+        except PersistenceError, error:
+            return dict([(identifier, error) for identifier in identifierDataMap])
+    
+    def _createBatchDataStorer(self, identifiers):
+        """ Creates the data storer which handles the given items at once. """
+        
+        identifierMap = dict()
+        for identifier in identifiers:
+            identifierMap[identifier] = self._determinePeristenceIdentifier(identifier)
+        return BatchDataTsmAdapter(identifierMap, self._configuration.serverNodeName, self._connectionPool,
+                                   self._configuration.blockSize)
     
     def _determinePeristenceIdentifier(self, identifier):
         """
@@ -99,6 +132,15 @@ class FileSystem(BaseFileSystem):
         persistenceId = self._configuration.basePath + identifier
         return persistenceId
 
+    @property
+    def blockSize(self):
+        """ 
+        This is the TSM-specific implementation.
+        @see: L{BaseFileSystem.blockSize<datafinder.persistence.common.base_factory.BaseFileSystem.blockSize>}
+        """
+        
+        return self._configuration.blockSize
+
     def release(self):
         """ 
         @see: L{FileSystem.release<datafinder.persistence.factory.FileSystem.release>}
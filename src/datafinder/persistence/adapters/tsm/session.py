@@ -0,0 +1,198 @@
+#
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+#
+#Redistribution and use in source and binary forms, with or without
+#
+#modification, are permitted provided that the following conditions are
+#
+#met:
+#
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+""" 
+Implements the persistent SSH session to the TSM host.
+"""
+
+
+import logging
+import socket
+
+from paramiko import SSHException, SFTPClient
+
+from datafinder.persistence.adapters.tsm.constants import CONNECTION_TIMEOUT, MAXIMUM_RECEIVED_BYTES
+from datafinder.persistence.error import PersistenceError
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_TIMEOUT_ERROR_MESSAGE = "A timeout occurred during the execution of command '%s'!"
+_COMMAND_STDERR_MESSAGE_START = "Problems executing command"
+
+_UNKNOWN_TSM_NODE_ERROR_CODE = "ANS1217E"
+_INVALID_OPTION_ERROR_CODE = "ANS1107E"
+
+
+_log = logging.getLogger()
+
+
+class TsmSession(object):
+    """ 
+    Wraps an established SSH transport to the TSM host. The transport
+    and the SFTP client are kept open as long as the session is pooled, so
+    that only a new channel is required to execute a command.
+    """
+    
+    def __init__(self, transport):
+        """ 
+        Constructor. 
+        
+        @param transport: Connected and authenticated SSH transport.
+        @type transport: C{paramiko.Transport}
+        """
+        
+        self._transport = transport
+        self._sftp = None
+        
+    @property
+    def transport(self):
+        """ Returns the underlying SSH transport. """
+        
+        return self._transport
+        
+    @property
+    def sftp(self):
+        """ 
+        Returns the SFTP client of the session. It is created on first access.
+        
+        @raise PersistenceError: Indicating problems opening the SFTP channel.
+        """
+        
+        if self._sftp is None:
+            try:
+                self._sftp = SFTPClient.from_transport(self._transport)
+            except SSHException, error:
+                raise PersistenceError("Cannot open SFTP channel to TSM host.\nReason: '%s'" % str(error))
+        return self._sftp
+    
+    def execute(self, command):
+        """ 
+        Executes the given command on the connected host. 
+
+        @param command: The command line to execute.
+        @type command: C{unicode}
+        
+        @return: Standard output of the command.
+        @rtype: C{str}
+        
+        @raise PersistenceError: Indicating problem executing the specific command.
+        """
+        
+        standardOutput = "".join(self.iterateOutputLines(command))
+        _log.debug("standard out of command '%s' >>" % command)
+        _log.debug(standardOutput)
+        return standardOutput
+    
+    def iterateOutputLines(self, command):
+        """ 
+        Executes the given command on the connected host and yields the lines of 
+        its standard output as soon as they are received. This allows processing
+        large outputs incrementally.
+
+        @param command: The command line to execute.
+        @type command: C{unicode}
+        
+        @return: Generator of the standard output lines including the line separators.
+        @rtype: C{generator} of C{str}
+        
+        @raise PersistenceError: Indicating problem executing the specific command.
+        """
+        
+        try:
+            channel = self._transport.open_session()
+            channel.settimeout(CONNECTION_TIMEOUT)
+            channel.exec_command(command)
+        except SSHException, sshException:
+            errorMessage = "Cannot send command '%s' to TSM host.\nReason: '%s'" % (command, str(sshException)) 
+            raise PersistenceError(errorMessage)
+        else:
+            try:
+                for line in self._iterateLines(channel.recv, command):
+                    if _UNKNOWN_TSM_NODE_ERROR_CODE in line or _INVALID_OPTION_ERROR_CODE in line:
+                        raise PersistenceError(_COMMAND_STDERR_MESSAGE_START + "'%s'. Error message was:\n '%s'" % (command, line))
+                    yield line
+                standardError = "".join(self._iterateOutputParts(channel.recv_stderr, command))
+                _log.debug("standard error of command '%s' >>" % command)
+                _log.debug(standardError)
+                if len(standardError) > 0:
+                    raise PersistenceError(_COMMAND_STDERR_MESSAGE_START + "'%s'. Error message was:\n '%s'" % (command, standardError))
+            finally:
+                channel.close()
+
+    @classmethod
+    def _iterateLines(cls, outputFunction, command):
+        """ Joins the received output parts to complete lines. """
+        
+        incompleteLine = ""
+        for outputPart in cls._iterateOutputParts(outputFunction, command):
+            lines = (incompleteLine + outputPart).splitlines(True)
+            incompleteLine = ""
+            if not lines[-1].endswith("\n"):
+                incompleteLine = lines.pop()
+            for line in lines:
+                yield line
+        if len(incompleteLine) > 0:
+            yield incompleteLine
+            
+    @staticmethod
+    def _iterateOutputParts(outputFunction, command):
+        """
+        Yields the output parts of the executed command (standard out or standard error)
+        in the order they are received.
+        
+        @raise PersistenceError: Indicating problem time outs.
+        """
+        
+        try:
+            outputContentPart = outputFunction(MAXIMUM_RECEIVED_BYTES)
+            while len(outputContentPart) > 0:
+                yield outputContentPart
+                outputContentPart = outputFunction(MAXIMUM_RECEIVED_BYTES)
+        except socket.timeout:
+            raise PersistenceError(_TIMEOUT_ERROR_MESSAGE % command)
+        
+    def close(self):
+        """ Closes the SFTP client. The SSH transport is released by the connection pool. """
+        
+        try:
+            if not self._sftp is None:
+                self._sftp.close()
+        finally:
+            self._sftp = None
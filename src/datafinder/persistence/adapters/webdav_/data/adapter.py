@@ -46,7 +46,8 @@ from webdav.Connection import WebdavError
 from webdav.Constants import CODE_NOT_FOUND
 
 from datafinder.persistence.error import PersistenceError
-from datafinder.persistence.data.datastorer import NullDataStorer
+from datafinder.persistence.data.datastorer import NullDataStorer, \
+    ITEM_TYPE_COLLECTION, ITEM_TYPE_LEAF, ITEM_TYPE_LINK
 from datafinder.persistence.adapters.webdav_ import constants, util
 
 
@@ -213,6 +214,11 @@ class DataWebdavAdapter(NullDataStorer):
 
     def getChildren(self):
         """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}  """
+        
+        return [identifier for identifier, _ in self.getTypedChildren()]
+    
+    def getTypedChildren(self):
+        """ @see: L{NullDataStorer<datafinder.persistence.data.datastorer.NullDataStorer>}  """
 
         connection = self._connectionPool.acquire()
         try:
@@ -229,7 +235,13 @@ class DataWebdavAdapter(NullDataStorer):
                     identifier = self._itemIdMapper.mapPersistenceIdentifier(path)
                     self._resourceTypeCache[identifier] = (isCollection, linkTargetPath)
                     if identifier != self.identifier:
-                        result.append(identifier)
+                        if not linkTargetPath is None:
+                            itemType = ITEM_TYPE_LINK
+                        elif isCollection:
+                            itemType = ITEM_TYPE_COLLECTION
+                        else:
+                            itemType = ITEM_TYPE_LEAF
+                        result.append((identifier, itemType))
                 return result
         finally:
             self._connectionPool.release(connection)
@@ -87,6 +87,7 @@ class FileSystem(BaseFileSystem):    """
         self._hasMetadataSearchSupport = None
         self._hasPrivilegeSupport = None
         self._resourceTypeCache = dict()
+        self._privilegeCache = dict()
         self._connectionPool = self._getConnectionPool()
 
     def _getConnectionPool(self):
@@ -145,10 +146,12 @@ class FileSystem(BaseFileSystem):    """
         
         if self.hasPrivilegeSupport:
             return PrivilegeWebdavAdapter(identifier, self._connectionPool, ItemIdentifierMapper(self._configuration.baseUrl),
-                                          PrivilegeMapper(self._configuration.userCollectionUrl, self._configuration.groupCollectionUrl))
+                                          PrivilegeMapper(self._configuration.userCollectionUrl, self._configuration.groupCollectionUrl),
+                                          privilegeCache=self._privilegeCache, resourceTypeCache=self._resourceTypeCache)
         else:
             return SimplePrivilegeWebdavAdapter(
-                identifier, self._connectionPool, ItemIdentifierMapper(self._configuration.baseUrl), PrivilegeMapper(None, None))
+                identifier, self._connectionPool, ItemIdentifierMapper(self._configuration.baseUrl), PrivilegeMapper(None, None),
+                privilegeCache=self._privilegeCache, resourceTypeCache=self._resourceTypeCache)
         
     def createPrincipalSearcher(self):
         """ 
@@ -181,6 +184,16 @@ class FileSystem(BaseFileSystem):    """
         
         self._connectionManager.remove(self._configuration.baseUrl)
 
+    @property
+    def maxConcurrentRequests(self):
+        """ 
+        This is the WebDAV-specific implementation.
+        @note: Returns the number of connections a connection pool provides.
+        @see: L{BaseFileSystem.maxConcurrentRequests<datafinder.persistence.common.base_factory.BaseFileSystem.maxConcurrentRequests>}
+        """
+        
+        return constants.MAX_CONNECTION_NUMBER
+
     @property
     def hasCustomMetadataSupport(self):
         """ 
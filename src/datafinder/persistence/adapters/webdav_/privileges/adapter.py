@@ -40,8 +40,10 @@ Implements the privilege adapter.
 """
 
 
+import time
+
 from webdav import Constants
-from webdav.acp import Privilege
+from webdav.acp import ACL, Privilege
 from webdav.Connection import WebdavError
 
 from datafinder.persistence.error import PersistenceError
@@ -52,10 +54,26 @@ from datafinder.persistence.adapters.webdav_ import util
 __version__ = "$Revision-Id:$" 
 
 
+_CURRENT_USER_PRIVILEGE_SET_PROPERTY = (Constants.NS_DAV, Constants.PROP_CURRENT_USER_PRIVILEGE_SET)
+_ACL_PROPERTY = (Constants.NS_DAV, Constants.TAG_ACL)
+_MAX_CACHE_SIZE = 10000
+_CACHE_TIMEOUT = 60 # in seconds
+
+
 class PrivilegeWebdavAdapter(NullPrivilegeStorer):
-    """ Privilege adapter implementation. """
+    """ 
+    Privilege adapter implementation. 
+    
+    When a privilege cache is provided and the item has been retrieved by listing its 
+    parent collection, the privileges and ACLs of all listed items are retrieved with a 
+    single request on first access. Cached values expire after a short time and are handed 
+    out only once. Thus, refreshing an item always results in up-to-date information.
+    ACLs which the server does not report in the collection response are retrieved
+    separately for every item.
+    """
     
-    def __init__(self, identifier, connectionPool, itemIdMapper, privilegeMapper, connectionHelper=util):
+    def __init__(self, identifier, connectionPool, itemIdMapper, privilegeMapper, connectionHelper=util, 
+                 privilegeCache=None, resourceTypeCache=None):
         """
         Constructor.
         
@@ -69,17 +87,30 @@ class PrivilegeWebdavAdapter(NullPrivilegeStorer):
         @type privilegeMapper: L{PrivilegeMapper<datafinder.persistence.adapters.webdav_.privileges.privileges_mapping.PrivilegeMapper>} 
         @param connectionHelper: Utility object/module creating WebDAV library storer instances.
         @type connectionHelper: L{ItemIdentifierMapper<datafinder.persistence.adapters.webdav_.util}
+        @param privilegeCache: Optional cache for prefetched privileges and ACLs. 
+                               Identifier => (property => value), expiration time
+        @type privilegeCache: C{dict} keys: C{unicode}, values: C{tuple} of C{dict}, C{float}
+        @param resourceTypeCache: Resource types of listed items. It determines whether 
+                                  the privileges of the siblings are prefetched.
+        @type resourceTypeCache: C{dict} keys: C{unicode}, values: C{tuple} of C{bool}, C{unicode}
         """
 
         NullPrivilegeStorer.__init__(self, identifier)
         self.__connectionPool = connectionPool
+        self.__itemIdMapper = itemIdMapper
         self.__persistenceId = itemIdMapper.mapIdentifier(identifier)
         self.__privilegeMapper = privilegeMapper
         self.__connectionHelper = connectionHelper
+        self.__privilegeCache = privilegeCache
+        self.__resourceTypeCache = resourceTypeCache
         
     def retrievePrivileges(self):
         """ @see: L{NullPrivilegeStorer<datafinder.persistence.privileges.privilegestorer.NullPrivilegeStorer>}"""
 
+        privileges = self._getCachedProperty(_CURRENT_USER_PRIVILEGE_SET_PROPERTY)
+        if not privileges is None:
+            return self.__privilegeMapper.mapPersistencePrivileges(privileges)
+        
         connection = self.__connectionPool.acquire()
         try:
             webdavStorer = self.__connectionHelper.createResourceStorer(self.__persistenceId, connection)
@@ -95,6 +126,10 @@ class PrivilegeWebdavAdapter(NullPrivilegeStorer):
     def retrieveAcl(self):
         """ @see: L{NullPrivilegeStorer<datafinder.persistence.privileges.privilegestorer.NullPrivilegeStorer>}"""
 
+        acl = self._getCachedProperty(_ACL_PROPERTY)
+        if not acl is None:
+            return self.__privilegeMapper.mapPersistenceAcl(acl)
+        
         connection = self.__connectionPool.acquire()
         try:
             webdavStorer = self.__connectionHelper.createResourceStorer(self.__persistenceId, connection)
@@ -109,6 +144,8 @@ class PrivilegeWebdavAdapter(NullPrivilegeStorer):
     def updateAcl(self, acl):
         """ @see: L{NullPrivilegeStorer<datafinder.persistence.privileges.privilegestorer.NullPrivilegeStorer>}"""
         
+        if not self.__privilegeCache is None:
+            self.__privilegeCache.pop(self.identifier, None)
         connection = self.__connectionPool.acquire()
         try:
             webdavStorer = self.__connectionHelper.createResourceStorer(self.__persistenceId, connection)
@@ -119,20 +156,111 @@ class PrivilegeWebdavAdapter(NullPrivilegeStorer):
         finally:
             self.__connectionPool.release(connection)
             
+    def _getCachedProperty(self, propertyId):
+        """ 
+        Returns and removes the cached property value of the item. If nothing is cached and 
+        the item has been listed, the privileges and ACLs of all items of the parent collection 
+        are retrieved.
+        """
+        
+        if self.__privilegeCache is None:
+            return None
+        cachedValue = self.__privilegeCache.get(self.identifier)
+        if cachedValue is None or not propertyId in cachedValue[0]:
+            parentId = self.__itemIdMapper.determineParentPath(self.identifier)
+            if self._isListed(parentId):
+                self._prefetchSiblings(parentId)
+                cachedValue = self.__privilegeCache.get(self.identifier)
+        if not cachedValue is None:
+            properties, expirationTime = cachedValue
+            value = properties.pop(propertyId, None)
+            if len(properties) == 0 or time.time() >= expirationTime:
+                self.__privilegeCache.pop(self.identifier, None)
+            if time.time() < expirationTime:
+                return value
+        return None
+    
+    def _isListed(self, parentId):
+        """ Checks whether the item has been retrieved by listing its parent collection. """
+        
+        return not self.__resourceTypeCache is None and parentId != "" and parentId != self.identifier \
+               and self.identifier in self.__resourceTypeCache and parentId in self.__resourceTypeCache
+
+    def _prefetchSiblings(self, parentId):
+        """ Retrieves the privileges and ACLs of all items of the parent collection with one request. """
+        
+        connection = self.__connectionPool.acquire()
+        try:
+            collectionStorer = self.__connectionHelper.createCollectionStorer(
+                self.__itemIdMapper.mapIdentifier(parentId), connection)
+            try:
+                response = collectionStorer.findProperties(_CURRENT_USER_PRIVILEGE_SET_PROPERTY, _ACL_PROPERTY)
+            except WebdavError:
+                return # Falling back to the retrieval of the single item
+        finally:
+            self.__connectionPool.release(connection)
+        
+        if len(self.__privilegeCache) > _MAX_CACHE_SIZE:
+            self.__privilegeCache.clear()
+        expirationTime = time.time() + _CACHE_TIMEOUT
+        for path, properties in response.iteritems():
+            if isinstance(properties, dict):
+                identifier = self.__itemIdMapper.mapPersistenceIdentifier(path)
+                if identifier != parentId:
+                    cachedProperties = _mapPrefetchedProperties(properties)
+                    if len(cachedProperties) > 0:
+                        self.__privilegeCache[identifier] = cachedProperties, expirationTime
+            
+
+def _mapPrefetchedProperties(properties):
+    """ Creates the privileges and the ACL from the properties which could be parsed. """
+    
+    result = dict()
+    if _CURRENT_USER_PRIVILEGE_SET_PROPERTY in properties:
+        try:
+            result[_CURRENT_USER_PRIVILEGE_SET_PROPERTY] = [
+                Privilege(domroot=child) for child in properties[_CURRENT_USER_PRIVILEGE_SET_PROPERTY].children]
+        except WebdavError:
+            pass
+    if _ACL_PROPERTY in properties:
+        try:
+            result[_ACL_PROPERTY] = ACL(properties[_ACL_PROPERTY])
+        except WebdavError:
+            pass
+    return result
+            
 
 class SimplePrivilegeWebdavAdapter(NullPrivilegeStorer):
-    """ Used for non-ACP version. It just evaluates the WebDAV options. """
+    """ 
+    Used for non-ACP version. It just evaluates the WebDAV options. 
+    
+    The allowed methods only depend on the server configuration and the resource type.
+    Thus, when a privilege cache and the resource type of the item are available the 
+    result is shared between all items of the same type within a collection for a 
+    short time.
+    """
     
-    def __init__(self, identifier, connectionPool, itemIdMapper, privilegeMapper, connectionHelper=util):
+    def __init__(self, identifier, connectionPool, itemIdMapper, privilegeMapper, connectionHelper=util,
+                 privilegeCache=None, resourceTypeCache=None):
         NullPrivilegeStorer.__init__(self, identifier)
         self.__connectionPool = connectionPool
         self.__persistenceId = itemIdMapper.mapIdentifier(identifier)
         self.__privilegeMapper = privilegeMapper
         self.__connectionHelper = connectionHelper
+        self.__privilegeCache = privilegeCache
+        self.__cacheKey = None
+        if not privilegeCache is None and not resourceTypeCache is None and identifier in resourceTypeCache:
+            self.__cacheKey = itemIdMapper.determineParentPath(identifier), resourceTypeCache[identifier]
 
     def retrievePrivileges(self):
         """ @see: L{NullPrivilegeStorer<datafinder.persistence.privileges.privilegestorer.NullPrivilegeStorer>}"""
         
+        if not self.__cacheKey is None and self.__cacheKey in self.__privilegeCache:
+            privileges, expirationTime = self.__privilegeCache[self.__cacheKey]
+            if time.time() < expirationTime:
+                return privileges[:]
+            self.__privilegeCache.pop(self.__cacheKey, None)
+        
         connection = self.__connectionPool.acquire()
         try:
             webdavStorer = self.__connectionHelper.createResourceStorer(self.__persistenceId, connection)
@@ -144,6 +272,10 @@ class SimplePrivilegeWebdavAdapter(NullPrivilegeStorer):
                 privileges = list()
                 if "allow" in options:
                     privileges = self._mapHttpOptionsToPrivileges(options["allow"])
+                if not self.__cacheKey is None:
+                    if len(self.__privilegeCache) > _MAX_CACHE_SIZE:
+                        self.__privilegeCache.clear()
+                    self.__privilegeCache[self.__cacheKey] = privileges[:], time.time() + _CACHE_TIMEOUT
                 return privileges
         finally:
             self.__connectionPool.release(connection)
@@ -44,12 +44,16 @@ from webdav.Connection import WebdavError
 from datafinder.persistence.adapters.webdav_ import util
 from datafinder.persistence.adapters.webdav_.search.search_restriction_mapping import mapSearchRestriction
 from datafinder.persistence.error import PersistenceError
+from datafinder.persistence.search.restriction_cache import RestrictionMappingCache
 from datafinder.persistence.search.searcher import NullSearcher
 
 
 __version__ = "$Revision-Id:$" 
 
 
+_restrictionCache = RestrictionMappingCache(mapSearchRestriction)
+
+
 class SearchWebdavAdapter(NullSearcher):
     """ WebDAV-specific implementation of the search. """
     
@@ -70,27 +74,34 @@ class SearchWebdavAdapter(NullSearcher):
         self.__itemIdMapper = itemIdMapper
         self.__connectionHelper = connectionHelper
 
-    def search(self, restrictions, destination):
-        """ @see: L{NullPrincipalSearcher<datafinder.persistence.search.searcher.NullSearcher>} """
+    def search(self, restrictions, destination, limit=None):
+        """ 
+        @see: L{NullPrincipalSearcher<datafinder.persistence.search.searcher.NullSearcher>} 
+        @note: The server response is completely retrieved and parsed before the first
+            result is returned. Only the persistence identifiers are mapped while the result 
+            is iterated. Thus, the limit is passed to the server using the DASL C{limit} element.
+        """
         
-        result = list()
         connection = self.__connectionPool.acquire()
         try:
             try:
-                restrictions = mapSearchRestriction(restrictions)
+                restrictions = _restrictionCache.map(restrictions)
             except AssertionError:
                 restrictions = list()
             persistenceId = self.__itemIdMapper.mapIdentifier(destination.identifier)
             collectionStorer = self.__connectionHelper.createCollectionStorer(persistenceId, connection)
             try:
-                rawResult = collectionStorer.search(restrictions, [Constants.PROP_DISPLAY_NAME])
+                rawResult = collectionStorer.search(restrictions, [Constants.PROP_DISPLAY_NAME], limit)
             except WebdavError, error:
                 errorMessage = "Problem during meta data search." \
                                 + "Reason: '%s'" % error.reason 
                 raise PersistenceError(errorMessage)
-            else:
-                for persistenceId in rawResult.keys():
-                    result.append(self.__itemIdMapper.mapPersistenceIdentifier(persistenceId))
         finally:
             self.__connectionPool.release(connection)
-        return result
+        return self._mapPersistenceIdentifiers(rawResult)
+    
+    def _mapPersistenceIdentifiers(self, rawResult):
+        """ Lazily maps the persistence identifiers of the search result. """
+        
+        for persistenceId in rawResult.iterkeys():
+            yield self.__itemIdMapper.mapPersistenceIdentifier(persistenceId)
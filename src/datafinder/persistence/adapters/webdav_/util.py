@@ -42,9 +42,11 @@ Implements mapping of logical identifiers to WebDAV-specific identifiers.
 
 import urlparse
 
+from davlib import XML_CONTENT_TYPE
+from webdav import Constants
 from webdav.Connection import WebdavError
 from webdav.WebdavClient import ResourceStorer, CollectionStorer
-from webdav.WebdavRequests import createFindBody
+from webdav.WebdavRequests import createFindBody, createSearchBody
 
 from datafinder.persistence.error import PersistenceError
 from datafinder.persistence.adapters.webdav_.constants import RESOURCE_TYPE_PROPERTY, LINK_TARGET_PROPERTY
@@ -53,6 +55,13 @@ from datafinder.persistence.adapters.webdav_.constants import RESOURCE_TYPE_PROP
 __version__ = "$Revision-Id:$" 
 
 
+_RESOURCE_TYPE_PROPERTIES = (LINK_TARGET_PROPERTY, RESOURCE_TYPE_PROPERTY)
+_MAX_CACHED_FIND_BODIES = 256
+_findBodyCache = dict()
+_BASIC_SEARCH_END_TAG = "</D:%s>" % Constants.TAG_SEARCH_BASIC
+_SEARCH_LIMIT_ELEMENT = "<D:limit><D:nresults>%i</D:nresults></D:limit>"
+
+
 class ItemIdentifierMapper(object):
     """ Utility class mapping identifiers. """
     
@@ -163,7 +172,7 @@ def createResourceStorer(persistenceIdentifier, connection, validate=False):
     @raise PersistenceError - Indicating problems with WebDAV connection. 
     """
     
-    webdavStorer = ResourceStorer(persistenceIdentifier, connection)
+    webdavStorer = _ResourceStorer(persistenceIdentifier, connection)
     if validate:
         _checkWebdavConnection(webdavStorer)
     return webdavStorer
@@ -186,7 +195,7 @@ def createCollectionStorer(persistenceIdentifier, connection, validate=False):
     @raise PersistenceError - Indicating problems with WebDAV connection.
     """
 
-    webdavStorer = CollectionStorer(persistenceIdentifier, connection)
+    webdavStorer = _CollectionStorer(persistenceIdentifier, connection)
     if validate:
         _checkWebdavConnection(webdavStorer)
     return webdavStorer    
@@ -216,7 +225,7 @@ def determineResourceType(resourceStorer, includeChildren=False):
     depth = 0
     if includeChildren:
         depth = 1
-    body = createFindBody([LINK_TARGET_PROPERTY, RESOURCE_TYPE_PROPERTY])
+    body = getFindBody(_RESOURCE_TYPE_PROPERTIES)
     response = resourceStorer.connection.propfind(resourceStorer.path, body, depth=depth)
     result = dict()
     for path, properties in response.msr.items():
@@ -228,3 +237,81 @@ def determineResourceType(resourceStorer, includeChildren=False):
             linkTargetPath = properties[LINK_TARGET_PROPERTY].textof()
         result[path] = isCollection, linkTargetPath
     return result
+
+
+def getFindBody(propertyIds, defaultNamespace=None):
+    """
+    Returns the serialized PROPFIND request body for the given properties.
+    DataFinder requests the same few property sets over and over again. Thus, the 
+    serialized bodies are cached and shared instead of being rebuilt for every request.
+    
+    @param propertyIds: Identifiers of the requested properties.
+    @type propertyIds: C{list} of C{tuple} of C{unicode}, C{unicode}
+    @param defaultNamespace: Name space used for property names without explicit name space.
+    @type defaultNamespace: C{unicode}
+    
+    @return: The serialized request body.
+    @rtype: C{str}
+    """
+    
+    key = (tuple(propertyIds), defaultNamespace)
+    try:
+        return _findBodyCache[key]
+    except KeyError:
+        body = createFindBody(propertyIds, defaultNamespace)
+        if len(_findBodyCache) >= _MAX_CACHED_FIND_BODIES:
+            _findBodyCache.clear()
+        _findBodyCache[key] = body
+        return body
+
+
+class _ResourceStorer(ResourceStorer):
+    """ Resource storer which reuses cached PROPFIND request bodies. """
+    
+    def readProperties(self, *names, **kwargs):
+        """ @see: L{ResourceStorer<webdav.WebdavClient.ResourceStorer>} """
+        
+        return _readProperties(self, names, kwargs.pop("ignore404", False))
+        
+
+class _CollectionStorer(CollectionStorer):
+    """ Collection storer which reuses cached PROPFIND request bodies. """
+    
+    def readProperties(self, *names, **kwargs):
+        """ @see: L{ResourceStorer<webdav.WebdavClient.ResourceStorer>} """
+        
+        return _readProperties(self, names, kwargs.pop("ignore404", False))
+
+    def findProperties(self, *names):
+        """ @see: L{CollectionStorer<webdav.WebdavClient.CollectionStorer>} """
+        
+        body = getFindBody(names, self.defaultNamespace)
+        return self.connection.propfind(self.path, body, depth=1).msr
+    
+    def search(self, conditions, selects, limit=None):
+        """ 
+        @see: L{CollectionStorer<webdav.WebdavClient.CollectionStorer>} 
+        @param limit: Optional maximum number of results requested using the DASL C{limit} element.
+        @type limit: C{int}
+        """
+        # pylint: disable=W0212
+        # W0212: The WebDAV library offers no other way to send a customized SEARCH request.
+        
+        body = createSearchBody(selects, self.path, conditions)
+        if not limit is None:
+            body = body.replace(_BASIC_SEARCH_END_TAG, _SEARCH_LIMIT_ELEMENT % limit + _BASIC_SEARCH_END_TAG)
+        headers = {"Content-Type": XML_CONTENT_TYPE, "depth": Constants.HTTP_HEADER_DEPTH_INFINITY}
+        return self.connection._request("SEARCH", self.path, body, headers).msr
+
+
+def _readProperties(webdavStorer, propertyIds, ignore404):
+    """ Reads the given properties of the resource using a cached request body. """
+    # pylint: disable=W0212
+    # W0212: The response filter of the WebDAV library handles non-conforming servers.
+    
+    body = getFindBody(propertyIds, webdavStorer.defaultNamespace)
+    response = webdavStorer.connection.propfind(webdavStorer.path, body, depth=0)
+    properties = webdavStorer._filter_property_response(response)
+    if not ignore404 and properties.errorCount > 0:
+        raise WebdavError("Property is missing on '%s': %s" % (webdavStorer.path, properties.reason), properties.code)
+    return properties
@@ -41,9 +41,13 @@ Base class for the adaptor specific file system factory implementations.
 
 
 import decimal
+import logging
+import sys
 
 from datafinder.persistence.common import character_constants as char_const
+from datafinder.persistence.common.concurrency import performConcurrently
 from datafinder.persistence.data.datastorer import NullDataStorer
+from datafinder.persistence.error import PersistenceError
 from datafinder.persistence.metadata.metadatastorer import NullMetadataStorer
 from datafinder.persistence.principal_search.principalsearcher import NullPrincipalSearcher
 from datafinder.persistence.privileges.privilegestorer import NullPrivilegeStorer
@@ -53,6 +57,12 @@ from datafinder.persistence.search.searcher import NullSearcher
 __version__ = "$Revision-Id:$" 
 
 
+_logger = logging.getLogger()
+
+
+DEFAULT_BLOCK_SIZE = 65536 # bytes
+
+
 class BaseFileSystem(object):
     """ Base class for the adaptor specific file system factory implementations. """
     
@@ -121,6 +131,94 @@ class BaseFileSystem(object):
         
         self = self # silent pylint
         return NullSearcher()
+    
+    def createIndexer(self):
+        """ 
+        Factory method for the index which is fed with the data and meta data changes 
+        of the repository. The default implementation returns C{None} indicating that 
+        the search does not need to be fed.
+        
+        @return: Adapter specific index.
+        @rtype: C{object} implementing the interface of L{MetadataIndex<datafinder.persistence.
+                adapters.metadata_index.index.MetadataIndex>} except for the search
+        """
+        
+        self = self # silent pylint
+        return None
+
+    def updateMetadata(self, identifierPropertiesMap):
+        """ 
+        @see: L{FileSystem.updateMetadata<datafinder.persistence.factory.FileSystem.updateMetadata>}
+        @note: The default implementation updates the meta data of every item separately 
+               using up to C{maxConcurrentRequests} parallel requests.
+        """
+        
+        def _update(identifier):
+            self.createMetadataStorer(identifier).update(identifierPropertiesMap[identifier])
+        return performConcurrently(_update, identifierPropertiesMap.keys(), self.maxConcurrentRequests)
+
+    def readData(self, identifiers):
+        """ 
+        @see: L{FileSystem.readData<datafinder.persistence.factory.FileSystem.readData>}
+        @note: The default implementation retrieves the data of every item separately 
+               using up to C{maxConcurrentRequests} parallel requests.
+        """
+        
+        result = dict()
+        def _read(identifier):
+            result[identifier] = self.createDataStorer(identifier).readData()
+        errors = performConcurrently(_read, identifiers, self.maxConcurrentRequests)
+        return result, errors
+
+    def writeData(self, identifierDataMap):
+        """ 
+        @see: L{FileSystem.writeData<datafinder.persistence.factory.FileSystem.writeData>}
+        @note: The default implementation stores the data of every item separately 
+               using up to C{maxConcurrentRequests} parallel requests.
+        """
+        
+        def _write(identifier):
+            self.createDataStorer(identifier).writeData(identifierDataMap[identifier])
+        return performConcurrently(_write, identifierDataMap.keys(), self.maxConcurrentRequests)
+
+    def createResource(self, dataStorer, metadataStorer, properties):
+        """ 
+        Creates the resource and stores its meta data. Adapters may override
+        this method to perform both steps at once.
+        
+        @param dataStorer: Data storer of the new resource.
+        @type dataStorer: C{object} implementing the interface of L{NullDataStorer<datafinder.
+                          persistence.data.datastorer.NullDataStorer>}
+        @param metadataStorer: Meta data storer of the new resource.
+        @type metadataStorer: C{object} implementing the interface of L{NullMetadataStorer<datafinder.
+                              persistence.metadata.metadatastorer.NullMetadataStorer>}
+        @param properties: The meta data of the new resource.
+        @type properties: C{dict}, keys: C{unicode}, values: C{object}
+        
+        @note: The default implementation creates the resource and updates its meta data afterwards.
+               If the meta data cannot be stored, the resource is removed again and the error is raised.
+        """
+        
+        self = self # silent pylint
+        dataStorer.createResource()
+        try:
+            metadataStorer.update(properties)
+        except PersistenceError:
+            errorType, error, traceback = sys.exc_info()
+            try:
+                dataStorer.delete()
+            except PersistenceError:
+                _logger.warning("Cannot remove the resource '%s' whose meta data could not be stored." 
+                                % dataStorer.identifier, exc_info=True)
+            raise errorType, error, traceback
+        
+    def rescanMetadataIndex(self, identifier, full=False):
+        """ 
+        @see: L{FileSystem.rescanMetadataIndex<datafinder.persistence.factory.FileSystem.rescanMetadataIndex>}
+        @note: The default implementation does nothing.
+        """
+        
+        pass
 
     def release(self):
         """ 
@@ -182,6 +280,26 @@ class BaseFileSystem(object):
                                         char_const.PROPERTYNAME_INVALID_CHARACTER_RE, 
                                         char_const.PROPERTYNAME_VALID_STARTCHARACTER_RE)
     
+    @property
+    def maxConcurrentRequests(self):
+        """ 
+        Maximum number of requests which can be performed in parallel. 
+        @note: This implementation always returns C{1}.
+        """
+        
+        self = self # silent pylint
+        return 1
+    
+    @property
+    def blockSize(self):
+        """ 
+        Size in bytes of the blocks used when streaming data to or from the file system.
+        @note: This implementation always returns C{DEFAULT_BLOCK_SIZE}.
+        """
+        
+        self = self # silent pylint
+        return DEFAULT_BLOCK_SIZE
+    
     @property
     def hasCustomMetadataSupport(self):
         """ 
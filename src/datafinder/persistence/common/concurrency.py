@@ -0,0 +1,114 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Provides helpers to perform independent persistence operations concurrently.
+"""
+
+
+import Queue
+import sys
+import threading
+
+from datafinder.persistence.error import PersistenceError
+
+
+__version__ = "$Revision-Id:$" 
+
+
+def performConcurrently(function, arguments, maxWorkerNumber=1):
+    """ 
+    Calls C{function} for every argument using up to C{maxWorkerNumber} threads.
+    Problems of single calls are collected and do not affect the remaining calls.
+    
+    @param function: Callable which is called with exactly one argument.
+    @type function: C{callable}
+    @param arguments: Hashable arguments C{function} is called with.
+    @type arguments: C{list} of C{object}
+    @param maxWorkerNumber: Maximum number of parallel calls. Default: 1
+    @type maxWorkerNumber: C{int}
+    
+    @return: Mapping of the arguments of the failed calls to the raised errors.
+    @rtype: C{dict} keys: C{object}, values: L{PersistenceError<datafinder.persistence.error.PersistenceError>}
+    
+    @note: Errors which are not of type C{PersistenceError} are re-raised 
+           after all running calls have been finished.
+    """
+    
+    errors = dict()
+    if maxWorkerNumber <= 1 or len(arguments) <= 1:
+        for argument in arguments:
+            try:
+                function(argument)
+            except PersistenceError, error:
+                errors[argument] = error
+    else:
+        workQueue = Queue.Queue()
+        for argument in arguments:
+            workQueue.put(argument)
+        unexpectedErrors = list()
+        workers = list()
+        for _ in range(min(maxWorkerNumber, len(arguments))):
+            worker = threading.Thread(target=_work, args=(function, workQueue, errors, unexpectedErrors))
+            worker.setDaemon(True)
+            worker.start()
+            workers.append(worker)
+        for worker in workers:
+            worker.join()
+        if len(unexpectedErrors) > 0:
+            errorType, error, traceback = unexpectedErrors[0]
+            raise errorType, error, traceback
+    return errors
+
+
+def _work(function, workQueue, errors, unexpectedErrors):
+    """ Processes arguments from the queue until it is empty or an unexpected error occurs. """
+    # pylint: disable=W0703
+    # W0703: Unexpected errors are handed over to the calling thread.
+    
+    while len(unexpectedErrors) == 0:
+        try:
+            argument = workQueue.get_nowait()
+        except Queue.Empty:
+            break
+        try:
+            function(argument)
+        except PersistenceError, error:
+            errors[argument] = error
+        except Exception:
+            unexpectedErrors.append(sys.exc_info())
@@ -88,22 +88,26 @@ class ConnectionPool(object):
         @rtype: C{object} 
         
         @raise PersistenceError: Indicating time when acquiring a connection object.
+        
+        @note: Unused connections are reused before new connections are created.
         """
 
         self._lock.acquire()
         try:
-            if self._availableConnections < self._maxConnectionNumber:
-                connection = self._createConnection()
-            else:
-                start = time.time()
-                while self._determineUnunsedConnection() is None:
-                    if not self._timeout is None:
-                        if time.time() - start > self._timeout:
-                            break
-                    self._lock.wait(1) # check at least every second
-                connection = self._determineUnunsedConnection()
-                if connection is None:
-                    raise PersistenceError("Time out occurred before a new connection was available.")
+            connection = self._determineUnunsedConnection()
+            if connection is None:
+                if self._availableConnections < self._maxConnectionNumber:
+                    connection = self._createConnection()
+                else:
+                    start = time.time()
+                    while self._determineUnunsedConnection() is None:
+                        if not self._timeout is None:
+                            if time.time() - start > self._timeout:
+                                break
+                        self._lock.wait(1) # check at least every second
+                    connection = self._determineUnunsedConnection()
+                    if connection is None:
+                        raise PersistenceError("Time out occurred before a new connection was available.")
             self._connections[id(connection)] = connection, True
             return connection
         finally:
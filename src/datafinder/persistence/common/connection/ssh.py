@@ -0,0 +1,163 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Shares authenticated SSH transports between the SSH-based adapters.
+"""
+
+
+import socket
+import threading
+
+from paramiko import Transport, SSHException
+
+from datafinder.persistence.error import PersistenceError
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_MAX_CHANNELS_PER_TRANSPORT = 10 # Default of the OpenSSH server option MaxSessions
+
+
+class SshTransportManager(object):
+    """ 
+    Manages authenticated SSH transports by host name, port and credentials.
+    A transport is established once and shared by all connection pools 
+    connecting to the same host with the same credentials. Every pooled connection 
+    opens its own channels on the shared transport. As SSH servers limit the number 
+    of channels per transport, a further transport is established when the channel
+    limit of the existing transports is reached. A transport is closed when the last 
+    connection using it has been released.
+    """
+    
+    def __init__(self, maxChannels=_MAX_CHANNELS_PER_TRANSPORT):
+        """ 
+        Constructor. 
+        
+        @param maxChannels: Maximum number of channels opened on one transport.
+        @type maxChannels: C{int}
+        """
+        
+        self._maxChannels = maxChannels
+        self._transports = dict()
+        self._lock = threading.Lock()
+        
+    def acquire(self, hostname, port, username, password, windowSize=None, channels=1):
+        """ 
+        Returns an authenticated transport to the given host. Every acquired 
+        transport has to be handed back with L{release<SshTransportManager.release>}.
+        
+        @param hostname: Name of the SSH host.
+        @type hostname: C{unicode}
+        @param port: SSH port of the host.
+        @type port: C{int}
+        @param username: Name of the user.
+        @type username: C{unicode}
+        @param password: Password of the user.
+        @type password: C{unicode}
+        @param windowSize: Minimum window size of new channels in bytes. It is advertised to the 
+                           server and therefore only limits the data received from the server.
+                           Default: C{None}
+        @type windowSize: C{int}
+        @param channels: Number of channels the caller opens at the same time on the transport.
+        @type channels: C{int}
+        
+        @return: Connected and authenticated transport.
+        @rtype: C{paramiko.Transport}
+        
+        @raise PersistenceError: Indicating problems establishing the transport.
+        """
+        
+        key = (hostname, port, username, password)
+        with self._lock:
+            entries = [entry for entry in self._transports.get(key, list()) if entry[0].is_active()]
+            for entry in entries:
+                if entry[1] + channels <= self._maxChannels:
+                    break
+            else:
+                entry = [self._connect(hostname, port, username, password), 0]
+                entries.append(entry)
+            transport = entry[0]
+            entry[1] += channels
+            if not windowSize is None and windowSize > transport.window_size:
+                transport.window_size = windowSize
+            self._transports[key] = entries
+            return transport
+        
+    @staticmethod
+    def _connect(hostname, port, username, password):
+        try:
+            transport = Transport((hostname, port))
+            transport.connect(username=username, password=password)
+            return transport
+        except (SSHException, socket.error, socket.gaierror), error:
+            errorMessage = u"Unable to establish SSH connection to host '%s:%s'! " % (hostname, port) \
+                           + "\nReason: '%s'" % str(error)
+            raise PersistenceError(errorMessage)
+        
+    def release(self, transport, channels=1):
+        """ 
+        Releases the transport. It is closed if it is not used anymore. 
+        
+        @param transport: Transport returned by L{acquire<SshTransportManager.acquire>}.
+        @type transport: C{paramiko.Transport}
+        @param channels: Number of channels specified on acquisition.
+        @type channels: C{int}
+        """
+        
+        with self._lock:
+            for key, entries in self._transports.items():
+                for entry in entries:
+                    if entry[0] is transport:
+                        entry[1] -= channels
+                        if entry[1] > 0:
+                            return
+                        entries.remove(entry)
+                        if len(entries) == 0:
+                            del self._transports[key]
+                        break
+        transport.close() # Also closes replaced transports which are not managed anymore
+        
+    def __len__(self):
+        """ Returns the number of managed transports. """
+        
+        return sum([len(entries) for entries in self._transports.values()])
+
+    
+transportManager = SshTransportManager()
@@ -46,6 +46,11 @@ from StringIO import StringIO
 __version__ = "$Revision-Id:$" 
 
 
+ITEM_TYPE_COLLECTION = "collection"
+ITEM_TYPE_LEAF = "leaf"
+ITEM_TYPE_LINK = "link"
+
+
 class NullDataStorer(object):
     """ 
     Null pattern / default implementation of the data-related interface.
@@ -166,6 +171,19 @@ class NullDataStorer(object):
         self = self # silent pylint
         return list()
     
+    def getTypedChildren(self):
+        """ 
+        Retrieves the logical identifiers of the child items together with the item types 
+        which are known from the listing. Thus, no further type checks are required. 
+        By default, the item types are unknown.
+        
+        @return: List of the child item identifiers and item types. The item type is one of 
+                 C{ITEM_TYPE_COLLECTION}, C{ITEM_TYPE_LEAF}, C{ITEM_TYPE_LINK}, or C{None} if it is unknown.
+        @rtype: C{list} of C{tuple} of C{unicode}, C{unicode} 
+        """
+        
+        return [(identifier, None) for identifier in self.getChildren()]
+    
     def exists(self):
         """ 
         Checks whether the item does already exist.
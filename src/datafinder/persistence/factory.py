@@ -43,9 +43,11 @@ ACL).
 """
 
 
+import itertools
 import logging
 from urlparse import urlsplit
         
+from datafinder.persistence.adapters.metadata_index.factory import IndexFeedingFileSystem, IndexingFileSystem
 from datafinder.persistence.common.base_factory import BaseFileSystem
 from datafinder.persistence.common.configuration import BaseConfiguration
 from datafinder.persistence.error import PersistenceError
@@ -125,17 +127,30 @@ class FileSystem(object):
 
 
         @raise PersistenceError: Indicates an unsupported interface or wrong configuration.
+        
+        @note: When the configuration parameter C{metadataIndexPath} is set, the meta data 
+               is additionally stored in a local index at this path. The index provides 
+               the meta data search unless a search configuration is given.
+        @note: When the search adapter maintains its own index (e.g. a local Lucene index),
+               the data and meta data changes are fed into this index.
         """
 
         self._baseConfiguration = baseConfiguration
+        self._isPrepared = False
         if baseConfiguration is None: # Creating a null object file system
             self._factory = BaseFileSystem()
             self._principalSearchFactory = BaseFileSystem()
             self._searchFactory = BaseFileSystem()
         else:
             self._factory = self._createFactory(baseConfiguration.uriScheme, baseConfiguration)
+            if baseConfiguration.metadataIndexPath:
+                self._factory = IndexingFileSystem(self._factory, baseConfiguration.metadataIndexPath)
             self._principalSearchFactory = self._createPrincipalSearchFactory(basePrincipalSearchConfiguration)
             self._searchFactory = self._createSearchFactory(baseSearchConfiguration)
+            if not self._searchFactory is self._factory:
+                indexer = self._searchFactory.createIndexer()
+                if not indexer is None:
+                    self._factory = IndexFeedingFileSystem(self._factory, indexer)
             
     def _createPrincipalSearchFactory(self, basePrincipalSearchConfiguration):
         if basePrincipalSearchConfiguration is None:
@@ -179,23 +194,34 @@ class FileSystem(object):
         except KeyError:
             raise PersistenceError("The URI scheme '%s' is unsupported." % uriScheme)            
 
-    def createFileStorer(self, identifier):
+    def createFileStorer(self, identifier, itemType=None):
         """ 
         Creates a C{FileStorer} which represents a concrete item in the file system.
         
         @param identifier: Path of the item within the file system.
         @type identifier: C{unicode}
+        @param itemType: Item type known from listing the parent collection. Default: C{None}
+        @type itemType: C{unicode}
         
         @return: Representation of the item in the file system.
         @rtype: L{FileStorer<datafinder.persistence.factory.FileStorer>} 
+        
+        @note: The data, meta data, and privilege storers are created on first access.
         """
         
-        self._factory.prepareUsage()
-        identifier = self._normalizeIdentifier(identifier)
-        dataStorer = self._factory.createDataStorer(identifier)
-        metadataStorer = self._factory.createMetadataStorer(identifier)
-        privilegeStorer = self._factory.createPrivilegeStorer(identifier)
-        return FileStorer(self, identifier, dataStorer, metadataStorer, privilegeStorer)
+        self._prepareUsage()
+        return FileStorer(self, self._normalizeIdentifier(identifier), storerFactory=self._factory, itemType=itemType)
+
+    def _prepareUsage(self):
+        """ 
+        Prepares the usage of the file system once. The preparation is 
+        repeated after the file system has been released or the credentials
+        have been changed.
+        """
+        
+        if not self._isPrepared:
+            self._factory.prepareUsage()
+            self._isPrepared = True
 
     @staticmethod
     def _normalizeIdentifier(identifier):
@@ -221,29 +247,103 @@ class FileSystem(object):
         @param searchMode: Distinguishes search for users / groups or both.
         @type searchMode: C{unicode} @see L{Constants<definition<datafinder.persistence.constants>} 
         
-        @return: Matched principals described by dictionary (unique name => {displayName, isUser, [memberOf])}.
-        @rtype: C{dict} keys: C{unicode} values: C{tuple} of C{unicode}, C{bool}, C{list} of C{unicode}
+        @return: Matched principals. Adapters may retrieve the principals while the result is iterated.
+        @rtype: iterable of L{Principal<datafinder.persistence.principal_search.principal.Principal>}
         """
         
         principalSearcher = self._principalSearchFactory.createPrincipalSearcher()
         return principalSearcher.searchPrincipal(pattern, searchMode)
     
-    def search(self, query, destination):
+    def search(self, query, destination, limit=None):
         """ 
         Allows searching for items based on meta data restrictions.
+        The search is performed when the result is iterated the first time.
         
         @param query: The search query string.
         @type query: C{unicode}
+        @param destination: Restricts the search to a certain item and its sub-items.
+        @type destination: L{FileStorer<datafinder.persistence.factory.FileStorer>}
+        @param limit: Optional maximum number of matched items.
+        @type limit: C{int}
         
-        @return: List of matched item identifiers.
-        @rtype: C{list} of L{FileStorer<datafinder.persistence.factory.FileStorer>}
+        @return: Iterator over the matched items.
+        @rtype: C{generator} of L{FileStorer<datafinder.persistence.factory.FileStorer>}
         """
         
-        result = list()
         searcher = self._searchFactory.createSearcher()
-        for item in searcher.search(query, destination):
-            result.append(self.createFileStorer(item))
-        return result
+        identifiers = itertools.islice(searcher.search(query, destination, limit), limit)
+        for identifier in identifiers:
+            yield self.createFileStorer(identifier)
+    
+    def updateMetadata(self, identifierPropertiesMap):
+        """ 
+        Updates the meta data of multiple items at once. Depending on the
+        used interface the updates are performed in parallel.
+        
+        @param identifierPropertiesMap: Maps item identifiers to the new / updated meta data.
+        @type identifierPropertiesMap: C{dict} keys: C{unicode}, values: C{dict} of C{unicode}, C{object}
+        
+        @return: Maps the identifiers of the items which could not be updated to the occurred error.
+        @rtype: C{dict} keys: C{unicode}, values: L{PersistenceError<datafinder.persistence.error.PersistenceError>}
+        """
+        
+        self._prepareUsage()
+        normalizedIdentifierPropertiesMap = dict()
+        for identifier, properties in identifierPropertiesMap.iteritems():
+            normalizedIdentifierPropertiesMap[self._normalizeIdentifier(identifier)] = properties
+        return self._factory.updateMetadata(normalizedIdentifierPropertiesMap)
+    
+    def readData(self, identifiers):
+        """ 
+        Retrieves the data of multiple items at once. Depending on the used
+        interface the data is retrieved in parallel or using a single request.
+        
+        @param identifiers: Identifiers of the items whose data is retrieved.
+        @type identifiers: C{list} of C{unicode}
+        
+        @return: Maps the identifiers to file-like objects providing the data and the 
+                 identifiers of the items which could not be retrieved to the occurred error.
+        @rtype: C{tuple} of C{dict} keys: C{unicode}, values: C{object} and 
+                C{dict} keys: C{unicode}, values: L{PersistenceError<datafinder.persistence.error.PersistenceError>}
+        """
+        
+        self._prepareUsage()
+        return self._factory.readData([self._normalizeIdentifier(identifier) for identifier in identifiers])
+    
+    def writeData(self, identifierDataMap):
+        """ 
+        Stores the data of multiple items at once. Depending on the used
+        interface the data is stored in parallel or using a single request.
+        
+        @param identifierDataMap: Maps item identifiers to file-like objects providing the data.
+        @type identifierDataMap: C{dict} keys: C{unicode}, values: C{object}
+        
+        @return: Maps the identifiers of the items which could not be stored to the occurred error.
+        @rtype: C{dict} keys: C{unicode}, values: L{PersistenceError<datafinder.persistence.error.PersistenceError>}
+        """
+        
+        self._prepareUsage()
+        normalizedIdentifierDataMap = dict()
+        for identifier, data in identifierDataMap.iteritems():
+            normalizedIdentifierDataMap[self._normalizeIdentifier(identifier)] = data
+        return self._factory.writeData(normalizedIdentifierDataMap)
+    
+    def rescanMetadataIndex(self, identifier="/", full=False):
+        """ 
+        Updates the local meta data index or the index of the search adapter with the 
+        meta data of the given item and its sub-items. 
+        
+        @param identifier: Identifier of the item the scan starts with.
+        @type identifier: C{unicode}
+        @param full: Flag indicating that all items are indexed again. Otherwise
+                     only changed items are indexed again.
+        @type full: C{bool}
+        
+        @note: Nothing happens when no index is configured.
+        """
+        
+        self._prepareUsage()
+        self._factory.rescanMetadataIndex(self._normalizeIdentifier(identifier), full)
     
     def updateCredentials(self, credentials):
         """ 
@@ -253,6 +353,7 @@ class FileSystem(object):
         @type credentials: C{dict} 
         """
         
+        self._isPrepared = False
         self._factory.updateCredentials(credentials)
             
     def updatePrincipalSearchCredentials(self, credentials):
@@ -268,7 +369,12 @@ class FileSystem(object):
     def release(self):
         """ Releases the file system. """
         
+        self._isPrepared = False
         self._factory.release()
+        if not self._principalSearchFactory is self._factory:
+            self._principalSearchFactory.release()
+        if not self._searchFactory is self._factory:
+            self._searchFactory.release()
 
     @property
     def baseConfiguration(self):
@@ -276,6 +382,21 @@ class FileSystem(object):
         
         return self._baseConfiguration
             
+    @property
+    def blockSize(self):
+        """ 
+        Size in bytes of the blocks used when streaming data of this file system.
+        It is taken from the configuration parameter C{blockSize}. If it is not
+        set, the default of the specific adapter is used.
+        
+        @rtype: C{int}
+        """
+        
+        blockSize = None
+        if not self._baseConfiguration is None:
+            blockSize = self._baseConfiguration.blockSize
+        return blockSize or self._factory.blockSize
+            
     @property
     def baseUri(self):
         """ Getter for the base URI. """
@@ -291,7 +412,8 @@ class FileSystem(object):
             
         isAccessible = True
         try:
-            self._factory.prepareUsage()
+            self._isPrepared = False
+            self._prepareUsage()
         except PersistenceError:
             isAccessible = False
         else:
@@ -43,15 +43,13 @@ Provides file storer implementation allowing access to an item on a specific sto
 import os
 
 from tempfile import NamedTemporaryFile, mkstemp
+from datafinder.persistence.common.base_factory import BaseFileSystem
 from datafinder.persistence.error import PersistenceError
         
 
 __version__ = "$Revision-Id:$" 
 
 
-_BLOCK_SIZE = 30000
-
-
 class FileStorer(object):
     """ 
     Convenience object provided to allow access of the complete interface. 
@@ -66,9 +64,11 @@ class FileStorer(object):
     # So it is fine to disable this warning.
 
     
-    def __init__(self, fileSystem, identifier, dataStorer, metadataStorer, privilegeStorer):
+    def __init__(self, fileSystem, identifier, dataStorer=None, metadataStorer=None, privilegeStorer=None, 
+                 storerFactory=None, itemType=None):
         """ 
-        Constructor. 
+        Constructor. Storers which are not provided are created on first 
+        access using the given storer factory.
         
         @param fileSystem: File system representation this item belongs to.
         @type fileSystem: L{FileSystem<datafinder.persistence.factory.FileSystem>}
@@ -82,6 +82,10 @@ class FileStorer(object):
         @param privilegeStorer: Encapsulates privilege specific behavior.
         @type privilegeStorer: C{object} implementing the interface of L{NullPrivilegeStorer<datafinder.
                                persistence.privileges.privilegestorer.NullPrivilegeStorer>}
+        @param storerFactory: Adapter specific factory creating the missing storers.
+        @type storerFactory: L{BaseFileSystem<datafinder.persistence.common.base_factory.BaseFileSystem>}
+        @param itemType: Item type known from listing the parent collection. Default: C{None}
+        @type itemType: C{unicode}
         """
         
         self.__fileSystem = fileSystem
@@ -89,7 +93,9 @@ class FileStorer(object):
         self.__dataStorer = dataStorer
         self.__metadataStorer = metadataStorer
         self.__privilegeStorer = privilegeStorer
+        self.__storerFactory = storerFactory
         self._tempfile = None
+        self._itemType = itemType
         
     @property
     def identifier(self):
@@ -121,6 +127,19 @@ class FileStorer(object):
             result = self.__identifier.rsplit("/")[-1]
         return result
         
+    @property
+    def itemType(self):
+        """ 
+        Returns the item type known from listing the parent collection or C{None}. 
+        The item type reflects the state at listing time and allows creating items 
+        without further type checks.
+        
+        @return: One of the C{ITEM_TYPE_*} constants of L{datastorer<datafinder.persistence.data.datastorer>}.
+        @rtype: C{unicode}
+        """
+        
+        return self._itemType
+    
     @property
     def fileSystem(self):
         """ Simple getter for the fileSystem attribute. """
@@ -129,20 +148,26 @@ class FileStorer(object):
     
     @property
     def dataStorer(self):
-        """ Simple getter for the dataStorer attribute. """
+        """ Returns the data storer and creates it on first access. """
         
+        if self.__dataStorer is None:
+            self.__dataStorer = self.__storerFactory.createDataStorer(self.__identifier)
         return self.__dataStorer
     
     @property
     def metadataStorer(self):
-        """ Simple getter for the metadataStorer attribute. """
+        """ Returns the meta data storer and creates it on first access. """
         
+        if self.__metadataStorer is None:
+            self.__metadataStorer = self.__storerFactory.createMetadataStorer(self.__identifier)
         return self.__metadataStorer
     
     @property
     def privilegeStorer(self):
-        """ Simple getter for the privilegeStorer attribute. """
+        """ Returns the privilege storer and creates it on first access. """
         
+        if self.__privilegeStorer is None:
+            self.__privilegeStorer = self.__storerFactory.createPrivilegeStorer(self.__identifier)
         return self.__privilegeStorer
     
     @property
@@ -162,7 +187,7 @@ class FileStorer(object):
         If the file storer is no link the property is C{None}.
         """
         
-        linkTarget = self.__dataStorer.linkTarget
+        linkTarget = self.dataStorer.linkTarget
         if not linkTarget is None:
             return self.__fileSystem.createFileStorer(linkTarget)
     
@@ -176,7 +201,7 @@ class FileStorer(object):
         @rtype: C{bool}
         """
         
-        return self.__dataStorer.isLink
+        return self.dataStorer.isLink
     
     @property
     def isCollection(self):
@@ -187,7 +212,7 @@ class FileStorer(object):
         @rtype: C{bool}
         """
         
-        return self.__dataStorer.isCollection
+        return self.dataStorer.isCollection
     
     @property
     def isLeaf(self):
@@ -198,7 +223,7 @@ class FileStorer(object):
         @rtype: C{bool}
         """
         
-        return self.__dataStorer.isLeaf
+        return self.dataStorer.isLeaf
      
     @property
     def canAddChildren(self):
@@ -209,7 +234,7 @@ class FileStorer(object):
         @rtype: C{bool}
         """
            
-        return self.__dataStorer.canAddChildren
+        return self.dataStorer.canAddChildren
         
     def createCollection(self, recursively=False):
         """ 
@@ -219,12 +244,22 @@ class FileStorer(object):
         @type recursively: C{bool}
         """
         
-        self.__dataStorer.createCollection(recursively)
+        self.dataStorer.createCollection(recursively)
     
-    def createResource(self):
-        """ Creates a resource. """
+    def createResource(self, properties=None):
+        """ 
+        Creates a resource. 
+        
+        @param properties: Optional meta data which is stored together with the resource.
+                           Adapters may store the resource and its meta data at once.
+        @type properties: C{dict}, keys: C{unicode}, values: C{object}
+        """
     
-        self.__dataStorer.createResource()
+        if not properties:
+            self.dataStorer.createResource()
+        else:
+            storerFactory = self.__storerFactory or BaseFileSystem()
+            storerFactory.createResource(self.dataStorer, self.metadataStorer, properties)
     
     def createLink(self, destination):
         """ 
@@ -234,7 +269,7 @@ class FileStorer(object):
         @type destination: L{FileStorer<datafinder.persistence.factory.FileStorer>
         """
         
-        self.__dataStorer.createLink(destination.dataStorer)
+        self.dataStorer.createLink(destination.dataStorer)
     
     def getChildren(self):
         """ 
@@ -246,8 +281,8 @@ class FileStorer(object):
         """
         
         result = list()
-        for item in self.__dataStorer.getChildren():
-            result.append(self.__fileSystem.createFileStorer(item))
+        for item, itemType in self.dataStorer.getTypedChildren():
+            result.append(self.__fileSystem.createFileStorer(item, itemType))
         return result
     
     def getChild(self, name):
@@ -270,12 +305,12 @@ class FileStorer(object):
         @rtype: C{bool}
         """
         
-        return self.__dataStorer.exists()
+        return self.dataStorer.exists()
     
     def delete(self):
         """ Deletes the item. """
         
-        self.__dataStorer.delete()
+        self.dataStorer.delete()
     
     def copy(self, destination):
         """ 
@@ -285,7 +320,7 @@ class FileStorer(object):
         @type destination: L{FileStorer<datafinder.persistence.factory.FileStorer>}
         """
         
-        self.__dataStorer.copy(destination.dataStorer)
+        self.dataStorer.copy(destination.dataStorer)
     
     def move(self, destination):
         """ 
@@ -295,7 +330,7 @@ class FileStorer(object):
         @type destination: L{FileStorer<datafinder.persistence.factory.FileStorer>}
         """
         
-        self.__dataStorer.move(destination.dataStorer)
+        self.dataStorer.move(destination.dataStorer)
     
     def readData(self):
         """ 
@@ -305,7 +340,7 @@ class FileStorer(object):
         @rtype: C{object} implementing the file protocol.
         """
         
-        return self.__dataStorer.readData()
+        return self.dataStorer.readData()
     
     def writeData(self, data):
         """ 
@@ -315,7 +350,7 @@ class FileStorer(object):
         @type data: C{object} implementing the file protocol.
         """
         
-        self.__dataStorer.writeData(data)
+        self.dataStorer.writeData(data)
         
     def getTemporaryFileObject(self, fileNameSuffix="", deleteOnClose=True):
         """ 
@@ -345,13 +380,11 @@ class FileStorer(object):
                     fd, path = mkstemp(suffix=fileNameSuffix)
                     fileHandle = os.fdopen(fd, "w+b")
 
-                block = inStream.read(_BLOCK_SIZE)
+                blockSize = self.__fileSystem.blockSize
+                block = inStream.read(blockSize)
                 while len(block) > 0:
                     fileHandle.write(block)
-                    block = inStream.read(_BLOCK_SIZE)
-                    while len(block) > 0:
-                        fileHandle.write(block)
-                        block = inStream.read(_BLOCK_SIZE)
+                    block = inStream.read(blockSize)
             except (OSError, IOError), error:
                 reason = os.strerror(error.errno or 0)
                 errorMessage = "Cannot create local temporary file for '%s'. Reason: '%s'." % (self.identifier, reason)
@@ -373,7 +406,7 @@ class FileStorer(object):
         value_mapping.MetaddataValue>}
         """
         
-        return self.__metadataStorer.retrieve(propertyIds)
+        return self.metadataStorer.retrieve(propertyIds)
 
     def updateMetadata(self, properties):
         """ 
@@ -384,7 +417,7 @@ class FileStorer(object):
         @type properties: C{dict} of C{unicde}, C{object}
         """
         
-        self.__metadataStorer.update(properties)
+        self.metadataStorer.update(properties)
     
     def deleteMetadata(self, propertyIds):
         """
@@ -394,7 +427,7 @@ class FileStorer(object):
         @type propertyIds: C{list} of C{unicode} 
         """
         
-        self.__metadataStorer.delete(propertyIds)
+        self.metadataStorer.delete(propertyIds)
     
     def updateAcl(self, acl):
         """
@@ -406,7 +439,7 @@ class FileStorer(object):
         @type acl: C{dict} of C{unicode} of C{tuple} of C{list} of C{unicode}, C{list} of C{unicode}.
         """
         
-        self.__privilegeStorer.updateAcl(acl)
+        self.privilegeStorer.updateAcl(acl)
     
     def retrievePrivileges(self):
         """
@@ -417,7 +450,7 @@ class FileStorer(object):
         @rtype: C{list} of C{unicode}
         """
         
-        return self.__privilegeStorer.retrievePrivileges()
+        return self.privilegeStorer.retrievePrivileges()
     
     def retrieveAcl(self):
         """
@@ -429,4 +462,4 @@ class FileStorer(object):
         @rtype C{dict} of C{unicode} of C{tuple} of C{list} of C{unicode}, C{list} of C{unicode}.
         """
         
-        return self.__privilegeStorer.retrieveAcl()
+        return self.privilegeStorer.retrieveAcl()
@@ -61,8 +61,8 @@ class NullPrincipalSearcher(object):
         @param searchMode: Distinguishes search for users / groups.
         @type searchMode: C{unicode} @see L{Constants<definition<datafinder.persistence.constants>} 
         
-        @return: Matched principals.
-        @rtype: C{list} of L{Principal<datafinder.interface.principal_search.principal.Principal>}
+        @return: Matched principals. Adapters may retrieve the principals while the result is iterated.
+        @rtype: iterable of L{Principal<datafinder.interface.principal_search.principal.Principal>}
         """
         
         self, pattern, searchMode = self, pattern, searchMode # silent pylint
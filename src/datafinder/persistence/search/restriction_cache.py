@@ -0,0 +1,98 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Caches the adapter-specific representation of search restrictions.
+"""
+
+
+import threading
+
+
+__version__ = "$Revision-Id:$" 
+
+
+MAX_CACHED_RESTRICTIONS = 1000
+
+
+class RestrictionMappingCache(object):
+    """ 
+    Keeps the adapter-specific representation of parsed search restrictions.
+    The core layer reuses the parsed restrictions for equal restriction strings.
+    Thus, the mapped restrictions are looked up by the identity of the parsed 
+    restrictions which avoids walking the restriction tree again.
+    """
+    
+    def __init__(self, mapFunction, maxSize=MAX_CACHED_RESTRICTIONS):
+        """ 
+        @param mapFunction: Maps the parsed restrictions to the adapter-specific representation.
+        @type mapFunction: C{callable} 
+        @param maxSize: Maximum number of cached restrictions. C{0} disables caching.
+        @type maxSize: C{int}
+        """
+        
+        self._mapFunction = mapFunction
+        self._maxSize = maxSize
+        self._mappedRestrictions = dict()
+        self._lock = threading.Lock()
+        
+    def map(self, restrictions):
+        """ 
+        Returns the cached representation of the restrictions or maps them.
+        
+        @param restrictions: Search restrictions described as hierarchical organized list.
+        @type restrictions: C{list}
+        
+        @return: The adapter-specific representation of the restrictions.
+        @rtype: C{object}
+        """
+        
+        key = id(restrictions)
+        with self._lock:
+            if key in self._mappedRestrictions:
+                cachedRestrictions, mappedRestrictions = self._mappedRestrictions[key]
+                if cachedRestrictions is restrictions:
+                    return mappedRestrictions
+        mappedRestrictions = self._mapFunction(restrictions)
+        if self._maxSize > 0:
+            with self._lock:
+                if len(self._mappedRestrictions) >= self._maxSize:
+                    self._mappedRestrictions.clear()
+                # The restrictions are kept to make sure the identifier is not reused.
+                self._mappedRestrictions[key] = restrictions, mappedRestrictions
+        return mappedRestrictions
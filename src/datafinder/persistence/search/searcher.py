@@ -52,7 +52,7 @@ class NullSearcher(object):
            to indicate problems.
     """
     
-    def search(self, restrictions, destination):
+    def search(self, restrictions, destination, limit=None):
         """ 
         Allows searching for items based on meta data restrictions.
         
@@ -61,10 +61,14 @@ class NullSearcher(object):
         @type restrictions: C{list}
         @param destination: Restricts the search to a certain item and its sub-items.
         @type destination: L{<FilerStorer>datafinder.persistence.filestorer.FileStorer}
+        @param limit: Optional maximum number of matched items. Implementations may use it 
+                      to avoid retrieving more results than required but can return more.
+        @type limit: C{int}
         
-        @return: List of matched item identifiers.
-        @rtype: C{list} of C{unicode}
+        @return: Iterable of matched item identifiers. Implementations 
+                 should provide the identifiers as soon as they are available.
+        @rtype: C{iterable} of C{unicode}
         """
         
-        self, restrictions, destination = self, restrictions, destination # silent pylint
+        self, restrictions, destination, limit = self, restrictions, destination, limit # silent pylint
         return list()
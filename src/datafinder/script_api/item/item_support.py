@@ -320,7 +320,7 @@ def storeData(path, fileObject):
             raise ItemSupportError("Cannot write data.\nReason: '%s'" % error.message)
 
 
-def search(path, restrictions):
+def search(path, restrictions, limit=None):
     """
     Search the given item path.
 
@@ -328,6 +328,8 @@ def search(path, restrictions):
     @type path: C{unicode}  
     @param restrictions: The search restrictions.
     @type restrictions: C{unicode}
+    @param limit: Optional maximum number of matched items.
+    @type limit: C{int}
     
     @return: List of items paths matching the given query.
     @rtype: C{list} of C{unicode}
@@ -335,13 +337,36 @@ def search(path, restrictions):
     @raise ItemSupportError: Indicates problems while parsing the restrictions or executing the search. 
     """
     
+    return list(iterSearch(path, restrictions, limit))
+
+
+def iterSearch(path, restrictions, limit=None):
+    """
+    Search the given item path and provides the matched item paths
+    as soon as they are available.
+
+    @param path: Path of the item where the search should start.
+    @type path: C{unicode}  
+    @param restrictions: The search restrictions.
+    @type restrictions: C{unicode}
+    @param limit: Optional maximum number of matched items.
+    @type limit: C{int}
+    
+    @return: Iterator over the items paths matching the given query.
+    @rtype: C{generator} of C{unicode}
+    
+    @raise ItemSupportError: Indicates problems while parsing the restrictions or executing the search. 
+    """
+    
+    cwr = repositoryManagerInstance.workingRepository
     try:
-        item = repositoryManagerInstance.workingRepository.getItem(path)
+        item = cwr.getItem(path)
     except ItemError:
         raise ItemSupportError("Item cannot be found.")
     else:
         try:
-            return [item.path for item in item.search(restrictions)]
+            for matchedItem in cwr.search(restrictions, item, limit):
+                yield matchedItem.path
         except CoreError, error:
             raise ItemSupportError("Problems during search occurred.\nReason:'%s'" % error.message)
 
@@ -365,7 +390,8 @@ def createArchive(path, targetPath, defaultProperties=None):
 
 
 def performImport(sourcePath, targetParentPath, targetRepository, 
-                  defaultProperties=None, copyData=True, ignoreLinks=False, determinePropertiesCallback=None):
+                  defaultProperties=None, copyData=True, ignoreLinks=False, determinePropertiesCallback=None,
+                  maxConcurrentImports=1, isCancelledCallback=None):
     """
     This method initiates the copy process and starts walking the source creating a
     new node in the destination tree for each item it passes.
@@ -385,8 +411,13 @@ def performImport(sourcePath, targetParentPath, targetRepository,
     @param determinePropertiesCallback: Function determining properties used when importing a specific item.
     @type: determinePropertiesCallback: C{callable} using an item description as input and returns a dictionary
                                         describing the properties.
+    @param maxConcurrentImports: Maximum number of items whose data is transferred in parallel. Default: C{1}
+    @type maxConcurrentImports: C{int}
+    @param isCancelledCallback: Function indicating that the import has been cancelled. It is called 
+                                from different threads. Default: C{None}
+    @type isCancelledCallback: C{callable} without arguments returning C{bool}
     
-    @raise ItemSupportError: Raised when errors during the import occur.
+    @raise ItemSupportError: Raised when errors during the import occur or the import has been cancelled.
     """
     # pylint: disable=W0212
     # W0212: We need to access the _repository attribute of the
@@ -405,7 +436,8 @@ def performImport(sourcePath, targetParentPath, targetRepository,
         try:
             targetItemName = targetRepository.determineUniqueItemName(sourceItem.name, targetParentPath)
             targetRepository._repository.performImport(sourceItem, targetParentItem, targetItemName, 
-                                                       mappedProperties, copyData, ignoreLinks, determinePropertiesCallback)  
+                                                       mappedProperties, copyData, ignoreLinks, determinePropertiesCallback,
+                                                       maxConcurrentImports, isCancelledCallback)
         except ItemError, error:
             errorMessage = "Problems during import of the following item:\n"
             errorMessage += "\n" + sourceItem.path + "\nReason: " + error.message
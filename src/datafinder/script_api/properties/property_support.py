@@ -174,28 +174,65 @@ def storeProperties(path, properties):
     """
     
     cwr = repositoryManagerInstance.workingRepository
+    item = _getItem(cwr, path)
+    mappedProperties = _mapProperties(cwr, item, properties)
     try:
-        item = cwr.getItem(path)
+        item.updateProperties(mappedProperties)
+    except ItemError, error:
+        raise ItemSupportError("Cannot update properties.\nReason: '%s'" % str(error.args))
+
+
+def storeMultipleProperties(pathPropertiesMap):
+    """ 
+    Adds/Updates the given properties of multiple items. Depending on the
+    repository the properties of different items are stored in parallel.
+    
+    @param pathPropertiesMap: Maps the item paths to the properties which should be updated.
+    @type pathPropertiesMap: C{dict} keys: C{unicode}, values: C{dict} of C{unicode}, C{object}
+    
+    @return: Maps the paths of the items which could not be updated to the reason.
+        Items which cannot be found or whose system-specific properties should be 
+        changed are reported as well and do not prevent the update of the other items.
+    @rtype: C{dict} keys: C{unicode}, values: C{unicode}
+    """
+    
+    cwr = repositoryManagerInstance.workingRepository
+    failedItems = dict()
+    itemProperties = list()
+    for path, properties in pathPropertiesMap.iteritems():
+        try:
+            item = _getItem(cwr, path)
+            itemProperties.append((item, _mapProperties(cwr, item, properties)))
+        except (ItemSupportError, PropertySupportError), error:
+            failedItems[path] = error.message
+    failedItems.update(cwr.updateProperties(itemProperties))
+    return failedItems
+
+
+def _getItem(cwr, path):
+    try:
+        return cwr.getItem(path)
     except ItemError:
         raise ItemSupportError("Cannot find item '%s'." % path)
-    else:
-        mappedProperties = list()
-        for propId, value in properties.iteritems():
-            if propId in item.properties:
-                prop = item.properties[propId]
-                prop.value = value
-            else:
-                prop = cwr.createProperty(propId, value)
-            if (prop.propertyDefinition.category != const.MANAGED_SYSTEM_PROPERTY_CATEGORY
-               and prop.propertyDefinition.category != const.UNMANAGED_SYSTEM_PROPERTY_CATEGORY):
-                mappedProperties.append(prop)
-            else:
-                errorMessage = "You cannot change system-specific property values."
-                raise PropertySupportError(errorMessage)
-        try:
-            item.updateProperties(mappedProperties)
-        except ItemError, error:
-            raise ItemSupportError("Cannot update properties.\nReason: '%s'" % str(error.args))
+
+
+def _mapProperties(cwr, item, properties):
+    # The properties of the item are not changed in place. Otherwise,
+    # they cannot be reset when storing them fails.
+    mappedProperties = list()
+    for propId, value in properties.iteritems():
+        if propId in item.properties:
+            propDef = item.properties[propId].propertyDefinition
+            prop = cwr.createPropertyFromDefinition(propDef, value)
+        else:
+            prop = cwr.createProperty(propId, value)
+        if (prop.propertyDefinition.category != const.MANAGED_SYSTEM_PROPERTY_CATEGORY
+           and prop.propertyDefinition.category != const.UNMANAGED_SYSTEM_PROPERTY_CATEGORY):
+            mappedProperties.append(prop)
+        else:
+            errorMessage = "You cannot change system-specific property values."
+            raise PropertySupportError(errorMessage)
+    return mappedProperties
 
 
 def deleteProperties(path, propertyIdentifiers):
@@ -71,6 +71,23 @@ class ItemBaseTestCase(unittest.TestCase):
         item._dataPersister = SimpleMock(state=ITEM_STATE_NULL)
         return item
     
+    def testCapabilities(self):
+        """ Tests the caching of the capability checker. """
+        
+        item = self._createItem("item")
+        item.itemFactory = SimpleMock(createItemCapabilityChecker=lambda _: SimpleMock(True))
+        capabilities = item.capabilities
+        self.assertTrue(item.capabilities is capabilities)
+        
+        item.refresh()
+        self.assertFalse(item.capabilities is capabilities)
+        capabilities = item.capabilities
+        
+        item._fileStorer = SimpleMock()
+        item._acl = SimpleMock()
+        item.updateAcl(SimpleMock())
+        self.assertFalse(item.capabilities is capabilities)
+        
     def testPropertyParent(self):
         """
         Test for the parent property.
@@ -0,0 +1,174 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+"""
+Test cases for the item factory.
+"""
+
+
+import unittest
+
+from datafinder.core.item.factory import ItemFactory
+from datafinder.persistence.data import datastorer
+from datafinder_test.mocks import SimpleMock
+
+
+__version__ = "$Revision-Id:$" 
+
+
+class _FileSystemMock(object):
+    """ Provides file storers of a simple item tree and counts the backend accesses. """
+    
+    def __init__(self, collections, leafs, links):
+        self.collections = collections
+        self.leafs = leafs
+        self.links = links
+        self.listings = dict()
+        self.typeChecks = dict()
+        self.linkTargetRequests = dict()
+        self.isTypedListing = False
+        
+    def createFileStorer(self, identifier):
+        """ Creates the file storer mock. """
+        
+        return _FileStorerMock(self, identifier)
+    
+    
+class _FileStorerMock(object):
+    """ Mocks the file storer. """
+    
+    def __init__(self, fileSystem, identifier):
+        self._fileSystem = fileSystem
+        self.identifier = identifier
+        self.name = identifier.rsplit("/", 1)[1]
+        self.itemType = None
+        
+    def _count(self, counter):
+        counter[self.identifier] = counter.get(self.identifier, 0) + 1
+        
+    @property
+    def parent(self):
+        return self._fileSystem.createFileStorer(self.identifier.rsplit("/", 1)[0] or "/")
+    
+    @property
+    def isCollection(self):
+        self._count(self._fileSystem.typeChecks)
+        return self.identifier in self._fileSystem.collections
+    
+    @property
+    def isLink(self):
+        return self.identifier in self._fileSystem.links
+    
+    @property
+    def isLeaf(self):
+        return self.identifier in self._fileSystem.leafs
+    
+    @property
+    def linkTarget(self):
+        self._count(self._fileSystem.linkTargetRequests)
+        if self.identifier in self._fileSystem.links:
+            return self._fileSystem.createFileStorer(self._fileSystem.links[self.identifier])
+        
+    def getChildren(self):
+        self._count(self._fileSystem.listings)
+        children = [self._fileSystem.createFileStorer(identifier) for identifier 
+                    in self._fileSystem.collections[self.identifier]]
+        if self._fileSystem.isTypedListing:
+            for child in children:
+                child.itemType = self._determineItemType(child)
+        return children
+    
+    def _determineItemType(self, child):
+        if child.identifier in self._fileSystem.links:
+            return datastorer.ITEM_TYPE_LINK
+        elif child.identifier in self._fileSystem.leafs:
+            return datastorer.ITEM_TYPE_LEAF
+        return datastorer.ITEM_TYPE_COLLECTION
+
+        
+class ItemFactoryTestCase(unittest.TestCase):
+    """ Tests the item factory. """
+    
+    def setUp(self):
+        links = {"/links/link1": "/data/a", "/links/link2": "/data/b", "/links/link3": "/data/a",
+                 "/links/chain": "/links/link1", "/links/broken": "/data/unknown",
+                 "/links/cycle1": "/links/cycle2", "/links/cycle2": "/links/cycle1"}
+        collections = {"/": ["/links", "/data"], "/links": sorted(links.keys()), 
+                       "/data": ["/data/a", "/data/b"]}
+        self._fileSystem = _FileSystemMock(collections, ["/data/a", "/data/b"], links)
+        self._factory = ItemFactory(self._fileSystem, SimpleMock())
+        self._links = dict([(link.path, link) for link in self._factory.create("/links").getChildren()])
+        
+    def testTypedListing(self):
+        """ Ensures that item types known from the listing are used on item creation. """
+        
+        self._fileSystem.isTypedListing = True
+        items = self._factory.create("/data").getChildren()
+        self.assertEquals([item.isLeaf for item in items], [True, True])
+        self.assertFalse("/data/a" in self._fileSystem.typeChecks)
+        
+    def testResolveLinkTargets(self):
+        """ Ensures that the link targets of a listed collection are resolved in one batch. """
+        
+        self.assertEquals(self._links["/links/link1"].linkTarget.path, "/data/a")
+        self.assertEquals(self._links["/links/link2"].linkTarget.path, "/data/b")
+        self.assertEquals(self._links["/links/link3"].linkTarget.path, "/data/a")
+        self.assertEquals(self._links["/links/chain"].linkTarget.path, "/data/a")
+        self.assertEquals(self._links["/links/broken"].linkTarget, None)
+        self.assertEquals(self._fileSystem.listings["/data"], 1)
+        self.assertEquals(self._fileSystem.typeChecks["/data/a"], 1)
+        for linkPath in self._links:
+            self.assertEquals(self._fileSystem.linkTargetRequests[linkPath], 1)
+        
+    def testLinkCycle(self):
+        """ Ensures that link cycles are detected. """
+        
+        self.assertEquals(self._links["/links/cycle1"].linkTarget, None)
+        self.assertEquals(self._links["/links/cycle2"].linkTarget, None)
+        self.assertEquals(self._fileSystem.linkTargetRequests["/links/cycle1"], 1)
+        self.assertEquals(self._fileSystem.linkTargetRequests["/links/cycle2"], 1)
+        
+    def testLinkTargetInvalidation(self):
+        """ Ensures that resolved link targets are invalidated when the target is moved. """
+        
+        self.assertEquals(self._links["/links/chain"].linkTarget.path, "/data/a")
+        self._factory.create("/data/a").invalidate()
+        self._fileSystem.links["/links/link1"] = "/data/b"
+        self._links["/links/link1"].refresh()
+        self._links["/links/chain"].refresh()
+        self.assertEquals(self._links["/links/chain"].linkTarget.path, "/data/b")
@@ -49,8 +49,9 @@ from datafinder.core.item.collection import ItemRoot, ItemCollection
 from datafinder.core.item.data_persister import constants
 from datafinder.core.item.leaf import ItemLeaf
 from datafinder.core.item.link import ItemLink
-from datafinder.core.item.privileges.privilege import ALL_PRIVILEGE
-from datafinder.core.item.visitor.checks import ActionCheckVisitor, ActionCheckTreeWalker
+from datafinder.core.item.privileges.privilege import ALL_PRIVILEGE, READ_PRIVILEGE
+from datafinder.core.item.visitor.checks import ActionCheckVisitor, ActionCheckTreeWalker, \
+                                             ItemCapabilityChecker
 from datafinder_test.mocks import SimpleMock
 
 
@@ -345,3 +346,59 @@ class ActionCheckTreeWalkerTestCase(ActionCheckTestCase):
         self.assertEquals(len(self.checker.affectedItems), 0)
         self.checker.check(self.testLink)
         self.assertEquals(len(self.checker.affectedItems), 0)
+
+
+class ItemCapabilityCheckerTestCase(ActionCheckTestCase):
+    """
+    Test case for L{ItemCapabilityChecker<datafinder.core.item.visitor.checks.ItemCapabilityChecker>}.
+    """
+    
+    __checker__ = ActionCheckVisitor
+    
+    def setUp(self):
+        """ Creates the capability checker of the test leaf. """
+        
+        ActionCheckTestCase.setUp(self)
+        self._capabilityChecker = ItemCapabilityChecker(self.testLeaf, True, True)
+        self._checkCount = 0
+        check = self._capabilityChecker._actionCheckVisitor.check
+        def _countingCheck(item):
+            self._checkCount += 1
+            check(item)
+        self._capabilityChecker._actionCheckVisitor.check = _countingCheck
+        
+    def testCapabilitiesCached(self):
+        """ Tests that the capabilities are only evaluated once for an unchanged item. """
+        
+        self.assertTrue(self._capabilityChecker.canStoreData)
+        self.assertTrue(self._capabilityChecker.canDelete)
+        self.assertTrue(self._capabilityChecker.canStoreProperties)
+        self.assertFalse(self._capabilityChecker.canArchive)
+        self.assertEquals(self._checkCount, 1)
+        
+    def testCapabilitiesInvalidatedOnPrivilegeChange(self):
+        """ Tests the re-evaluation of the capabilities when the privileges change. """
+        
+        self.assertTrue(self._capabilityChecker.canStoreData)
+        self.testLeaf._privileges = [READ_PRIVILEGE]
+        self.assertFalse(self._capabilityChecker.canStoreData)
+        self.assertFalse(self._capabilityChecker.canDelete)
+        self.assertTrue(self._capabilityChecker.canRetrieveData)
+        self.assertEquals(self._checkCount, 2)
+        
+    def testCapabilitiesInvalidatedOnDataStateChange(self):
+        """ Tests the re-evaluation of the capabilities when the data persister changes. """
+        
+        self.testLeaf._dataPersister = SimpleMock(state=constants.ITEM_STATE_ACCESSIBLE)
+        self.assertTrue(self._capabilityChecker.canRetrieveData)
+        self.testLeaf._dataPersister = SimpleMock(state=constants.ITEM_STATE_MIGRATED)
+        self.assertFalse(self._capabilityChecker.canRetrieveData)
+        self.assertEquals(self._checkCount, 2)
+        
+    def testCapabilitiesInvalidatedOnPropertyChange(self):
+        """ Tests the re-evaluation of the capabilities when the properties are reloaded. """
+        
+        self.assertTrue(self._capabilityChecker.canStoreData)
+        self.testLeaf._properties = dict()
+        self.assertTrue(self._capabilityChecker.canStoreData)
+        self.assertEquals(self._checkCount, 2)
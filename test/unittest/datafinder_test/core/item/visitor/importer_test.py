@@ -0,0 +1,228 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+"""
+Test case for the importer.
+"""
+
+
+import threading
+import unittest
+
+from datafinder.core.error import ItemError
+from datafinder.core.item.collection import ItemCollection
+from datafinder.core.item.leaf import ItemLeaf
+from datafinder.core.item.visitor.importer import Importer
+from datafinder_test.mocks import SimpleMock
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_FAILING_NAME = "fail"
+_FAILING_TRANSFER_NAME = "transferFail"
+
+
+class _TargetItemMock(object):
+    """ 
+    Mocks an imported item and checks that its parent has been created before. 
+    The threads changing the item structure are recorded.
+    """
+    
+    def __init__(self, name, parent=None, itemFactory=None):
+        self.name = name
+        self.parent = parent
+        self.path = "/" + name
+        if not parent is None:
+            self.path = parent.path + "/" + name
+        self.itemFactory = itemFactory
+        self.created = parent is None
+        self.data = None
+        
+    def create(self, _):
+        self.itemFactory.threads.add(threading.currentThread())
+        if self.name == _FAILING_NAME or not self.parent.created:
+            raise ItemError("Cannot create item.")
+        self.created = True
+        
+    def storeData(self, data):
+        if self.name == _FAILING_TRANSFER_NAME:
+            raise ItemError("Cannot store data.")
+        self.data = data
+        
+    def delete(self, ignoreStorageLocation):
+        self.invalidate()
+
+    def invalidate(self):
+        self.itemFactory.threads.add(threading.currentThread())
+        self.itemFactory.items.pop(self.path, None)
+        
+        
+class _ItemFactoryMock(object):
+    """ Creates and records the imported items. """
+    
+    def __init__(self):
+        self.items = dict()
+        self.threads = set()
+        
+    @staticmethod
+    def determineValidItemName(name):
+        return name
+    
+    def createLeaf(self, name, parent):
+        self.threads.add(threading.currentThread())
+        item = _TargetItemMock(name, parent, self)
+        self.items[item.path] = item
+        return item
+    createCollection = createLeaf
+    
+    
+class _Importer(Importer):
+    """ Importer which uses no additional properties for leafs. """
+    
+    def _determineLeafProperties(self, _):
+        return list()
+
+
+def _createSourceItem(itemClass, name, parent=None):
+    item = itemClass(name)
+    item.path = "/" + name
+    if not parent is None:
+        item.path = parent.path + "/" + name
+        parent._children.append(item)
+    item._properties = dict()
+    item._dataPersister = SimpleMock(item.path, state="")
+    item._capabilities = SimpleMock(canRetrieveData=True)
+    if item.isCollection:
+        item._children = list()
+    return item
+
+
+class ImporterTestCase(unittest.TestCase):
+    """ Tests the sequential and concurrent import of an item tree. """
+    
+    def setUp(self):
+        self._source = _createSourceItem(ItemCollection, "source")
+        self._createSourceTree(self._source)
+        self._itemFactory = _ItemFactoryMock()
+        self._target = _TargetItemMock("target", itemFactory=self._itemFactory)
+        self._importer = _Importer()
+        
+    @staticmethod
+    def _createSourceTree(root, depth=2):
+        for index in range(5):
+            _createSourceItem(ItemLeaf, "leaf%i" % index, root)
+        if depth > 0:
+            for index in range(2):
+                collection = _createSourceItem(ItemCollection, "collection%i" % index, root)
+                ImporterTestCase._createSourceTree(collection, depth - 1)
+    
+    def _assertImported(self, sourcePaths):
+        for sourcePath in sourcePaths:
+            importedPath = "/target" + sourcePath
+            self.assertTrue(importedPath in self._itemFactory.items)
+            importedItem = self._itemFactory.items[importedPath]
+            self.assertTrue(importedItem.created)
+            if sourcePath.split("/")[-1].startswith("leaf"):
+                self.assertEquals(importedItem.data, sourcePath)
+            
+    def _determineSourcePaths(self, item=None):
+        item = item or self._source
+        paths = [item.path]
+        for child in item.getChildren():
+            paths.extend(self._determineSourcePaths(child))
+        return paths
+        
+    def testSequentialImport(self):
+        """ Tests the default sequential import. """
+        
+        self._importer.performImport(self._source, self._target)
+        sourcePaths = self._determineSourcePaths()
+        self._assertImported(sourcePaths)
+        self.assertEquals(len(self._itemFactory.items), len(sourcePaths))
+        self.assertEquals(len(self._importer.importedLeafs), 35)
+        
+        self.assertEquals(self._itemFactory.threads, set([threading.currentThread()]))
+        
+    def testConcurrentImport(self):
+        """ Tests the concurrent import. """
+        
+        self._importer.performImport(self._source, self._target, maxConcurrentImports=4)
+        sourcePaths = self._determineSourcePaths()
+        self._assertImported(sourcePaths)
+        self.assertEquals(len(self._itemFactory.items), len(sourcePaths))
+        self.assertEquals(len(self._importer.importedLeafs), 35)
+        self.assertEquals(self._itemFactory.threads, set([threading.currentThread()]))
+        
+    def testImportErrors(self):
+        """ Tests that problems of single items are reported at the end of the import. """
+        
+        sourcePaths = self._determineSourcePaths()
+        failingLeafs = [_createSourceItem(ItemLeaf, _FAILING_NAME, self._source.getChildren()[-1]),
+                        _createSourceItem(ItemLeaf, _FAILING_TRANSFER_NAME, self._source.getChildren()[-1]),
+                        _createSourceItem(ItemLeaf, _FAILING_TRANSFER_NAME, self._source)]
+        failingCollection = _createSourceItem(ItemCollection, _FAILING_NAME, self._source)
+        _createSourceItem(ItemLeaf, "leaf", failingCollection)
+        for maxConcurrentImports in [1, 4]:
+            self._itemFactory.items.clear()
+            try:
+                self._importer.performImport(self._source, self._target, maxConcurrentImports=maxConcurrentImports)
+                self.fail("No ItemError has been raised.")
+            except ItemError, error:
+                for failingLeaf in failingLeafs:
+                    self.assertTrue(failingLeaf.path in error.message)
+                self.assertTrue(failingCollection.path in error.message)
+            self._assertImported(sourcePaths)
+            self.assertEquals(len(self._itemFactory.items), len(sourcePaths))
+            self.assertEquals(self._itemFactory.threads, set([threading.currentThread()]))
+        
+    def testCancellation(self):
+        """ Tests the cancellation of the concurrent import. """
+        
+        isCancelledCallback = lambda: len(self._importer.importedLeafs) >= 3
+        self.assertRaises(ItemError, self._importer.performImport, self._source, self._target, 
+                          maxConcurrentImports=2, isCancelledCallback=isCancelledCallback)
+        self.assertTrue(len(self._importer.importedLeafs) < 35)
+        for item in self._itemFactory.items.values():
+            if item.name.startswith("leaf"):
+                self.assertFalse(item.data is None)
+        
+        self._itemFactory.items.clear()
+        self.assertRaises(ItemError, self._importer.performImport, self._source, self._target, 
+                          isCancelledCallback=lambda: True)
+        self.assertEquals(len(self._itemFactory.items), 0)
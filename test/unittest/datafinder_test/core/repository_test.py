@@ -0,0 +1,107 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Tests the repository implementation.
+"""
+
+
+import unittest
+
+from datafinder.core.configuration.properties.property_definition import PropertyDefinition
+from datafinder.core.item.leaf import ItemLeaf
+from datafinder.core.item.privileges.privilege import ALL_PRIVILEGE
+from datafinder.core.item.property import Property
+from datafinder.core.repository import Repository
+from datafinder.persistence.error import PersistenceError
+from datafinder_test.mocks import SimpleMock
+
+
+__version__ = "$Revision-Id:$" 
+
+
+class RepositoryTestCase(unittest.TestCase):
+    """ Tests the repository. """
+    
+    def setUp(self):
+        """ Creates the repository using a mocked file system. """
+        
+        self._fileSystem = SimpleMock(methodNameResultMap={"createFileStorer": (SimpleMock(list(), identifier="/"), None)})
+        self._repository = Repository(self._fileSystem, SimpleMock(preferences=None), SimpleMock())
+        self._propertyDefinition = PropertyDefinition("name")
+        
+    def _createItem(self, name, canStoreProperties=True):
+        """ Creates a leaf below the root with the given property. """
+        
+        item = ItemLeaf(name)
+        item.parent = self._repository.root
+        item._privileges = [ALL_PRIVILEGE]
+        item._properties = {"name": Property(self._propertyDefinition, "old")}
+        item._capabilities = SimpleMock(canStoreProperties=canStoreProperties)
+        item.itemFactory = SimpleMock(SimpleMock(canStoreProperties=canStoreProperties))
+        return item
+        
+    def testUpdateProperties(self):
+        """ Tests the update of the properties of multiple items. """
+        
+        items = [self._createItem("a"), self._createItem("b")]
+        self._fileSystem.methodNameResultMap["updateMetadata"] = (dict(), None)
+        itemProperties = [(item, [Property(self._propertyDefinition, "new")]) for item in items]
+        self.assertEquals(self._repository.updateProperties(itemProperties), dict())
+        for item in items:
+            self.assertEquals(item.properties["name"].value, "new")
+            
+    def testUpdatePropertiesErrors(self):
+        """ Tests that the properties of failed items are reset. """
+        
+        items = [self._createItem("a"), self._createItem("b"), self._createItem("c", False)]
+        self._fileSystem.methodNameResultMap["updateMetadata"] = ({"/b": PersistenceError("Failed.")}, None)
+        itemProperties = [(item, [Property(self._propertyDefinition, "new")]) for item in items]
+        failedItems = self._repository.updateProperties(itemProperties)
+        self.assertEquals(sorted(failedItems.keys()), ["/b", "/c"])
+        self.assertEquals(failedItems["/b"], "Failed.")
+        self.assertEquals(items[0].properties["name"].value, "new")
+        self.assertEquals(items[1].properties["name"].value, "old")
+        self.assertEquals(items[2].properties["name"].value, "old")
+        
+        # The whole update fails
+        self._fileSystem.methodNameResultMap["updateMetadata"] = (None, PersistenceError("Failed."))
+        failedItems = self._repository.updateProperties(itemProperties[:2])
+        self.assertEquals(sorted(failedItems.keys()), ["/a", "/b"])
+        self.assertEquals(items[0].properties["name"].value, "new")
+        self.assertEquals(items[1].properties["name"].value, "old")
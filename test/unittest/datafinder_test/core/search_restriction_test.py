@@ -42,7 +42,9 @@ Implements tests for the search restriction parser.
 
 import unittest
 
-from datafinder.core.search_restriction import SearchRestrictionParser
+from pyparsing import ParseException
+
+from datafinder.core.search_restriction import SearchRestrictionParser, SearchRestrictionCache
 
 
 __version__ = "$Revision-Id:$" 
@@ -163,3 +165,28 @@ class SearchSupportTestCase(unittest.TestCase):
         """ Tests the available quoted string characters. """
         
         self.assertEquals(self.__searchRestrictionParser.quotedStringCharacters, ["\"", "'"])
+
+
+class SearchRestrictionCacheTestCase(unittest.TestCase):
+    """ Tests the caching of parsed search restrictions. """
+    
+    def testParse(self):
+        """ Ensures that equal restrictions are parsed once. """
+        
+        cache = SearchRestrictionCache()
+        restrictions = cache.parse("a = 'b' and c = 'd'")
+        self.assertEquals(restrictions, [[("a", "=", "b"), "AND", ("c", "=", "d")]])
+        self.assertTrue(cache.parse("a = 'b' and c = 'd'") is restrictions)
+        self.assertFalse(cache.parse("a = 'b'") is restrictions)
+        self.assertRaises(ParseException, cache.parse, "a = ")
+        
+    def testLimits(self):
+        """ Tests the disabled and full cache. """
+        
+        cache = SearchRestrictionCache(0)
+        self.assertFalse(cache.parse("a = 'b'") is cache.parse("a = 'b'"))
+        
+        cache = SearchRestrictionCache(1)
+        restrictions = cache.parse("a = 'b'")
+        cache.parse("c = 'd'")
+        self.assertFalse(cache.parse("a = 'b'") is restrictions)
@@ -218,6 +218,27 @@ class DataWebdavAdapterTestCase(unittest.TestCase):
         self._utilMock.error = OSError("")
         self.assertRaises(PersistenceError, self._adapter.getChildren)
         
+    def testItemStateCache(self):
+        """ Tests the usage of the item state cache. """
+        
+        itemState = SimpleMock(exists=True, isLink=False, isCollection=True, isLeaf=False)
+        itemStateCache = SimpleMock(
+            methodNameResultMap={"determine": (itemState, None), "listDirectory": (["C:\\test.txt"], None)})
+        cachingAdapter = adapter.DataFileSystemAdapter("/identifier", self._identifierMapperMock, itemStateCache)
+        self._osPathMock.value = False
+        self._utilMock.value = SimpleMock(True)
+        
+        self.assertTrue(cachingAdapter.exists())
+        self.assertTrue(cachingAdapter.isCollection)
+        self.assertFalse(cachingAdapter.isLeaf)
+        self.assertFalse(cachingAdapter.isLink)
+        
+        itemState.isLink = None # Unknown shortcut state
+        self.assertTrue(cachingAdapter.isLink)
+        
+        self._identifierMapperMock.value = "/C:/test.txt"
+        self.assertEquals(["/C:/test.txt"], cachingAdapter.getChildren())
+        
     def testExists(self):
         """ Tests the exists method behavior. """
         
@@ -249,16 +270,16 @@ class DataWebdavAdapterTestCase(unittest.TestCase):
         
         destination = adapter.DataFileSystemAdapter("", SimpleMock())
         
-        self._shutilMock.error = None
+        self._utilMock.error = None
         self._adapter.copy(destination)
         
-        self._shutilMock.error = IOError("")
+        self._utilMock.error = IOError("")
         self.assertRaises(PersistenceError, self._adapter.copy, destination)
         
-        self._shutilMock.error = OSError("")
+        self._utilMock.error = OSError("")
         self.assertRaises(PersistenceError, self._adapter.copy, destination)
         
-        self._shutilMock.error = shutil.Error("")
+        self._utilMock.error = shutil.Error("")
         self.assertRaises(PersistenceError, self._adapter.copy, destination)
         
     def testMove(self):
@@ -125,6 +125,23 @@ class MetadataFileSystemAdapterTestCase(unittest.TestCase):
         self._osModuleMock.error = OSError()
         self.assertRaises(PersistenceError, self._adapter.retrieve)
         
+    def testRetrieveFromItemStateCache(self):
+        """ Tests the retrieve behavior when the item state is cached. """
+        
+        itemState = SimpleMock(exists=True, size=self._osStatResult.st_size, mimeType="application/pdf", 
+                               creationTime=self._osStatResult.st_ctime, 
+                               modificationTime=self._osStatResult.st_mtime)
+        self._osModuleMock.error = OSError()
+        cachingAdapter = adapter.MetadataFileSystemAdapter(
+            "/identifier", SimpleMock("/identifier"), SimpleMock(itemState))
+        
+        self.assertEquals(cachingAdapter.retrieve(), self._initValidRetrieveResult("application/pdf"))
+        self.assertEquals(len(cachingAdapter.retrieve([constants.SIZE])), 1)
+        
+        itemState.exists = False
+        self._osModuleMock.error = None
+        self.assertRaises(PersistenceError, cachingAdapter.retrieve)
+        
     def testUpdate(self):
         """ Tests the update behavior. """
         
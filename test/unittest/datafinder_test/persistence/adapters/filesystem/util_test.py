@@ -0,0 +1,214 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+""" 
+Implements test cases of the file system utilities.
+"""
+
+
+import os
+import shutil
+import StringIO
+import tempfile
+import unittest
+
+import mock
+
+from datafinder.persistence.adapters.filesystem import util
+
+
+__version__ = "$Revision-Id:$" 
+
+
+class ItemStateCacheTestCase(unittest.TestCase):
+    """ Implements test cases of the item state cache. """
+    
+    def setUp(self):
+        """ Creates a small directory tree. """
+        
+        self._directory = tempfile.mkdtemp()
+        self._collectionPath = os.path.join(self._directory, u"collection")
+        os.mkdir(self._collectionPath)
+        self._filePath = os.path.join(self._collectionPath, u"file.txt")
+        with open(self._filePath, "wb") as fileObject:
+            fileObject.write("data")
+        self._itemStateCache = util.ItemStateCache(30)
+        
+    def tearDown(self):
+        """ Removes the directory tree. """
+        
+        shutil.rmtree(self._directory)
+        
+    def testItemState(self):
+        """ Tests the determined item states. """
+        
+        itemState = self._itemStateCache.determine(self._filePath)
+        self.assertTrue(itemState.exists)
+        self.assertTrue(itemState.isLeaf)
+        self.assertFalse(itemState.isCollection)
+        self.assertEquals(itemState.size, 4)
+        self.assertEquals(itemState.mimeType, "text/plain")
+        
+        itemState = self._itemStateCache.determine(self._collectionPath)
+        self.assertTrue(itemState.isCollection)
+        self.assertFalse(itemState.isLink)
+        
+        itemState = self._itemStateCache.determine(os.path.join(self._directory, u"unknown"))
+        self.assertFalse(itemState.exists)
+        self.assertFalse(itemState.isCollection)
+        
+    def testListDirectory(self):
+        """ Tests that the children states are cached when listing a directory. """
+        
+        self.assertEquals(self._itemStateCache.listDirectory(self._collectionPath), [self._filePath])
+        with mock.patch.object(util.os, "lstat") as lstatMock:
+            self.assertTrue(self._itemStateCache.determine(self._filePath).isLeaf)
+            self.assertFalse(lstatMock.called)
+            
+    def testDetermineDoesNotCache(self):
+        """ Tests that only the item states of listed items are cached. """
+        
+        self.assertTrue(self._itemStateCache.determine(self._filePath).exists)
+        os.remove(self._filePath)
+        self.assertFalse(self._itemStateCache.determine(self._filePath).exists)
+            
+    def testInvalidate(self):
+        """ Tests the invalidation of modified items. """
+        
+        otherPath = os.path.join(self._directory, u"collectionOther")
+        os.mkdir(otherPath)
+        self._itemStateCache.listDirectory(self._directory)
+        self._itemStateCache.listDirectory(self._collectionPath)
+        shutil.rmtree(self._collectionPath)
+        
+        self._itemStateCache.invalidate(self._collectionPath)
+        
+        with mock.patch.object(util.os, "lstat") as lstatMock:
+            lstatMock.side_effect = OSError
+            self.assertFalse(self._itemStateCache.determine(self._collectionPath).exists)
+            self.assertFalse(self._itemStateCache.determine(self._filePath).exists)
+            self.assertTrue(self._itemStateCache.determine(otherPath).exists)
+            
+    def testDisabledCache(self):
+        """ Tests that nothing is cached if the time out is zero. """
+        
+        itemStateCache = util.ItemStateCache(0)
+        itemStateCache.listDirectory(self._collectionPath)
+        os.remove(self._filePath)
+        
+        self.assertFalse(itemStateCache.determine(self._filePath).exists)
+        
+    def testSymbolicLink(self):
+        """ Tests the item state of symbolic links. """
+        
+        if hasattr(os, "symlink"):
+            linkPath = os.path.join(self._directory, u"link")
+            os.symlink(self._collectionPath, linkPath)
+            itemState = self._itemStateCache.determine(linkPath)
+            self.assertTrue(itemState.isLink)
+            self.assertTrue(itemState.isCollection)
+            
+            danglingLinkPath = os.path.join(self._directory, u"dangling")
+            os.symlink(os.path.join(self._directory, u"unknown"), danglingLinkPath)
+            itemState = self._itemStateCache.determine(danglingLinkPath)
+            self.assertTrue(itemState.isLink)
+            self.assertFalse(itemState.exists)
+
+
+class CopyTestCase(unittest.TestCase):
+    """ Implements test cases of the file copy functions. """
+    
+    def setUp(self):
+        """ Creates a small directory tree. """
+        
+        self._directory = tempfile.mkdtemp()
+        self._sourcePath = os.path.join(self._directory, u"source")
+        os.makedirs(os.path.join(self._sourcePath, u"collection"))
+        self._content = os.urandom(3 * util.COPY_BLOCK_SIZE + 10)
+        for path in [os.path.join(self._sourcePath, u"file.bin"), 
+                     os.path.join(self._sourcePath, u"collection", u"file.bin")]:
+            with open(path, "wb") as fileObject:
+                fileObject.write(self._content)
+        
+    def tearDown(self):
+        """ Removes the directory tree. """
+        
+        shutil.rmtree(self._directory)
+        
+    def _assertContent(self, path, content):
+        with open(path, "rb") as fileObject:
+            self.assertEquals(fileObject.read(), content)
+        
+    def testCopyFileObject(self):
+        """ Tests copying between file objects. """
+        
+        destinationPath = os.path.join(self._directory, u"destination.bin")
+        with open(os.path.join(self._sourcePath, u"file.bin"), "rb") as source:
+            source.read(10)
+            with open(destinationPath, "wb") as destination:
+                destination.write("header")
+                util.copyFileObject(source, destination)
+                destination.write("trailer")
+        self._assertContent(destinationPath, "header" + self._content[10:] + "trailer")
+        
+    def testCopyFileObjectWithoutKernelSupport(self):
+        """ Tests the block-wise fall back when no kernel-level copying is possible. """
+        
+        destinationPath = os.path.join(self._directory, u"destination.bin")
+        with mock.patch.multiple(util, _copyFileRange=None, _sendFile=None, _reflink=mock.Mock(return_value=False)):
+            with open(os.path.join(self._sourcePath, u"file.bin"), "rb") as source:
+                with open(destinationPath, "wb") as destination:
+                    util.copyFileObject(source, destination)
+        self._assertContent(destinationPath, self._content)
+        
+    def testCopyStream(self):
+        """ Tests copying from a stream which is no file. """
+        
+        destinationPath = os.path.join(self._directory, u"destination.bin")
+        with open(destinationPath, "wb") as destination:
+            util.copyFileObject(StringIO.StringIO(self._content), destination)
+        self._assertContent(destinationPath, self._content)
+        
+    def testCopyTree(self):
+        """ Tests copying of a directory tree. """
+        
+        destinationPath = os.path.join(self._directory, u"destination")
+        util.copyTree(self._sourcePath, destinationPath)
+        self._assertContent(os.path.join(destinationPath, u"file.bin"), self._content)
+        self._assertContent(os.path.join(destinationPath, u"collection", u"file.bin"), self._content)
+        
+        self.assertRaises(OSError, util.copyTree, self._sourcePath, destinationPath)
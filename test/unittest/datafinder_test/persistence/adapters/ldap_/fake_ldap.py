@@ -0,0 +1,77 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Fake implementation of the parts of the python-ldap module which are used by the LDAP adapter.
+It serves as module C{ldap} and as module C{ldap.controls}. Connecting to a server always fails,
+so tests replace L{initialize} by a function returning a handle mock.
+"""
+
+
+__version__ = "$Revision-Id:$" 
+
+
+VERSION3 = 3
+SCOPE_SUBTREE = 2
+OPT_REFERRALS = 8
+RES_SEARCH_RESULT = 101
+
+
+class LDAPError(Exception):
+    """ Base class of the LDAP errors. """
+
+
+class SERVER_DOWN(LDAPError): # pylint: disable=C0103
+    """ Indicates that the server cannot be reached or has closed the connection. """
+
+
+def initialize(uri):
+    """ No server is available. """
+    
+    raise SERVER_DOWN("Cannot contact LDAP server '%s'." % uri)
+
+
+class SimplePagedResultsControl(object):
+    """ Represents the control of paged search results. """
+    
+    controlType = "1.2.840.113556.1.4.319"
+    
+    def __init__(self, criticality=False, size=10, cookie=""):
+        self.criticality = criticality
+        self.size = size
+        self.cookie = cookie
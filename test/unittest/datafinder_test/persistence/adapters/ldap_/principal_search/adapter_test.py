@@ -39,13 +39,19 @@
 """ Test cases for the LDAP-specific principal search adapter. """
 
 
-import ldap
+import sys
 import unittest
 
+from datafinder_test.persistence.adapters.ldap_ import fake_ldap
+sys.modules.setdefault("ldap", fake_ldap) # python-ldap is usually not available
+sys.modules.setdefault("ldap.controls", fake_ldap)
+import ldap
+from ldap.controls import SimplePagedResultsControl
 from datafinder.persistence.common.configuration import BaseConfiguration
 from datafinder.persistence.error import PersistenceError
 from datafinder.persistence.principal_search import constants, principal
 from datafinder.persistence.adapters.ldap_.configuration import Configuration
+from datafinder.persistence.adapters.ldap_.constants import MAX_CONNECTION_NUMBER, SEARCH_PAGE_SIZE
 from datafinder.persistence.adapters.ldap_.principal_search import adapter
 
 
@@ -74,12 +80,16 @@ _MAPPED_GROUP = principal.Principal(_TEST_DOMAIN + "\\test1", type=constants.GRO
 
 class _LdapConnectionMock(object):
     """ Class to mock class C{_Ldap}. """
+    
+    instanceCount = 0
+    searchCount = 0
 
     def __init__(self, ldapServerUri, _, __, encoding=None):
         """
         Constructor. 
         """
         
+        _LdapConnectionMock.instanceCount += 1
         self.__searchCalls = 0
         self.searchStateDictionary = {_VALID_USER_QUERY: self._returnValidUserResult,
                                       _VALID_GROUP_QUERY: self._returnValidGroupResult,
@@ -88,9 +98,10 @@ class _LdapConnectionMock(object):
         if ldapServerUri == _SERVER_DOWN_URI:
             self._raiseLdapError()
         
-    def search(self, query, _, filterDictionary=None):
+    def iterSearch(self, query, _, filterDictionary=None):
         """ Mocked search method. """
         
+        _LdapConnectionMock.searchCount += 1
         if _VALID_USER_GROUP_QUERY in query:
             if self.__searchCalls == 0:
                 self.__searchCalls += 1
@@ -139,25 +150,27 @@ class LdapSearchTestCase(unittest.TestCase):
         self._configuration = Configuration(BaseConfiguration())
         self._configuration.domain = _TEST_DOMAIN
         self._ldapPrincipalSearcher = adapter.LdapPrincipalSearchAdapter(self._configuration)
+        _LdapConnectionMock.instanceCount = 0
+        _LdapConnectionMock.searchCount = 0
         
     def testValidUserResult(self):
         """ Tests the successful search for a specific user. """
         
-        result = self._ldapPrincipalSearcher.searchPrincipal(_VALID_USER_QUERY, constants.SEARCH_MODE_USER_ONLY)
+        result = list(self._ldapPrincipalSearcher.searchPrincipal(_VALID_USER_QUERY, constants.SEARCH_MODE_USER_ONLY))
         self.assertEquals(len(result), 1)
         self.assertEquals(result[0], _MAPPED_USER)
 
     def testValidGroupResult(self):
         """ Tests the successful search for a specific group. """
         
-        result = self._ldapPrincipalSearcher.searchPrincipal(_VALID_GROUP_QUERY, constants.SEARCH_MODE_GROUP_ONLY)
+        result = list(self._ldapPrincipalSearcher.searchPrincipal(_VALID_GROUP_QUERY, constants.SEARCH_MODE_GROUP_ONLY))
         self.assertEquals(len(result), 1)
         self.assertEquals(result[0], _MAPPED_GROUP)
 
     def testValidUserGroupResult(self):
         """ Tests the successful search for a specific user and group. """
         
-        result = self._ldapPrincipalSearcher.searchPrincipal(_VALID_USER_GROUP_QUERY, constants.SEARCH_MODE_USER_AND_GROUP)
+        result = list(self._ldapPrincipalSearcher.searchPrincipal(_VALID_USER_GROUP_QUERY, constants.SEARCH_MODE_USER_AND_GROUP))
         self.assertEquals(len(result), 2)
         self.assertEquals(result[0], _MAPPED_USER)
         self.assertEquals(result[1], _MAPPED_GROUP)
@@ -180,3 +193,103 @@ class LdapSearchTestCase(unittest.TestCase):
         
         self.assertRaises(PersistenceError, self._ldapPrincipalSearcher.searchPrincipal,
                           _PROBLEM_ON_QUERY, constants.SEARCH_MODE_GROUP_ONLY)
+        
+    def testConnectionReuse(self):
+        """ Ensures that the bound connections are reused by subsequent searches. """
+        
+        for _ in range(MAX_CONNECTION_NUMBER + 1):
+            self._ldapPrincipalSearcher.searchPrincipal(_VALID_GROUP_QUERY, constants.SEARCH_MODE_GROUP_ONLY)
+        self.assertTrue(_LdapConnectionMock.instanceCount <= MAX_CONNECTION_NUMBER)
+        self.assertEquals(_LdapConnectionMock.searchCount, MAX_CONNECTION_NUMBER + 1)
+        
+    def testSearchCache(self):
+        """ Ensures that search results are reused until they expire. """
+        
+        searchCache = adapter.PrincipalSearchCache(60)
+        searcher = adapter.LdapPrincipalSearchAdapter(self._configuration, searchCache=searchCache)
+        result = searcher.searchPrincipal(_VALID_USER_QUERY, constants.SEARCH_MODE_USER_ONLY)
+        self.assertEquals(list(result), [_MAPPED_USER])
+        self.assertEquals(list(searcher.searchPrincipal(_VALID_USER_QUERY, constants.SEARCH_MODE_USER_ONLY)), [_MAPPED_USER])
+        self.assertEquals(_LdapConnectionMock.searchCount, 1)
+        
+        list(searcher.searchPrincipal(_VALID_USER_QUERY, constants.SEARCH_MODE_USER_AND_GROUP))
+        self.assertEquals(_LdapConnectionMock.searchCount, 3)
+        
+        searchCache.clear()
+        list(searcher.searchPrincipal(_VALID_USER_QUERY, constants.SEARCH_MODE_USER_ONLY))
+        self.assertEquals(_LdapConnectionMock.searchCount, 4)
+        
+        expiredSearchCache = adapter.PrincipalSearchCache(60)
+        expiredSearchCache.put(_VALID_USER_QUERY, constants.SEARCH_MODE_USER_ONLY, [_MAPPED_USER])
+        expiredSearchCache._results[(_VALID_USER_QUERY, constants.SEARCH_MODE_USER_ONLY)] = [_MAPPED_USER], 0
+        self.assertEquals(expiredSearchCache.get(_VALID_USER_QUERY, constants.SEARCH_MODE_USER_ONLY), None)
+        
+        
+_Ldap = adapter._Ldap # The connection class is replaced in LdapSearchTestCase
+
+
+class _LdapHandleMock(object):
+    """ Stands in for the LDAP server connection which is closed by the server once. """
+    
+    def __init__(self, handles, pages=1):
+        self.protocol_version = None
+        self.isServerDown = len(handles) == 0
+        self.pages = pages
+        self.pageSizes = list()
+        handles.append(self)
+        
+    def simple_bind_s(self, _, __):
+        pass
+    
+    def set_option(self, _, __):
+        pass
+    
+    def search_ext(self, _, __, ___, ____, serverctrls):
+        if self.isServerDown:
+            raise ldap.SERVER_DOWN("Connection closed.")
+        pageControl = serverctrls[0]
+        self.pageSizes.append(pageControl.size)
+        page = int(pageControl.cookie or 0)
+        cookie = ""
+        if page + 1 < self.pages:
+            cookie = str(page + 1)
+        self._result = [("cn=test%i" % page, {"cn": ["test%i" % page]}), (None, ["ldap://referral"])], \
+                       [SimplePagedResultsControl(False, size=pageControl.size, cookie=cookie)]
+        return 1
+    
+    def result3(self, _, __, ___):
+        entries, serverControls = self._result
+        return ldap.RES_SEARCH_RESULT, entries, 1, serverControls
+    
+    
+class LdapConnectionTestCase(unittest.TestCase):
+    """ Tests the LDAP connection. """
+    
+    def setUp(self):
+        self._handles = list()
+        self._initialize = adapter.ldap.initialize
+        adapter.ldap.initialize = lambda _: _LdapHandleMock(self._handles)
+        
+    def tearDown(self):
+        adapter.ldap.initialize = self._initialize
+        
+    def testReconnect(self):
+        """ Ensures that the connection is re-established when the server closed it. """
+        
+        connection = _Ldap("ldap://localhost", "user", "password")
+        self.assertEquals(connection.search(u"(cn=test)", "", filterDictionary={"cn": 0}), [{0: ["test0"]}])
+        self.assertEquals(len(self._handles), 2)
+        
+    def testPagedSearch(self):
+        """ Ensures that all result pages are retrieved and yielded incrementally. """
+        
+        adapter.ldap.initialize = lambda _: _LdapHandleMock([None], 3)
+        connection = _Ldap("ldap://localhost", "user", "password")
+        entries = connection.iterSearch(u"(cn=test)", "", filterDictionary={"cn": 0})
+        self.assertEquals(entries.next(), {0: ["test0"]})
+        self.assertEquals(connection._handle.pageSizes, [SEARCH_PAGE_SIZE])
+        self.assertEquals(list(entries), [{0: ["test1"]}, {0: ["test2"]}])
+        self.assertEquals(connection._handle.pageSizes, [SEARCH_PAGE_SIZE] * 3)
+        
+        self.assertEquals(connection.search(u"(cn=test)", ""), 
+                          [[("cn=test%i" % page, {"cn": ["test%i" % page]})] for page in range(3)])
@@ -0,0 +1,311 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Fake implementation of the parts of the PyLucene module which are used by the Lucene adapter.
+The indexes are kept in memory per directory path. Changes of a writer become visible to
+new readers when the writer commits. A second writer cannot be opened while the write lock is held.
+"""
+
+
+import copy
+import re
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_indexes = dict() # directory path -> committed list of documents
+_lockedPaths = set()
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class JavaError(Exception):
+    """ Represents Java exceptions. """
+
+
+class LockObtainFailedException(JavaError):
+    """ Indicates that the write lock of the index is already held. """
+
+
+def initVM():
+    return _Environment()
+
+
+class _Environment(object):
+    @staticmethod
+    def attachCurrentThread():
+        pass
+
+
+class Version(object):
+    LUCENE_CURRENT = "LUCENE_CURRENT"
+
+
+class StandardAnalyzer(object):
+    def __init__(self, version):
+        self.version = version
+
+
+def File(path):
+    return path
+
+
+class SimpleFSDirectory(object):
+    def __init__(self, path):
+        self.path = path
+
+
+class Field(object):
+    """ Stored field. Analyzed fields are matched token by token in lower case. """
+    
+    class Store(object):
+        YES = "YES"
+        
+    class Index(object):
+        ANALYZED = "ANALYZED"
+        NOT_ANALYZED = "NOT_ANALYZED"
+        
+    def __init__(self, name, value, store, index):
+        self._name = name
+        self._value = value
+        self.store = store
+        self.index = index
+        
+    def name(self):
+        return self._name
+    
+    def stringValue(self):
+        return self._value
+    
+    def terms(self):
+        if self.index == Field.Index.ANALYZED:
+            return [token.lower() for token in _TOKEN_PATTERN.findall(self._value)]
+        return [self._value]
+
+
+class Document(object):
+    def __init__(self):
+        self._fields = list()
+        
+    def add(self, field):
+        self._fields.append(field)
+        
+    def get(self, name):
+        for field in self._fields:
+            if field.name() == name:
+                return field.stringValue()
+        
+    def getFields(self):
+        return self._fields[:]
+    
+    def terms(self, name):
+        terms = list()
+        for field in self._fields:
+            if field.name() == name:
+                terms.extend(field.terms())
+        return terms
+
+
+class Term(object):
+    def __init__(self, field, text):
+        self.field = field
+        self.text = text
+
+
+class TermQuery(object):
+    def __init__(self, term):
+        self.term = term
+        
+    def matches(self, document):
+        return self.term.text in document.terms(self.term.field)
+    
+    
+class PrefixQuery(TermQuery):
+    def matches(self, document):
+        for term in document.terms(self.term.field):
+            if term.startswith(self.term.text):
+                return True
+        return False
+    
+    
+class MatchAllDocsQuery(object):
+    @staticmethod
+    def matches(_):
+        return True
+    
+    
+class BooleanClause(object):
+    class Occur(object):
+        MUST = "MUST"
+        SHOULD = "SHOULD"
+        MUST_NOT = "MUST_NOT"
+        
+
+class BooleanQuery(object):
+    def __init__(self):
+        self._clauses = list()
+        
+    def add(self, query, occur):
+        self._clauses.append((query, occur))
+        
+    def matches(self, document):
+        hasRequiredClause = False
+        matchesOptionalClause = False
+        for query, occur in self._clauses:
+            matches = query.matches(document)
+            if occur == BooleanClause.Occur.MUST_NOT and matches:
+                return False
+            elif occur == BooleanClause.Occur.MUST:
+                hasRequiredClause = True
+                if not matches:
+                    return False
+            elif occur == BooleanClause.Occur.SHOULD and matches:
+                matchesOptionalClause = True
+        return hasRequiredClause or matchesOptionalClause
+
+
+class IndexWriter(object):
+    """ Writes the documents. The changes are visible to new readers after C{commit} or C{close}. """
+    
+    class MaxFieldLength(object):
+        UNLIMITED = "UNLIMITED"
+        
+    def __init__(self, directory, analyzer, maxFieldLength):
+        self.analyzer = analyzer
+        self.maxFieldLength = maxFieldLength
+        if directory.path in _lockedPaths:
+            raise LockObtainFailedException("Lock obtain timed out: write.lock")
+        _lockedPaths.add(directory.path)
+        self._path = directory.path
+        self._documents = copy.copy(_indexes.get(directory.path, list()))
+        
+    def addDocument(self, document):
+        self._documents.append(document)
+        
+    def updateDocument(self, term, document):
+        self.deleteDocuments(TermQuery(term))
+        self.addDocument(document)
+        
+    def deleteDocuments(self, query):
+        self._documents = [document for document in self._documents if not query.matches(document)]
+        
+    def numDocs(self):
+        return len(self._documents)
+        
+    def commit(self):
+        _indexes[self._path] = self._documents[:]
+        
+    def rollback(self):
+        _lockedPaths.discard(self._path)
+        
+    def close(self):
+        self.commit()
+        _lockedPaths.discard(self._path)
+
+
+class IndexReader(object):
+    """ Read-only snapshot of the committed documents. """
+    
+    def __init__(self, documents):
+        self._documents = documents
+        
+    @staticmethod
+    def open(directory, readOnly):
+        if not directory.path in _indexes:
+            raise JavaError("no segments* file found")
+        assert readOnly
+        return IndexReader(_indexes[directory.path][:])
+    
+    @staticmethod
+    def indexExists(directory):
+        return directory.path in _indexes
+        
+    def maxDoc(self):
+        return len(self._documents)
+    
+    def document(self, docId):
+        return self._documents[docId]
+    
+    def close(self):
+        pass
+        
+        
+class _ScoreDoc(object):
+    def __init__(self, doc):
+        self.doc = doc
+
+
+class _TopDocs(object):
+    def __init__(self, totalHits, scoreDocs):
+        self.totalHits = totalHits
+        self.scoreDocs = scoreDocs
+
+
+class IndexSearcher(object):
+    def __init__(self, reader):
+        self._reader = reader
+        
+    def getIndexReader(self):
+        return self._reader
+    
+    def search(self, query, maxHits):
+        docIds = [docId for docId in range(self._reader.maxDoc()) if query.matches(self._reader.document(docId))]
+        return _TopDocs(len(docIds), [_ScoreDoc(docId) for docId in docIds[:maxHits]])
+    
+    def doc(self, docId):
+        return self._reader.document(docId)
+
+
+def createIndex(path, documents):
+    """ Helper creating an index with the given documents in the way external tools do it. """
+    
+    _indexes[path] = documents[:]
+    
+    
+def getDocuments(path):
+    """ Helper returning the committed documents of the index. """
+    
+    return _indexes.get(path, list())[:]
+
+
+def reset():
+    """ Helper removing all indexes and locks. """
+    
+    _indexes.clear()
+    _lockedPaths.clear()
@@ -0,0 +1,162 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Tests the Lucene indexer using the fake Lucene module. 
+"""
+
+
+import sys
+import unittest
+
+from datafinder_test.mocks import SimpleMock
+from datafinder_test.persistence.adapters.lucene import fake_lucene
+sys.modules.setdefault("lucene", fake_lucene) # PyLucene is usually not available
+from datafinder.persistence.adapters.lucene import constants, indexer
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_INDEX_PATH = "/path/to/index"
+
+
+def _createExternalDocument(filePath, content):
+    """ Creates a document the way C{contrib/lucene/create_sample_index.py} does. """
+    
+    document = fake_lucene.Document()
+    document.add(fake_lucene.Field(constants.CONTENT_FIELD, content, 
+                                   fake_lucene.Field.Store.YES, fake_lucene.Field.Index.ANALYZED))
+    document.add(fake_lucene.Field(constants.FILEPATH_FIELD, filePath, 
+                                   fake_lucene.Field.Store.YES, fake_lucene.Field.Index.ANALYZED))
+    return document
+
+
+class LuceneIndexerTestCase(unittest.TestCase):
+    """ Tests the Lucene indexer. """
+    
+    def setUp(self):
+        self._lucene = indexer.lucene
+        indexer.lucene = fake_lucene
+        fake_lucene.reset()
+        configuration = SimpleMock(luceneIndexPath=_INDEX_PATH, env=fake_lucene.initVM())
+        self._indexer = indexer.LuceneIndexer(configuration, commitBatchSize=3)
+        
+    def tearDown(self):
+        indexer.lucene = self._lucene
+        fake_lucene.reset()
+        
+    def _getDocuments(self):
+        documents = dict()
+        for document in fake_lucene.getDocuments(_INDEX_PATH):
+            documents[document.get(constants.IDENTIFIER_FIELD)] = document
+        return documents
+    
+    def _assertWriteLockReleased(self):
+        writer = fake_lucene.IndexWriter(fake_lucene.SimpleFSDirectory(_INDEX_PATH), None, None)
+        writer.close()
+        
+    def testExistingIndex(self):
+        """ Tests that documents of an externally created index are updated and not duplicated. """
+        
+        fake_lucene.createIndex(_INDEX_PATH, [_createExternalDocument("Projekte/bericht.txt", u"Konzeption"),
+                                              _createExternalDocument("Projekte/plan.txt", u"Entwicklung")])
+        self._indexer.updateProperties("/Projekte/bericht.txt", {"title": u"Report"})
+        self._indexer.commit()
+        
+        documents = self._getDocuments()
+        self.assertEquals(len(documents), 2)
+        document = documents["/Projekte/bericht.txt"]
+        self.assertEquals(document.get(constants.CONTENT_FIELD), u"Konzeption")
+        self.assertEquals(document.get("title"), u"Report")
+        self.assertEquals(document.get(constants.FILEPATH_FIELD), u"Projekte/bericht.txt")
+        self.assertEquals(document.get(constants.PARENT_FIELD), u"/Projekte")
+        self.assertEquals(documents["/Projekte/plan.txt"].get(constants.CONTENT_FIELD), u"Entwicklung")
+        self.assertEquals(self._indexer.getModificationTimes("/Projekte"), 
+                          {"/Projekte/bericht.txt": None, "/Projekte/plan.txt": None})
+        
+    def testReplaceItems(self):
+        """ Tests that replacing items during a rescan keeps the stored content. """
+        
+        fake_lucene.createIndex(_INDEX_PATH, [_createExternalDocument("bericht.txt", u"Konzeption")])
+        self._indexer.updateProperties("/bericht.txt", {"title": u"Report", "author": u"me"})
+        self._indexer.replaceItems([("/bericht.txt", False, {"title": u"New"}, 10.0), 
+                                    ("/plan.txt", False, dict(), 20.0)])
+        self._indexer.commit()
+        
+        documents = self._getDocuments()
+        self.assertEquals(len(documents), 2)
+        self.assertEquals(documents["/bericht.txt"].get(constants.CONTENT_FIELD), u"Konzeption")
+        self.assertEquals(documents["/bericht.txt"].get("title"), u"New")
+        self.assertEquals(documents["/bericht.txt"].get("author"), None)
+        self.assertEquals(self._indexer.getModificationTime("/bericht.txt"), 10.0)
+        self.assertEquals(documents["/plan.txt"].get(constants.CONTENT_FIELD), None)
+        
+    def testBatchesAndWriteLock(self):
+        """ Tests that changes are written in batches and the write lock is only held while writing. """
+        
+        self._indexer.addItem("/a", True)
+        self._indexer.addItem("/a/b", False)
+        self.assertEquals(len(self._getDocuments()), 0)
+        self._assertWriteLockReleased()
+        
+        self._indexer.updateProperties("/a/b", {"title": u"B"})
+        self.assertEquals(len(self._getDocuments()), 2)
+        self._assertWriteLockReleased()
+        
+        self._indexer.deleteProperties("/a/b", ["title"])
+        self._indexer.close()
+        self.assertEquals(self._getDocuments()["/a/b"].get("title"), None)
+        self._assertWriteLockReleased()
+        
+    def testMoveCopyRemove(self):
+        """ Tests moving, copying and removing of item trees. """
+        
+        self._indexer.replaceItems([("/a", True, dict(), 1.0), ("/a/b", False, {"title": u"B"}, 2.0)])
+        self._indexer.moveItem("/a", "/c")
+        self.assertEquals(sorted(self._getDocuments().keys()), ["/c", "/c/b"])
+        self.assertEquals(self._indexer.getModificationTime("/c/b"), 2.0)
+        
+        self._indexer.copyItem("/c", "/d")
+        self.assertEquals(sorted(self._getDocuments().keys()), ["/c", "/c/b", "/d", "/d/b"])
+        self.assertEquals(self._getDocuments()["/d/b"].get("title"), u"B")
+        self.assertEquals(self._indexer.getModificationTime("/d/b"), None)
+        
+        self._indexer.removeItem("/c")
+        self.assertEquals(sorted(self._getDocuments().keys()), ["/d", "/d/b"])
+        self._assertWriteLockReleased()
@@ -60,6 +60,7 @@ class ConfigurationTest(unittest.TestCase):
         config = Configuration(baseConfig, None)
         
         self.assertEquals(config.luceneIndexUri, "https://server.com/path/index.idx")
+        self.assertEquals(config.luceneIndexPath, None)
         
     def testLuceneHttpUri(self):
         baseConfig = BaseConfiguration("lucene+http://server.com/path/index.idx")
@@ -72,12 +73,14 @@ class ConfigurationTest(unittest.TestCase):
         config = Configuration(baseConfig, None)
         
         self.assertEquals(config.luceneIndexUri, "file:///c:/path/index.idx")
+        self.assertEquals(config.luceneIndexPath, "c:/path/index.idx")
         
     def testLuceneFileUri(self):
         baseConfig = BaseConfiguration("lucene+file:///path/index.idx")
         config = Configuration(baseConfig, None)
         
         self.assertEquals(config.luceneIndexUri, "file:///path/index.idx")
+        self.assertEquals(config.luceneIndexPath, "/path/index.idx")
         
     def testEmptyLuceneFileUri(self):
         baseConfig = BaseConfiguration("")
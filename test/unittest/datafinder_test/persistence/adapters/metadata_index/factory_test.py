@@ -0,0 +1,214 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Tests the factory maintaining the meta data index.
+"""
+
+
+import datetime
+import unittest
+
+from datafinder.persistence.adapters.metadata_index.factory import IndexingFileSystem
+from datafinder.persistence.common.base_factory import BaseFileSystem
+from datafinder.persistence.data.datastorer import NullDataStorer
+from datafinder.persistence.metadata.constants import MODIFICATION_DATETIME
+from datafinder.persistence.metadata.metadatastorer import NullMetadataStorer
+from datafinder.persistence.metadata.value_mapping.json_format import MetadataValue
+from datafinder_test.mocks import SimpleMock
+
+
+__version__ = "$Revision-Id:$" 
+
+
+class _DataStorerMock(NullDataStorer):
+    
+    def __init__(self, identifier, items):
+        NullDataStorer.__init__(self, identifier)
+        self._items = items
+        
+    @property
+    def isCollection(self):
+        return self.identifier == "/" or not self._items[self.identifier] is None
+    
+    def getChildren(self):
+        prefix = self.identifier.rstrip("/") + "/"
+        return [identifier for identifier in self._items
+                if identifier.startswith(prefix) and not "/" in identifier[len(prefix):]]
+    
+    def move(self, destination):
+        self._items[destination.identifier] = self._items.pop(self.identifier)
+
+
+class _MetadataStorerMock(NullMetadataStorer):
+    
+    def __init__(self, identifier, metadata, retrievedPropertyIds):
+        NullMetadataStorer.__init__(self, identifier)
+        self._metadata = metadata
+        self._retrievedPropertyIds = retrievedPropertyIds
+        
+    def retrieve(self, propertyIds=None):
+        self._retrievedPropertyIds.append((self.identifier, propertyIds))
+        properties = self._metadata.get(self.identifier, dict())
+        return dict([(name, MetadataValue(value)) for name, value in properties.iteritems()
+                     if propertyIds is None or name in propertyIds])
+    
+    def update(self, properties):
+        self._metadata.setdefault(self.identifier, dict()).update(properties)
+
+
+class _FileSystemMock(BaseFileSystem):
+    
+    maxConcurrentRequests = 1
+    
+    def __init__(self):
+        BaseFileSystem.__init__(self)
+        self.items = {"/a": [], "/a/b": None, "/c": None}
+        self.metadata = {"/a": {"name": u"Alpha"}, 
+                         "/a/b": {"name": u"Beta", MODIFICATION_DATETIME: datetime.datetime(2010, 1, 1)}}
+        self.retrievedPropertyIds = list()
+        
+    def createDataStorer(self, identifier):
+        return _DataStorerMock(identifier, self.items)
+    
+    def createMetadataStorer(self, identifier):
+        return _MetadataStorerMock(identifier, self.metadata, self.retrievedPropertyIds)
+
+
+class IndexingFileSystemTestCase(unittest.TestCase):
+    """ Tests the factory maintaining the meta data index. """
+    
+    def setUp(self):
+        """ Creates the object under test. """
+        
+        self._wrappedFileSystem = _FileSystemMock()
+        self._fileSystem = IndexingFileSystem(self._wrappedFileSystem, ":memory:")
+        
+    def tearDown(self):
+        """ Closes the index. """
+        
+        self._fileSystem.release()
+        
+    def _search(self, restrictions, destination="/"):
+        searcher = self._fileSystem.createSearcher()
+        return sorted(searcher.search(restrictions, SimpleMock(identifier=destination)))
+        
+    def testRescan(self):
+        """ Tests the incremental rescan. """
+        
+        self._fileSystem.rescanMetadataIndex("/")
+        self.assertEquals(self._search([("name", "exists", None)]), ["/a", "/a/b"])
+        self.assertEquals(self._search([(None, "isCollection", None)]), ["/", "/a"])
+        
+        del self._wrappedFileSystem.retrievedPropertyIds[:]
+        del self._wrappedFileSystem.items["/c"]
+        self._wrappedFileSystem.metadata["/a/b"]["name"] = u"Gamma" # Modification time is unchanged
+        self._fileSystem.rescanMetadataIndex("/")
+        self.assertEquals(self._search([("name", "=", u"Beta")]), ["/a/b"])
+        self.assertFalse(("/a/b", None) in self._wrappedFileSystem.retrievedPropertyIds)
+        self.assertEquals(self._search([(None, "isCollection", None)]), ["/", "/a"])
+        
+        self._wrappedFileSystem.metadata["/a/b"][MODIFICATION_DATETIME] = datetime.datetime(2011, 1, 1)
+        self._fileSystem.rescanMetadataIndex("/a")
+        self.assertEquals(self._search([("name", "=", u"Gamma")]), ["/a/b"])
+        
+    def testFullRescan(self):
+        """ Ensures that the full rescan indexes unchanged items as well. """
+        
+        self._fileSystem.rescanMetadataIndex("/")
+        self._wrappedFileSystem.metadata["/a/b"]["name"] = u"Gamma" # Modification time is unchanged
+        self._fileSystem.rescanMetadataIndex("/", True)
+        self.assertEquals(self._search([("name", "=", u"Gamma")]), ["/a/b"])
+        
+    def testConcurrentRescan(self):
+        """ Tests the rescan using parallel requests. """
+        
+        self._wrappedFileSystem.maxConcurrentRequests = 4
+        for index in range(20):
+            self._wrappedFileSystem.items["/a/%i" % index] = None
+            self._wrappedFileSystem.metadata["/a/%i" % index] = {"name": u"Item"}
+        self._fileSystem.rescanMetadataIndex("/")
+        self.assertEquals(len(self._search([("name", "=", u"Item")])), 20)
+        self.assertEquals(self._search([(None, "isCollection", None)]), ["/", "/a"])
+        
+    def testMetadataUpdates(self):
+        """ Ensures that meta data updates are fed into the index. """
+        
+        self._fileSystem.createMetadataStorer("/a").update({"name": u"Delta"})
+        self.assertEquals(self._search([("name", "=", u"Delta")]), ["/a"])
+        self.assertEquals(self._wrappedFileSystem.metadata["/a"]["name"], u"Delta")
+        
+        self._fileSystem.createMetadataStorer("/a").delete(["name"])
+        self.assertEquals(self._search([("name", "exists", None)]), list())
+        
+        self.assertEquals(self._fileSystem.updateMetadata({"/c": {"name": u"Epsilon"}}), dict())
+        self.assertEquals(self._search([("name", "=", u"Epsilon")]), ["/c"])
+        
+        self._fileSystem.createResource(self._fileSystem.createDataStorer("/f"), 
+                                        self._fileSystem.createMetadataStorer("/f"), {"name": u"Zeta"})
+        self.assertEquals(self._search([("name", "=", u"Zeta")]), ["/f"])
+        self.assertEquals(self._wrappedFileSystem.metadata["/f"]["name"], u"Zeta")
+        
+    def testDataOperations(self):
+        """ Ensures that the index follows the data operations. """
+        
+        self._fileSystem.rescanMetadataIndex("/")
+        dataStorer = self._fileSystem.createDataStorer("/a/b")
+        self.assertFalse(dataStorer.isCollection)
+        
+        dataStorer.move(self._fileSystem.createDataStorer("/c"))
+        self.assertEquals(self._search([("name", "=", u"Beta")]), ["/c"])
+        self.assertEquals(self._wrappedFileSystem.items["/c"], None)
+        
+        self._fileSystem.createDataStorer("/c").copy(self._fileSystem.createDataStorer("/d"))
+        self.assertEquals(self._search([("name", "=", u"Beta")]), ["/c", "/d"])
+        
+        self._fileSystem.createDataStorer("/c").delete()
+        self.assertEquals(self._search([("name", "=", u"Beta")]), ["/d"])
+        
+        self._fileSystem.createDataStorer("/e").createCollection()
+        self.assertEquals(self._search([(None, "isCollection", None)]), ["/", "/a", "/e"])
+        
+    def testDelegation(self):
+        """ Ensures that the other aspects are delegated to the wrapped factory. """
+        
+        self.assertTrue(self._fileSystem.hasMetadataSearchSupport)
+        self.assertEquals(self._fileSystem.hasCustomMetadataSupport, self._wrappedFileSystem.hasCustomMetadataSupport)
+        self.assertEquals(self._fileSystem.blockSize, self._wrappedFileSystem.blockSize)
+        self.assertEquals(self._fileSystem.isValidIdentifier("a"), self._wrappedFileSystem.isValidIdentifier("a"))
+        self.assertEquals(self._fileSystem.determineFreeDiskSpace(), self._wrappedFileSystem.determineFreeDiskSpace())
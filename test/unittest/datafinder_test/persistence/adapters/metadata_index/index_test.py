@@ -0,0 +1,147 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Tests the SQLite-based meta data index.
+"""
+
+
+import datetime
+import decimal
+import unittest
+
+from datafinder.persistence.adapters.metadata_index import index
+from datafinder.persistence.adapters.metadata_index.search.search_restriction_mapping import mapSearchRestriction
+from datafinder.persistence.error import PersistenceError
+
+
+__version__ = "$Revision-Id:$" 
+
+
+class MetadataIndexTestCase(unittest.TestCase):
+    """ Tests the SQLite-based meta data index. """
+    
+    def setUp(self):
+        """ Creates the object under test. """
+        
+        self._index = index.MetadataIndex(":memory:")
+        self._index.addItem("/a", True)
+        self._index.updateProperties("/a", {"name": u"Alpha", "size": decimal.Decimal("10")})
+        self._index.addItem("/a/b", False)
+        self._index.updateProperties("/a/b", {"name": u"Beta", "size": decimal.Decimal("20"), 
+                                              "keywords": [u"one", u"two"]})
+        self._index.updateProperties("/c", {"name": u"Gamma", "created": datetime.datetime(2010, 1, 1)})
+        
+    def tearDown(self):
+        """ Closes the index. """
+        
+        self._index.close()
+        
+    def _search(self, restrictions, destination="/"):
+        condition, parameters = mapSearchRestriction(restrictions)
+        return sorted(self._index.search(condition, parameters, destination))
+        
+    def testSearch(self):
+        """ Tests the different search operators. """
+        
+        self.assertEquals(self._search([("name", "=", u"Alpha")]), ["/a"])
+        self.assertEquals(self._search([("size", ">", 10)]), ["/a/b"])
+        self.assertEquals(self._search([("size", ">=", 10)]), ["/a", "/a/b"])
+        self.assertEquals(self._search([("name", "like", u"a%")]), list())
+        self.assertEquals(self._search([("name", "like", u"mm")]), ["/c"])
+        self.assertEquals(self._search([("keywords", "=", u"two")]), ["/a/b"])
+        self.assertEquals(self._search([("created", "exists", None)]), ["/c"])
+        self.assertEquals(self._search([(None, "isCollection", None)]), ["/a"])
+        self.assertEquals(self._search([(None, "contains", u"Alpha")]), list())
+        self.assertEquals(self._search([("created", "<", datetime.datetime(2011, 1, 1).timetuple())]), ["/c"])
+        self.assertEquals(self._search([[("size", "=", 10), "OR", ("name", "=", u"Gamma")]]), ["/a", "/c"])
+        self.assertEquals(self._search([[("size", "exists", None), "AND", 
+                                         ["NOT", ("name", "=", u"Alpha")]]]), ["/a/b"])
+        self.assertEquals(self._search([("size", "exists", None)], "/a/b"), ["/a/b"])
+        self.assertRaises(PersistenceError, self._search, [("name", "unknown", u"Alpha")])
+        
+    def testUpdateProperties(self):
+        """ Tests the update and deletion of properties. """
+        
+        self._index.updateProperties("/a", {"name": u"Delta"})
+        self.assertEquals(self._search([("name", "=", u"Delta")]), ["/a"])
+        self.assertEquals(self._search([("size", "=", 10)]), ["/a"])
+        
+        self._index.deleteProperties("/a", ["name"])
+        self.assertEquals(self._search([("name", "exists", None)]), ["/a/b", "/c"])
+        
+    def testRemoveItem(self):
+        """ Tests the removal of a subtree. """
+        
+        self._index.removeItem("/a")
+        self.assertEquals(self._search([("name", "exists", None)]), ["/c"])
+        
+    def testMoveItem(self):
+        """ Tests the moving of a subtree. """
+        
+        self._index.moveItem("/a", "/c")
+        self.assertEquals(self._search([("name", "exists", None)]), ["/c", "/c/b"])
+        self.assertEquals(self._index.getModificationTimes("/c"), {"/c/b": None})
+        
+    def testCopyItem(self):
+        """ Tests the copying of a subtree. """
+        
+        self._index.copyItem("/a", "/d")
+        self.assertEquals(self._search([("name", "=", u"Beta")]), ["/a/b", "/d/b"])
+        self.assertEquals(self._search([(None, "isCollection", None)]), ["/a", "/d"])
+        self.assertEquals(self._index.getModificationTimes("/"), {"/a": None, "/c": None, "/d": None})
+        
+    def testReplaceItems(self):
+        """ Tests the replacement of the indexed item state. """
+        
+        self._index.replaceItems([("/a", False, {"title": u"Epsilon"}, 100.0)])
+        self.assertEquals(self._search([("title", "exists", None)]), ["/a"])
+        self.assertEquals(self._search([("name", "=", u"Alpha")]), list())
+        self.assertEquals(self._search([(None, "isCollection", None)]), list())
+        self.assertEquals(self._index.getModificationTime("/a"), 100.0)
+        self.assertEquals(self._index.getModificationTime("/unknown"), None)
+        
+    def testConvertValue(self):
+        """ Tests the conversion of meta data values. """
+        
+        self.assertEquals(index.convertValue(True), [(u"True", 1, None)])
+        self.assertEquals(index.convertValue(decimal.Decimal("1.5")), [(u"1.5", 1.5, None)])
+        self.assertEquals(index.convertValue([u"a", None]), [(u"a", None, None), (None, None, None)])
+        self.assertEquals(index.determineParent("/"), None)
+        self.assertEquals(index.determineParent("/a"), "/")
+        self.assertEquals(index.determineParent("/a/b"), "/a")
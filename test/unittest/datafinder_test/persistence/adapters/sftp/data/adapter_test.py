@@ -43,7 +43,12 @@ Tests for the SFTP adapter.
 
 
 import errno
+import os
+import shutil
+import stat
 import StringIO
+import tempfile
+import threading
 import unittest
 
 import mock
@@ -52,6 +57,7 @@ import paramiko
 from datafinder.persistence.adapters.sftp.data import adapter
 from datafinder.persistence.adapters.sftp import utils
 from datafinder.persistence import error
+from datafinder.persistence.data import datastorer
 
 
 __version__ = "$Revision-Id:$" 
@@ -144,12 +150,44 @@ class SftpDataAdapterTest(unittest.TestCase):
         self.assertRaises(error.PersistenceError, self._sftpItem.createLink, None)
         
     def testGetChildrenSuccess(self):
-        self._connectionMock.listdir.return_value = ["a", "b", "c", "d"]
+        self._connectionMock.listdir_attr.return_value = [
+            mock.Mock(filename=name, st_mode=_STAT_IS_LEAF_CODE) for name in ["a", "b", "c", "d"]]
         
         self.assertEquals(len(self._sftpItem.getChildren()), 4)
+        self.assertEquals([itemType for _, itemType in self._sftpItem.getTypedChildren()], 
+                          [datastorer.ITEM_TYPE_LEAF] * 4)
+        
+    def testGetChildrenCachesAttributes(self):
+        self._connectionMock.listdir_attr.return_value = [
+            mock.Mock(filename="ä", st_mode=_STAT_IS_COLLECTION_CODE)]
+        attributeCache = utils.AttributeCache(30)
+        self._sftpItem._attributeCache = attributeCache
+        childId = self._sftpItem.getChildren()[0]
+        child = adapter.SftpDataAdapter(
+            childId, self._idMapper.determinePersistenceChildId("/ppärent/pidentifier", "ä"), 
+            self._connectionPoolMock, self._factoryMock, self._idMapper, attributeCache=attributeCache)
+        
+        self.assertTrue(child.exists())
+        self.assertTrue(child.isCollection)
+        self.assertFalse(self._connectionMock.stat.called)
+        
+        self._connectionMock.open.return_value = mock.Mock()
+        child.writeData(StringIO.StringIO(""))
+        self.assertTrue(child.exists())
+        self.assertTrue(self._connectionMock.stat.called)
+        
+    def testGetChildrenDoesNotCacheSymbolicLinks(self):
+        self._connectionMock.listdir_attr.return_value = [
+            mock.Mock(filename="link", st_mode=stat.S_IFLNK | 0777)]
+        attributeCache = utils.AttributeCache(30)
+        self._sftpItem._attributeCache = attributeCache
+        
+        self.assertEquals(self._sftpItem.getTypedChildren()[0][1], None)
+        self.assertEquals(
+            attributeCache.get(self._idMapper.determinePersistenceChildId("/ppärent/pidentifier", "link")), None)
         
     def testGetChildrenFromLeaf(self):
-        self._connectionMock.listdir.side_effect = IOError
+        self._connectionMock.listdir_attr.side_effect = IOError
         
         self.assertRaises(error.PersistenceError, self._sftpItem.getChildren)
         
@@ -221,6 +259,7 @@ class SftpDataAdapterTest(unittest.TestCase):
         
         self._markItemAsCollection()
         self._defineSubCollectionStructure()
+        self._connectionMock.open.side_effect = lambda *_: StringIO.StringIO("Test Data")
         class _FactoryMock(object):
             def createDataStorer(self, identifier):
                 return mock.Mock(identifier=identifier)
@@ -228,6 +267,44 @@ class SftpDataAdapterTest(unittest.TestCase):
             
         destination = mock.Mock(identifier=u"/newDästination")
         self._sftpItem.copy(destination)
+        
+        self.assertEquals(self._connectionMock.mkdir.call_count, 3)
+        self.assertEquals(self._connectionMock.open.call_count, 4)
+        
+    def testCopyCollectionOnServer(self):
+        self._markItemAsCollection()
+        configuration = mock.Mock(maxParallelTransfers=1, serverSideCopy=None)
+        self._sftpItem._configuration = configuration
+        self._factoryMock.serverSideCopy = None
+        commandRunnerMock = mock.Mock()
+        commandRunnerMock.executeCommand.return_value = ("", "")
+        commandRunnerMock.exitStatus = 0
+        
+        with mock.patch.object(adapter.utils, "SshCommandRunner", return_value=commandRunnerMock) as runnerClass:
+            self._sftpItem.copy(mock.Mock(identifier=u"/newDästination"))
+            self.assertTrue(self._factoryMock.serverSideCopy)
+            self.assertEquals(configuration.serverSideCopy, None)
+            self.assertEquals(runnerClass.call_count, 2)
+            self.assertTrue(runnerClass.call_args[0][0].endswith("-type d -exec chmod 3770 {} +"))
+            self.assertFalse(self._connectionMock.listdir_attr.called)
+            
+            commandRunnerMock.exitStatus = 1
+            self.assertRaises(error.PersistenceError, self._sftpItem.copy, mock.Mock(identifier=u"/newDästination"))
+        
+    def testCopyCollectionServerDoesNotAllowCommands(self):
+        self._markItemAsCollection()
+        self._defineSubCollectionStructure()
+        self._connectionMock.open.side_effect = lambda *_: StringIO.StringIO("Test Data")
+        configuration = mock.Mock(maxParallelTransfers=1, serverSideCopy=None)
+        self._sftpItem._configuration = configuration
+        self._factoryMock.serverSideCopy = None
+        commandRunnerMock = mock.Mock()
+        commandRunnerMock.executeCommand.side_effect = error.PersistenceError
+        
+        with mock.patch.object(adapter.utils, "SshCommandRunner", return_value=commandRunnerMock):
+            self._sftpItem.copy(mock.Mock(identifier=u"/newDästination"))
+            self.assertFalse(self._factoryMock.serverSideCopy)
+            self.assertEquals(self._connectionMock.mkdir.call_count, 3)
     
     def testCopyCollectionWhichDoesNotExist(self):
         self._markItemAsCollection()
@@ -249,13 +326,34 @@ class SftpDataAdapterTest(unittest.TestCase):
         self.assertRaises(error.PersistenceError, self._sftpItem.move, destination)
         
     def testWriteSuccess(self):
+        remoteFileObject = mock.Mock()
+        self._connectionMock.open.return_value = remoteFileObject
         data = StringIO.StringIO("Test Data")
         self._sftpItem.writeData(data)
         
         self.assertTrue(self._connectionMock.open.called)
+        remoteFileObject.set_pipelined.assert_called_once_with(True)
+        remoteFileObject.write.assert_called_once_with("Test Data")
+        self.assertTrue(remoteFileObject.close.called)
         self.assertTrue(data.closed)
+        
+    def testWriteUsesConfiguredBlockSize(self):
+        remoteFileObject = mock.Mock()
+        self._connectionMock.open.return_value = remoteFileObject
+        transferStatistics = utils.TransferStatistics()
+        sftpItem = adapter.SftpDataAdapter(
+            u"/pärent/identifier", "/ppärent/pidentifier", self._connectionPoolMock, 
+            self._factoryMock, self._idMapper, mock.Mock(transferBlockSize=4), 
+            transferStatistics=transferStatistics)
+        
+        sftpItem.writeData(StringIO.StringIO("Test Data"))
+        
+        self.assertEquals(remoteFileObject.write.call_count, 3)
+        self.assertEquals(transferStatistics.transferredBytes, 9)
+        self.assertEquals(transferStatistics.transferNumber, 1)
     
     def testWriteEnsureEmptyFileIsCreated(self):
+        self._connectionMock.open.return_value = mock.Mock()
         self._sftpItem.writeData(StringIO.StringIO(""))
         
         self.assertTrue(self._connectionMock.open.called) 
@@ -266,6 +364,15 @@ class SftpDataAdapterTest(unittest.TestCase):
         self.assertRaises(
             error.PersistenceError,
             self._sftpItem.writeData, StringIO.StringIO(""))
+        
+    def testWritePipelinedWriteError(self):
+        remoteFileObject = mock.Mock()
+        remoteFileObject.close.side_effect = IOError
+        self._connectionMock.open.return_value = remoteFileObject
+        
+        self.assertRaises(
+            error.PersistenceError,
+            self._sftpItem.writeData, StringIO.StringIO("Test Data"))
 
     def testReadSuccess(self):
         fileObject = self._sftpItem.readData()
@@ -277,4 +384,105 @@ class SftpDataAdapterTest(unittest.TestCase):
         self._connectionMock.open.side_effect = IOError
         
         self.assertRaises(error.PersistenceError, self._sftpItem.readData)
-    
\ No newline at end of file
+    
+
+class _LocalConnection(object):
+    """ Provides the used SFTP client methods on the basis of the local file system. """
+    # pylint: disable=C0111,R0201
+    
+    def __init__(self, concurrencyRecorder):
+        self._concurrencyRecorder = concurrencyRecorder
+        
+    def stat(self, path):
+        return os.stat(path)
+    
+    def listdir_attr(self, path):
+        with self._concurrencyRecorder:
+            attributes = list()
+            for name in os.listdir(path):
+                attributes.append(mock.Mock(filename=name, st_mode=os.lstat(os.path.join(path, name)).st_mode))
+            return attributes
+    
+    def remove(self, path):
+        with self._concurrencyRecorder:
+            os.remove(path)
+        
+    def rmdir(self, path):
+        with self._concurrencyRecorder:
+            os.rmdir(path)
+        
+    def mkdir(self, path):
+        os.mkdir(path)
+        
+    def chmod(self, path, mode):
+        os.chmod(path, mode)
+        
+    def open(self, path, mode="r"):
+        with self._concurrencyRecorder:
+            return open(path, mode + "b")
+        
+        
+class _ConcurrencyRecorder(object):
+    """ Records the maximum number of concurrent calls. """
+    # pylint: disable=C0111
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = 0
+        self.maximum = 0
+        
+    def __enter__(self):
+        with self._lock:
+            self._current += 1
+            self.maximum = max(self.maximum, self._current)
+        threading.Event().wait(0.001) # Give other threads the chance to run
+        
+    def __exit__(self, *_):
+        with self._lock:
+            self._current -= 1
+        
+
+class SftpDataAdapterTreeOperationsTest(unittest.TestCase):
+    """ Tests the concurrent tree operations on the basis of a local directory tree. """
+    # pylint: disable=R0904
+    
+    def setUp(self):
+        self._basePath = tempfile.mkdtemp()
+        self._concurrencyRecorder = _ConcurrencyRecorder()
+        connectionPoolMock = mock.Mock()
+        connectionPoolMock.acquire.side_effect = lambda: _LocalConnection(self._concurrencyRecorder)
+        idMapper = utils.ItemIdentifierMapper(unicode(self._basePath))
+        configuration = mock.Mock(maxParallelTransfers=4, serverSideCopy=False, transferBlockSize=1024)
+        self._sftpItem = adapter.SftpDataAdapter(
+            u"/tree", idMapper.determinePeristenceId(u"/tree"), connectionPoolMock, mock.Mock(serverSideCopy=False), 
+            idMapper, configuration)
+        self._createTree(os.path.join(self._basePath, "tree"), 3)
+        
+    def _createTree(self, path, depth):
+        os.mkdir(path)
+        for index in range(5):
+            open(os.path.join(path, "file%i" % index), "wb").write("data%i" % index)
+        if depth > 0:
+            for index in range(3):
+                self._createTree(os.path.join(path, "dir%i" % index), depth - 1)
+            
+    def tearDown(self):
+        shutil.rmtree(self._basePath)
+        
+    def testDelete(self):
+        self._sftpItem.delete()
+        
+        self.assertFalse(os.path.exists(os.path.join(self._basePath, "tree")))
+        self.assertTrue(self._concurrencyRecorder.maximum > 1)
+        self.assertTrue(self._concurrencyRecorder.maximum <= 4)
+        
+    def testCopy(self):
+        self._sftpItem.copy(mock.Mock(identifier=u"/copy"))
+        
+        for directory, _, files in os.walk(os.path.join(self._basePath, "tree")):
+            copiedDirectory = directory.replace(os.path.join(self._basePath, "tree"), os.path.join(self._basePath, "copy"))
+            self.assertTrue(os.path.isdir(copiedDirectory))
+            for name in files:
+                self.assertEquals(open(os.path.join(directory, name)).read(), 
+                                  open(os.path.join(copiedDirectory, name)).read())
+        self.assertTrue(self._concurrencyRecorder.maximum > 1)
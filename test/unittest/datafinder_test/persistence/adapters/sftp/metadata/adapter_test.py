@@ -0,0 +1,91 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Tests the meta data adapter of the SFTP file system.
+"""
+
+
+import unittest
+
+import mock
+
+from datafinder.persistence.adapters.sftp import utils
+from datafinder.persistence.adapters.sftp.metadata import adapter
+from datafinder.persistence.error import PersistenceError
+from datafinder.persistence.metadata import constants
+
+
+__version__ = "$Revision-Id:$" 
+
+
+class MetadataSftpAdapterTest(unittest.TestCase):
+    """ Tests the meta data adapter. """
+    # pylint: disable=R0904
+    
+    def setUp(self):
+        self._connectionMock = mock.Mock()
+        self._connectionMock.stat.return_value = mock.Mock(st_mtime=0, st_size=10)
+        connectionPoolMock = mock.Mock()
+        connectionPoolMock.acquire.return_value = self._connectionMock
+        self._attributeCache = utils.AttributeCache(30)
+        self._adapter = adapter.MetadataSftpAdapter(
+            u"/file.txt", "/base/file.txt", connectionPoolMock, self._attributeCache)
+        
+    def testRetrieveSuccess(self):
+        result = self._adapter.retrieve()
+        
+        self.assertEquals(len(result), 4)
+        self.assertEquals(result[constants.SIZE].value, 10)
+        self.assertEquals(result[constants.MIME_TYPE].value, "text/plain")
+        
+    def testRetrieveSelectedProperties(self):
+        result = self._adapter.retrieve([constants.SIZE, "unknown"])
+        
+        self.assertEquals(result.keys(), [constants.SIZE])
+        
+    def testRetrieveUsesCachedAttributes(self):
+        self._attributeCache.put("/base/file.txt", mock.Mock(st_mtime=0, st_size=20))
+        
+        self.assertEquals(self._adapter.retrieve()[constants.SIZE].value, 20)
+        self.assertFalse(self._connectionMock.stat.called)
+        
+    def testRetrieveError(self):
+        self._connectionMock.stat.side_effect = IOError
+        
+        self.assertRaises(PersistenceError, self._adapter.retrieve)
@@ -42,6 +42,8 @@
 
 import unittest
 
+import mock
+
 from datafinder.persistence.adapters.sftp import utils
 
 
@@ -83,3 +85,75 @@ class ItemIdMapperTest(unittest.TestCase):
         self.assertEquals(self._mapper.determineChildId(u"/ä", u"ö"), u"/ä/ö")
         self.assertEquals(self._mapper.determineChildId(u"/ä/", u"ö"), u"/ä/ö")
         self.assertEquals(self._mapper.determineChildId(u"/ä//", u"ö"), u"/ä//ö")
+
+
+class AttributeCacheTest(unittest.TestCase):
+    """ Tests the attribute cache. """
+    # pylint: disable=R0904
+    
+    def setUp(self):
+        self._cache = utils.AttributeCache(30)
+        self._connectionMock = mock.Mock()
+        self._connectionMock.stat.return_value = mock.Mock(st_mode=1)
+        
+    def testStatUsesCachedAttributes(self):
+        attributes = self._cache.stat(self._connectionMock, "/a/b")
+        
+        self.assertEquals(self._cache.stat(self._connectionMock, "/a/b"), attributes)
+        self.assertEquals(self._connectionMock.stat.call_count, 1)
+        
+    def testStatErrorIsNotCached(self):
+        self._connectionMock.stat.side_effect = IOError
+        
+        self.assertRaises(IOError, self._cache.stat, self._connectionMock, "/a/b")
+        self.assertEquals(self._cache.get("/a/b"), None)
+        
+    def testExpiredAttributes(self):
+        with mock.patch.object(utils.time, "time", return_value=0):
+            self._cache.put("/a/b", mock.Mock())
+        with mock.patch.object(utils.time, "time", return_value=31):
+            self.assertEquals(self._cache.get("/a/b"), None)
+        
+    def testDisabledCache(self):
+        cache = utils.AttributeCache(0)
+        cache.put("/a/b", mock.Mock())
+        
+        self.assertEquals(cache.get("/a/b"), None)
+        
+    def testInvalidate(self):
+        for persistenceId in ["/a", "/a/b", "/a/b/c", "/a/b/c/d", "/a/bc", "/e"]:
+            self._cache.put(persistenceId, mock.Mock())
+            
+        self._cache.invalidate("/a/b/")
+        
+        for persistenceId in ["/a", "/a/b", "/a/b/c", "/a/b/c/d"]:
+            self.assertEquals(self._cache.get(persistenceId), None)
+        for persistenceId in ["/a/bc", "/e"]:
+            self.assertNotEquals(self._cache.get(persistenceId), None)
+
+
+class TransferStatisticsTest(unittest.TestCase):
+    """ Tests the transfer statistics. """
+    # pylint: disable=R0904
+    
+    def setUp(self):
+        self._statistics = utils.TransferStatistics()
+        
+    def testThroughput(self):
+        self.assertEquals(self._statistics.throughput, 0.0)
+        
+        self._statistics.record(1000, 1.0)
+        self._statistics.record(3000, 1.0)
+        
+        self.assertEquals(self._statistics.transferredBytes, 4000)
+        self.assertEquals(self._statistics.transferNumber, 2)
+        self.assertEquals(self._statistics.throughput, 2000.0)
+        
+    def testReset(self):
+        self._statistics.record(1000, 1.0)
+        
+        self._statistics.reset()
+        
+        self.assertEquals(self._statistics.transferredBytes, 0)
+        self.assertEquals(self._statistics.transferTime, 0.0)
+        self.assertEquals(self._statistics.throughput, 0.0)
@@ -180,6 +180,17 @@ class DataSubversionAdapterTestCase(unittest.TestCase):
         self._osPathMock.methodNameResultMap = {"exists": (True, None), "isdir": (True, None)}
         self._shutilMock.error = OSError("")
         self.assertRaises(PersistenceError, self._adapter.createResource)
+        
+    def testCreateResourceWithProperties(self):
+        # Success
+        self._adapter.createResource({"name": "value"})
+        
+        # Error
+        # Problem to set the meta data
+        self._connectionMock.methodNameResultMap = {"setProperty": (None, SubversionError(""))}
+        self.assertRaises(PersistenceError, self._adapter.createResource, {"name": "value"})
+        # No meta data has to be set
+        self._adapter.createResource(dict())
     
     def testCreateCollection(self):
         # Success
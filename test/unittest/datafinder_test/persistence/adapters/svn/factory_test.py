@@ -49,7 +49,7 @@ import unittest
 from datafinder.persistence.common.configuration import BaseConfiguration
 from datafinder.persistence.common.connection.manager import ConnectionPoolManager
 from datafinder.persistence.error import PersistenceError
-from datafinder.persistence.adapters.svn import connection_pool
+from datafinder.persistence.adapters.svn import connection_pool, constants
 from datafinder.persistence.adapters.svn import factory
 from datafinder.persistence.adapters.svn.data.adapter import DataSubversionAdapter
 from datafinder.persistence.adapters.svn.metadata.adapter import MetadataSubversionAdapter
@@ -73,6 +73,13 @@ class FileSystemTestCase(unittest.TestCase):
         self.assertTrue(isinstance(self._factory.createDataStorer("identifier"), 
                                    DataSubversionAdapter))
 
+    def testBlockSize(self):
+        self.assertEquals(self._factory.blockSize, constants.BLOCK_SIZE)
+        
+        fileSystem = factory.FileSystem(BaseConfiguration("http://svn.test.de/svn", blockSize=1024))
+        self.assertEquals(fileSystem.blockSize, 1024)
+        self.assertEquals(fileSystem.createDataStorer("identifier")._blockSize, 1024)
+
     def testCreateMetadataStorer(self):
         self.assertTrue(isinstance(self._factory.createMetadataStorer("identifier"), 
                                    MetadataSubversionAdapter))
@@ -45,6 +45,7 @@ import socket
 import unittest
 
 from datafinder.persistence.adapters.tsm import connection_pool
+from datafinder.persistence.common.connection import ssh
 from datafinder.persistence.error import PersistenceError
 from datafinder_test.mocks import SimpleMock
 
@@ -62,6 +63,8 @@ class _TransportMock(object):
         
         self.username = None
         self.password = None
+        self.window_size = 0
+        self.closed = False
     
     def connect(self, username=None, password=None):
         """ Mocks connect method. """
@@ -72,7 +75,10 @@ class _TransportMock(object):
             raise self.error
         
     def close(self):
-        pass
+        self.closed = True
+        
+    def is_active(self):
+        return not self.closed
 
 
 class TsmConnectionTestCase(unittest.TestCase):
@@ -82,8 +88,10 @@ class TsmConnectionTestCase(unittest.TestCase):
         """ Creates the test setup."""
         
         _TransportMock.error = None
-        connection_pool.Transport = _TransportMock
-        self._connectionPool = connection_pool.TsmConnectionPool(SimpleMock())
+        ssh.Transport = _TransportMock
+        self._connectionPool = connection_pool.TsmConnectionPool(
+            SimpleMock(hostname="host", port=22, username="user", password="secret"))
+        self._connectionPool._transportManager = ssh.SshTransportManager()
         
     def tearDown(self):
         self._connectionPool.reload()
@@ -94,6 +102,16 @@ class TsmConnectionTestCase(unittest.TestCase):
         connection = self._connectionPool.acquire()
         self.assertNotEquals(connection, None)
         
+    def testSessionsShareTransport(self):
+        """ Tests that the sessions use the same SSH transport. """
+        
+        firstConnection = self._connectionPool.acquire()
+        secondConnection = self._connectionPool.acquire()
+        self.assertTrue(firstConnection.transport is secondConnection.transport)
+        
+        self._connectionPool.reload()
+        self.assertTrue(firstConnection.transport.closed)
+        
     def testAcquireError(self):
         """ Tests error handling when acquiring a TSM connection. """
 
@@ -41,13 +41,21 @@ Test cases of the TSM data adapter.
 """
 
 
-import unittest
+import os
+import shlex
+import shutil
 import socket
+import subprocess
+import sys
+import tempfile
+import unittest
 from StringIO import StringIO
 
 from paramiko import SSHException
 
+from datafinder.persistence.adapters.tsm import factory, session
 from datafinder.persistence.adapters.tsm.data import adapter
+from datafinder.persistence.common.configuration import BaseConfiguration
 from datafinder.persistence.error import PersistenceError
 from datafinder_test.mocks import SimpleMock
 
@@ -120,11 +128,12 @@ class DataTsmAdapterTestCase(unittest.TestCase):
         """ Creates test setup. """
         
         
-        adapter.SFTPClient = _SftpClientMock
+        session.SFTPClient = _SftpClientMock
         self._channelMock = _ChannelMock()
         self._connectionMock = SimpleMock(self._channelMock)
+        self._session = session.TsmSession(self._connectionMock)
         self._dataAdapter = adapter.DataTsmAdapter("/path/to/item", "/basPath/path/to/item", 
-                                                   "serverNodeName", SimpleMock(self._connectionMock))
+                                                   "serverNodeName", SimpleMock(self._session))
         
     def testFlags(self):
         """ Tests the isCollection, isLeaf and isLink flags. """
@@ -174,15 +183,22 @@ class DataTsmAdapterTestCase(unittest.TestCase):
         self._channelMock.methodNameResultMap = {"exec_command": (None, SSHException())} #W0201: Pylint cannot see this on commit time
         self.assertRaises(PersistenceError, self._dataAdapter.exists)
         
+    def testExistStopsAtArchivedFile(self):
+        """ Tests that the remaining query output is not read when the archive has been found. """
+        
+        self._channelMock.stdout = "  1  B  01/01/2011 12:00:00    /basPath/path/to/item Never Archive Date: 01/01/2011\n"
+        self._channelMock.stderr = "Error Code... ANS1092W kkk"
+        self.assertTrue(self._dataAdapter.exists())
+        self.assertEquals(self._channelMock._stderr.tell(), 0)
+        
     def testDelete(self):
         """ Tests the deletion method. """
         
         self._dataAdapter.delete()
         
-        self._dataAdapter.exists = lambda: False
+        self._channelMock.stderr = "Error Code... ANS1092W kkk"
         self.assertRaises(PersistenceError, self._dataAdapter.delete)
         
-        self._dataAdapter.exists = lambda: True
         self._channelMock.stderr = "An error occurred..."
         self.assertRaises(PersistenceError, self._dataAdapter.delete)
         
@@ -203,17 +219,17 @@ class DataTsmAdapterTestCase(unittest.TestCase):
     def testReadData(self):
         """ Tests the retrieving of data. """
         
-        self._dataAdapter._sendCommand = lambda _, __: None
+        self._session.execute = lambda _: ""
         self._connectionMock.value = StringIO("")
         self.assertEquals(self._dataAdapter.readData().read(), "")
         
         self._connectionMock.value = StringIO("Some test data...")
         self.assertEquals(self._dataAdapter.readData().read(), "Some test data...")
         
-        self._dataAdapter.exists = lambda: False
+        self._session.execute = SimpleMock(error=PersistenceError("Error Code... ANS1092W kkk"))
         self.assertRaises(PersistenceError, self._dataAdapter.readData)
         
-        self._dataAdapter.exists = lambda: True
+        self._session.execute = lambda _: ""
         self._connectionMock.value = SimpleMock(error=IOError(""))
         self.assertRaises(PersistenceError, self._dataAdapter.readData)
         
@@ -237,3 +253,189 @@ class DataTsmAdapterTestCase(unittest.TestCase):
         
         self._connectionMock.value = SimpleMock(error=SSHException(""))
         self.assertRaises(PersistenceError, self._dataAdapter.writeData, StringIO("Some test data..."))
+
+
+class IterateArchivedFilesTestCase(unittest.TestCase):
+    """ Tests the parsing of the query output. """
+    
+    def testIterateArchivedFiles(self):
+        """ Tests the parsing of a typical query output. """
+        
+        output = ["IBM Tivoli Storage Manager\n",
+                  "             Size  Archive Date - Time    File - Expires on - Description\n",
+                  "             ----  -------------------    -------------------------------\n",
+                  "         1,024  B  02/14/2011 10:11:12    /path/file 02/14/2012 Archive Date: 02/14/2011\n",
+                  "            12  KB  02/14/2011 10:11:13    /path/with space Never Archive Date: 02/14/2011\n"]
+        self.assertEquals(list(adapter.iterateArchivedFiles(output)), [u"/path/file", u"/path/with space"])
+
+
+class _LocalChannel(object):
+    """ Channel which executes the commands locally using the fake C{dsmc} script. """
+    
+    _FAKE_DSMC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_dsmc.py")
+    
+    def __init__(self):
+        """ Constructor. """
+        
+        self._stdout = StringIO()
+        self._stderr = StringIO()
+        
+    def settimeout(self, _):
+        """ Ignores the time out. """
+        
+        pass
+    
+    def exec_command(self, command):
+        """ Runs the command and keeps its outputs. """
+        
+        arguments = shlex.split(command.encode("utf-8"))
+        arguments = [sys.executable, self._FAKE_DSMC_PATH] + arguments[1:]
+        process = subprocess.Popen(arguments, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate()
+        self._stdout = StringIO(stdout)
+        self._stderr = StringIO(stderr)
+        
+    def recv(self, size):
+        """ Returns the standard output. """
+        
+        return self._stdout.read(size)
+    
+    def recv_stderr(self, size):
+        """ Returns the standard error. """
+        
+        return self._stderr.read(size)
+    
+    def close(self):
+        """ Nothing to close. """
+        
+        pass
+    
+    
+class _LocalSftpClient(object):
+    """ Accesses the local file system instead of the TSM host. """
+    
+    @staticmethod
+    def open(path, mode="r"):
+        """ Opens the local file. """
+        
+        return open(path, mode + "b")
+    
+    @staticmethod
+    def remove(path):
+        """ Removes the local file. """
+        
+        os.remove(path)
+        
+    def close(self):
+        """ Nothing to close. """
+        
+        pass
+    
+    
+class LocalDataTsmAdapterTestCase(unittest.TestCase):
+    """ Verifies the data adapters against the fake C{dsmc} script. """
+    
+    def setUp(self):
+        """ Creates the working and archive directories and the local TSM session. """
+        
+        self._workingDirectory = tempfile.mkdtemp()
+        self._archiveDirectory = tempfile.mkdtemp()
+        os.environ["FAKE_DSMC_ARCHIVE"] = self._archiveDirectory
+        
+        transportMock = SimpleMock()
+        transportMock.open_session = _LocalChannel
+        tsmSession = session.TsmSession(transportMock)
+        tsmSession._sftp = _LocalSftpClient()
+        self._connectionPool = SimpleMock(tsmSession)
+        self._persistenceIdentifier = os.path.join(self._workingDirectory, "item")
+        
+        identifierMap = dict()
+        for index in range(5):
+            identifierMap["/item%i" % index] = os.path.join(self._workingDirectory, "item%i" % index)
+        self._identifierMap = identifierMap
+        self._batchAdapter = adapter.BatchDataTsmAdapter(identifierMap, "serverNodeName", self._connectionPool)
+        
+    def tearDown(self):
+        """ Removes the directories. """
+        
+        del os.environ["FAKE_DSMC_ARCHIVE"]
+        shutil.rmtree(self._workingDirectory)
+        shutil.rmtree(self._archiveDirectory)
+        
+    @property
+    def _invocations(self):
+        """ Returns the recorded C{dsmc} invocations. """
+        
+        invocationsPath = os.path.join(self._archiveDirectory, "invocations")
+        if not os.path.exists(invocationsPath):
+            return list()
+        return open(invocationsPath).readlines()
+        
+    def testArchiveAndRetrieve(self):
+        """ Tests the data adapter which retrieves and deletes without a preceding query. """
+        
+        dataAdapter = adapter.DataTsmAdapter("/item", self._persistenceIdentifier, "serverNodeName", self._connectionPool)
+        self.assertRaises(PersistenceError, dataAdapter.readData)
+        self.assertEquals(len(self._invocations), 1)
+        
+        dataAdapter.writeData(StringIO("data"))
+        self.assertEquals(dataAdapter.readData().read(), "data")
+        self.assertEquals(len(self._invocations), 4)
+        
+        dataAdapter.delete()
+        self.assertFalse(dataAdapter.exists())
+        self.assertRaises(PersistenceError, dataAdapter.delete)
+        
+    def testBatchArchiveAndRetrieve(self):
+        """ Tests archiving and retrieving multiple files with file lists. """
+        
+        self.assertEquals(self._batchAdapter.exists(), dict([(identifier, False) for identifier in self._identifierMap]))
+        
+        identifierDataMap = dict([(identifier, StringIO(identifier)) for identifier in self._identifierMap])
+        self.assertEquals(self._batchAdapter.writeData(identifierDataMap), dict())
+        self.assertEquals(self._batchAdapter.exists(), dict([(identifier, True) for identifier in self._identifierMap]))
+        for persistenceIdentifier in self._identifierMap.values():
+            self.assertFalse(os.path.exists(persistenceIdentifier))
+        
+        result, errors = self._batchAdapter.readData()
+        self.assertEquals(errors, dict())
+        self.assertEquals(sorted(result.keys()), sorted(self._identifierMap.keys()))
+        for identifier, fileObject in result.iteritems():
+            self.assertEquals(fileObject.read(), identifier)
+            fileObject.close()
+            
+        # exists, (query, archive), exists, (query, retrieve)
+        self.assertEquals(len(self._invocations), 6)
+        for invocation in self._invocations[1:3] + self._invocations[4:]:
+            self.assertTrue("-filelist=" in invocation)
+        self.assertEquals(os.listdir(self._workingDirectory), list())
+        
+    def testBatchErrorHandling(self):
+        """ Tests that missing and already existing archives are reported per item. """
+        
+        result, errors = self._batchAdapter.readData()
+        self.assertEquals(result, dict())
+        self.assertEquals(sorted(errors.keys()), sorted(self._identifierMap.keys()))
+        
+        self.assertEquals(self._batchAdapter.writeData({"/item0": StringIO("data")}), dict())
+        result, errors = self._batchAdapter.readData()
+        self.assertEquals(result.keys(), ["/item0"])
+        self.assertEquals(len(errors), 4)
+        
+        errors = self._batchAdapter.writeData({"/item0": StringIO("data"), "/item1": StringIO("data")})
+        self.assertEquals(errors.keys(), ["/item0"])
+        self.assertEquals(self._batchAdapter.exists()["/item1"], True)
+        
+    def testFileSystem(self):
+        """ Tests the batch operations of the TSM file system. """
+        
+        fileSystem = factory.FileSystem(BaseConfiguration("tsm://localhost" + self._workingDirectory))
+        fileSystem._connectionPool = self._connectionPool
+        self.assertEquals(fileSystem.writeData({"/item0": StringIO("0"), "/item1": StringIO("1")}), dict())
+        result, errors = fileSystem.readData(["/item0", "/item1", "/item2"])
+        self.assertEquals(sorted(result.keys()), ["/item0", "/item1"])
+        self.assertEquals(result["/item1"].read(), "1")
+        self.assertEquals(errors.keys(), ["/item2"])
+        # (query, archive), (query, retrieve)
+        self.assertEquals(len(self._invocations), 4)
+        fileSystem.release()
@@ -0,0 +1,112 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Fake C{dsmc} command line client which is used to verify the TSM data adapter locally.
+The archive is kept in the directory specified by the environment variable C{FAKE_DSMC_ARCHIVE}.
+Every invocation is recorded in the file C{invocations} of this directory.
+"""
+
+
+import os
+import shutil
+import sys
+
+
+__version__ = "$Revision-Id:$" 
+
+
+_NON_MATCHING_FILESEARCH_MESSAGE = "ANS1092W No files matching search criteria were found\n"
+
+
+def _determineFiles(arguments):
+    """ Determines the file specifications from the arguments and the file list. """
+    
+    files = list()
+    for argument in arguments:
+        if argument.startswith("-filelist="):
+            for line in open(argument[len("-filelist="):]).readlines():
+                if len(line.strip()) > 0:
+                    files.append(line.strip().strip('"'))
+        elif not argument.startswith("-"):
+            files.append(argument)
+    return files
+
+
+def _archivePath(archiveDirectory, path):
+    """ Maps the given path to the path of the archived copy. """
+    
+    return os.path.join(archiveDirectory, path.encode("hex"))
+
+
+def main():
+    """ Emulates archive, query archive, retrieve and delete archive. """
+    
+    archiveDirectory = os.environ["FAKE_DSMC_ARCHIVE"]
+    invocations = open(os.path.join(archiveDirectory, "invocations"), "a")
+    invocations.write(" ".join(sys.argv[1:]) + "\n")
+    invocations.close()
+    
+    command = sys.argv[1]
+    if command in ("query", "delete"):
+        files = _determineFiles(sys.argv[3:])
+    else:
+        files = _determineFiles(sys.argv[2:])
+    
+    if command == "archive":
+        for path in files:
+            shutil.copy(path, _archivePath(archiveDirectory, path))
+            if "-deletefiles" in sys.argv:
+                os.remove(path)
+        return 0
+    archivedFiles = [path for path in files if os.path.exists(_archivePath(archiveDirectory, path))]
+    if len(archivedFiles) == 0:
+        sys.stderr.write(_NON_MATCHING_FILESEARCH_MESSAGE)
+        return 8
+    for path in archivedFiles:
+        if command == "query":
+            sys.stdout.write("  1  B  01/01/2011 12:00:00    %s Never Archive Date: 01/01/2011\n" % path)
+        elif command == "retrieve":
+            shutil.copy(_archivePath(archiveDirectory, path), path)
+        elif command == "delete":
+            os.remove(_archivePath(archiveDirectory, path))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
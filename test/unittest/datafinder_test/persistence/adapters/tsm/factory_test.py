@@ -45,9 +45,11 @@ Contains tests of the TSM factory.
 
 import unittest
 
-from datafinder.persistence.adapters.tsm import factory
+from datafinder.persistence.adapters.tsm import constants, factory
 from datafinder.persistence.adapters.tsm.data.adapter import DataTsmAdapter
 from datafinder.persistence.common.configuration import BaseConfiguration
+from datafinder.persistence.error import PersistenceError
+from datafinder_test.mocks import SimpleMock
 
 
 __version__ = "$Revision-Id:$" 
@@ -65,3 +67,24 @@ class FileSystemTestCase(unittest.TestCase):
         tsmFileSystem.updateCredentials(credentials)
         self.assertEquals(tsmFileSystem._configuration.username, "me")
         self.assertEquals(tsmFileSystem._configuration.password, "secret")
+        
+    def testBlockSize(self):
+        tsmFileSystem = factory.FileSystem(BaseConfiguration("tsm://host.de/basePath"))
+        self.assertEquals(tsmFileSystem.blockSize, constants.BLOCK_SIZE)
+        
+        tsmFileSystem = factory.FileSystem(BaseConfiguration("tsm://host.de/basePath", blockSize=1024))
+        self.assertEquals(tsmFileSystem.blockSize, 1024)
+        self.assertEquals(tsmFileSystem.createDataStorer("/logical/Identifier")._blockSize, 1024)
+        
+    def testBatchDataStorer(self):
+        tsmFileSystem = factory.FileSystem(BaseConfiguration("tsm://host.de/basePath", blockSize=1024))
+        batchDataStorer = tsmFileSystem._createBatchDataStorer(["/logical/Identifier"])
+        self.assertEquals(batchDataStorer._identifierMap, {"/logical/Identifier": "/basePath/logical/Identifier"})
+        self.assertEquals(batchDataStorer._blockSize, 1024)
+        
+        # A failing batch is reported for every item
+        tsmFileSystem._createBatchDataStorer = lambda _: SimpleMock(error=PersistenceError(""))
+        result, errors = tsmFileSystem.readData(["/a", "/b"])
+        self.assertEquals(result, dict())
+        self.assertEquals(sorted(errors.keys()), ["/a", "/b"])
+        self.assertEquals(sorted(tsmFileSystem.writeData({"/a": None, "/b": None}).keys()), ["/a", "/b"])
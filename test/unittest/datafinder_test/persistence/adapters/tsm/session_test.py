@@ -0,0 +1,143 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Tests the TSM session.
+"""
+
+
+import socket
+import unittest
+from StringIO import StringIO
+
+from paramiko import SSHException
+
+from datafinder.persistence.adapters.tsm import session
+from datafinder.persistence.error import PersistenceError
+from datafinder_test.mocks import SimpleMock
+
+
+__version__ = "$Revision-Id:$" 
+
+
+class _ChannelMock(object):
+    """ Returns the output in parts of the given size. """
+    
+    def __init__(self, stdout="", stderr="", partSize=3):
+        """ Constructor. """
+        
+        self._stdout = StringIO(stdout)
+        self._stderr = StringIO(stderr)
+        self._partSize = partSize
+        self.timeout = False
+        self.closed = False
+        
+    def settimeout(self, _):
+        """ Ignores the time out. """
+        
+        pass
+    
+    def exec_command(self, _):
+        """ Ignores the command. """
+        
+        pass
+    
+    def recv(self, _):
+        """ Returns the next part of the standard output. """
+        
+        if self.timeout:
+            raise socket.timeout()
+        return self._stdout.read(self._partSize)
+    
+    def recv_stderr(self, _):
+        """ Returns the next part of the standard error. """
+        
+        return self._stderr.read(self._partSize)
+    
+    def close(self):
+        """ Records the closing. """
+        
+        self.closed = True
+        
+    
+class TsmSessionTestCase(unittest.TestCase):
+    """ Tests the TSM session. """
+    
+    def setUp(self):
+        """ Creates the test setup. """
+        
+        self._channel = _ChannelMock()
+        self._transport = SimpleMock(self._channel)
+        self._session = session.TsmSession(self._transport)
+        
+    def testExecute(self):
+        """ Tests the command execution. """
+        
+        self._channel._stdout = StringIO("line1\nline2\n")
+        self.assertEquals(self._session.execute("command"), "line1\nline2\n")
+        self.assertTrue(self._channel.closed)
+        
+        self._channel._stderr = StringIO("error")
+        self.assertRaises(PersistenceError, self._session.execute, "command")
+        
+        self._channel._stdout = StringIO("ANS1217E unknown node")
+        self.assertRaises(PersistenceError, self._session.execute, "command")
+        
+        self._channel.timeout = True
+        self.assertRaises(PersistenceError, self._session.execute, "command")
+        
+        self._transport.error = SSHException("")
+        self.assertRaises(PersistenceError, self._session.execute, "command")
+        
+    def testIterateOutputLines(self):
+        """ Tests the incremental line-based output retrieval. """
+        
+        self._channel._stdout = StringIO("first line\r\nsecond line\n\nlast")
+        lines = self._session.iterateOutputLines("command")
+        self.assertEquals(lines.next(), "first line\r\n")
+        self.assertFalse(self._channel.closed)
+        self.assertEquals(list(lines), ["second line\n", "\n", "last"])
+        self.assertTrue(self._channel.closed)
+        
+    def testClose(self):
+        """ Tests closing of the session. """
+        
+        session.SFTPClient = SimpleMock(SimpleMock())
+        self.assertNotEquals(self._session.sftp, None)
+        self._session.close()
+        self.assertEquals(self._session._sftp, None)
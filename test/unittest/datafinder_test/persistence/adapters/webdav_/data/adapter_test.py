@@ -50,6 +50,7 @@ import unittest
 from webdav.Connection import WebdavError
 
 from datafinder.persistence.adapters.webdav_.data.adapter import DataWebdavAdapter
+from datafinder.persistence.data.datastorer import ITEM_TYPE_COLLECTION
 from datafinder.persistence.error import PersistenceError
 from datafinder_test.mocks import SimpleMock
 
@@ -138,6 +139,7 @@ class DataWebdavAdapterTestCase(unittest.TestCase):
         adapter = DataWebdavAdapter("/identifier", SimpleMock(), SimpleMock("/Path"), 
                                     SimpleMock(_VALID_GETCHILDREN_WEBDAV_RESULT))
         self.assertEquals(adapter.getChildren(), _VALID_GETCHILDREN_RESULT)
+        self.assertEquals(adapter.getTypedChildren(), [("/Path", ITEM_TYPE_COLLECTION)])
         
     def testWriteData(self):
         """ Tests the normal behavior of the writeData method. """
@@ -43,8 +43,11 @@ Test cases of the privilege adapter.
 __version__ = "$Revision-Id:$" 
 
 
+import time
 import unittest
 
+from webdav import Constants
+from webdav.acp import ACL
 from webdav.Connection import WebdavError
 
 from datafinder.persistence.principal_search import principal
@@ -52,6 +55,7 @@ from datafinder.persistence.privileges import constants
 from datafinder.persistence.privileges.ace import AccessControlListEntry
 from datafinder.persistence.adapters.webdav_.privileges import adapter
 from datafinder.persistence.adapters.webdav_.privileges import privileges_mapping
+from datafinder.persistence.adapters.webdav_.util import ItemIdentifierMapper
 from datafinder.persistence.error import PersistenceError
 from datafinder_test.mocks import SimpleMock
 
@@ -91,6 +95,127 @@ class PrivilegeWebdavAdapterTestCase(unittest.TestCase):
         self.assertRaises(PersistenceError, self._adapter.updateAcl, dict())
         self.assertRaises(PersistenceError, self._adapter.retrievePrivileges)
         
+
+class _ItemStorerMock(object):
+    
+    def __init__(self):
+        self.requestCount = 0
+        
+    def getCurrentUserPrivileges(self):
+        self.requestCount += 1
+        return list()
+
+    def getAcl(self):
+        self.requestCount += 1
+        return ACL()
+
+    def options(self):
+        self.requestCount += 1
+        return {"allow": ["GET", "PROPFIND"]}
+
+    def setAcl(self, _):
+        self.requestCount += 1
+
+
+class _CollectionStorerMock(object):
+    
+    def __init__(self, error=None):
+        self.requestCount = 0
+        self.error = error
+        self.properties = {(Constants.NS_DAV, Constants.PROP_CURRENT_USER_PRIVILEGE_SET): SimpleMock(children=list()),
+                           (Constants.NS_DAV, Constants.TAG_ACL): SimpleMock(children=list())}
+        
+    def findProperties(self, *_):
+        self.requestCount += 1
+        if not self.error is None:
+            raise self.error
+        return {"/base/parent": self.properties, "/base/parent/a": self.properties, 
+                "/base/parent/b": self.properties, "/base/parent/c": dict()}
+
+
+class PrivilegeWebdavAdapterCacheTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self._privilegeCache = dict()
+        self._resourceTypeCache = {"/parent": (True, None), "/parent/a": (False, None), 
+                                   "/parent/b": (False, None), "/parent/c": (False, None)}
+        self._collectionStorer = _CollectionStorerMock()
+        self._itemStorer = _ItemStorerMock()
+        self._connectionHelper = SimpleMock(methodNameResultMap={
+            "createCollectionStorer": (self._collectionStorer, None),
+            "createResourceStorer": (self._itemStorer, None)})
+        
+    def _createAdapter(self, identifier):
+        return adapter.PrivilegeWebdavAdapter(
+            identifier, SimpleMock(), ItemIdentifierMapper("http://test.de/base"), 
+            privileges_mapping.PrivilegeMapper("", ""), self._connectionHelper, 
+            self._privilegeCache, self._resourceTypeCache)
+        
+    def testPrefetchSiblings(self):
+        self.assertEquals(self._createAdapter("/parent/a").retrievePrivileges(), list())
+        self.assertEquals(self._createAdapter("/parent/b").retrievePrivileges(), list())
+        self.assertEquals(self._collectionStorer.requestCount, 1)
+        self.assertEquals(self._itemStorer.requestCount, 0)
+        for properties, _ in self._privilegeCache.values(): # Only the ACLs are left
+            self.assertEquals(properties.keys(), [(Constants.NS_DAV, Constants.TAG_ACL)])
+        
+        # Cached values are only used once
+        self._createAdapter("/parent/b").retrievePrivileges()
+        self.assertEquals(self._collectionStorer.requestCount, 2)
+        
+    def testPrefetchAcl(self):
+        self.assertEquals(self._createAdapter("/parent/a").retrieveAcl(), list())
+        self.assertEquals(self._createAdapter("/parent/b").retrieveAcl(), list())
+        self.assertEquals(self._createAdapter("/parent/a").retrievePrivileges(), list())
+        self.assertEquals(self._collectionStorer.requestCount, 1)
+        self.assertEquals(self._itemStorer.requestCount, 0)
+        self.assertEquals(self._privilegeCache.keys(), ["/parent/b"])
+        
+        # Cached values are only used once
+        self._createAdapter("/parent/b").retrieveAcl()
+        self.assertEquals(self._collectionStorer.requestCount, 2)
+        
+    def testMissingAcl(self):
+        del self._collectionStorer.properties[(Constants.NS_DAV, Constants.TAG_ACL)]
+        self.assertEquals(self._createAdapter("/parent/a").retrievePrivileges(), list())
+        self.assertEquals(self._createAdapter("/parent/a").retrieveAcl(), list())
+        self.assertEquals(self._collectionStorer.requestCount, 2)
+        self.assertEquals(self._itemStorer.requestCount, 1)
+        
+    def testNoPrefetchForItemsNotListed(self):
+        self._resourceTypeCache.clear()
+        self._createAdapter("/parent/a").retrievePrivileges()
+        self.assertEquals(self._collectionStorer.requestCount, 0)
+        self.assertEquals(self._itemStorer.requestCount, 1)
+        
+    def testExpiredPrivileges(self):
+        self._privilegeCache["/parent/a"] = \
+            {(Constants.NS_DAV, Constants.PROP_CURRENT_USER_PRIVILEGE_SET): list()}, time.time() - 1
+        self._createAdapter("/parent/a").retrievePrivileges()
+        self.assertEquals(self._collectionStorer.requestCount, 0)
+        self.assertEquals(self._itemStorer.requestCount, 1)
+        
+    def testMissingProperties(self):
+        self._createAdapter("/parent/c").retrievePrivileges()
+        self.assertEquals(self._collectionStorer.requestCount, 1)
+        self.assertEquals(self._itemStorer.requestCount, 1)
+        
+    def testPrefetchError(self):
+        self._collectionStorer.error = WebdavError("")
+        self._createAdapter("/parent/a").retrievePrivileges()
+        self.assertEquals(self._itemStorer.requestCount, 1)
+        
+    def testUpdateAcl(self):
+        self._createAdapter("/parent/a").retrievePrivileges()
+        self._createAdapter("/parent/a").updateAcl(list())
+        self.assertFalse("/parent/a" in self._privilegeCache)
+
+    def testRoot(self):
+        self._createAdapter("/").retrievePrivileges()
+        self.assertEquals(self._collectionStorer.requestCount, 0)
+        self.assertEquals(self._itemStorer.requestCount, 1)
+
+
 class SimplePrivilegeWebdavAdapterTestCase(unittest.TestCase):
     
     def setUp(self):
@@ -113,3 +238,27 @@ class SimplePrivilegeWebdavAdapterTestCase(unittest.TestCase):
     def testRetrievePrivilegesError(self):
         self._connectionHelper.error = PersistenceError("")
         self.assertRaises(PersistenceError, self._adapter.retrievePrivileges)
+        
+    def testRetrievePrivilegesCached(self):
+        self._connectionHelper.value.value = {"allow": ["GET", "PROPFIND"]}
+        privilegeCache = dict()
+        resourceTypeCache = {"/parent/a": (False, None), "/parent/b": (False, None)}
+        for identifier in ["/parent/a", "/parent/b"]:
+            adapter_ = adapter.SimplePrivilegeWebdavAdapter(
+                identifier, SimpleMock(), ItemIdentifierMapper("http://test.de/base"), 
+                self._privilegeMapper, self._connectionHelper, privilegeCache, resourceTypeCache)
+            self.assertEquals(adapter_.retrievePrivileges(), [constants.READ_PRIVILEGE])
+            self._connectionHelper.error = PersistenceError("")
+        self.assertEquals(len(privilegeCache), 1)
+        
+    def testRetrievePrivilegesCacheExpired(self):
+        itemStorer = _ItemStorerMock()
+        self._connectionHelper.value = itemStorer
+        cacheKey = ("/parent", (False, None))
+        privilegeCache = {cacheKey: ([constants.READ_PRIVILEGE], time.time() - 1)}
+        adapter_ = adapter.SimplePrivilegeWebdavAdapter(
+            "/parent/a", SimpleMock(), ItemIdentifierMapper("http://test.de/base"), 
+            self._privilegeMapper, self._connectionHelper, privilegeCache, {"/parent/a": (False, None)})
+        self.assertEquals(adapter_.retrievePrivileges(), [constants.READ_PRIVILEGE])
+        self.assertEquals(itemStorer.requestCount, 1)
+        self.assertTrue(privilegeCache[cacheKey][1] > time.time())
@@ -42,6 +42,8 @@ Tests the search adapter implementation.
 
 import unittest
 
+import mock
+
 from datafinder.persistence.adapters.webdav_.search.adapter import SearchWebdavAdapter
 from datafinder_test.mocks import SimpleMock
 
@@ -59,5 +61,14 @@ class SearchWebdavAdapterTestCase(unittest.TestCase):
         """ Tests successful search. """
         
         adapter = SearchWebdavAdapter(SimpleMock(), SimpleMock("/PATH"), SimpleMock(SimpleMock(_VALID_WEBDAV_SEARCH_RESULT)))
-        self.assertEquals(adapter.search([], SimpleMock("/PATH")), _VALID_SEARCH_RESULT)
+        self.assertEquals(list(adapter.search([], SimpleMock("/PATH"))), _VALID_SEARCH_RESULT)
+        
+    def testSearchLimit(self):
+        """ Tests that the limit is passed to the server. """
+        
+        collectionStorer = SimpleMock(_VALID_WEBDAV_SEARCH_RESULT)
+        adapter = SearchWebdavAdapter(SimpleMock(), SimpleMock("/PATH"), SimpleMock(collectionStorer))
+        with mock.patch.object(collectionStorer, "search", return_value=_VALID_WEBDAV_SEARCH_RESULT) as searchMock:
+            self.assertEquals(list(adapter.search([], SimpleMock("/PATH"), 10)), _VALID_SEARCH_RESULT)
+            self.assertEquals(searchMock.call_args[0][2], 10)
         
\ No newline at end of file
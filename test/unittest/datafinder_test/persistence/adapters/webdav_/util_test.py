@@ -45,7 +45,13 @@ __version__ = "$Revision-Id:$"
 
 import unittest
 
+from webdav.Condition import ExistsTerm
+from webdav.Connection import Connection
+from webdav.WebdavRequests import createFindBody, createSearchBody
+
 from datafinder.persistence.adapters.webdav_ import util
+from datafinder.persistence.adapters.webdav_.constants import LINK_TARGET_PROPERTY, RESOURCE_TYPE_PROPERTY
+from datafinder_test.mocks import SimpleMock
 
 
 _PERSISTENCE_ID = "http://test.de:80/hhh/j/c:/lll/"
@@ -100,3 +106,63 @@ class ItemIdentifierMapperTestCase(unittest.TestCase):
         
         self.assertRaises(AttributeError, util.ItemIdentifierMapper, None)
         util.ItemIdentifierMapper("invalidURL")
+
+
+class FindBodyTestCase(unittest.TestCase):
+    """ Tests the caching of PROPFIND request bodies. """
+    
+    def testGetFindBody(self):
+        """ Tests that the cached body is equal to the directly created body. """
+        
+        propertyIds = [LINK_TARGET_PROPERTY, RESOURCE_TYPE_PROPERTY]
+        body = util.getFindBody(propertyIds)
+        self.assertEquals(body, createFindBody(propertyIds))
+        self.assertTrue(util.getFindBody(tuple(propertyIds)) is body)
+        self.assertNotEquals(util.getFindBody([RESOURCE_TYPE_PROPERTY]), body)
+        
+    def testCacheLimit(self):
+        """ Tests that the cache does not grow unbounded. """
+        
+        for index in range(util._MAX_CACHED_FIND_BODIES + 1):
+            util.getFindBody([("http://test.de/", "property%i" % index)])
+        self.assertTrue(len(util._findBodyCache) <= util._MAX_CACHED_FIND_BODIES)
+
+
+class _ConnectionMock(Connection):
+    """ Records the performed request. """
+    # pylint: disable=W0231
+    # W0231: No real connection is required.
+    
+    def __init__(self):
+        self.method = None
+        self.body = None
+    
+    def _request(self, method, _, body, __):
+        self.method = method
+        self.body = body
+        return SimpleMock(msr=dict())
+
+
+class SearchTestCase(unittest.TestCase):
+    """ Tests the DASL search request. """
+    
+    def setUp(self):
+        self._connection = _ConnectionMock()
+        self._collectionStorer = util.createCollectionStorer("http://server.de/path/", self._connection)
+        self._conditions = ExistsTerm(LINK_TARGET_PROPERTY)
+        self._selects = [LINK_TARGET_PROPERTY]
+    
+    def testSearch(self):
+        """ Tests that the search request body is not changed without limit. """
+        
+        self.assertEquals(self._collectionStorer.search(self._conditions, self._selects), dict())
+        self.assertEquals(self._connection.method, "SEARCH")
+        self.assertEquals(self._connection.body, 
+                          createSearchBody(self._selects, "/path/", self._conditions))
+        
+    def testSearchLimit(self):
+        """ Tests that the limit is requested using the DASL limit element. """
+        
+        self._collectionStorer.search(self._conditions, self._selects, 10)
+        self.assertTrue(self._connection.body.endswith(
+            "<D:limit><D:nresults>10</D:nresults></D:limit></D:basicsearch></D:searchrequest>"))
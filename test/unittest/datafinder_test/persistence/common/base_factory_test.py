@@ -42,7 +42,11 @@ Tests the base factory implementation.
 
 import unittest
 
+import mock
+
 from datafinder.persistence.common.base_factory import BaseFileSystem
+from datafinder.persistence.error import PersistenceError
+from datafinder_test.mocks import SimpleMock
 
 
 __version__ = "$Revision-Id:$" 
@@ -78,3 +82,51 @@ class BaseFileSystemTestCase(unittest.TestCase):
         self.assertEquals(self._baseFactory.isValidMetadataIdentifier("asd;asd"), (False, 3))
         self.assertEquals(self._baseFactory.isValidMetadataIdentifier("12asdasd"), (False, 0))
         self.assertEquals(self._baseFactory.isValidMetadataIdentifier("!asdasd"), (False, 0))
+        
+    def testUpdateMetadata(self):
+        # Success
+        self.assertEquals(self._baseFactory.updateMetadata({"/a": {"name": "value"}, "/b": dict()}), dict())
+        
+        # Errors are reported per item
+        metadataStorers = {"/a": SimpleMock(), "/b": SimpleMock(error=PersistenceError(""))}
+        self._baseFactory.createMetadataStorer = lambda identifier: metadataStorers[identifier]
+        errors = self._baseFactory.updateMetadata({"/a": {"name": "value"}, "/b": dict()})
+        self.assertEquals(errors.keys(), ["/b"])
+        
+    def testReadData(self):
+        dataStorers = {"/a": SimpleMock("data"), "/b": SimpleMock(error=PersistenceError(""))}
+        self._baseFactory.createDataStorer = lambda identifier: dataStorers[identifier]
+        result, errors = self._baseFactory.readData(["/a", "/b"])
+        self.assertEquals(result, {"/a": "data"})
+        self.assertEquals(errors.keys(), ["/b"])
+        
+    def testWriteData(self):
+        dataStorers = {"/a": SimpleMock(), "/b": SimpleMock(error=PersistenceError(""))}
+        self._baseFactory.createDataStorer = lambda identifier: dataStorers[identifier]
+        errors = self._baseFactory.writeData({"/a": "data", "/b": "data"})
+        self.assertEquals(errors.keys(), ["/b"])
+        
+    def testCreateResource(self):
+        # Success
+        self._baseFactory.createResource(SimpleMock(), SimpleMock(), {"name": "value"})
+        
+        # Error
+        self.assertRaises(PersistenceError, self._baseFactory.createResource, 
+                          SimpleMock(), SimpleMock(error=PersistenceError("")), {"name": "value"})
+        
+    def testCreateResourceRemovesResourceOnMetadataError(self):
+        dataStorer = mock.Mock()
+        metadataStorer = mock.Mock()
+        metadataStorer.update.side_effect = PersistenceError("")
+        self.assertRaises(PersistenceError, self._baseFactory.createResource, 
+                          dataStorer, metadataStorer, {"name": "value"})
+        self.assertTrue(dataStorer.createResource.called)
+        self.assertTrue(dataStorer.delete.called)
+        
+        # The original error is reported even if the resource cannot be removed
+        dataStorer.delete.side_effect = PersistenceError("Cannot delete.")
+        try:
+            self._baseFactory.createResource(dataStorer, metadataStorer, {"name": "value"})
+            self.fail("No PersistenceError has been raised.")
+        except PersistenceError, error:
+            self.assertTrue(error is metadataStorer.update.side_effect)
@@ -0,0 +1,94 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Implements test cases for the concurrent execution helper.
+"""
+
+
+import threading
+import unittest
+
+from datafinder.persistence.common.concurrency import performConcurrently
+from datafinder.persistence.error import PersistenceError
+
+
+__version__ = "$Revision-Id:$" 
+
+
+class PerformConcurrentlyTestCase(unittest.TestCase):
+    """ Implements the test cases. """
+    
+    def setUp(self):
+        """ Creates test setup. """
+        
+        self._calledArguments = list()
+        self._threadNames = set()
+        
+    def _function(self, argument):
+        """ Records the call and fails for odd arguments. """
+        
+        self._calledArguments.append(argument)
+        self._threadNames.add(threading.currentThread().getName())
+        if argument % 2 == 1:
+            raise PersistenceError("Odd argument %i." % argument)
+        
+    def testSequential(self):
+        """ Tests the sequential execution. """
+        
+        errors = performConcurrently(self._function, range(10))
+        self.assertEquals(self._calledArguments, range(10))
+        self.assertEquals(sorted(errors.keys()), [1, 3, 5, 7, 9])
+        self.assertEquals(len(self._threadNames), 1)
+        
+    def testConcurrent(self):
+        """ Tests the parallel execution. """
+        
+        errors = performConcurrently(self._function, range(100), 4)
+        self.assertEquals(sorted(self._calledArguments), range(100))
+        self.assertEquals(sorted(errors.keys()), range(1, 100, 2))
+        self.assertTrue(len(self._threadNames) <= 4)
+        self.assertEquals(performConcurrently(self._function, list(), 4), dict())
+        
+    def testUnexpectedError(self):
+        """ Tests the handling of errors which are no persistence errors. """
+        
+        def _raiseError(_):
+            raise ValueError("")
+        self.assertRaises(ValueError, performConcurrently, _raiseError, range(10), 4)
+        self.assertRaises(ValueError, performConcurrently, _raiseError, range(10))
@@ -50,6 +50,18 @@ from datafinder.persistence.error import PersistenceError
 __version__ = "$Revision-Id:$" 
 
 
+class _CountingConnectionPool(ConnectionPool):
+    """ Creates distinct connections and counts them. """
+    
+    def __init__(self, maxConnectionNumber):
+        self.createdConnections = 0
+        ConnectionPool.__init__(self, maxConnectionNumber)
+        
+    def _createConnection(self):
+        self.createdConnections += 1
+        return object()
+
+
 class ConnectionPoolTestCase(unittest.TestCase):
     """ Implements the test cases. """
     
@@ -66,6 +78,19 @@ class ConnectionPoolTestCase(unittest.TestCase):
             connection = self._connectionPool.acquire()
             self._connectionPool.release(connection)
         self._connectionPool.reload()
+        
+    def testIdleConnectionReuse(self):
+        """ Ensures that idle connections are reused before new connections are created. """
+        
+        connectionPool = _CountingConnectionPool(3)
+        for _ in range(10):
+            connection = connectionPool.acquire()
+            connectionPool.release(connection)
+        self.assertEquals(connectionPool.createdConnections, 1)
+        
+        self.assertTrue(connectionPool.acquire() is connection)
+        self.assertFalse(connectionPool.acquire() is connection)
+        self.assertEquals(connectionPool.createdConnections, 2)
             
     def testEmptyConnectionPool(self):
         """ Test behavior when no connection is available. """
@@ -0,0 +1,133 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Implements the test cases of the SSH transport manager.
+"""
+
+
+import socket
+import unittest
+
+import mock
+
+from datafinder.persistence.common.connection import ssh
+from datafinder.persistence.error import PersistenceError
+
+
+__version__ = "$Revision-Id:$" 
+
+
+class SshTransportManagerTestCase(unittest.TestCase):
+    """ Implements test cases for the SSH transport manager. """
+    
+    def setUp(self):
+        """ Creates the instance under test. """
+        
+        self._transportClassPatcher = mock.patch.object(ssh, "Transport")
+        self._transportClass = self._transportClassPatcher.start()
+        self._transportClass.side_effect = lambda _: mock.Mock(window_size=65536)
+        self._transportManager = ssh.SshTransportManager()
+        
+    def tearDown(self):
+        """ Restores the transport class. """
+        
+        self._transportClassPatcher.stop()
+        
+    def testSharedTransport(self):
+        """ Tests that a transport is shared by host name, port and credentials. """
+        
+        transport = self._transportManager.acquire("host", 22, "user", "secret")
+        self.assertTrue(self._transportManager.acquire("host", 22, "user", "secret") is transport)
+        self.assertFalse(self._transportManager.acquire("host", 2222, "user", "secret") is transport)
+        self.assertFalse(self._transportManager.acquire("host", 22, "other", "secret") is transport)
+        self.assertFalse(self._transportManager.acquire("host", 22, "user", "other") is transport)
+        self.assertEquals(len(self._transportManager), 4)
+        self._transportClass.assert_any_call(("host", 2222))
+        
+        self._transportManager.release(transport)
+        self.assertFalse(transport.close.called)
+        self._transportManager.release(transport)
+        self.assertTrue(transport.close.called)
+        self.assertEquals(len(self._transportManager), 3)
+        
+    def testChannelLimit(self):
+        """ Tests that a further transport is established when the channel limit is reached. """
+        
+        transportManager = ssh.SshTransportManager(maxChannels=3)
+        transport = transportManager.acquire("host", 22, "user", "secret", channels=2)
+        self.assertTrue(transportManager.acquire("host", 22, "user", "secret") is transport)
+        newTransport = transportManager.acquire("host", 22, "user", "secret")
+        self.assertFalse(newTransport is transport)
+        self.assertEquals(len(transportManager), 2)
+        
+        transportManager.release(transport, 2)
+        self.assertFalse(transport.close.called)
+        self.assertTrue(transportManager.acquire("host", 22, "user", "secret", channels=2) is transport)
+        transportManager.release(transport)
+        transportManager.release(transport, 2)
+        self.assertTrue(transport.close.called)
+        self.assertEquals(len(transportManager), 1)
+        
+    def testInactiveTransport(self):
+        """ Tests that inactive transports are replaced. """
+        
+        transport = self._transportManager.acquire("host", 22, "user", "secret")
+        transport.is_active.return_value = False
+        newTransport = self._transportManager.acquire("host", 22, "user", "secret")
+        self.assertFalse(newTransport is transport)
+        
+        self._transportManager.release(transport)
+        self.assertTrue(transport.close.called)
+        self.assertFalse(newTransport.close.called)
+        self.assertEquals(len(self._transportManager), 1)
+        
+    def testWindowSize(self):
+        """ Tests that the larger window size is used for new channels. """
+        
+        transport = self._transportManager.acquire("host", 22, "user", "secret", 1024 * 1024)
+        self.assertEquals(transport.window_size, 1024 * 1024)
+        self._transportManager.acquire("host", 22, "user", "secret", 1024)
+        self.assertEquals(transport.window_size, 1024 * 1024)
+        
+    def testConnectionError(self):
+        """ Tests the error handling when the connection cannot be established. """
+        
+        self._transportClass.side_effect = socket.error("")
+        self.assertRaises(PersistenceError, self._transportManager.acquire, "host", 22, "user", "secret")
+        self.assertEquals(len(self._transportManager), 0)
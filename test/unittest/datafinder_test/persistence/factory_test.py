@@ -45,7 +45,8 @@ import decimal
 import re
 import unittest
 
-from datafinder.persistence.common.base_factory import BaseFileSystem
+from datafinder.persistence.adapters.metadata_index.factory import IndexFeedingFileSystem, IndexingFileSystem
+from datafinder.persistence.common.base_factory import BaseFileSystem, DEFAULT_BLOCK_SIZE
 from datafinder.persistence.error import PersistenceError
 from datafinder.persistence.factory import FileSystem
 from datafinder_test.mocks import SimpleMock
@@ -58,12 +59,17 @@ _UNSUPPORTED_URI_SCHEME = "unknown"
 _VALID_URI_SCHEME = "valid"
 _VALID_PRINCIPAL_SEARCH_SCHEME = "ldap"
 _VALID_SEARCH_SCHEME = "lucene+http"
+_VALID_INDEXING_SEARCH_SCHEME = "lucene+file"
 
 
 class _ConcreteFactoryMock(BaseFileSystem):
     
     def __init__(self, _):
         BaseFileSystem.__init__(self)
+        self.preparationCount = 0
+        
+    def prepareUsage(self):
+        self.preparationCount += 1
     
     def createDataStorer(self, _):
         mock = SimpleMock(True)
@@ -126,12 +132,39 @@ class _ConcreteSearcherFactoryMock(BaseFileSystem):
     
     def __init__(self, _):
         BaseFileSystem.__init__(self)
+        self.isReleased = False
     
     def createSearcher(self):
         class SearcherMock(object):
-            def search(self, _, __):
+            def search(self, _, __, ___):
                 return ["", ""]
         return SearcherMock()
+    
+    def release(self):
+        self.isReleased = True
+
+
+class _IndexerMock(object):
+    
+    def __init__(self):
+        self.updates = list()
+        self.isClosed = False
+        
+    def updateProperties(self, identifier, properties):
+        self.updates.append((identifier, properties))
+        
+    def close(self):
+        self.isClosed = True
+
+
+class _ConcreteIndexingSearcherFactoryMock(_ConcreteSearcherFactoryMock):
+    
+    def __init__(self, configuration):
+        _ConcreteSearcherFactoryMock.__init__(self, configuration)
+        self.indexer = _IndexerMock()
+        
+    def createIndexer(self):
+        return self.indexer
 
 
 def _createFactoryMock(_, uriScheme, configuration):
@@ -141,6 +174,8 @@ def _createFactoryMock(_, uriScheme, configuration):
         return _ConcretePrincipalSearcherFactoryMock(configuration)
     elif uriScheme == _VALID_SEARCH_SCHEME:
         return _ConcreteSearcherFactoryMock(configuration)
+    elif uriScheme == _VALID_INDEXING_SEARCH_SCHEME:
+        return _ConcreteIndexingSearcherFactoryMock(configuration)
     else:
         return _ConcreteFactoryMock(configuration)
 
@@ -172,8 +207,7 @@ class FileSystemTestCase(unittest.TestCase):
         self.assertRaises(PersistenceError, FileSystem, baseConf)
     
     def testValidInterfaceType(self):
-        baseConf = SimpleMock()
-        baseConf.uriScheme = _VALID_URI_SCHEME
+        baseConf = SimpleMock(uriScheme=_VALID_URI_SCHEME, metadataIndexPath=None)
         fileSystem = FileSystem(baseConf)
 
         fileStorer = fileSystem.createFileStorer("identifier")
@@ -190,13 +224,57 @@ class FileSystemTestCase(unittest.TestCase):
         self.assertEquals(fileSystem.isAccessible, True)
         
         self.assertEquals(len(fileSystem.searchPrincipal("pattern", "searchMode")), 0)
+        self.assertEquals(fileSystem.updateMetadata({"identifier": dict(), "/identifier2/": dict()}), dict())
+        self.assertEquals(fileSystem.readData(["identifier", "/identifier2/"]), ({"/identifier": True, "/identifier2": True}, dict()))
+        self.assertEquals(fileSystem.writeData({"identifier": None, "/identifier2/": None}), dict())
         fileSystem.updateCredentials(dict())
         fileSystem.updatePrincipalSearchCredentials(dict())
         fileSystem.release()
         
+    def testCreateFileStorer(self):
+        baseConf = SimpleMock(uriScheme=_VALID_URI_SCHEME, metadataIndexPath=None)
+        fileSystem = FileSystem(baseConf)
+        factory = fileSystem._factory
+        
+        fileStorer = fileSystem.createFileStorer("/identifier/")
+        fileSystem.createFileStorer("/identifier2")
+        self.assertEquals(fileStorer.identifier, "/identifier")
+        self.assertEquals(factory.preparationCount, 1)
+        self.assertEquals(fileStorer.dataStorer, fileStorer.dataStorer)
+        
+        fileSystem.updateCredentials(dict())
+        fileSystem.createFileStorer("/identifier")
+        self.assertEquals(factory.preparationCount, 2)
+        
+        fileSystem.release()
+        fileSystem.createFileStorer("/identifier")
+        self.assertEquals(factory.preparationCount, 3)
+        
+    def testMetadataIndex(self):
+        baseConf = SimpleMock(uriScheme=_VALID_URI_SCHEME, metadataIndexPath=":memory:")
+        fileSystem = FileSystem(baseConf)
+        self.assertTrue(isinstance(fileSystem._factory, IndexingFileSystem))
+        self.assertTrue(fileSystem.hasMetadataSearchSupport)
+        
+        fileSystem.updateMetadata({"/identifier": {"name": u"value"}})
+        result = list(fileSystem.search([("name", "=", u"value")], fileSystem.createFileStorer("/")))
+        self.assertEquals([fileStorer.identifier for fileStorer in result], ["/identifier"])
+        fileSystem.release()
+        
+        self.assertFalse(isinstance(FileSystem(SimpleMock(uriScheme=_VALID_URI_SCHEME, 
+                                                          metadataIndexPath=None))._factory, IndexingFileSystem))
+        
+    def testBlockSize(self):
+        self.assertEquals(FileSystem().blockSize, DEFAULT_BLOCK_SIZE)
+        
+        baseConf = SimpleMock(uriScheme=_VALID_URI_SCHEME, blockSize=None, metadataIndexPath=None)
+        self.assertEquals(FileSystem(baseConf).blockSize, DEFAULT_BLOCK_SIZE)
+        
+        baseConf.blockSize = 1024
+        self.assertEquals(FileSystem(baseConf).blockSize, 1024)
+        
     def testDifferentPrincipalSearch(self):
-        baseConf = SimpleMock()
-        baseConf.uriScheme = _VALID_URI_SCHEME
+        baseConf = SimpleMock(uriScheme=_VALID_URI_SCHEME, metadataIndexPath=None)
         principalSearchBaseConf = SimpleMock()
         principalSearchBaseConf.uriScheme = _VALID_PRINCIPAL_SEARCH_SCHEME
         fileSystem = FileSystem(baseConf, principalSearchBaseConf)
@@ -204,8 +282,7 @@ class FileSystemTestCase(unittest.TestCase):
         self.assertEquals(len(fileSystem.searchPrincipal("pattern", "searchMode")), 2)
         
     def testDifferentPrincipalSearchFallback(self):
-        baseConf = SimpleMock()
-        baseConf.uriScheme = _VALID_URI_SCHEME
+        baseConf = SimpleMock(uriScheme=_VALID_URI_SCHEME, metadataIndexPath=None)
         principalSearchBaseConf = SimpleMock()
         principalSearchBaseConf.uriScheme = "invalid_principal_scheme"
         fileSystem = FileSystem(baseConf, principalSearchBaseConf)
@@ -213,19 +290,33 @@ class FileSystemTestCase(unittest.TestCase):
         self.assertEquals(len(fileSystem.searchPrincipal("pattern", "searchMode")), 0)
         
     def testDifferentSearch(self):
-        baseConf = SimpleMock()
-        baseConf.uriScheme = _VALID_URI_SCHEME
+        baseConf = SimpleMock(uriScheme=_VALID_URI_SCHEME, metadataIndexPath=None)
         searchBaseConf = SimpleMock()
         searchBaseConf.uriScheme = _VALID_SEARCH_SCHEME
         fileSystem = FileSystem(baseConf, baseSearchConfiguration=searchBaseConf)
         
-        self.assertEquals(len(fileSystem.search("*", "/")), 2)
+        self.assertEquals(len(list(fileSystem.search("*", "/"))), 2)
+        self.assertEquals(len(list(fileSystem.search("*", "/", 1))), 1)
+        fileSystem.release()
+        self.assertTrue(fileSystem._searchFactory.isReleased)
+        
+    def testSearchIndexFeeding(self):
+        baseConf = SimpleMock(uriScheme=_VALID_URI_SCHEME, metadataIndexPath=None)
+        searchBaseConf = SimpleMock(uriScheme=_VALID_INDEXING_SEARCH_SCHEME)
+        fileSystem = FileSystem(baseConf, baseSearchConfiguration=searchBaseConf)
+        self.assertTrue(isinstance(fileSystem._factory, IndexFeedingFileSystem))
+        
+        fileSystem.updateMetadata({"/identifier": {"name": u"value"}})
+        indexer = fileSystem._searchFactory.indexer
+        self.assertEquals(indexer.updates, [("/identifier", {"name": u"value"})])
+        self.assertEquals(len(list(fileSystem.search("*", "/"))), 2)
+        fileSystem.release()
+        self.assertTrue(indexer.isClosed)
         
     def testDifferentSearchFallback(self):
-        baseConf = SimpleMock()
-        baseConf.uriScheme = _VALID_URI_SCHEME
+        baseConf = SimpleMock(uriScheme=_VALID_URI_SCHEME, metadataIndexPath=None)
         searchBaseConf = SimpleMock()
         searchBaseConf.uriScheme = "invalid_search_interface"
         fileSystem = FileSystem(baseConf, baseSearchConfiguration=searchBaseConf)
         
-        self.assertEquals(len(fileSystem.search("*", "/")), 0)
+        self.assertEquals(len(list(fileSystem.search("*", "/"))), 0)
@@ -45,7 +45,7 @@ from StringIO import StringIO
 
 from datafinder.persistence.factory import FileSystem
 from datafinder.persistence import filestorer
-from datafinder.persistence.data.datastorer import NullDataStorer
+from datafinder.persistence.data.datastorer import NullDataStorer, ITEM_TYPE_LEAF
 from datafinder.persistence.error import PersistenceError
 from datafinder.persistence.metadata.metadatastorer import NullMetadataStorer
 from datafinder.persistence.privileges.privilegestorer import NullPrivilegeStorer
@@ -106,6 +106,27 @@ class FileStorerTestCase(unittest.TestCase):
         self.assertEquals(self._fileStorer.retrievePrivileges(), self._privilegeStorer.retrievePrivileges())
         self.assertEquals(self._fileStorer.retrieveAcl(), self._privilegeStorer.retrieveAcl())
 
+    def testListedItemType(self):
+        """ Ensures that the item types known from the listing are passed to the child file storers. """
+        
+        dataStorer = SimpleMock(methodNameResultMap={"getTypedChildren": ([("/a", ITEM_TYPE_LEAF), ("/b", None)], None)})
+        fileStorer = filestorer.FileStorer(self._nullFileSystem, "/", dataStorer)
+        
+        self.assertEquals([child.itemType for child in fileStorer.getChildren()], [ITEM_TYPE_LEAF, None])
+        self.assertEquals(self._fileStorer.itemType, None)
+
+    def testLazyStorerCreation(self):
+        """ Ensures that the storers are created on first access only. """
+        
+        storerFactory = SimpleMock(methodNameResultMap={"createDataStorer": (self._dataStorer, None),
+                                                        "createMetadataStorer": (self._metadataStorer, None),
+                                                        "createPrivilegeStorer": (self._privilegeStorer, None)})
+        fileStorer = filestorer.FileStorer(self._nullFileSystem, "/identifier", storerFactory=storerFactory)
+        self.assertEquals(fileStorer.isCollection, self._dataStorer.isCollection)
+        self.assertEquals(fileStorer.dataStorer, self._dataStorer)
+        self.assertEquals(fileStorer.metadataStorer, self._metadataStorer)
+        self.assertEquals(fileStorer.privilegeStorer, self._privilegeStorer)
+        
     def testGetTemporaryFileObject(self):
         """ Tests the creation of the temporary file object. """
         
@@ -0,0 +1,94 @@
+# $Filename$ 
+# $Authors$
+# Last Changed: $Date$ $Committer$ $Revision-Id$
+#
+# Copyright (c) 2003-2011, German Aerospace Center (DLR)
+# All rights reserved.
+#
+#
+#Redistribution and use in source and binary forms, with or without
+#modification, are permitted provided that the following conditions are
+#met:
+#
+# * Redistributions of source code must retain the above copyright 
+#   notice, this list of conditions and the following disclaimer. 
+#
+# * Redistributions in binary form must reproduce the above copyright 
+#   notice, this list of conditions and the following disclaimer in the 
+#   documentation and/or other materials provided with the 
+#   distribution. 
+#
+# * Neither the name of the German Aerospace Center nor the names of
+#   its contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+#LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR 
+#A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+#OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+#SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+#LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+#DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+#THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+#(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.  
+
+
+
+""" 
+Tests the caching of mapped search restrictions.
+"""
+
+
+import unittest
+
+from datafinder.persistence.search.restriction_cache import RestrictionMappingCache
+
+
+__version__ = "$Revision-Id:$" 
+
+
+class RestrictionMappingCacheTestCase(unittest.TestCase):
+    """ Tests the caching of mapped search restrictions. """
+    
+    def setUp(self):
+        """ Creates the object under test. """
+        
+        self._mappedRestrictions = list()
+        self._cache = RestrictionMappingCache(self._map, 2)
+        
+    def _map(self, restrictions):
+        self._mappedRestrictions.append(restrictions)
+        return str(restrictions)
+        
+    def testMap(self):
+        """ Ensures that restrictions are mapped once. """
+        
+        restrictions = [("a", "=", "b")]
+        self.assertEquals(self._cache.map(restrictions), str(restrictions))
+        self.assertEquals(self._cache.map(restrictions), str(restrictions))
+        self.assertEquals(len(self._mappedRestrictions), 1)
+        
+        self.assertEquals(self._cache.map([("a", "=", "b")]), str(restrictions))
+        self.assertEquals(len(self._mappedRestrictions), 2)
+        
+    def testFullCache(self):
+        """ Ensures that the cache is cleared when it is full. """
+        
+        restrictions = [("a", "=", "b")]
+        self._cache.map(restrictions)
+        self._cache.map([("c", "=", "d")])
+        self._cache.map([("e", "=", "f")])
+        self._cache.map(restrictions)
+        self.assertEquals(len(self._mappedRestrictions), 4)
+        
+    def testMappingError(self):
+        """ Ensures that errors are passed and nothing is cached. """
+        
+        cache = RestrictionMappingCache(self._raiseError)
+        self.assertRaises(AssertionError, cache.map, list())
+        
+    @staticmethod
+    def _raiseError(_):
+        raise AssertionError()
@@ -42,7 +42,7 @@ Test case for the item support module.
 
 import unittest
 
-from datafinder.core.error import ItemError
+from datafinder.core.error import CoreError, ItemError
 from datafinder.script_api.error import ItemSupportError
 from datafinder.script_api.item import item_support
 from datafinder_test.mocks import SimpleMock
@@ -148,10 +148,14 @@ class ItemSupportTestCase(unittest.TestCase):
     def testSearch(self):
         """ Test for the search method. """
         
-        self._itemMock.value = list()
-        item_support.search("", "")
+        self._repositoryMock.value = [SimpleMock(path="/test"), SimpleMock(path="/test2")]
+        self.assertEquals(item_support.search("", ""), ["/test", "/test2"])
+        self.assertEquals(list(item_support.iterSearch("", "", 2)), ["/test", "/test2"])
 
-        self._itemMock.error = ItemError("")
+        self._repositoryMock.methodNameResultMap = {"search": (None, CoreError(""))}
+        self.assertRaises(ItemSupportError, item_support.search, "", "")
+        
+        self._repositoryMock.error = ItemError("")
         self.assertRaises(ItemSupportError, item_support.search, "", "")
 
     def testWalk(self):
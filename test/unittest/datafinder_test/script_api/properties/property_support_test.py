@@ -46,8 +46,14 @@ Test case for the property support module.
 import unittest
 
 from datafinder.core.configuration.properties.registry import PropertyDefinitionRegistry
-from datafinder.core.configuration.properties.property_definition import PropertyDefinitionFactory
+from datafinder.core.configuration.properties.property_definition import PropertyDefinition, \
+                                                                         PropertyDefinitionFactory
 from datafinder.core.error import ItemError
+from datafinder.core.item.leaf import ItemLeaf
+from datafinder.core.item.privileges.privilege import ALL_PRIVILEGE
+from datafinder.core.item.property import Property
+from datafinder.core.repository import Repository
+from datafinder.persistence.error import PersistenceError
 from datafinder.script_api import error
 from datafinder.script_api.properties import constants as const
 from datafinder.script_api.properties import property_support as prop_supp
@@ -62,7 +68,7 @@ class _PropertyMock(object):
     def __init__(self, identifier="", value=""):
         self.identifier = identifier
         self.value = value
-        self.propertyDefinition = SimpleMock(category="user")
+        self.propertyDefinition = SimpleMock(identifier=identifier, category="user")
 
 
 class _ItemMock(object):
@@ -97,7 +103,11 @@ class _RepositoryMock(object):
     
     def createProperty(self, propId, value):
         propDef = self.propRegistry.getPropertyDefinition(propId)
-        prop = _PropertyMock(propId, value)
+        return self.createPropertyFromDefinition(propDef, value)
+    
+    @staticmethod
+    def createPropertyFromDefinition(propDef, value):
+        prop = _PropertyMock(propDef.identifier, value)
         prop.propertyDefinition = propDef
         return prop
     
@@ -106,6 +116,15 @@ class _RepositoryMock(object):
             raise ItemError("")
         return self.itemMock
     
+    def updateProperties(self, itemProperties):
+        failedItems = dict()
+        for item, properties in itemProperties:
+            try:
+                item.updateProperties(properties)
+            except ItemError:
+                failedItems[item.path] = ""
+        return failedItems
+    
     @property
     def configuration(self):
         return SimpleMock(
@@ -154,6 +173,33 @@ class PropertySupportTestCase(unittest.TestCase):
         self._repositoryMock.error = True
         self.assertRaises(error.ItemSupportError, prop_supp.storeProperties, "/item", dict())
 
+    def testStoreMultipleProperties(self):
+        # Success
+        self._itemMock.properties = {"name": _PropertyMock("name", "AnotherName")}
+        properties = {"name": "TheName", "price": 120}
+        self.assertEquals(prop_supp.storeMultipleProperties({"/item": properties}), dict())
+        self.assertEquals(prop_supp.retrieveProperties("/item"), properties)
+        
+        # System-specific properties cannot be changed
+        self.assertEquals(prop_supp.storeMultipleProperties({"/item": {const.SIZE_ID: 10}}).keys(), 
+                          ["/item"])
+        self.assertEquals(prop_supp.retrieveProperties("/item"), properties)
+        
+        # Cannot store them
+        self._itemMock.error = True
+        self.assertEquals(prop_supp.storeMultipleProperties({"/item": dict()}).keys(), [""])
+        
+        # Cannot find item
+        self._repositoryMock.error = True
+        self.assertEquals(prop_supp.storeMultipleProperties({"/item": dict()}).keys(), ["/item"])
+
+    def testStoreMultiplePropertiesDoesNotChangeItems(self):
+        originalProperty = _PropertyMock("name", "AnotherName")
+        self._itemMock.properties = {"name": originalProperty}
+        self._itemMock.error = True
+        prop_supp.storeMultipleProperties({"/item": {"name": "TheName"}})
+        self.assertEquals(originalProperty.value, "AnotherName")
+
     def testDeleteProperties(self):
         # Success
         prop_supp.deleteProperties("/item", ["name", "price"])
@@ -224,3 +270,37 @@ class PropertySupportTestCase(unittest.TestCase):
         self._propRegistry._propertyDefinitionFactory.propertyIdValidator = lambda _: (False, 0)
         self.assertRaises(error.PropertySupportError, prop_supp.registerPropertyDefinition, 
                           "id", StringType())
+
+
+class StoreMultiplePropertiesTestCase(unittest.TestCase):
+    """ Tests the bulk property update using the repository implementation. """
+    
+    def setUp(self):
+        self._fileSystem = SimpleMock(methodNameResultMap={"createFileStorer": (SimpleMock(list(), identifier="/"), None)})
+        repository = Repository(self._fileSystem, SimpleMock(preferences=None), SimpleMock())
+        self._propertyDefinition = PropertyDefinition("name")
+        self._items = dict()
+        for name in ["a", "b"]:
+            item = ItemLeaf(name)
+            item.parent = repository.root
+            item._privileges = [ALL_PRIVILEGE]
+            item._properties = {"name": Property(self._propertyDefinition, "old")}
+            item._capabilities = SimpleMock(canStoreProperties=True)
+            item.itemFactory = SimpleMock(SimpleMock(canStoreProperties=True))
+            self._items[item.path] = item
+        repository.getItem = self._getItem
+        prop_supp.repositoryManagerInstance = SimpleMock(workingRepository=repository)
+        
+    def _getItem(self, path):
+        try:
+            return self._items[path]
+        except KeyError:
+            raise ItemError("")
+        
+    def testResetFailedItems(self):
+        self._fileSystem.methodNameResultMap["updateMetadata"] = ({"/b": PersistenceError("Failed.")}, None)
+        failedItems = prop_supp.storeMultipleProperties(
+            {"/a": {"name": "new"}, "/b": {"name": "new"}, "/unknown": {"name": "new"}})
+        self.assertEquals(sorted(failedItems.keys()), ["/b", "/unknown"])
+        self.assertEquals(prop_supp.retrieveProperties("/a"), {"name": "new"})
+        self.assertEquals(prop_supp.retrieveProperties("/b"), {"name": "old"})